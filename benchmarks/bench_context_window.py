@@ -0,0 +1,132 @@
+"""
+上下文窗口压测
+
+模拟长会话：每轮以完整对话历史调用 Fake LLM（以 prompt 的 token 数模拟输入长度对首 token 的影响），
+回答计入历史。对比：
+- full: 原行为，全部历史原样发送
+- trim: reasoning.context_window.ContextWindow 按预算丢弃更早的轮次
+- summary: 同上，丢弃的轮次由 LlmSummarizer 在后台生成摘要，缓存后复用
+
+统计每轮 prompt token（最大值 / 最后一轮 / 合计）、首 token 延迟、被裁剪的轮次数、
+摘要调用次数与使用了摘要的轮次数，以及 fit 本身的耗时。
+
+Usage:
+    python benchmarks/bench_context_window.py --turns 60 --budget 2000
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import LatencyDistribution
+from src.reasoning.llm.base import LlmConfig
+from src.reasoning.llm.fake import FakeLlmService
+from src.reasoning.context_window import ContextWindow, LlmSummarizer, SUMMARY_PREFIX
+from src.orchestrator.conversation import ConversationLog
+from src.server.grpc.servicer import _convert_messages
+
+MODES = ('full', 'trim', 'summary')
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+async def run(mode: str, args) -> dict:
+    llm = FakeLlmService(
+        ttft=LatencyDistribution(args.llm_ttft_ms, 0),
+        token_gap=LatencyDistribution(0, 0),
+        tokens=args.answer_tokens,
+    )
+    summarizer_llm = FakeLlmService(ttft=LatencyDistribution(10, 0), token_gap=LatencyDistribution(0, 0), tokens=60)
+    summary_calls = 0
+
+    async def summarize(previous, messages):
+        nonlocal summary_calls
+        summary_calls += 1
+        return await LlmSummarizer(summarizer_llm, model="fake-summary")(previous, messages)
+
+    window = None
+    if mode != 'full':
+        window = ContextWindow(
+            args.budget, count=llm.count_tokens_batch,
+            summarizer=summarize if mode == 'summary' else None, name=f"bench-{mode}"
+        )
+
+    system = {"role": "system", "content": "你是一个耐心的旅行助手。" * 5}
+    history = ConversationLog()
+    prompt_tokens, ttfts, fit_us = [], [], []
+    trimmed_turns = summarized_turns = 0
+    for turn in range(args.turns):
+        question = f"第{turn}个问题：" + "请帮我规划一下行程安排" * args.question_repeat
+        messages = [system, *history.view(), {"role": "user", "content": question}]
+        if window:
+            begin = time.perf_counter()
+            fitted = window.fit(messages)
+            fit_us.append((time.perf_counter() - begin) * 1e6)
+            trimmed_turns += fitted is not messages
+            messages = fitted
+            summarized_turns += any(m["content"].startswith(SUMMARY_PREFIX) for m in messages)
+        typed = _convert_messages(messages)
+        tokens = llm.count_tokens(typed)
+        prompt_tokens.append(tokens)
+        # 输入越长首 token 越慢：每 1000 token 额外 --prefill-ms
+        await asyncio.sleep(tokens / 1000 * args.prefill_ms / 1000)
+        begin = time.monotonic()
+        answer = ""
+        async for chunk in llm.chat_stream(typed, LlmConfig(model="fake-model")):
+            if not answer:
+                ttfts.append((time.monotonic() - begin) * 1000 + tokens / 1000 * args.prefill_ms)
+            answer += chunk.delta
+        history.append("user", question)
+        history.append("assistant", answer)
+        await asyncio.sleep(0.02)    # 轮间间隔，让后台摘要完成
+
+    return {
+        'mode': mode,
+        'max_prompt_tokens': max(prompt_tokens),
+        'last_prompt_tokens': prompt_tokens[-1],
+        'total_prompt_tokens': sum(prompt_tokens),
+        'ttft_p95_ms': round(percentile(ttfts, 95), 1),
+        'trimmed_turns': trimmed_turns,
+        'summary_calls': summary_calls,
+        'summarized_turns': summarized_turns,
+        'fit_p95_us': round(percentile(fit_us, 95), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=60)
+    parser.add_argument('--budget', type=int, default=2000, help='输入 token 预算')
+    parser.add_argument('--question-repeat', type=int, default=4)
+    parser.add_argument('--answer-tokens', type=int, default=80)
+    parser.add_argument('--llm-ttft-ms', type=float, default=5)
+    parser.add_argument('--prefill-ms', type=float, default=20, help='每 1000 输入 token 增加的首 token 延迟')
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(mode, args)) for mode in MODES]
+    print(json.dumps(results, indent=2))
+
+    full, trim, summary = results
+    ok = (full['max_prompt_tokens'] > args.budget
+          and trim['max_prompt_tokens'] <= args.budget
+          and summary['max_prompt_tokens'] <= args.budget
+          and trim['total_prompt_tokens'] < full['total_prompt_tokens'] / 2
+          and trim['ttft_p95_ms'] < full['ttft_p95_ms']
+          and summary['summarized_turns'] >= summary['trimmed_turns'] * 0.8
+          and 0 < summary['summary_calls'] <= summary['trimmed_turns'] / 2 + 1)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
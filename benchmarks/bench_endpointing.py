@@ -0,0 +1,219 @@
+"""
+本地断句压测
+
+合成多轮对话音频（16kHz 单声道 int16）：每轮若干语音段，段间为句中停顿（--pause-ms 均值），
+说完后静音 --gap-ms 再开始下一轮。模拟 Provider 按真实音频推进：语音期间每 100ms 一条逐步增长的
+中间结果，句尾静音达到 --silence-ms（max_sentence_silence）后经 --finalize-ms 定稿输出最终结果；
+Provider 不支持 flush，本地断句走 SttService 默认的合成最终结果。对比：
+- off: 只依赖 Provider 断句（原行为）
+- on: orchestrator.endpointing.Endpointer 按 VAD 静音、中间结果稳定与标点提前断句
+
+统计说完（最后一个语音帧）到该轮最终结果的延迟、最终结果拼接后是否与原文一致（不丢字、不重复）、
+过早断句比例与自适应后的静音阈值。时间按 --speed 压缩回放，输出的毫秒数已换算回真实时间。
+
+Usage:
+    python benchmarks/bench_endpointing.py --turns 12 --pause-ms 250 --initial-ms 500
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+import numpy as np
+
+from src.perception.stt.base import SttService, SttResult
+from src.perception.stt.stabilizer import normalize_text
+from src.orchestrator.endpointing import Endpointer
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 100
+_CHARS = "请帮我查询明天上海到北京的航班并且预订靠窗座位谢谢"
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def synthesize(args):
+    """返回 (pcm, 逐 100ms 分块的 [(轮次, 该轮已揭示文本 | None)], 每轮原文, 每轮说完所在分块)"""
+    rng = np.random.default_rng(args.seed)
+    chunk = SAMPLE_RATE * CHUNK_MS // 1000
+    audio, marks, texts, speech_end = [], [], [], []
+
+    def silence(ms, turn):
+        n = int(ms) // CHUNK_MS
+        audio.append(rng.normal(0, 32768 * 10 ** (-65 / 20), n * chunk))
+        marks.extend([(turn, None)] * n)
+
+    silence(500, -1)
+    for turn in range(args.turns):
+        segments = int(rng.integers(2, 5))
+        words = ["".join(rng.choice(list(_CHARS), int(rng.integers(3, 7)))) for _ in range(segments)]
+        texts.append("".join(words))
+        spoken = ""
+        for s, word in enumerate(words):
+            n = int(rng.integers(6, 13))          # 语音段 600 ~ 1200ms
+            t = np.arange(n * chunk) / SAMPLE_RATE
+            f0 = rng.uniform(100, 250)
+            voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+            level = 32768 * 10 ** (rng.uniform(-25, -15) / 20)
+            audio.append(level * voiced / 2)
+            for i in range(n):
+                marks.append((turn, spoken + word[:max(1, len(word) * (i + 1) // n)]))
+            spoken += word
+            if s < segments - 1:
+                silence(max(CHUNK_MS, rng.normal(args.pause_ms, args.pause_ms * 0.2)), turn)
+        speech_end.append(len(marks) - 1)
+        silence(args.gap_ms, turn)
+
+    pcm = np.clip(np.concatenate(audio), -32768, 32767).astype(np.int16)
+    return pcm.tobytes(), marks, texts, speech_end
+
+
+class SimulatedStt(SttService):
+    """按合成音频的真实标注输出识别结果的 Provider（不支持 flush）"""
+
+    def __init__(self, args):
+        super().__init__()
+        self.args = args
+        self._silence_ms = 0
+        self._sentence = ""            # 当前句已识别文本
+        self._sentence_start = 0
+        self._audio_ms = 0
+
+    @property
+    def provider_name(self) -> str:
+        return "simulated"
+
+    async def start_session(self, session_id, config):
+        pass
+
+    async def stop_session(self):
+        pass
+
+    async def send_audio(self, audio_chunk):
+        pass
+
+    def advance(self, revealed):
+        """推进 100ms 音频；revealed 为该轮截至当前的文本（静音时为 None）"""
+        self._audio_ms += CHUNK_MS
+        if revealed is not None:
+            if not self._sentence:
+                self._sentence_start = self._audio_ms
+            self._silence_ms = 0
+            self._sentence = revealed
+            self._emit_partial(self._result(self._sentence, is_final=False))
+            return
+        if not self._sentence:
+            return
+        self._silence_ms += CHUNK_MS
+        if self._silence_ms >= self.args.silence_ms:
+            final = self._result(self._sentence + "。", is_final=True)
+            self._sentence = ""
+            asyncio.get_running_loop().call_later(
+                self.args.finalize_ms * self.args.speed / 1000, self._emit_final, final
+            )
+
+    def _result(self, text, is_final):
+        return SttResult(text=text, is_final=is_final, start_time_ms=self._sentence_start,
+                         end_time_ms=self._audio_ms)
+
+
+async def run(mode, pcm, marks, texts, speech_end, args):
+    s = args.speed
+    stt = SimulatedStt(args)
+    finals = []           # (墙钟时间, 文本)
+    endpointer = None
+    if mode == 'on':
+        endpointer = Endpointer(
+            stt.flush, sample_rate=SAMPLE_RATE, initial_silence_ms=args.initial_ms,
+            provider_silence_ms=args.silence_ms, stable_ms=args.stable_ms * s, name="bench"
+        )
+
+    def on_partial(result):
+        if endpointer:
+            endpointer.observe_partial(result.text)
+
+    def on_final(result):
+        if endpointer:
+            endpointer.observe_final(result.text)
+        finals.append((time.monotonic(), result.text))
+
+    stt.on_partial(on_partial)
+    stt.on_final(on_final)
+
+    chunk = SAMPLE_RATE * 2 * CHUNK_MS // 1000
+    end_wall = {}
+    for i, (turn, revealed) in enumerate(marks):
+        await asyncio.sleep(CHUNK_MS * s / 1000)
+        stt.advance(revealed)
+        if endpointer:
+            await endpointer.push_audio(pcm[i * chunk:(i + 1) * chunk])
+        if turn >= 0 and i == speech_end[turn]:
+            end_wall[turn] = time.monotonic()
+    await asyncio.sleep((args.silence_ms + args.finalize_ms) * s / 1000 + 0.05)
+
+    # 每轮的最终结果：说完之后第一条覆盖到该轮末尾的最终结果
+    latencies = []
+    joined = ""
+    target = ""
+    cursor = 0
+    for turn, text in enumerate(texts):
+        target += text
+        while cursor < len(finals) and len(normalize_text(joined)) < len(target):
+            at, final = finals[cursor]
+            joined += final
+            cursor += 1
+            if len(normalize_text(joined)) >= len(target) and turn in end_wall:
+                latencies.append((at - end_wall[turn]) * 1000 / s)
+    stats = None
+    if endpointer:
+        endpointer.close()
+        stats = endpointer.stats.to_dict()
+
+    return {
+        'mode': mode,
+        'finals': len(finals),
+        'end_to_final_p50_ms': round(percentile(latencies, 50), 1),
+        'end_to_final_p95_ms': round(percentile(latencies, 95), 1),
+        'text_intact': normalize_text("".join(text for _, text in finals)) == "".join(texts),
+        'stats': stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=12)
+    parser.add_argument('--pause-ms', type=float, default=250, help='句中停顿均值')
+    parser.add_argument('--gap-ms', type=int, default=1500, help='轮间静音')
+    parser.add_argument('--silence-ms', type=int, default=800, help='Provider 断句静音（max_sentence_silence）')
+    parser.add_argument('--finalize-ms', type=int, default=150, help='静音结束到最终结果的定稿延迟')
+    parser.add_argument('--initial-ms', type=float, default=500, help='本地断句初始静音阈值')
+    parser.add_argument('--stable-ms', type=float, default=200, help='中间结果最短稳定时长')
+    parser.add_argument('--speed', type=float, default=0.2, help='时间压缩系数（0.2 表示 5 倍速回放）')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    pcm, marks, texts, speech_end = synthesize(args)
+    results = [asyncio.run(run(mode, pcm, marks, texts, speech_end, args)) for mode in ('off', 'on')]
+    print(json.dumps(results, indent=2))
+
+    off, on = results
+    ok = (off['text_intact'] and on['text_intact']
+          and on['stats']['endpoints'] > 0
+          and on['stats']['premature_ratio'] <= 0.25
+          and on['end_to_final_p50_ms'] < off['end_to_final_p50_ms'] - 200)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,412 @@
+"""
+gRPC 端到端压测
+
+在进程内启动 gRPC 服务（或连接 --target 指定的服务），使用 fake STT / LLM Provider，
+通过真实的 grpc.aio 通道并发驱动 ProcessStream / StreamSTT / StreamChat / Process，统计：
+- ready_ms:            打开流到收到就绪帧
+- final_to_delta_ms:   STT 最终结果到对应回答的第一个 LLM 增量（ProcessStream）
+- ttft_ms:             发出请求到第一个 LLM 增量（StreamChat）
+- completion_ms:       结束音频（或发出请求）到完成帧
+以及吞吐（会话/秒）、错误数、CPU 利用率与 RSS。指定 --output 时结果写入 JSON 文件，便于在提交之间对比。
+
+进程内模式下 CPU / RSS 同时包含客户端与服务端；连接外部服务时只反映客户端，
+且 fake Provider 的时间参数需在服务端通过 FAKE_* 环境变量配置。
+每个会话使用不同的 system_prompt，避免请求合并 / 缓存掩盖真实负载。
+
+Usage:
+    python benchmarks/bench_grpc_load.py --scenario all --sessions 200 --concurrency 50 \\
+        --audio-seconds 4 --realtime 1.0 --output /tmp/bench_grpc_load.json
+    python benchmarks/bench_grpc_load.py --compare before.json after.json
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import resource
+import subprocess
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+SCENARIOS = ('process_stream', 'stream_stt', 'stream_chat', 'process')
+SAMPLE_RATE = 16000
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def summarize(values) -> dict:
+    return {
+        'count': len(values),
+        'p50': round(percentile(values, 50), 1),
+        'p95': round(percentile(values, 95), 1),
+        'p99': round(percentile(values, 99), 1),
+        'max': round(max(values, default=0.0), 1),
+    }
+
+
+def rss_mb() -> float:
+    """当前常驻内存（MB）"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Recorder:
+    """单个场景的采样"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = 0
+        self.completed = 0
+
+    def add(self, name: str, started: float) -> None:
+        self.samples.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+
+
+def audio_chunks(args):
+    chunk = bytes(SAMPLE_RATE * 2 * args.chunk_ms // 1000)
+    count = max(1, int(args.audio_seconds * 1000 / args.chunk_ms))
+    return chunk, count
+
+
+async def pace(args) -> None:
+    """按音频速率发送：realtime=1 为实时，0 为不限速"""
+    if args.realtime > 0:
+        await asyncio.sleep(args.chunk_ms / 1000 / args.realtime)
+
+
+# ---------- 场景 ----------
+
+async def process_stream_session(stub, args, rec: Recorder, index: int) -> None:
+    from src.server.grpc.generated import multimodal_pb2 as pb
+
+    call = stub.ProcessStream()
+    opened = time.perf_counter()
+    ready = asyncio.Event()
+    end_sent = None
+
+    async def writer():
+        nonlocal end_sent
+        await call.write(pb.MultiModalStreamRequest(start=pb.StreamStartFrame(
+            session_id=f"bench_{uuid.uuid4().hex[:12]}",
+            config=pb.ProcessingConfig(
+                stt_provider=args.stt_provider, llm_provider=args.llm_provider,
+                llm_model="fake-model", system_prompt=f"bench session {index}",
+                speculative_stable_ms=args.speculative_stable_ms,
+            ),
+        )))
+        await ready.wait()
+        chunk, count = audio_chunks(args)
+        for seq in range(count):
+            await call.write(pb.MultiModalStreamRequest(audio=pb.StreamAudioFrame(data=chunk, sequence=seq)))
+            await pace(args)
+        end_sent = time.perf_counter()
+        await call.write(pb.MultiModalStreamRequest(
+            control=pb.StreamControlFrame(command=pb.StreamControlFrame.END_AUDIO)
+        ))
+        await call.done_writing()
+
+    writer_task = asyncio.create_task(writer())
+    finals = deque()      # 尚未开始回答的 STT 最终结果时间
+    answering = False
+    try:
+        async for resp in call:
+            frame = resp.WhichOneof('frame')
+            if frame == 'ready':
+                rec.add('ready_ms', opened)
+                ready.set()
+            elif frame == 'stt' and resp.stt.is_final:
+                finals.append(time.perf_counter())
+            elif frame == 'llm' and not answering:
+                answering = True
+                if finals:
+                    rec.add('final_to_delta_ms', finals.popleft())
+            elif frame == 'complete':
+                if resp.complete.finish_reason == 'stop':
+                    rec.add('completion_ms', end_sent)
+                    rec.completed += 1
+                    break
+                answering = False
+            elif frame == 'error':
+                rec.errors += 1
+    finally:
+        ready.set()
+        writer_task.cancel()
+        call.cancel()
+
+
+async def stream_stt_session(stub, args, rec: Recorder, index: int) -> None:
+    from src.server.grpc.generated import stt_pb2 as pb
+
+    call = stub.StreamSTT()
+    opened = time.perf_counter()
+    ready = asyncio.Event()
+    end_sent = None
+
+    async def writer():
+        nonlocal end_sent
+        await call.write(pb.SttRequest(config=pb.SttConfig(
+            session_id=f"bench_{uuid.uuid4().hex[:12]}",
+            provider=args.stt_provider, sample_rate=SAMPLE_RATE,
+        )))
+        await ready.wait()
+        chunk, count = audio_chunks(args)
+        for seq in range(count):
+            await call.write(pb.SttRequest(audio=pb.AudioFrame(data=chunk, sequence=seq)))
+            await pace(args)
+        end_sent = time.perf_counter()
+        await call.write(pb.SttRequest(control=pb.SttControl(command=pb.SttControl.END)))
+        await call.done_writing()
+
+    writer_task = asyncio.create_task(writer())
+    try:
+        async for resp in call:
+            kind = resp.WhichOneof('response_type')
+            if kind == 'ready':
+                rec.add('ready_ms', opened)
+                ready.set()
+            elif kind == 'complete':
+                rec.add('completion_ms', end_sent)
+                rec.completed += 1
+                break
+            elif kind == 'error':
+                rec.errors += 1
+    finally:
+        ready.set()
+        writer_task.cancel()
+        call.cancel()
+
+
+async def stream_chat_session(stub, args, rec: Recorder, index: int) -> None:
+    from src.server.grpc.generated import llm_pb2 as pb
+
+    started = time.perf_counter()
+    first = True
+    async for resp in stub.StreamChat(pb.ChatRequest(
+        provider=args.llm_provider, model="fake-model",
+        messages=[pb.ChatMessage(role="user", content=f"bench question {index}")],
+    )):
+        kind = resp.WhichOneof('response_type')
+        if kind == 'delta' and first:
+            first = False
+            rec.add('ttft_ms', started)
+        elif kind == 'complete':
+            rec.add('completion_ms', started)
+            rec.completed += 1
+        elif kind == 'error':
+            rec.errors += 1
+
+
+async def process_session(stub, args, rec: Recorder, index: int) -> None:
+    from src.server.grpc.generated import multimodal_pb2 as pb
+
+    chunk, count = audio_chunks(args)
+    started = time.perf_counter()
+    resp = await stub.Process(pb.MultiModalRequest(
+        session_id=f"bench_{uuid.uuid4().hex[:12]}",
+        inputs=[pb.ModalityInput(audio=pb.AudioInput(data=chunk * count, format="pcm", sample_rate=SAMPLE_RATE))],
+        config=pb.ProcessingConfig(
+            stt_provider=args.stt_provider, llm_provider=args.llm_provider,
+            llm_model="fake-model", system_prompt=f"bench session {index}",
+        ),
+    ))
+    if resp.metadata.finish_reason == 'stop':
+        rec.add('completion_ms', started)
+        rec.completed += 1
+    else:
+        rec.errors += 1
+
+
+SESSIONS = {
+    'process_stream': process_stream_session,
+    'stream_stt': stream_stt_session,
+    'stream_chat': stream_chat_session,
+    'process': process_session,
+}
+
+
+async def run_scenario(stub, name: str, args) -> dict:
+    session = SESSIONS[name]
+    rec = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    peak_rss = rss_mb()
+
+    async def one(index: int):
+        async with semaphore:
+            try:
+                await asyncio.wait_for(session(stub, args, rec, index), timeout=args.timeout)
+            except Exception:
+                rec.errors += 1
+
+    async def sample_rss():
+        nonlocal peak_rss
+        while True:
+            peak_rss = max(peak_rss, rss_mb())
+            await asyncio.sleep(0.2)
+
+    sampler = asyncio.create_task(sample_rss())
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.sessions)))
+    wall = time.perf_counter() - started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    sampler.cancel()
+
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    result = {
+        'sessions': args.sessions,
+        'completed': rec.completed,
+        'errors': rec.errors,
+        'wall_s': round(wall, 2),
+        'throughput_per_s': round(rec.completed / wall, 2) if wall else 0.0,
+        'cpu_s': round(cpu, 2),
+        'cpu_util': round(cpu / wall, 3) if wall else 0.0,
+        'rss_mb': round(rss_mb(), 1),
+        'peak_rss_mb': round(max(peak_rss, rss_mb()), 1),
+    }
+    for metric, values in sorted(rec.samples.items()):
+        result[metric] = summarize(values)
+    return result
+
+
+def configure_fakes(args) -> None:
+    """进程内服务的 fake Provider 时间参数（命令行优先于已有环境变量）"""
+    settings = {
+        'FAKE_STT_READY_MS': args.stt_ready_ms,
+        'FAKE_STT_SENTENCE_MS': args.stt_sentence_ms,
+        'FAKE_STT_FINAL_LATENCY_MS': args.stt_final_latency_ms,
+        'FAKE_LLM_TTFT_MS': args.llm_ttft_ms,
+        'FAKE_LLM_TOKEN_GAP_MS': args.llm_token_gap_ms,
+        'FAKE_LLM_TOKENS': args.llm_tokens,
+    }
+    for key, value in settings.items():
+        if value is not None:
+            os.environ[key] = str(value)
+
+
+async def run(args) -> dict:
+    import grpc
+    from src.server.grpc.generated import omni_agent_pb2_grpc
+
+    server = None
+    target = args.target
+    if not target:
+        from src.server.grpc.server import GrpcServer
+        configure_fakes(args)
+        server = GrpcServer(port=0, max_workers=4)
+        await server.start()
+        target = f"127.0.0.1:{server.port}"
+
+    scenarios = SCENARIOS if args.scenario == 'all' else args.scenario.split(',')
+    results = {}
+    try:
+        async with grpc.aio.insecure_channel(target, options=[
+            ('grpc.max_send_message_length', 10 * 1024 * 1024),
+            ('grpc.max_receive_message_length', 10 * 1024 * 1024),
+        ]) as channel:
+            stub = omni_agent_pb2_grpc.OmniAgentServiceStub(channel)
+            for name in scenarios:
+                results[name] = await run_scenario(stub, name, args)
+    finally:
+        if server:
+            await server.stop()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """对比两次结果的分位数（after - before）"""
+    with open(before_path) as f:
+        before = json.load(f)['scenarios']
+    with open(after_path) as f:
+        after = json.load(f)['scenarios']
+
+    diff = {}
+    for name in sorted(set(before) & set(after)):
+        rows = {}
+        for metric, value in after[name].items():
+            old = before[name].get(metric)
+            if isinstance(value, dict) and isinstance(old, dict):
+                rows[metric] = {p: round(value[p] - old[p], 1) for p in ('p50', 'p95', 'p99')}
+            elif isinstance(value, (int, float)) and isinstance(old, (int, float)):
+                rows[metric] = round(value - old, 3)
+        diff[name] = rows
+    print(json.dumps(diff, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', default='all', help=f"all 或逗号分隔：{','.join(SCENARIOS)}")
+    parser.add_argument('--sessions', type=int, default=100, help='每个场景的会话数')
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--audio-seconds', type=float, default=4.0)
+    parser.add_argument('--chunk-ms', type=int, default=100)
+    parser.add_argument('--realtime', type=float, default=1.0, help='音频发送速率倍数，0 为不限速')
+    parser.add_argument('--timeout', type=float, default=60.0, help='单个会话超时（秒）')
+    parser.add_argument('--target', default='', help='外部服务地址 host:port，默认进程内启动')
+    parser.add_argument('--stt-provider', default='fake')
+    parser.add_argument('--llm-provider', default='fake')
+    parser.add_argument('--stt-ready-ms', type=float)
+    parser.add_argument('--stt-sentence-ms', type=int, default=1500)
+    parser.add_argument('--stt-final-latency-ms', type=float)
+    parser.add_argument('--llm-ttft-ms', type=float)
+    parser.add_argument('--llm-token-gap-ms', type=float)
+    parser.add_argument('--llm-tokens', type=int)
+    parser.add_argument('--speculative-stable-ms', type=int, default=0,
+                        help='ProcessStream 推测生成稳定窗口，0 使用服务端默认')
+    parser.add_argument('--max-error-rate', type=float, default=0.0)
+    parser.add_argument('--output', help='结果 JSON 文件路径，默认只输出到标准输出')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='对比两份结果文件')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    scenarios = asyncio.run(run(args))
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'args': {k: v for k, v in vars(args).items() if k != 'compare'},
+        'scenarios': scenarios,
+    }
+    print(json.dumps(scenarios, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"results written to {args.output}")
+
+    ok = all(
+        s['completed'] > 0 and s['errors'] <= args.max_error_rate * s['sessions']
+        for s in scenarios.values()
+    )
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
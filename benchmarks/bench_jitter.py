@@ -0,0 +1,125 @@
+"""
+音频抖动缓冲压测
+
+模拟弱网客户端按 100ms 节奏发送带序列号的音频帧：部分帧延迟投递（乱序）、
+部分帧重复投递、少量帧丢失。对比：
+- direct: 按到达顺序直接转发（原行为）
+- jitter: 经 perception.jitter.JitterBuffer 重排、去重、补齐
+
+统计转发帧的乱序数、重复数、时长误差（丢帧是否以静音补齐）以及抖动缓冲引入的额外延迟。
+
+Usage:
+    python benchmarks/bench_jitter.py --frames 600 --reorder 0.1 --duplicate 0.05 --loss 0.01
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.jitter import JitterBuffer
+
+FRAME_BYTES = 3200
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def schedule(args):
+    """生成 (到达时间, 序列号) 列表"""
+    rng = random.Random(args.seed)
+    events = []
+    for seq in range(1, args.frames + 1):
+        if rng.random() < args.loss:
+            continue
+        sent = seq * args.frame_ms / 1000
+        delay = rng.uniform(0, args.max_delay_ms) / 1000 if rng.random() < args.reorder else 0.0
+        events.append((sent + delay, seq))
+        if rng.random() < args.duplicate:
+            events.append((sent + delay + rng.uniform(0, 0.3), seq))
+    events.sort()
+    return events
+
+
+async def run(mode: str, args) -> dict:
+    events = schedule(args)
+    forwarded = []
+    added = []
+    arrival = {}
+
+    async def sink(data):
+        seq = int.from_bytes(data[:4], 'little')
+        forwarded.append(seq)
+        arrived = arrival.pop(seq, None)
+        if arrived is not None:
+            added.append((time.monotonic() - arrived) * 1000)
+
+    jitter = JitterBuffer(sink, max_delay_ms=args.jitter_ms, name="bench") if mode == 'jitter' else None
+    start = time.monotonic()
+    for at, seq in events:
+        await asyncio.sleep(max(0.0, start + at * args.speed - time.monotonic()))
+        data = seq.to_bytes(4, 'little') + bytes(FRAME_BYTES - 4)
+        if seq not in forwarded:
+            arrival.setdefault(seq, time.monotonic())
+        if jitter is None:
+            await sink(data)
+        else:
+            await jitter.push(seq, data)
+    if jitter is not None:
+        await jitter.flush()
+        stats = jitter.stats.to_dict()
+        jitter.close()
+    else:
+        stats = None
+
+    real = [s for s in forwarded if s]
+    out_of_order = sum(1 for a, b in zip(real, real[1:]) if b < a)
+    return {
+        'mode': mode,
+        'forwarded_frames': len(forwarded),
+        'out_of_order': out_of_order,
+        'duplicates_forwarded': len(real) - len(set(real)),
+        'duration_error_frames': len(forwarded) - args.frames,
+        'added_delay_p50_ms': round(percentile(added, 50) / args.speed, 1),
+        'added_delay_p99_ms': round(percentile(added, 99) / args.speed, 1),
+        'stats': stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--frame-ms', type=float, default=100)
+    parser.add_argument('--reorder', type=float, default=0.1, help='延迟投递概率')
+    parser.add_argument('--max-delay-ms', type=float, default=150, help='延迟投递的最大延迟')
+    parser.add_argument('--duplicate', type=float, default=0.05)
+    parser.add_argument('--loss', type=float, default=0.01)
+    parser.add_argument('--jitter-ms', type=float, default=200, help='抖动缓冲最长等待')
+    parser.add_argument('--speed', type=float, default=0.1, help='时间压缩系数（0.1 表示 10 倍速回放）')
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+    # 回放加速时等待时间同比缩放
+    args.jitter_ms *= args.speed
+
+    results = [asyncio.run(run(mode, args)) for mode in ('direct', 'jitter')]
+    print(json.dumps(results, indent=2))
+
+    direct, jitter = results
+    ok = (jitter['out_of_order'] == 0 and jitter['duplicates_forwarded'] == 0
+          and jitter['duration_error_frames'] == 0
+          and jitter['added_delay_p99_ms'] <= args.jitter_ms / args.speed + 20)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
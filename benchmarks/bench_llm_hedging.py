@@ -0,0 +1,141 @@
+"""
+LLM 对冲与重试压测
+
+使用进程内伪 Provider 注入长尾首 token 延迟与可重试错误，对比：
+- baseline: 直接调用 Provider
+- hedged:   HedgedLlmService（p95 对冲 + 抖动退避重试）
+
+Usage:
+    python benchmarks/bench_llm_hedging.py --requests 1000 --concurrency 50 --tail-prob 0.03
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.reasoning.llm.base import LlmService, LlmConfig, LlmResponse, StreamChunk, Message, MessageRole
+from src.reasoning.llm.hedging import HedgedLlmService
+
+
+class TransientError(Exception):
+    retryable = True
+
+
+class TailLatencyLlm(LlmService):
+    """首 token 延迟带长尾、偶发可重试错误的伪 Provider"""
+
+    def __init__(self, ttft_ms: float, tail_ms: float, tail_prob: float, error_prob: float,
+                 tokens: int, gap_ms: float, seed: int):
+        self.ttft_ms = ttft_ms
+        self.tail_ms = tail_ms
+        self.tail_prob = tail_prob
+        self.error_prob = error_prob
+        self.tokens = tokens
+        self.gap_ms = gap_ms
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    @property
+    def provider_name(self) -> str:
+        return "tail"
+
+    async def chat(self, messages, config=None) -> LlmResponse:
+        text = "".join([c.delta async for c in self.chat_stream(messages, config)])
+        return LlmResponse(content=text, finish_reason="stop")
+
+    async def chat_stream(self, messages, config=None):
+        self.calls += 1
+        if self.rng.random() < self.error_prob:
+            await asyncio.sleep(self.ttft_ms / 1000 / 2)
+            raise TransientError("injected 503")
+        tail = self.rng.random() < self.tail_prob
+        ttft = self.tail_ms if tail else self.rng.gauss(self.ttft_ms, self.ttft_ms * 0.2)
+        await asyncio.sleep(max(ttft, 1) / 1000)
+        for i in range(self.tokens):
+            if i:
+                await asyncio.sleep(self.gap_ms / 1000)
+            yield StreamChunk(delta=f"t{i}", finish_reason="stop" if i == self.tokens - 1 else None)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+async def run(mode: str, args) -> dict:
+    provider = TailLatencyLlm(args.ttft_ms, args.tail_ms, args.tail_prob, args.error_prob,
+                              args.tokens, args.gap_ms, seed=args.seed)
+    service = provider if mode == 'baseline' else HedgedLlmService(
+        provider, hedge_enabled=True, max_hedge_ratio=0.1
+    )
+    messages = [Message(role=MessageRole.USER, content="hello")]
+    config = LlmConfig(model="tail-model", timeout=10.0, retry_times=2)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                async for _ in service.chat_stream(messages, config):
+                    pass
+                latencies.append((time.perf_counter() - start) * 1000)
+            except Exception:
+                errors += 1
+
+    # 预热：让对冲策略学到 p95
+    for _ in range(args.warmup):
+        await one()
+    latencies.clear()
+    errors = 0
+    calls_before = provider.calls
+
+    await asyncio.gather(*(one() for _ in range(args.requests)))
+    await asyncio.sleep(0.05)
+
+    return {
+        'mode': mode,
+        'requests': args.requests,
+        'errors': errors,
+        'upstream_calls': provider.calls - calls_before,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'max_ms': round(max(latencies, default=0.0), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--ttft-ms', type=float, default=40)
+    parser.add_argument('--tail-ms', type=float, default=1500)
+    parser.add_argument('--tail-prob', type=float, default=0.03)
+    parser.add_argument('--error-prob', type=float, default=0.02)
+    parser.add_argument('--tokens', type=int, default=10)
+    parser.add_argument('--gap-ms', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(mode, args)) for mode in ('baseline', 'hedged')]
+    print(json.dumps(results, indent=2))
+
+    baseline, hedged = results
+    ok = hedged['p99_ms'] < baseline['p99_ms'] and hedged['errors'] <= baseline['errors']
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
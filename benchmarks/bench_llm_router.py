@@ -0,0 +1,164 @@
+"""
+LLM 多后端路由压测
+
+注册三个进程内替身 Provider（快 / 慢且抖动 / 不稳定），对比：
+- random: 随机选择后端（无失败转移）
+- router: LlmRouter（EWMA 打分 + 失败转移 + 熔断）
+
+第二阶段让最快的后端整体故障，验证熔断与失败转移后调用方几乎无感知。
+
+Usage:
+    python benchmarks/bench_llm_router.py --requests 600 --concurrency 30
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.reasoning.llm import LlmRegistry, LlmRouter, LlmConfig, Message, MessageRole
+from src.reasoning.llm.base import LlmService, LlmResponse, StreamChunk
+
+
+class StandInLlm(LlmService):
+    """按给定延迟分布与错误率输出的替身 Provider"""
+
+    profiles = {
+        'bench-fast': {'ttft_ms': 40, 'jitter': 0.2, 'error_prob': 0.0},
+        'bench-slow': {'ttft_ms': 200, 'jitter': 0.5, 'error_prob': 0.0},
+        'bench-flaky': {'ttft_ms': 60, 'jitter': 0.3, 'error_prob': 0.3},
+    }
+    down: set = set()
+
+    def __init__(self, name: str):
+        self.name = name
+        self.profile = self.profiles[name]
+        self.calls = 0
+
+    @property
+    def provider_name(self) -> str:
+        return self.name
+
+    async def chat(self, messages, config=None) -> LlmResponse:
+        text = "".join([c.delta async for c in self.chat_stream(messages, config)])
+        return LlmResponse(content=text, finish_reason="stop")
+
+    async def chat_stream(self, messages, config=None):
+        self.calls += 1
+        p = self.profile
+        ttft = max(1.0, random.gauss(p['ttft_ms'], p['ttft_ms'] * p['jitter']))
+        await asyncio.sleep(ttft / 1000)
+        if self.name in self.down or random.random() < p['error_prob']:
+            raise ConnectionError(f"{self.name} unavailable")
+        for i in range(5):
+            await asyncio.sleep(0.005)
+            yield StreamChunk(delta=f"t{i}", finish_reason="stop" if i == 4 else None)
+
+
+def make_provider(name: str):
+    return lambda **kwargs: StandInLlm(name)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+class RandomRouter(LlmService):
+    """对照组：随机选择后端"""
+
+    def __init__(self, names):
+        self.services = [LlmRegistry.get_service(n, wrap=False) for n in names]
+
+    @property
+    def provider_name(self) -> str:
+        return "random"
+
+    async def chat(self, messages, config=None):
+        return await random.choice(self.services).chat(messages, config)
+
+    async def chat_stream(self, messages, config=None):
+        async for chunk in random.choice(self.services).chat_stream(messages, config):
+            yield chunk
+
+
+async def drive(service, requests: int, concurrency: int) -> dict:
+    messages = [Message(role=MessageRole.USER, content="hello")]
+    semaphore = asyncio.Semaphore(concurrency)
+    ttfts, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            first = None
+            try:
+                async for _ in service.chat_stream(messages, LlmConfig(model="m")):
+                    if first is None:
+                        first = time.perf_counter() - start
+                ttfts.append(first * 1000)
+            except Exception:
+                errors += 1
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return {
+        'errors': errors,
+        'ttft_p50_ms': round(percentile(ttfts, 50), 1),
+        'ttft_p99_ms': round(percentile(ttfts, 99), 1),
+    }
+
+
+async def run(args) -> dict:
+    names = list(StandInLlm.profiles)
+    for name in names:
+        LlmRegistry.register(name, make_provider(name))
+
+    results = {}
+    for mode in ('random', 'router'):
+        random.seed(args.seed)
+        StandInLlm.down.clear()
+        LlmRegistry._instances.clear()
+        service = RandomRouter(names) if mode == 'random' else LlmRouter(names, cooldown=1.0)
+
+        healthy = await drive(service, args.requests, args.concurrency)
+        StandInLlm.down.add('bench-fast')
+        outage = await drive(service, args.requests, args.concurrency)
+
+        calls = {n: LlmRegistry.get_service(n, wrap=False).calls for n in names}
+        results[mode] = {'healthy': healthy, 'fast_backend_down': outage, 'upstream_calls': calls}
+        if mode == 'router':
+            results[mode]['backends'] = service.stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=600)
+    parser.add_argument('--concurrency', type=int, default=30)
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    # 注册内置 Provider 后再注册替身，保证 LlmRegistry 的懒加载不被跳过
+    LlmRegistry.list_providers()
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    rnd, router = results['random'], results['router']
+    ok = (
+        router['healthy']['ttft_p99_ms'] < rnd['healthy']['ttft_p99_ms']
+        and router['healthy']['errors'] < rnd['healthy']['errors']
+        and router['fast_backend_down']['errors'] <= max(1, args.requests // 100)
+    )
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
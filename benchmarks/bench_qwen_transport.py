@@ -0,0 +1,143 @@
+"""
+QwenLlmService 异步传输压测
+
+启动一个本地伪 DashScope SSE 服务，并发发起 N 路流式请求，验证：
+- 各路流的 token 交错到达（无队头阻塞）
+- 总耗时接近单路耗时，而非 N 倍
+- 事件循环最大卡顿保持在毫秒级
+
+Usage:
+    python benchmarks/bench_qwen_transport.py --streams 50 --tokens 20 --gap-ms 20
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from aiohttp import web
+
+from src.reasoning.llm.base import Message, MessageRole, LlmConfig
+from src.reasoning.llm.qwen import QwenLlmService
+from src.reasoning.llm.transport import get_dashscope_transport
+
+
+def make_fake_dashscope(tokens: int, gap_ms: int) -> web.Application:
+    """伪 DashScope 文本生成接口：按固定间隔推送增量 token"""
+
+    async def generation(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        if request.headers.get('X-DashScope-SSE') != 'enable':
+            return web.json_response({
+                'output': {'choices': [{'finish_reason': 'stop',
+                                        'message': {'role': 'assistant', 'content': 'ok'}}]},
+                'usage': {'input_tokens': 1, 'output_tokens': 1},
+            })
+
+        resp = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await resp.prepare(request)
+        try:
+            for i in range(tokens):
+                await asyncio.sleep(gap_ms / 1000)
+                finish = 'stop' if i == tokens - 1 else 'null'
+                data = {
+                    'output': {'choices': [{'finish_reason': finish,
+                                            'message': {'role': 'assistant', 'content': f't{i} '}}]},
+                    'usage': {'input_tokens': 1, 'output_tokens': i + 1},
+                    'request_id': body.get('model'),
+                }
+                event = f"id:{i + 1}\nevent:result\n:HTTP_STATUS/200\ndata:{json.dumps(data)}\n\n"
+                await resp.write(event.encode('utf-8'))
+            await resp.write_eof()
+        except ConnectionResetError:
+            # 客户端提前断开（取消场景）
+            pass
+        return resp
+
+    app = web.Application()
+    app.router.add_post('/api/v1/services/aigc/text-generation/generation', generation)
+    return app
+
+
+async def monitor_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """测量事件循环最大卡顿（毫秒）"""
+    max_lag = 0.0
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, loop.time() - expected)
+    return max_lag * 1000
+
+
+async def run(streams: int, tokens: int, gap_ms: int, port: int) -> dict:
+    runner = web.AppRunner(make_fake_dashscope(tokens, gap_ms))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', port)
+    await site.start()
+
+    service = QwenLlmService(api_key='sk-bench', base_url=f'http://127.0.0.1:{port}/api/v1')
+    messages = [Message(role=MessageRole.USER, content='hello')]
+    arrivals = []
+
+    async def one_stream(idx: int):
+        config = LlmConfig(model=f'fake-{idx}')
+        async for chunk in service.chat_stream(messages, config):
+            if chunk.delta:
+                arrivals.append(idx)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(monitor_loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one_stream(i) for i in range(streams)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    max_lag_ms = await lag_task
+
+    # 统计相邻 token 来自不同流的比例，衡量交错程度
+    switches = sum(1 for a, b in zip(arrivals, arrivals[1:]) if a != b)
+
+    await get_dashscope_transport().close()
+    await runner.cleanup()
+
+    single_stream_s = tokens * gap_ms / 1000
+    return {
+        'streams': streams,
+        'tokens_per_stream': tokens,
+        'elapsed_s': round(elapsed, 3),
+        'single_stream_s': round(single_stream_s, 3),
+        'serial_estimate_s': round(single_stream_s * streams, 3),
+        'interleave_ratio': round(switches / max(len(arrivals) - 1, 1), 3),
+        'max_loop_lag_ms': round(max_lag_ms, 2),
+        'tokens_received': len(arrivals),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--streams', type=int, default=50)
+    parser.add_argument('--tokens', type=int, default=20)
+    parser.add_argument('--gap-ms', type=int, default=20)
+    parser.add_argument('--port', type=int, default=18089)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.streams, args.tokens, args.gap_ms, args.port))
+    print(json.dumps(result, indent=2))
+
+    ok = (
+        result['tokens_received'] == args.streams * args.tokens
+        and result['elapsed_s'] < result['single_stream_s'] * 3
+        and result['interleave_ratio'] > 0.5
+    )
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+会话上下文压测
+
+模拟长会话：每轮 Session.create_task 取上下文、完成任务（一问一答两条消息）。对比：
+- rebuild: 原实现，每次访问 Session.context 遍历全部 Task 复制消息
+- log: orchestrator.conversation.ConversationLog 增量维护，上下文为只读快照
+
+统计每轮 create_task 的耗时（p50 / p95 / 最后 100 轮均值）、保留的 Task 数，
+并校验两种实现得到的上下文内容一致。
+
+Usage:
+    python benchmarks/bench_session_context.py --turns 2000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.orchestrator.session import Session, SessionConfig, SessionStatus
+from src.orchestrator.task import TaskContext, TaskResult
+
+
+class RebuildSession(Session):
+    """原实现：每次访问重建上下文，保留全部 Task"""
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.tasks = []
+
+    @property
+    def context(self) -> TaskContext:
+        messages = []
+        for task in self.tasks:
+            if task.result:
+                messages.extend(task.result.messages)
+        return TaskContext(messages=messages)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def run(cls, args):
+    session = cls(session_id="bench", trace_id="bench", client_id="bench",
+                  config=SessionConfig(), status=SessionStatus.ACTIVE)
+    costs = []
+    for turn in range(args.turns):
+        begin = time.perf_counter()
+        task = session.create_task(f"第{turn}轮问题")
+        costs.append((time.perf_counter() - begin) * 1e6)
+        answer = "回答" * args.answer_chars
+        task.complete(TaskResult(content=answer, messages=[
+            {"role": "user", "content": task.instruction},
+            {"role": "assistant", "content": answer},
+        ]))
+    context = [dict(m) for m in session.context.messages]
+    return {
+        'mode': 'log' if cls is Session else 'rebuild',
+        'create_task_p50_us': round(percentile(costs, 50), 1),
+        'create_task_p95_us': round(percentile(costs, 95), 1),
+        'last_100_avg_us': round(sum(costs[-100:]) / len(costs[-100:]), 1),
+        'tasks_retained': len(session.tasks),
+        'messages': len(context),
+    }, context
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=2000)
+    parser.add_argument('--answer-chars', type=int, default=100)
+    args = parser.parse_args()
+
+    (rebuild, rebuild_context), (log, log_context) = run(RebuildSession, args), run(Session, args)
+    print(json.dumps([rebuild, log], indent=2))
+
+    ok = (rebuild_context == log_context
+          and log['messages'] == args.turns * 2
+          and log['tasks_retained'] < args.turns
+          and log['last_100_avg_us'] * 5 < rebuild['last_100_avg_us'])
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+会话管理器压测
+
+在事件循环中创建 --sessions 个会话，对比：
+- legacy: 原实现，单个字典 + threading.RLock，清理时扫描全部会话（达到上限时 create 同步执行同样的扫描）
+- sharded: orchestrator.session.SessionManager，按 session_id 哈希分片、无锁读取、过期最小堆
+
+统计：
+- create / get 的单次耗时，会话数为 --small 与 --sessions 时各测一次（常数时间则两者接近）
+- touch 顺延过期时间的单次耗时
+- 清理耗时：无到期会话的空刻度，以及 --expired 个超时 + --expired 个已关闭会话的刻度
+- 会话数达到上限时 create 的耗时
+
+Usage:
+    python benchmarks/bench_session_manager.py --sessions 100000 --expired 100
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+import uuid
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import generate_trace_id
+from src.orchestrator.session import Session, SessionConfig, SessionManager, SessionStatus, logger, metrics
+
+
+class LegacySessionManager(SessionManager):
+    """原实现：单个字典 + RLock，清理时全量扫描"""
+
+    def __init__(self, max_sessions: int):
+        super().__init__(max_sessions=max_sessions)
+        self._sessions = {}
+        self._lock = threading.RLock()
+
+    def create(self, client_id, config=None, metadata=None):
+        with self._lock:
+            if len(self._sessions) >= self._max_sessions:
+                self._cleanup_expired()
+                if len(self._sessions) >= self._max_sessions:
+                    raise RuntimeError(f"Max sessions limit reached: {self._max_sessions}")
+            session = Session(
+                session_id=f"sess_{uuid.uuid4().hex[:16]}", trace_id=generate_trace_id(), client_id=client_id,
+                config=config or SessionConfig(), status=SessionStatus.ACTIVE, metadata=metadata or {},
+            )
+            self._sessions[session.session_id] = session
+            metrics.track("session", "session_created", dimensions={"client_id": client_id})
+            logger.info("Session created", session_id=session.session_id, client_id=client_id)
+            return session
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session and session.is_expired():
+                session.status = SessionStatus.EXPIRED
+            return session
+
+    def close(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session:
+                session.close()
+            return session
+
+    def count(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def _cleanup_expired(self, now=None):
+        expired_ids = [sid for sid, s in self._sessions.items()
+                       if s.is_expired() or s.status == SessionStatus.CLOSED]
+        for sid in expired_ids:
+            del self._sessions[sid]
+        return len(expired_ids)
+
+
+def per_op_us(fn, items):
+    begin = time.perf_counter()
+    for item in items:
+        fn(item)
+    return (time.perf_counter() - begin) * 1e6 / max(1, len(items))
+
+
+def timed_ms(fn):
+    begin = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - begin) * 1000
+
+
+async def run(mode: str, args) -> dict:
+    cls = LegacySessionManager if mode == 'legacy' else SessionManager
+    manager = cls(max_sessions=args.sessions)
+    probe = 1000
+    ids, result = [], {'mode': mode}
+
+    for size in (args.small, args.sessions):
+        while len(ids) < size - probe:
+            ids.append(manager.create("bench").session_id)
+        created = []
+        result[f'create_us_at_{size}'] = round(per_op_us(lambda _: created.append(manager.create("bench").session_id), range(probe)), 2)
+        ids.extend(created)
+        sample = random.Random(size).sample(ids, probe)
+        result[f'get_us_at_{size}'] = round(per_op_us(manager.get_active, sample), 2)
+
+    sessions = [manager.get(sid) for sid in random.Random(1).sample(ids, probe)]
+    result['touch_us'] = round(per_op_us(Session.touch, sessions), 2)
+
+    _, result['empty_tick_ms'] = timed_ms(manager._cleanup_expired)
+
+    # 到期：--expired 个超时会话（替换掉同样数量的普通会话）与 --expired 个已关闭会话
+    for sid in ids[:args.expired]:
+        manager.delete(sid) if mode == 'sharded' else manager._sessions.pop(sid)
+    ids = ids[args.expired:]
+    for _ in range(args.expired):
+        manager.create("bench", config=SessionConfig(timeout_seconds=0))
+    for sid in ids[-args.expired:]:
+        manager.close(sid)
+    await asyncio.sleep(0.01)
+    removed, result['expiry_tick_ms'] = timed_ms(manager._cleanup_expired)
+    result['expiry_tick_removed'] = removed
+    result['expiry_us_per_session'] = result['expiry_tick_ms'] * 1000 / max(1, removed)
+
+    # 已满：create 先清理再创建
+    manager.create("bench", config=SessionConfig(timeout_seconds=0))
+    while manager.count() < args.sessions:
+        manager.create("bench")
+    await asyncio.sleep(0.01)
+    _, result['create_at_capacity_ms'] = timed_ms(lambda: manager.create("bench"))
+    result['sessions'] = manager.count()
+    for key, value in result.items():
+        if isinstance(value, float):
+            result[key] = round(value, 3)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=100_000)
+    parser.add_argument('--small', type=int, default=2_000, help='对照的较小会话数')
+    parser.add_argument('--expired', type=int, default=100)
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(mode, args)) for mode in ('legacy', 'sharded')]
+    print(json.dumps(results, indent=2))
+
+    legacy, sharded = results
+    big, small = args.sessions, args.small
+    ok = (sharded['expiry_tick_removed'] == 2 * args.expired
+          and legacy['expiry_tick_removed'] == 2 * args.expired
+          and sharded['empty_tick_ms'] < 1
+          and sharded['expiry_tick_ms'] < legacy['expiry_tick_ms'] / 10
+          and sharded['create_at_capacity_ms'] < 1
+          and sharded[f'get_us_at_{big}'] < sharded[f'get_us_at_{small}'] * 2
+          and sharded[f'create_us_at_{big}'] < sharded[f'create_us_at_{small}'] * 2)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
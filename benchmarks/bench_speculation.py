@@ -0,0 +1,173 @@
+"""
+推测生成压测
+
+模拟多轮语音对话：每轮用户说话期间每 100ms 一条逐步增长的中间结果，说完后静音
+--silence-ms（provider 的 max_sentence_silence）再经 --finalize-ms 定稿输出最终结果；
+按概率注入「最终结果改写了末尾文字」（--revise）与「停顿后继续说」（--resume）。
+回答由 Fake LLM 生成，用户听完回答后开始下一轮。对比：
+- off: 最终结果之后才调用 LLM（原行为）
+- on: orchestrator.speculation.SpeculativeGenerator，中间结果稳定 --stable-ms 后提前生成
+
+统计最终结果到第一个回答增量的延迟、回答文本是否与正常生成一致、推测提交 / 取消次数、
+累计提前量与浪费比例。
+时间按 --speed 压缩回放，输出的毫秒数已换算回真实时间。
+
+Usage:
+    python benchmarks/bench_speculation.py --turns 12 --stable-ms 300 --revise 0.2 --resume 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import LatencyDistribution
+from src.reasoning.llm.base import Message, MessageRole, LlmConfig
+from src.reasoning.llm.fake import FakeLlmService
+from src.orchestrator.speculation import SpeculativeGenerator, normalize_text
+
+_CHARS = "请帮我查询明天上海到北京的航班并且预订靠窗座位谢谢"
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def make_turns(args):
+    """每轮：[(相对上一事件的等待 ms, 'partial'|'final', 文本)]"""
+    rng = random.Random(args.seed)
+    turns = []
+    for _ in range(args.turns):
+        text = "".join(rng.choice(_CHARS) for _ in range(rng.randint(8, 16)))
+        events = []
+        speech_steps = max(1, args.speech_ms // 100)
+        for i in range(1, speech_steps + 1):
+            events.append((100, 'partial', text[:max(1, len(text) * i // speech_steps)]))
+        if rng.random() < args.resume:
+            # 停顿超过稳定窗口但短于断句静音后继续说
+            more = "".join(rng.choice(_CHARS) for _ in range(4))
+            events.append((args.stable_ms + 200, 'partial', text + more[:2]))
+            events.append((100, 'partial', text + more))
+            text = text + more
+        final = text
+        if rng.random() < args.revise:
+            final = text[:-2] + "".join(rng.choice(_CHARS) for _ in range(2))
+        events.append((args.silence_ms + args.finalize_ms, 'final', final + "。"))
+        turns.append(events)
+    return turns
+
+
+async def run(mode: str, turns, args) -> dict:
+    s = args.speed
+    llm = FakeLlmService(
+        ttft=LatencyDistribution(args.llm_ttft_ms * s, 0),
+        token_gap=LatencyDistribution(args.llm_token_gap_ms * s, 0),
+        tokens=args.llm_tokens,
+    )
+    history = []
+
+    async def open_stream(sentence):
+        # Fake LLM 的输出由输入文本决定；按提交规则忽略标点，使推测与正常生成的回答可直接比较
+        messages = history + [Message(role=MessageRole.USER, content=normalize_text(sentence))]
+        async for chunk in llm.chat_stream(messages, LlmConfig(model="fake-model")):
+            if chunk.delta:
+                yield chunk.delta
+
+    speculator = SpeculativeGenerator(open_stream, args.stable_ms * s, name="bench") if mode == 'on' else None
+    sentences: asyncio.Queue = asyncio.Queue()
+    answers = []
+    latencies = []
+
+    async def worker():
+        while True:
+            sentence, final_at, done = await sentences.get()
+            speculation = speculator.claim(sentence) if speculator else None
+            try:
+                reply, first = "", None
+                async for delta in (speculation.stream() if speculation else open_stream(sentence)):
+                    if first is None:
+                        first = time.monotonic()
+                    reply += delta
+                latencies.append((first - final_at) * 1000 / s)
+                history.extend([Message(role=MessageRole.USER, content=sentence),
+                                Message(role=MessageRole.ASSISTANT, content=reply)])
+                answers.append(reply)
+            finally:
+                if speculator:
+                    speculator.release()
+                done.set()
+
+    worker_task = asyncio.create_task(worker())
+    for events in turns:
+        for wait_ms, kind, text in events:
+            await asyncio.sleep(wait_ms * s / 1000)
+            if kind == 'partial':
+                if speculator:
+                    speculator.observe_partial(text)
+            else:
+                if speculator:
+                    speculator.observe_final(text)
+                done = asyncio.Event()
+                sentences.put_nowait((text, time.monotonic(), done))
+                await done.wait()
+                await asyncio.sleep(args.listen_ms * s / 1000)
+    worker_task.cancel()
+    stats = None
+    if speculator:
+        speculator.close()
+        stats = speculator.stats.to_dict()
+        stats['saved_ms'] = round(stats['saved_ms'] / s, 1)
+
+    return {
+        'mode': mode,
+        'turns': len(answers),
+        'final_to_delta_p50_ms': round(percentile(latencies, 50), 1),
+        'final_to_delta_p95_ms': round(percentile(latencies, 95), 1),
+        'answers': answers,
+        'stats': stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=12)
+    parser.add_argument('--speech-ms', type=int, default=1500)
+    parser.add_argument('--silence-ms', type=int, default=800, help='断句静音（max_sentence_silence）')
+    parser.add_argument('--finalize-ms', type=int, default=150, help='静音结束到最终结果的定稿延迟')
+    parser.add_argument('--stable-ms', type=int, default=300, help='推测生成的稳定窗口')
+    parser.add_argument('--revise', type=float, default=0.2, help='最终结果改写末尾文字的概率')
+    parser.add_argument('--resume', type=float, default=0.2, help='停顿后继续说的概率')
+    parser.add_argument('--listen-ms', type=int, default=300, help='回答结束到下一轮开口的间隔')
+    parser.add_argument('--llm-ttft-ms', type=float, default=300)
+    parser.add_argument('--llm-token-gap-ms', type=float, default=20)
+    parser.add_argument('--llm-tokens', type=int, default=20)
+    parser.add_argument('--speed', type=float, default=0.2, help='时间压缩系数（0.2 表示 5 倍速回放）')
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    turns = make_turns(args)
+    results = [asyncio.run(run(mode, turns, args)) for mode in ('off', 'on')]
+    off, on = results
+    same_answers = off['answers'] == on['answers']
+    for r in results:
+        r.pop('answers')
+    print(json.dumps(results + [{'same_answers': same_answers}], indent=2))
+
+    stats = on['stats']
+    ok = (same_answers and on['turns'] == off['turns'] == args.turns
+          and stats['committed'] > 0
+          and on['final_to_delta_p50_ms'] < off['final_to_delta_p50_ms'] / 2)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
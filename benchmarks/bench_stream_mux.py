@@ -0,0 +1,146 @@
+"""
+流多路复用 vs 定时轮询 压测
+
+模拟 N 路打开的流（如 ProcessStream/StreamSTT），事件由独立线程
+（相当于 STT SDK 回调线程）写入，对比两种消费方式：
+- poll: 旧实现，asyncio.Queue.put_nowait + wait_for(queue.get(), timeout=0.05) 轮询
+- mux:  EventChannel + infra.multiplex，仅在真实事件到达时唤醒
+
+测量：
+- 空闲阶段的进程 CPU 占用（所有流都无事件）
+- 事件端到端交付延迟（线程写入 → 协程收到）p50/p99
+
+Usage:
+    python benchmarks/bench_stream_mux.py --streams 2000 --idle-s 3 --frames 20
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import multiplex
+from src.perception.channel import EventChannel
+
+
+POLL_TIMEOUT = 0.05
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def poll_consumer(queue: asyncio.Queue, producer: asyncio.Future, latencies: list):
+    """旧实现：超时轮询"""
+    while True:
+        try:
+            sent_at = await asyncio.wait_for(queue.get(), timeout=POLL_TIMEOUT)
+            latencies.append(time.perf_counter() - sent_at)
+        except asyncio.TimeoutError:
+            if producer.done() and queue.empty():
+                break
+
+
+async def mux_consumer(channel: EventChannel, producer: asyncio.Future, latencies: list):
+    """新实现：事件驱动多路复用"""
+    async for sent_at in multiplex(channel, producer):
+        latencies.append(time.perf_counter() - sent_at)
+
+
+async def run(mode: str, streams: int, idle_s: float, frames: int, gap_ms: int) -> dict:
+    loop = asyncio.get_running_loop()
+    # 生产者完成信号（相当于请求处理任务）
+    producer = loop.create_future()
+    latencies: list = []
+
+    if mode == 'poll':
+        sources = [asyncio.Queue() for _ in range(streams)]
+        consumers = [asyncio.create_task(poll_consumer(q, producer, latencies)) for q in sources]
+
+        def put(source, item):
+            # 旧实现在 SDK 线程中直接调用（非线程安全）
+            source.put_nowait(item)
+    else:
+        sources = [EventChannel(name='bench') for _ in range(streams)]
+        consumers = [asyncio.create_task(mux_consumer(c, producer, latencies)) for c in sources]
+
+        def put(source, item):
+            source.put(item)
+
+    await asyncio.sleep(0.2)
+
+    # 空闲阶段：所有流打开但没有事件
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    await asyncio.sleep(idle_s)
+    idle_cpu = (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+
+    # 活跃阶段：SDK 线程按固定间隔向部分流写入事件
+    active = sources[:min(len(sources), 100)]
+    done = threading.Event()
+
+    def sdk_thread():
+        for _ in range(frames):
+            for source in active:
+                put(source, time.perf_counter())
+            time.sleep(gap_ms / 1000)
+        done.set()
+
+    thread = threading.Thread(target=sdk_thread, daemon=True)
+    thread.start()
+    while not done.is_set():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(POLL_TIMEOUT * 3)
+
+    producer.set_result(None)
+    await asyncio.wait_for(asyncio.gather(*consumers), timeout=30)
+
+    latencies_ms = [x * 1000 for x in latencies]
+    return {
+        'mode': mode,
+        'streams': streams,
+        'idle_cpu_pct': round(idle_cpu * 100, 2),
+        'frames_delivered': len(latencies_ms),
+        'frames_expected': frames * len(active),
+        'latency_p50_ms': round(percentile(latencies_ms, 50), 3),
+        'latency_p99_ms': round(percentile(latencies_ms, 99), 3),
+        'latency_max_ms': round(max(latencies_ms, default=0.0), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--streams', type=int, default=2000)
+    parser.add_argument('--idle-s', type=float, default=3.0)
+    parser.add_argument('--frames', type=int, default=20)
+    parser.add_argument('--gap-ms', type=int, default=20)
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(run(mode, args.streams, args.idle_s, args.frames, args.gap_ms))
+        for mode in ('poll', 'mux')
+    ]
+    print(json.dumps(results, indent=2))
+
+    poll, mux = results
+    ok = (
+        mux['frames_delivered'] == mux['frames_expected']
+        and mux['idle_cpu_pct'] < poll['idle_cpu_pct']
+        and mux['latency_p99_ms'] < poll['latency_p99_ms']
+    )
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+非实时批量识别压测
+
+用替身 Recognition 模拟 DashScope SDK：start() 后台握手，音频按 --speed 倍实时速度处理，
+每 --sentence-ms 音频输出一句带时间戳的最终结果，stop() 等待处理完毕。
+构造句间带静音的长音频，对比：
+- paced: 原单次识别路径（100ms 分块，每块间隔 10ms，单会话，stop() 阻塞事件循环）
+- batch: perception.stt.batch.BatchTranscriber（静音切分 + 多会话并发，不限速）
+
+Usage:
+    python benchmarks/bench_stt_batch.py --audio-seconds 60 --speed 20
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import asyncio
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+os.environ.setdefault('DASHSCOPE_API_KEY', 'bench')
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+SPEECH_MS = 2400
+PAUSE_MS = 600
+
+
+class _Result:
+    def __init__(self, sentence):
+        self.sentence = sentence
+
+    def get_sentence(self):
+        return self.sentence
+
+
+class StandInRecognition:
+    """替身 Recognition：后台线程握手后按倍速处理排队的音频"""
+
+    handshake_ms = 200.0
+    speed = 20.0
+    sentence_ms = SPEECH_MS + PAUSE_MS
+
+    def __init__(self, model, format, sample_rate, callback, **kwargs):
+        self._callback = callback
+        self._sample_rate = sample_rate
+        self._queue = queue.Queue()
+        self._running = False
+        self._worker = None
+
+    def start(self):
+        self._running = True
+        self._callback.on_open()
+        self._worker = threading.Thread(target=self._work, daemon=True)
+        self._worker.start()
+
+    def _work(self):
+        time.sleep(self.handshake_ms / 1000)
+        audio_ms, sentence_start = 0.0, 0.0
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            ms = len(chunk) * 1000 / (self._sample_rate * 2)
+            time.sleep(ms / self.speed / 1000)
+            audio_ms += ms
+            while audio_ms - sentence_start >= self.sentence_ms:
+                self._emit(sentence_start, sentence_start + self.sentence_ms)
+                sentence_start += self.sentence_ms
+        if audio_ms - sentence_start > PAUSE_MS:
+            self._emit(sentence_start, audio_ms)
+        self._callback.on_complete()
+
+    def _emit(self, begin, end):
+        self._callback.on_event(_Result({
+            'text': f"句{int(begin)}", 'begin_time': int(begin), 'end_time': int(end),
+        }))
+
+    def send_audio_frame(self, buffer):
+        if not self._running:
+            raise RuntimeError("Speech recognition has stopped.")
+        self._queue.put(buffer)
+
+    def stop(self):
+        self._running = False
+        self._queue.put(None)
+        self._worker.join()
+        self._callback.on_close()
+
+
+def make_audio(seconds: float) -> bytes:
+    """句间带静音的音频：SPEECH_MS 语音（正弦）+ PAUSE_MS 静音，循环"""
+    period = (SPEECH_MS + PAUSE_MS) * SAMPLE_RATE // 1000
+    speech = SPEECH_MS * SAMPLE_RATE // 1000
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n)
+    x = np.sin(2 * np.pi * 220 * t / SAMPLE_RATE) * 8000 * ((t % period) < speech)
+    return x.astype('<i2').tobytes()
+
+
+async def paced(audio: bytes, config) -> dict:
+    """原实现：100ms 分块、每块 sleep 10ms，stop() 在事件循环中阻塞"""
+    from src.perception.channel import EventChannel
+    channel = EventChannel(name="bench_paced")
+    texts = []
+
+    class Callback:
+        def on_open(self): pass
+        def on_close(self): pass
+        def on_event(self, result): channel.put(result.get_sentence()['text'])
+        def on_error(self, result): channel.close()
+        def on_complete(self): channel.close()
+
+    recognition = StandInRecognition(config.model, 'pcm', config.sample_rate, Callback())
+    recognition.start()
+    for i in range(0, len(audio), 3200):
+        recognition.send_audio_frame(audio[i:i + 3200])
+        await asyncio.sleep(0.01)
+    recognition.stop()
+
+    async def collect():
+        async for text in channel:
+            texts.append(text)
+    await asyncio.wait_for(collect(), timeout=10.0)
+    return {'text': " ".join(texts), 'segments': 1, 'results': len(texts), 'ordered': True}
+
+
+async def batch(audio: bytes, config, concurrency: int) -> dict:
+    from src.perception.stt.batch import BatchTranscriber
+    transcript = await BatchTranscriber("aliyun", max_concurrency=concurrency).transcribe(audio, config)
+    starts = [r.start_time_ms for r in transcript.results]
+    return {
+        'text': transcript.text,
+        'segments': transcript.segments,
+        'results': len(transcript.results),
+        'ordered': starts == sorted(starts),
+        'covered_ms': transcript.results[-1].end_time_ms if transcript.results else 0,
+    }
+
+
+async def run(mode: str, args) -> dict:
+    from dashscope.audio import asr
+    from src.perception.stt import SttConfig
+
+    asr.Recognition = StandInRecognition
+    StandInRecognition.speed = args.speed
+    config = SttConfig(model="paraformer-realtime-v2")
+    audio = make_audio(args.audio_seconds)
+
+    start = time.perf_counter()
+    if mode == 'paced':
+        result = await paced(audio, config)
+    else:
+        result = await batch(audio, config, args.concurrency)
+    result['mode'] = mode
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    result.pop('text')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--audio-seconds', type=float, default=60)
+    parser.add_argument('--speed', type=float, default=20, help='替身识别处理速度（实时倍数）')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(mode, args)) for mode in ('paced', 'batch')]
+    print(json.dumps(results, indent=2))
+
+    paced_result, batch_result = results
+    ok = (batch_result['ordered'] and batch_result['results'] >= paced_result['results'] - batch_result['segments']
+          and abs(batch_result['covered_ms'] - args.audio_seconds * 1000) < 1000
+          and batch_result['elapsed_ms'] < paced_result['elapsed_ms'] / 2)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
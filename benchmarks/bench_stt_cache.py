@@ -0,0 +1,130 @@
+"""
+转写缓存压测
+
+用 Fake STT（会话就绪与最终结果带固定延迟）模拟重复音频场景：--clips 段不同音频，
+按 Zipf 分布重复请求 --requests 次。对比：
+- off: 不启用缓存，每次都走识别会话
+- memory: 内存层 LRU
+- disk: 内存层按容量只容纳少量条目，其余命中来自磁盘层；另起一个缓存实例模拟重启后命中
+
+统计命中率、命中 / 未命中延迟与命中结果是否与首次识别一致。
+
+Usage:
+    python benchmarks/bench_stt_cache.py --clips 20 --requests 200
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+os.environ.setdefault('FAKE_STT_READY_MS', '100')
+os.environ.setdefault('FAKE_STT_READY_JITTER', '0')
+os.environ.setdefault('FAKE_STT_FINAL_LATENCY_MS', '100')
+os.environ.setdefault('FAKE_STT_FINAL_LATENCY_JITTER', '0')
+
+from src.perception.stt import SttConfig, SttRegistry
+from src.perception.stt import cache as stt_cache
+
+SAMPLE_RATE = 16000
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def make_clips(count: int, seconds: float, seed: int):
+    rng = random.Random(seed)
+    size = int(seconds * SAMPLE_RATE) * 2
+    return [rng.randbytes(size) for _ in range(count)]
+
+
+async def run(mode: str, args, directory: str) -> dict:
+    os.environ['STT_CACHE_ENABLED'] = 'false' if mode == 'off' else 'true'
+    if mode == 'disk':
+        # 内存层只够容纳少量条目，迫使大部分命中回落到磁盘层
+        stt_cache._cache = stt_cache.TranscriptCache(max_bytes=1024, directory=directory)
+    else:
+        stt_cache._cache = stt_cache.TranscriptCache(directory='')
+
+    clips = make_clips(args.clips, args.clip_seconds, args.seed)
+    rng = random.Random(args.seed)
+    weights = [1 / (i + 1) for i in range(args.clips)]
+    order = rng.choices(range(args.clips), weights=weights, k=args.requests)
+    config = SttConfig(model="fake", sample_rate=SAMPLE_RATE)
+
+    first = {}
+    latencies = {'hit': [], 'miss': []}
+    mismatches = 0
+    start = time.perf_counter()
+    for index in order:
+        service = SttRegistry.get_service("fake")
+        t0 = time.perf_counter()
+        text = await service.transcribe_once(clips[index], config)
+        elapsed = (time.perf_counter() - t0) * 1000
+        if index in first:
+            mismatches += text != first[index]
+        else:
+            first[index] = text
+        latencies['hit' if elapsed < args.hit_threshold_ms else 'miss'].append(elapsed)
+    total_ms = (time.perf_counter() - start) * 1000
+
+    result = {
+        'mode': mode,
+        'requests': args.requests,
+        'unique_clips': len(first),
+        'hits': len(latencies['hit']),
+        'hit_rate': round(len(latencies['hit']) / args.requests, 3),
+        'hit_p50_ms': round(percentile(latencies['hit'], 50), 2),
+        'hit_p99_ms': round(percentile(latencies['hit'], 99), 2),
+        'miss_p50_ms': round(percentile(latencies['miss'], 50), 1),
+        'mismatches': mismatches,
+        'total_ms': round(total_ms, 1),
+    }
+    if mode != 'off':
+        result['stats'] = stt_cache._cache.stats()
+    if mode == 'disk':
+        # 新实例（空内存层）模拟进程重启，全部命中磁盘层
+        stt_cache._cache = stt_cache.TranscriptCache(directory=directory)
+        restored = 0
+        for index, text in first.items():
+            restored += await SttRegistry.get_service("fake").transcribe_once(clips[index], config) == text
+        result['restored_after_restart'] = restored
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clips', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--clip-seconds', type=float, default=3)
+    parser.add_argument('--hit-threshold-ms', type=float, default=50, help='低于该延迟视为缓存命中')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [asyncio.run(run(mode, args, directory)) for mode in ('off', 'memory', 'disk')]
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    off, memory, disk = results
+    expected = 1 - memory['unique_clips'] / args.requests
+    ok = (off['hits'] == 0
+          and memory['hit_rate'] >= expected - 0.01 and disk['hit_rate'] >= expected - 0.01
+          and memory['mismatches'] == 0 and disk['mismatches'] == 0
+          and disk['stats']['disk_hits'] > 0
+          and disk['restored_after_restart'] == disk['unique_clips']
+          and memory['total_ms'] < off['total_ms'] / 2)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
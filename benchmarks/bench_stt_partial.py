@@ -0,0 +1,131 @@
+"""
+STT 中间结果增量化压测
+
+模拟 DashScope 长句中间结果：每条中间结果携带整句已识别文本，逐步增长，
+并以一定概率改写末尾几个字。按 --partial-ms 间隔送入 perception.stt.stabilizer，对比：
+- full: 原行为，每条中间结果全量下发
+- delta: 只下发变化的后缀（stable_prefix_len + is_delta）
+- delta+throttle: 增量 + 中间结果最短间隔 --interval-ms
+
+统计下行 StreamSttFrame 序列化字节数、帧数、中间结果最小间隔，
+并按协议在客户端侧还原整句，校验与原始文本一致、最终结果未被节流。
+
+Usage:
+    python benchmarks/bench_stt_partial.py --sentences 5 --chars 200 --partial-ms 5 --interval-ms 50
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.stt import SttConfig, SttResult
+from src.perception.stt.stabilizer import PartialStabilizer
+from src.server.grpc.generated import multimodal_pb2
+
+_CHARS = "今天天气很好我们一起去公园散步然后吃午饭下午开会讨论项目进度和预算安排"
+
+
+def make_sentences(args):
+    """每句一组中间结果文本（逐步增长，偶尔改写末尾）与最终文本"""
+    rng = random.Random(args.seed)
+    sentences = []
+    for _ in range(args.sentences):
+        final = "".join(rng.choice(_CHARS) for _ in range(args.chars))
+        partials = []
+        shown = 0
+        while shown < len(final):
+            shown = min(len(final), shown + rng.randint(1, 3))
+            text = final[:shown]
+            if rng.random() < args.revise and shown > 3:
+                k = rng.randint(1, 3)
+                text = text[:-k] + "".join(rng.choice(_CHARS) for _ in range(k))
+            partials.append(text)
+        sentences.append((partials, final))
+    return sentences
+
+
+def frame(result: SttResult) -> multimodal_pb2.MultiModalStreamResponse:
+    return multimodal_pb2.MultiModalStreamResponse(stt=multimodal_pb2.StreamSttFrame(
+        text=result.text,
+        is_final=result.is_final,
+        confidence=result.confidence,
+        stable_prefix_len=result.stable_prefix_len,
+        is_delta=result.is_delta,
+    ))
+
+
+def run(mode: str, sentences, args) -> dict:
+    config = SttConfig(
+        enable_partial_delta=mode != 'full',
+        partial_interval_ms=args.interval_ms if mode == 'delta+throttle' else 0,
+    )
+    stabilizer = PartialStabilizer.from_config(config, name="bench")
+
+    wire_bytes, frames, mismatches, final_mismatches = 0, 0, 0, 0
+    partial_times = []
+    for partials, final in sentences:
+        shown = ""          # 客户端还原出的当前句
+        for text in partials:
+            result = SttResult(text=text, is_final=False)
+            out = stabilizer.partial(result) if stabilizer else result
+            if out is not None:
+                data = frame(out).SerializeToString()
+                wire_bytes += len(data)
+                frames += 1
+                partial_times.append(time.monotonic())
+                decoded = multimodal_pb2.MultiModalStreamResponse.FromString(data).stt
+                shown = shown[:decoded.stable_prefix_len] + decoded.text if decoded.is_delta else decoded.text
+                mismatches += shown != text
+            time.sleep(args.partial_ms / 1000)
+        result = SttResult(text=final, is_final=True)
+        out = stabilizer.final(result) if stabilizer else result
+        data = frame(out).SerializeToString()
+        wire_bytes += len(data)
+        frames += 1
+        final_mismatches += multimodal_pb2.MultiModalStreamResponse.FromString(data).stt.text != final
+        partial_times.append(None)   # 句子边界，不计入间隔
+
+    gaps = [(b - a) * 1000 for a, b in zip(partial_times, partial_times[1:]) if a is not None and b is not None]
+    return {
+        'mode': mode,
+        'frames': frames,
+        'wire_bytes': wire_bytes,
+        'min_partial_gap_ms': round(min(gaps), 1) if gaps else None,
+        'reconstruct_mismatches': mismatches,
+        'final_mismatches': final_mismatches,
+        'stats': stabilizer.stats.to_dict() if stabilizer else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sentences', type=int, default=5)
+    parser.add_argument('--chars', type=int, default=200, help='每句字数')
+    parser.add_argument('--revise', type=float, default=0.2, help='中间结果改写末尾的概率')
+    parser.add_argument('--partial-ms', type=float, default=5, help='中间结果到达间隔')
+    parser.add_argument('--interval-ms', type=int, default=50, help='节流模式的最短下发间隔')
+    parser.add_argument('--seed', type=int, default=11)
+    args = parser.parse_args()
+
+    sentences = make_sentences(args)
+    results = [run(mode, sentences, args) for mode in ('full', 'delta', 'delta+throttle')]
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    full, delta, throttled = results
+    ok = (all(r['reconstruct_mismatches'] == 0 and r['final_mismatches'] == 0 for r in results)
+          and delta['wire_bytes'] < full['wire_bytes'] / 5
+          and throttled['min_partial_gap_ms'] >= args.interval_ms
+          and throttled['frames'] < delta['frames'])
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
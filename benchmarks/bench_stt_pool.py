@@ -0,0 +1,151 @@
+"""
+STT 会话池压测
+
+用替身 Recognition 模拟 DashScope SDK：start() 立即返回，后台线程经过握手延迟后才开始处理音频，
+首个识别结果在连接建立后 + 处理延迟到达。对比 AliyunSttService 在开启 / 关闭会话池时
+从 start_session 到首个识别结果的耗时。
+
+Usage:
+    python benchmarks/bench_stt_pool.py --sessions 80 --concurrency 8 --handshake-ms 300
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+os.environ.setdefault('DASHSCOPE_API_KEY', 'bench')
+
+
+class _Result:
+    def __init__(self, sentence):
+        self.sentence = sentence
+
+    def get_sentence(self):
+        return self.sentence
+
+
+class StandInRecognition:
+    """替身 Recognition：握手在后台线程完成，之前发送的音频排队"""
+
+    handshake_ms = 300.0
+    process_ms = 20.0
+
+    def __init__(self, model, format, sample_rate, callback, **kwargs):
+        self._callback = callback
+        self._running = False
+        self._connected = threading.Event()
+        self._first_audio = threading.Event()
+
+    def start(self):
+        self._running = True
+        self._callback.on_open()
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def _worker(self):
+        time.sleep(max(0.0, random.gauss(self.handshake_ms, self.handshake_ms * 0.2)) / 1000)
+        self._connected.set()
+        while self._running:
+            if self._first_audio.wait(0.05):
+                time.sleep(self.process_ms / 1000)
+                self._callback.on_event(_Result({'text': '你好', 'end_time': None, 'begin_time': 0}))
+                return
+
+    def send_audio_frame(self, buffer):
+        if not self._running:
+            raise RuntimeError("Speech recognition has stopped.")
+        if buffer.count(0) != len(buffer):  # 静音保活帧不触发识别
+            self._first_audio.set()
+
+    def stop(self):
+        self._running = False
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+async def run(pooled: bool, args) -> dict:
+    from dashscope.audio import asr
+    from src.perception.stt import aliyun, pool as pool_module
+    from src.perception.stt import SttConfig
+
+    asr.Recognition = StandInRecognition
+    StandInRecognition.handshake_ms = args.handshake_ms
+    os.environ['STT_POOL_ENABLED'] = 'true' if pooled else 'false'
+    pool_module._pool = pool_module.SttSessionPool(
+        size=args.pool_size, max_total=args.pool_size * 4,
+        opener=lambda key, cb: _open(key, cb),
+    )
+    if pooled:
+        await pool_module.get_stt_pool().start()
+        await asyncio.sleep(args.handshake_ms * 2 / 1000)
+
+    audio = bytes([1]) * 3200
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def one(i):
+        async with semaphore:
+            service = aliyun.AliyunSttService()
+            first = asyncio.Event()
+            loop = asyncio.get_running_loop()
+            service.on_partial(lambda r: loop.call_soon_threadsafe(first.set))
+            start = time.perf_counter()
+            await service.start_session(f"bench_{i}", SttConfig(model="paraformer-realtime-v2"))
+            await service.send_audio(audio)
+            await first.wait()
+            latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(args.session_ms / 1000)
+            await service.stop_session()
+
+    await asyncio.gather(*(one(i) for i in range(args.sessions)))
+    stats = pool_module.get_stt_pool().stats()
+    await pool_module.close_stt_pool()
+    return {
+        'mode': 'pooled' if pooled else 'direct',
+        'first_result_p50_ms': round(percentile(latencies, 50), 1),
+        'first_result_p95_ms': round(percentile(latencies, 95), 1),
+        'first_result_p99_ms': round(percentile(latencies, 99), 1),
+        'pool': {k: stats[k] for k in ('hits', 'misses', 'opened')} if pooled else None,
+    }
+
+
+def _open(key, callback):
+    model, sample_rate = key
+    recognition = StandInRecognition(model=model, format='pcm', sample_rate=sample_rate, callback=callback)
+    recognition.start()
+    recognition._connected.wait()
+    return recognition
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=80)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--handshake-ms', type=float, default=300)
+    parser.add_argument('--session-ms', type=float, default=1000, help='首个结果之后会话继续占用的时长')
+    parser.add_argument('--pool-size', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    results = [asyncio.run(run(pooled, args)) for pooled in (False, True)]
+    print(json.dumps(results, indent=2))
+
+    direct, pooled = results
+    ok = pooled['first_result_p50_ms'] < direct['first_result_p50_ms'] / 2
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+STT 会话截止时间调度压测
+
+模拟大量并发音频会话，每个会话需要保活、空闲超时与最长时长三个截止时间，
+音频帧每 100ms 到达一次并推后截止时间。对比：
+- tasks: 每个会话一个保活休眠任务 + loop.call_later 的空闲 / 最长时长定时器（音频到达时取消重建）
+- wheel: perception.timer_wheel.SessionDeadlines（全局时间轮，音频到达时惰性推后）
+
+统计 CPU 时间、事件循环延迟（探针 p99）、内存峰值与存活任务数。
+
+Usage:
+    python benchmarks/bench_timer_wheel.py --sessions 5000 --seconds 5
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.timer_wheel import SessionDeadlines, TimerWheel
+
+KEEPALIVE = 10.0
+IDLE_TIMEOUT = 30.0
+MAX_DURATION = 600.0
+
+
+class TaskDeadlines:
+    """对照组：每会话一个保活任务 + 事件循环定时器"""
+
+    def __init__(self, on_keepalive, on_expire):
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._on_expire = on_expire
+        self._on_keepalive = on_keepalive
+        self._last_audio = time.monotonic()
+        self._task = loop.create_task(self._keepalive_loop())
+        self._idle = loop.call_later(IDLE_TIMEOUT, on_expire, "idle_timeout")
+        self._max = loop.call_later(MAX_DURATION, on_expire, "max_duration")
+
+    async def _keepalive_loop(self):
+        while True:
+            await asyncio.sleep(KEEPALIVE)
+            if time.monotonic() - self._last_audio >= KEEPALIVE:
+                self._on_keepalive()
+
+    def touch(self):
+        self._last_audio = time.monotonic()
+        self._idle.cancel()
+        self._idle = self._loop.call_later(IDLE_TIMEOUT, self._on_expire, "idle_timeout")
+
+    def cancel(self):
+        self._task.cancel()
+        self._idle.cancel()
+        self._max.cancel()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+async def run(mode: str, args) -> dict:
+    noop = lambda *a: None
+    tracemalloc.start()
+    wheel = TimerWheel()
+
+    def make():
+        if mode == 'wheel':
+            return SessionDeadlines(
+                on_keepalive=noop, keepalive_interval=KEEPALIVE,
+                on_expire=noop, idle_timeout=IDLE_TIMEOUT, max_duration=MAX_DURATION,
+                wheel=wheel
+            )
+        return TaskDeadlines(noop, noop)
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    sessions = [make() for _ in range(args.sessions)]
+    lags = []
+
+    async def probe():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append((time.perf_counter() - start - 0.01) * 1000)
+
+    async def audio():
+        # 音频帧每 100ms 到达一次，分批推后各会话的截止时间
+        batches = 10
+        size = (len(sessions) + batches - 1) // batches
+        i = 0
+        while True:
+            for s in sessions[(i % batches) * size:(i % batches + 1) * size]:
+                s.touch()
+            i += 1
+            await asyncio.sleep(0.1 / batches)
+
+    probe_task = asyncio.create_task(probe())
+    audio_task = asyncio.create_task(audio())
+    await asyncio.sleep(args.seconds)
+    audio_task.cancel()
+    probe_task.cancel()
+    tasks_alive = len(asyncio.all_tasks())
+
+    for s in sessions:
+        s.cancel()
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    wheel.close()
+
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    return {
+        'mode': mode,
+        'sessions': args.sessions,
+        'cpu_s': round(cpu, 2),
+        'loop_lag_p50_ms': round(percentile(lags, 50), 2),
+        'loop_lag_p99_ms': round(percentile(lags, 99), 2),
+        'peak_mem_mb': round(peak / 1024 / 1024, 1),
+        'tasks_alive': tasks_alive,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=5000)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(mode, args)) for mode in ('tasks', 'wheel')]
+    print(json.dumps(results, indent=2))
+
+    tasks, wheel = results
+    ok = wheel['cpu_s'] < tasks['cpu_s'] and wheel['peak_mem_mb'] < tasks['peak_mem_mb']
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
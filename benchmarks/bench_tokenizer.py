@@ -0,0 +1,115 @@
+"""
+Token 计数压测
+
+生成中英混合长文本（中文句子、英文句子、代码与数字交替），对比 reasoning.llm.tokenizer.Tokenizer：
+- throughput: 单条长文本的计数吞吐（字符/秒、token/秒）
+- batch: 多条消息逐条计数 vs count_batch 一次批量计数（冷缓存；多核时并行编码）
+- growing: 模拟增长中的对话，每轮对全部历史计数；无缓存 vs 按消息缓存
+- estimate: 原先按字符数 / 2 估算的误差
+
+Usage:
+    python benchmarks/bench_tokenizer.py --chars 400000 --messages 400 --turns 200
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.reasoning.llm.base import Message, MessageRole
+from src.reasoning.llm.tokenizer import Tokenizer, MESSAGE_OVERHEAD
+
+_ZH = ["请帮我查询明天从上海到北京的航班信息", "这个方案的成本大约是多少", "我们需要在周五之前完成代码评审",
+       "模型的上下文长度限制了对话历史的保留", "语音识别的结果会实时推送给客户端"]
+_EN = ["The quick brown fox jumps over the lazy dog.", "Latency budgets dominate real-time voice agents.",
+       "Please summarize the previous discussion in three bullet points.", "Tokenizers split text into subword units."]
+_CODE = ["def handler(event):\n    return {'status': 200, 'body': event}\n", "for i in range(1024): total += i * 3.14\n",
+         "SELECT id, name FROM users WHERE created_at > '2024-01-01';\n"]
+
+
+def mixed_text(rng: random.Random, chars: int) -> str:
+    parts, size = [], 0
+    while size < chars:
+        part = rng.choice([rng.choice(_ZH) + "。", " " + rng.choice(_EN), rng.choice(_CODE), f" {rng.randint(0, 10 ** 6)} "])
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)[:chars]
+
+
+def timed(fn, *args):
+    begin = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - begin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chars', type=int, default=400_000, help='长文本字符数')
+    parser.add_argument('--messages', type=int, default=400, help='batch 场景的消息数')
+    parser.add_argument('--turns', type=int, default=200, help='growing 场景的对话轮数')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    Tokenizer().count_text("warm up")    # 词表加载不计入
+
+    # 单条长文本
+    text = mixed_text(rng, args.chars)
+    tokens, elapsed = timed(Tokenizer().count_text, text)
+    throughput = {
+        'chars': len(text),
+        'tokens': tokens,
+        'chars_per_s': round(len(text) / elapsed),
+        'tokens_per_s': round(tokens / elapsed),
+    }
+
+    # 逐条 vs 批量
+    messages = [Message(role=MessageRole.USER, content=mixed_text(rng, rng.randint(200, 2000)))
+                for _ in range(args.messages)]
+    sequential_tokenizer = Tokenizer()
+    sequential, sequential_s = timed(lambda: [sequential_tokenizer.count_message(m) for m in messages])
+    batch, batch_s = timed(Tokenizer().count_batch, messages)
+    batched = {
+        'messages': len(messages),
+        'sequential_ms': round(sequential_s * 1000, 1),
+        'batch_ms': round(batch_s * 1000, 1),
+        'speedup': round(sequential_s / batch_s, 2),
+        'identical': sequential == batch,
+    }
+
+    # 增长中的对话：每轮对全部历史计数
+    history = []
+    for turn in range(args.turns):
+        history.append(Message(role=MessageRole.USER, content=mixed_text(rng, rng.randint(20, 200))))
+        history.append(Message(role=MessageRole.ASSISTANT, content=mixed_text(rng, rng.randint(100, 800))))
+    growing = {'turns': args.turns}
+    totals = {}
+    for name, tokenizer in (('uncached', Tokenizer(cache_chars=0)), ('cached', Tokenizer())):
+        begin = time.perf_counter()
+        totals[name] = [tokenizer.count_messages(history[:2 * (turn + 1)]) for turn in range(args.turns)]
+        growing[f'{name}_ms'] = round((time.perf_counter() - begin) * 1000, 1)
+    growing['speedup'] = round(growing['uncached_ms'] / growing['cached_ms'], 1)
+    growing['identical'] = totals['uncached'] == totals['cached']
+
+    # 原估算的误差
+    errors = [abs(len(m.content) // 2 - (c - MESSAGE_OVERHEAD)) / (c - MESSAGE_OVERHEAD) for m, c in zip(messages, batch)]
+    estimate = {'mean_abs_error_pct': round(100 * sum(errors) / len(errors), 1)}
+
+    result = {'throughput': throughput, 'batch': batched, 'growing': growing, 'estimate': estimate}
+    print(json.dumps(result, indent=2))
+
+    ok = (batched['identical'] and growing['identical']
+          and throughput['chars_per_s'] > 500_000
+          and growing['speedup'] >= 10)
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
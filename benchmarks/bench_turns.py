@@ -0,0 +1,132 @@
+"""
+对话轮次调度压测
+
+模拟用户一口气说出几句短句：每组 --burst 句，句间间隔 --gap-ms，组间静默 --pause-ms。
+回答由 Fake LLM 生成（首 token --llm-ttft-ms，每 token --llm-token-gap-ms）。对比：
+- serial: 逐句串行回答（原行为）
+- merge: orchestrator.turns.TurnScheduler，生成期间到达的句子合并为一个轮次
+- barge_in: 新句子到达时打断进行中的生成，与被打断的句子合并重新生成
+
+统计每句最终结果到「覆盖该句的回答」首个增量的延迟、LLM 调用次数、完整回答数、
+被打断作废的增量数，以及调度器的排队时长。
+时间按 --speed 压缩回放，输出的毫秒数已换算回真实时间。
+
+Usage:
+    python benchmarks/bench_turns.py --groups 8 --burst 3 --gap-ms 400
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import LatencyDistribution
+from src.reasoning.llm.base import Message, MessageRole, LlmConfig
+from src.reasoning.llm.fake import FakeLlmService
+from src.perception.channel import EventChannel
+from src.orchestrator.turns import TurnScheduler
+
+MODES = {
+    'serial': dict(merge=False, barge_in=False),
+    'merge': dict(merge=True, barge_in=False),
+    'barge_in': dict(merge=True, barge_in=True),
+}
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+async def run(mode: str, args) -> dict:
+    s = args.speed
+    llm = FakeLlmService(
+        ttft=LatencyDistribution(args.llm_ttft_ms * s, 0),
+        token_gap=LatencyDistribution(args.llm_token_gap_ms * s, 0),
+        tokens=args.llm_tokens,
+    )
+    sentences = EventChannel(merge_partials=False, name="bench_turns")
+    scheduler = TurnScheduler(sentences, name="bench", **MODES[mode])
+    final_at = {}           # 句子 -> 最终结果时间
+    answered = {}           # 句子 -> 覆盖该句的完整回答的首个增量时间
+    counters = {'llm_calls': 0, 'answers': 0, 'wasted_deltas': 0}
+
+    async def answer(turn):
+        counters['llm_calls'] += 1
+        first, deltas = None, 0
+        try:
+            messages = [Message(role=MessageRole.USER, content=turn.text)]
+            async for chunk in llm.chat_stream(messages, LlmConfig(model="fake-model")):
+                if chunk.delta:
+                    first = first or time.monotonic()
+                    deltas += 1
+        except asyncio.CancelledError:
+            counters['wasted_deltas'] += deltas
+            raise
+        counters['answers'] += 1
+        for sentence in turn.sentences:
+            answered[sentence.text] = first
+
+    worker = asyncio.create_task(scheduler.run(answer))
+    index = 0
+    for _ in range(args.groups):
+        for i in range(args.burst):
+            if i:
+                await asyncio.sleep(args.gap_ms * s / 1000)
+            text = f"第{index}句"
+            index += 1
+            final_at[text] = time.monotonic()
+            sentences.put(text)
+        await asyncio.sleep(args.pause_ms * s / 1000)
+    sentences.close()
+    await worker
+    scheduler.close()
+
+    delays = [(answered[text] - at) * 1000 / s for text, at in final_at.items() if text in answered]
+    stats = scheduler.stats.to_dict()
+    for key in ('avg_queue_delay_ms', 'max_queue_delay_ms'):
+        stats[key] = round(stats[key] / s, 1)
+    return {
+        'mode': mode,
+        'sentences': len(final_at),
+        'covered': len(delays),
+        'final_to_answer_p50_ms': round(percentile(delays, 50), 1),
+        'final_to_answer_p95_ms': round(percentile(delays, 95), 1),
+        **counters,
+        'scheduler': stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--groups', type=int, default=8)
+    parser.add_argument('--burst', type=int, default=3, help='每组连续说出的句子数')
+    parser.add_argument('--gap-ms', type=int, default=400, help='组内句间间隔')
+    parser.add_argument('--pause-ms', type=int, default=4000, help='组间静默')
+    parser.add_argument('--llm-ttft-ms', type=float, default=300)
+    parser.add_argument('--llm-token-gap-ms', type=float, default=30)
+    parser.add_argument('--llm-tokens', type=int, default=40)
+    parser.add_argument('--speed', type=float, default=0.2, help='时间压缩系数（0.2 表示 5 倍速回放）')
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(mode, args)) for mode in MODES]
+    print(json.dumps(results, indent=2))
+
+    serial, merge, barge_in = results
+    ok = (all(r['covered'] == r['sentences'] for r in results)
+          and merge['llm_calls'] < serial['llm_calls']
+          and merge['final_to_answer_p95_ms'] < serial['final_to_answer_p95_ms']
+          and barge_in['answers'] == args.groups
+          and barge_in['final_to_answer_p95_ms'] < merge['final_to_answer_p95_ms'])
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
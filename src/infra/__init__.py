@@ -28,6 +28,14 @@ from .hooks import (
     LoggingHooks,
 )
 
+from .multiplex import multiplex
+
+from .lru import LruCache
+
+from .singleflight import SingleFlight, StreamFlight, StreamSubscription, StreamSingleFlight, FlightCancelledError
+
+from .latency import LatencyDistribution
+
 from .nacos import (
     NacosRegistry,
     init_nacos_registry,
@@ -60,6 +68,17 @@ __all__ = [
     'AgentHooks',
     'CompositeHooks',
     'LoggingHooks',
+    # Streams
+    'multiplex',
+    # Cache
+    'LruCache',
+    'SingleFlight',
+    'StreamFlight',
+    'StreamSubscription',
+    'StreamSingleFlight',
+    'FlightCancelledError',
+    # Simulation
+    'LatencyDistribution',
     # Nacos Registry
     'NacosRegistry',
     'init_nacos_registry',
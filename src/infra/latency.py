@@ -0,0 +1,58 @@
+"""
+可配置的延迟分布
+
+供 fake Provider 等模拟组件按给定分布采样延迟，支持从环境变量读取配置。
+"""
+
+import os
+import math
+import random
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LatencyDistribution:
+    """延迟分布（毫秒）
+
+    - fixed:     恒定 mean_ms
+    - normal:    均值 mean_ms、标准差 mean_ms * jitter，截断到 >= 0
+    - lognormal: 中位数 mean_ms、形状参数 jitter（右偏长尾）
+    另外以 tail_prob 的概率返回 tail_ms，用于注入长尾。
+    """
+    mean_ms: float = 0.0
+    jitter: float = 0.0
+    kind: str = "normal"
+    tail_prob: float = 0.0
+    tail_ms: float = 0.0
+
+    def sample_ms(self, rng: Optional[random.Random] = None) -> float:
+        rng = rng or random
+        if self.tail_prob and rng.random() < self.tail_prob:
+            return self.tail_ms
+        if self.kind == "fixed" or not self.jitter:
+            return self.mean_ms
+        if self.kind == "lognormal":
+            return self.mean_ms * math.exp(rng.gauss(0, self.jitter))
+        return max(0.0, rng.gauss(self.mean_ms, self.mean_ms * self.jitter))
+
+    def sample(self, rng: Optional[random.Random] = None) -> float:
+        """采样（秒）"""
+        return self.sample_ms(rng) / 1000
+
+    @classmethod
+    def from_env(
+        cls,
+        prefix: str,
+        mean_ms: float,
+        jitter: float = 0.0,
+        kind: str = "normal"
+    ) -> 'LatencyDistribution':
+        """从环境变量读取：{prefix}_MS / _JITTER / _DIST / _TAIL_PROB / _TAIL_MS"""
+        return cls(
+            mean_ms=float(os.getenv(f'{prefix}_MS', str(mean_ms))),
+            jitter=float(os.getenv(f'{prefix}_JITTER', str(jitter))),
+            kind=os.getenv(f'{prefix}_DIST', kind),
+            tail_prob=float(os.getenv(f'{prefix}_TAIL_PROB', '0')),
+            tail_ms=float(os.getenv(f'{prefix}_TAIL_MS', '0')),
+        )
@@ -0,0 +1,144 @@
+"""
+按字节预算淘汰的 LRU + TTL 缓存
+
+供 LLM 响应缓存、转写缓存等复用。仅在事件循环内使用，不加锁。
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    expires_at: float
+
+
+class LruCache:
+    """LRU 缓存
+
+    - 总大小（调用方给出的字节数）超过 max_bytes 时淘汰最久未使用的条目
+    - 每个条目有独立 TTL，过期条目在读取时惰性删除
+
+    Usage:
+        cache = LruCache(max_bytes=64 * 1024 * 1024, ttl=3600)
+        cache.set(key, value, size=len(payload))
+        value = cache.get(key)
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+        max_entries: Optional[int] = None
+    ):
+        """
+        Args:
+            max_bytes: 字节预算
+            ttl: 默认条目存活时间（秒），None 表示不过期
+            max_entries: 最大条目数，None 表示不限制
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+
+        # 统计
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """读取条目并标记为最近使用"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, size: int, ttl: Optional[float] = None) -> bool:
+        """写入条目
+
+        Args:
+            key: 键
+            value: 值
+            size: 条目大小（字节）
+            ttl: 覆盖默认 TTL
+
+        Returns:
+            是否写入（单个条目超过字节预算时不缓存）
+        """
+        if size > self.max_bytes:
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else float('inf')
+        self._entries[key] = _Entry(value=value, size=size, expires_at=expires_at)
+        self._bytes += size
+
+        while self._bytes > self.max_bytes or (
+            self.max_entries is not None and len(self._entries) > self.max_entries
+        ):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return True
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """删除条目并返回其值"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._remove(key)
+        return entry.value
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
@@ -0,0 +1,100 @@
+"""
+流多路复用
+
+将「输出队列 + 生产者任务 + 停止信号」合并为一个事件驱动的异步迭代器，
+替代 `asyncio.wait_for(queue.get(), timeout=0.05)` 式的定时轮询：
+空闲的流不再周期性唤醒，新事件到达时立即交付。
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Optional, Set
+
+
+async def multiplex(
+    source: Any,
+    *producers: "asyncio.Future",
+    stop: Optional[asyncio.Event] = None,
+    raise_errors: bool = True
+) -> AsyncIterator[Any]:
+    """同时等待事件源、生产者任务与停止信号，仅在真实事件发生时唤醒
+
+    结束条件（任一满足）：
+    - 事件源已关闭且读空（source.closed 为真时 get() 抛出的异常视为关闭）
+    - 传入了生产者任务，且全部完成后事件源已读空
+    - stop 被置位（已缓冲的事件不再交付）
+
+    Args:
+        source: 事件源，需提供 `async get()` 与 `get_nowait()`
+                （asyncio.Queue、perception.channel.EventChannel 等）
+        producers: 生产者任务；全部完成且事件源读空后结束迭代
+        stop: 停止信号
+        raise_errors: 生产者任务异常时是否向调用方抛出
+
+    Yields:
+        事件源中的事件
+
+    Usage:
+        request_task = asyncio.create_task(request_processor())
+        async for response in multiplex(output_queue, request_task):
+            yield response
+    """
+    pending: Set[asyncio.Future] = set(producers)
+    get_task: Optional[asyncio.Future] = None
+    stop_task: Optional[asyncio.Future] = None
+
+    try:
+        while True:
+            if stop is not None and stop.is_set():
+                return
+
+            # 快速路径：已有缓冲事件时不创建等待任务
+            if get_task is None:
+                try:
+                    item = source.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+                else:
+                    yield item
+                    continue
+
+            if producers and not pending and get_task is None:
+                return
+
+            if get_task is None:
+                get_task = asyncio.ensure_future(source.get())
+            waiters = {get_task, *pending}
+            if stop is not None:
+                if stop_task is None:
+                    stop_task = asyncio.ensure_future(stop.wait())
+                waiters.add(stop_task)
+
+            done, _ = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            if stop_task in done:
+                return
+
+            for task in done & pending:
+                pending.discard(task)
+                if task.cancelled():
+                    continue
+                error = task.exception()
+                if error is not None and raise_errors:
+                    raise error
+
+            if get_task in done:
+                finished, get_task = get_task, None
+                try:
+                    item = finished.result()
+                except Exception:
+                    if getattr(source, 'closed', False):
+                        return
+                    raise
+                yield item
+            elif producers and not pending:
+                # 生产者已全部结束：放弃等待，回到快速路径读空剩余事件
+                get_task.cancel()
+                get_task = None
+
+    finally:
+        for task in (get_task, stop_task):
+            if task is not None and not task.done():
+                task.cancel()
@@ -0,0 +1,235 @@
+"""
+在途请求合并（singleflight）
+
+相同键的并发调用只执行一次上游请求，结果由所有调用方共享：
+- SingleFlight: 一次性结果（协程）
+- StreamFlight: 流式结果，后加入者先收到已缓冲的片段，再接收实时片段
+
+所有调用方都放弃（取消/提前退出）时，上游请求随之取消；
+上游被取消时仍在读取的订阅者收到 FlightCancelledError。
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class _Call:
+    """一次在途的一次性调用"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """合并相同键的并发协程调用
+
+    Usage:
+        flight = SingleFlight()
+        result, shared = await flight.do(key, lambda: fetch(...))
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """执行或加入相同键的在途调用
+
+        Args:
+            key: 合并键
+            fn: 发起上游调用的工厂函数（仅由首个调用方执行）
+
+        Returns:
+            (结果, 是否复用了其他调用方发起的请求)
+        """
+        call = self._calls.get(key)
+        shared = call is not None
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task), shared
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # 最后一个调用方放弃，取消上游
+                self._forget(key, call)
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+class FlightCancelledError(RuntimeError):
+    """共享的上游流被取消（订阅者收到的普通错误，而非 CancelledError）"""
+
+
+class StreamFlight:
+    """将一个上游异步迭代器广播给多个订阅者
+
+    上游片段按序缓冲，每个订阅者从头读取缓冲再等待新片段；
+    上游异常会传递给所有订阅者。
+    """
+
+    def __init__(self, source: AsyncIterator[Any], on_idle: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            source: 上游异步迭代器
+            on_idle: 所有订阅者都离开时的回调
+        """
+        self._source = source
+        self._on_idle = on_idle
+        self._buffer: List[Any] = []
+        self._changed = asyncio.Event()
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._subscribers = 0
+        self._task = asyncio.ensure_future(self._pump())
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def buffered(self) -> int:
+        return len(self._buffer)
+
+    async def _pump(self) -> None:
+        try:
+            async for item in self._source:
+                self._buffer.append(item)
+                self._notify()
+        except asyncio.CancelledError:
+            # 上游被取消：对仍在读取的订阅者表现为普通错误，不把取消传给无关的任务
+            self._error = FlightCancelledError("Shared stream was cancelled")
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done = True
+            self._notify()
+            aclose = getattr(self._source, 'aclose', None)
+            if aclose is not None:
+                try:
+                    await aclose()
+                except Exception:
+                    pass
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def subscribe(self) -> "StreamSubscription":
+        """订阅：立即计入订阅者；先回放已缓冲片段，再接收实时片段"""
+        return StreamSubscription(self)
+
+    def _release(self) -> None:
+        self._subscribers -= 1
+        if self._subscribers == 0 and not self._done:
+            # 没有订阅者了，取消上游
+            if self._on_idle is not None:
+                self._on_idle()
+            self._task.cancel()
+
+
+class StreamSubscription:
+    """StreamFlight 的一个订阅者
+
+    创建时即计入订阅者数；迭代结束、出错、被取消或调用 aclose() 时退订。
+    未迭代就被丢弃的订阅在回收时退订，不会让上游一直运行。
+    """
+
+    def __init__(self, flight: StreamFlight):
+        self.flight = flight
+        self._index = 0
+        self._active = True
+        flight._subscribers += 1
+
+    def __aiter__(self) -> "StreamSubscription":
+        return self
+
+    async def __anext__(self) -> Any:
+        flight = self.flight
+        if not self._active:
+            raise StopAsyncIteration
+        try:
+            while self._index >= len(flight._buffer):
+                if flight._done:
+                    self._close()
+                    if flight._error is not None:
+                        raise flight._error
+                    raise StopAsyncIteration
+                await flight._changed.wait()
+        except asyncio.CancelledError:
+            self._close()
+            raise
+        item = flight._buffer[self._index]
+        self._index += 1
+        return item
+
+    async def aclose(self) -> None:
+        self._close()
+
+    def _close(self) -> None:
+        if self._active:
+            self._active = False
+            self.flight._release()
+
+    def __del__(self):
+        try:
+            self._close()
+        except Exception:
+            pass
+
+
+class StreamSingleFlight:
+    """合并相同键的并发流式调用
+
+    Usage:
+        flights = StreamSingleFlight()
+        async for chunk in flights.subscribe(key, lambda: llm.chat_stream(...)):
+            ...
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, StreamFlight] = {}
+
+    def join(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> Tuple[StreamSubscription, bool]:
+        """订阅相同键的在途流，不存在时创建
+
+        返回时已计入订阅者；调用方用完（含提前退出）应 aclose()。
+
+        Returns:
+            (订阅, 是否复用了其他调用方发起的流)
+        """
+        flight = self._flights.get(key)
+        if flight is not None and not flight.done:
+            return flight.subscribe(), True
+
+        flight = StreamFlight(factory(), on_idle=lambda: self._forget(key, flight))
+        self._flights[key] = flight
+        flight._task.add_done_callback(lambda _: self._forget(key, flight))
+        return flight.subscribe(), False
+
+    async def subscribe(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        subscription, _ = self.join(key, factory)
+        try:
+            async for item in subscription:
+                yield item
+        finally:
+            await subscription.aclose()
+
+    def _forget(self, key: Hashable, flight: StreamFlight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def __len__(self) -> int:
+        return len(self._flights)
@@ -158,6 +158,15 @@ async def lifespan(app: FastAPI):
     session_manager = get_session_manager()
     await session_manager.start()
     
+    # 预先加载 token 计数词表（在线程池中，避免首个请求在事件循环中加载）
+    from .reasoning.llm.tokenizer import warm_tokenizer
+    await warm_tokenizer()
+    
+    # 预热 STT 识别会话池（如果启用）
+    from .perception.stt.pool import stt_pool_enabled, get_stt_pool
+    if stt_pool_enabled():
+        await get_stt_pool().start()
+    
     # 获取 gRPC 配置
     if get_nacos_config():
         grpc_port = int(_get_config("service.grpc-port", 50051))
@@ -212,6 +221,14 @@ async def lifespan(app: FastAPI):
     if grpc_server:
         await grpc_server.stop()
     await session_manager.stop()
+    
+    # 关闭 DashScope 连接池
+    from .reasoning.llm.transport import get_dashscope_transport
+    await get_dashscope_transport().close()
+    
+    # 关闭 STT 识别会话池
+    from .perception.stt.pool import close_stt_pool
+    await close_stt_pool()
     logger.info("Omni-Agent stopped")
 
 
@@ -10,6 +10,7 @@ Omni-Agent 编排层
 
 from .task import Task, TaskStatus, TaskResult, TaskContext
 from .session import Session, SessionConfig, SessionStatus, SessionManager, get_session_manager
+from .conversation import ConversationLog, ConversationView
 from .engine import Orchestrator
 from .events import PerceptionEvent, ModalityType, EventStage
 
@@ -25,6 +26,9 @@ __all__ = [
     'SessionStatus',
     'SessionManager',
     'get_session_manager',
+    # Conversation
+    'ConversationLog',
+    'ConversationView',
     # Engine
     'Orchestrator',
     # Events
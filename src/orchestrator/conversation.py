@@ -0,0 +1,100 @@
+"""
+对话日志
+
+Session.context 原先每次访问都遍历全部 Task、复制 task.result.messages 重建 TaskContext，
+长会话每轮 O(轮数) 复制，且所有 Task 对象永久驻留。ConversationLog 是按会话增量维护的只追加日志：
+- 追加 O(1)，消息在追加时冻结为只读映射，之后各处共享同一对象
+- view() 返回截至当前长度的只读快照（ConversationView），O(1) 创建、不复制列表
+- 日志只追加不修改，快照创建后内容不再变化
+
+Session 与 ProcessStream 的对话历史都由它承载。
+"""
+
+from collections.abc import Sequence
+from itertools import islice
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, List, Mapping, Optional
+
+
+def freeze_message(message: Mapping[str, Any]) -> Mapping[str, Any]:
+    """冻结为只读映射（已冻结的消息原样返回）"""
+    if isinstance(message, MappingProxyType):
+        return message
+    return MappingProxyType(dict(message))
+
+
+class ConversationView(Sequence):
+    """对话日志的只读快照
+
+    与日志共享底层列表，只记录区间 [start, stop)；日志只追加，区间内的消息不会变化。
+    需要修改时先 list(view) 复制。
+    """
+
+    __slots__ = ('_items', '_start', '_stop')
+
+    def __init__(self, items: List[Mapping[str, Any]], start: int = 0, stop: Optional[int] = None):
+        self._items = items
+        self._start = start
+        self._stop = len(items) if stop is None else stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return ConversationView(self._items, self._start + start, self._start + max(start, stop))
+            return [self._items[self._start + i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("conversation view index out of range")
+        return self._items[self._start + index]
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        return islice(self._items, self._start, self._stop)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ConversationView, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ConversationView({list(self)!r})"
+
+
+class ConversationLog:
+    """只追加的对话日志（单个会话内使用；追加与快照在 GIL 下线程安全）
+
+    Usage:
+        log = ConversationLog()
+        log.append("user", "你好")
+        log.append("assistant", "你好，有什么可以帮你？")
+        messages = [system, *log.view(), {"role": "user", "content": sentence}]
+    """
+
+    def __init__(self, messages: Optional[Iterable[Mapping[str, Any]]] = None):
+        self._items: List[Mapping[str, Any]] = []
+        if messages:
+            self.extend(messages)
+
+    def append(self, role: str, content: str, **extra: Any) -> Mapping[str, Any]:
+        """追加一条消息，返回冻结后的消息"""
+        message = MappingProxyType({"role": role, "content": content, **extra})
+        self._items.append(message)
+        return message
+
+    def extend(self, messages: Iterable[Mapping[str, Any]]) -> None:
+        """追加多条消息（如 TaskResult.messages）"""
+        self._items.extend(freeze_message(m) for m in messages)
+
+    def view(self, start: int = 0) -> ConversationView:
+        """截至当前的只读快照，start 为起始下标"""
+        return ConversationView(self._items, start, len(self._items))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        return iter(self.view())
@@ -0,0 +1,289 @@
+"""
+本地断句（端点检测）
+
+Provider 只有在句尾静音达到 max_sentence_silence（默认 800ms）并定稿后才发出最终结果。
+Endpointer 在本地结合三路信号提前判定一句话结束：
+- VAD 静音：按 20ms 帧判定语音（perception.vad），累计句尾连续静音时长（按音频时长计）
+- 中间结果稳定：最近一条中间结果保持不变超过 stable_ms
+- 标点：中间结果以句末标点结尾时所需静音按 punctuation_factor 缩短，以逗号等结尾时不提前断句
+满足条件时调用 on_endpoint（通常为 stt_service.flush：立即结束当前句，或以中间结果合成最终结果）。
+
+静音阈值按会话自适应：记录句中停顿（静音后恢复说话、未断句）的时长，阈值取近期停顿的高分位加余量，
+限制在 [min_silence_ms, provider_silence_ms]；断句后在 Provider 断句窗口内又恢复说话视为过早断句，
+该停顿同样计入，阈值随之升高。
+埋点：orchestrator.endpointing 的 endpoint（断句时静音时长、阈值、估计提前量）、
+endpoint_premature 与会话结束时的 endpoint_summary。
+"""
+
+import time
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from ..infra import get_logger, get_metrics
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+_TERMINAL = frozenset("。？！?!.…")
+_CONTINUATION = frozenset("，、,；;：:")
+_MIN_PAUSE_MS = 100      # 短于该时长的静音视为字间间隙，不计入停顿统计
+_MIN_SAMPLES = 3         # 停顿样本少于该数时使用初始阈值
+
+
+@dataclass
+class EndpointStats:
+    """断句统计"""
+    endpoints: int = 0           # 本地断句次数
+    premature: int = 0           # 断句后在 Provider 断句窗口内恢复说话
+    provider_finals: int = 0     # 未经本地断句、由 Provider 发出的最终结果
+    saved_ms: float = 0.0        # 估计提前量累计（Provider 断句窗口 - 断句时的静音时长）
+    threshold_ms: float = 0.0    # 当前静音阈值
+
+    @property
+    def premature_ratio(self) -> float:
+        return self.premature / self.endpoints if self.endpoints else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'endpoints': self.endpoints,
+            'premature': self.premature,
+            'premature_ratio': round(self.premature_ratio, 4),
+            'provider_finals': self.provider_finals,
+            'saved_ms': round(self.saved_ms, 1),
+            'threshold_ms': round(self.threshold_ms, 1),
+        }
+
+
+class Endpointer:
+    """本地断句引擎（每个流式会话一个实例）
+
+    push_audio 在事件循环中按发送顺序调用（音频送入 STT 之后）；
+    observe_partial / observe_final 可在 SDK 线程调用。
+
+    Usage:
+        endpointer = Endpointer(on_endpoint=stt_service.flush, provider_silence_ms=800)
+        stt_service.on_partial(lambda r: endpointer.observe_partial(r.text))
+        stt_service.on_final(lambda r: endpointer.observe_final(r.text))
+
+        await stt_service.send_audio(chunk)
+        await endpointer.push_audio(chunk)
+        endpointer.close()
+    """
+
+    def __init__(
+        self,
+        on_endpoint: Callable[[], Awaitable[None]],
+        sample_rate: int = 16000,
+        initial_silence_ms: float = 500,
+        min_silence_ms: float = 200,
+        provider_silence_ms: float = 800,
+        stable_ms: float = 200,
+        punctuation_factor: float = 0.6,
+        margin_ms: float = 100,
+        quantile: float = 0.9,
+        history: int = 20,
+        name: str = "stream"
+    ):
+        """
+        Args:
+            on_endpoint: 判定句子结束时调用
+            sample_rate: 音频采样率（PCM 16bit 单声道）
+            initial_silence_ms: 初始静音阈值（停顿样本不足时使用）
+            min_silence_ms: 自适应阈值下限
+            provider_silence_ms: Provider 断句静音（max_sentence_silence），也是阈值上限
+            stable_ms: 中间结果最短稳定时长
+            punctuation_factor: 中间结果以句末标点结尾时静音阈值的缩放系数
+            margin_ms: 停顿分位数之上的余量
+            quantile: 停顿统计取的分位数
+            history: 参与统计的最近停顿数
+            name: 名称（用于埋点）
+
+        Raises:
+            ImportError: 未安装 numpy
+        """
+        import numpy as np
+        from ..perception.vad import VoiceActivityDetector
+
+        self._np = np
+        self._on_endpoint = on_endpoint
+        self._vad = VoiceActivityDetector(sample_rate=sample_rate)
+        self.frame_ms = 1000 * self._vad.frame_samples / sample_rate
+        self.initial_silence_ms = initial_silence_ms
+        self.min_silence_ms = min(min_silence_ms, provider_silence_ms)
+        self.provider_silence_ms = provider_silence_ms
+        self.stable = stable_ms / 1000
+        self.punctuation_factor = punctuation_factor
+        self.margin_ms = margin_ms
+        self.quantile = quantile
+        self.name = name
+        self._pauses: Deque[float] = deque(maxlen=history)   # 近期句中停顿时长
+        self.stats = EndpointStats(threshold_ms=self.threshold_ms)
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._remainder = b""
+        self._silence_ms = 0.0                        # 句尾连续静音
+        self._in_pause = False                        # 当前静音始于句中（已有中间结果）
+        self._text = ""                               # 当前句最近的中间结果
+        self._changed_at = 0.0
+        self._endpointed = False                      # 已断句，等待确认是否过早
+        self._expect_final = False                    # 下一条最终结果由本地断句触发
+        self._closed = False
+
+    @property
+    def threshold_ms(self) -> float:
+        """当前静音阈值：近期句中停顿的高分位 + 余量"""
+        if len(self._pauses) < _MIN_SAMPLES:
+            return self.initial_silence_ms
+        pauses = sorted(self._pauses)
+        q = pauses[min(len(pauses) - 1, int(len(pauses) * self.quantile))]
+        return min(self.provider_silence_ms, max(self.min_silence_ms, q + self.margin_ms))
+
+    # ---------- STT 回调（线程安全）----------
+
+    def observe_partial(self, text: str) -> None:
+        self._call(self._on_partial, text)
+
+    def observe_final(self, text: str) -> None:
+        self._call(self._on_final, text)
+
+    def _call(self, callback, text: str) -> None:
+        if threading.get_ident() == self._loop_thread_id:
+            callback(text)
+        else:
+            self._loop.call_soon_threadsafe(callback, text)
+
+    def _on_partial(self, text: str) -> None:
+        if self._closed or not text.strip() or text == self._text:
+            return
+        self._text = text
+        self._changed_at = time.monotonic()
+
+    def _on_final(self, text: str) -> None:
+        self._text = ""
+        self._in_pause = False
+        if self._expect_final:
+            self._expect_final = False
+        elif text.strip() and not self._closed:
+            self.stats.provider_finals += 1
+
+    # ---------- 音频 ----------
+
+    async def push_audio(self, chunk: bytes) -> None:
+        """更新句尾静音时长，满足断句条件时调用 on_endpoint"""
+        if self._closed:
+            return
+        np = self._np
+        data = self._remainder + bytes(chunk) if self._remainder else bytes(chunk)
+        frame_bytes = self._vad.frame_bytes
+        count = len(data) // frame_bytes
+        self._remainder = data[count * frame_bytes:]
+        if not count:
+            return
+
+        frames = np.frombuffer(data, dtype=np.int16, count=count * self._vad.frame_samples)
+        for speech in self._vad.classify(frames.reshape(count, self._vad.frame_samples)):
+            if speech:
+                if self._silence_ms:
+                    self._pause_ended(self._silence_ms)
+                self._silence_ms = 0.0
+            else:
+                if not self._silence_ms:
+                    self._in_pause = bool(self._text)
+                self._silence_ms += self.frame_ms
+                if self._endpointed and self._silence_ms >= self.provider_silence_ms:
+                    # 静音持续到 Provider 断句窗口：断句正确
+                    self._endpointed = False
+                    self._in_pause = False
+
+        required = self._required_silence()
+        if (required is not None and self._silence_ms >= required
+                and time.monotonic() - self._changed_at >= self.stable):
+            await self._endpoint(required)
+
+    def _required_silence(self) -> Optional[float]:
+        """当前句断句所需静音，None 表示不提前断句"""
+        text = self._text.rstrip()
+        if not text:
+            return None
+        threshold = self.threshold_ms
+        if text[-1] in _TERMINAL:
+            return threshold * self.punctuation_factor
+        if text[-1] in _CONTINUATION:
+            return None
+        return threshold
+
+    def _pause_ended(self, pause_ms: float) -> None:
+        """静音后恢复说话"""
+        if self._endpointed:
+            self._endpointed = False
+            self.stats.premature += 1
+            self._pauses.append(pause_ms)
+            metrics.track(
+                "orchestrator.endpointing", "endpoint_premature",
+                dimensions={"stream": self.name},
+                metrics={"pause_ms": pause_ms, "threshold_ms": self.threshold_ms}
+            )
+        elif self._in_pause and pause_ms >= _MIN_PAUSE_MS:
+            # 句中停顿
+            self._pauses.append(pause_ms)
+        self._in_pause = False
+        self.stats.threshold_ms = self.threshold_ms
+
+    async def _endpoint(self, required_ms: float) -> None:
+        silence_ms = self._silence_ms
+        saved_ms = max(0.0, self.provider_silence_ms - silence_ms)
+        self._text = ""
+        self._endpointed = True
+        self._expect_final = True
+        self.stats.endpoints += 1
+        self.stats.saved_ms += saved_ms
+        metrics.track(
+            "orchestrator.endpointing", "endpoint",
+            dimensions={"stream": self.name},
+            metrics={"silence_ms": silence_ms, "required_ms": required_ms, "saved_ms": saved_ms}
+        )
+        logger.debug("Local endpoint", stream=self.name, silence_ms=int(silence_ms), required_ms=int(required_ms))
+        try:
+            await self._on_endpoint()
+        except Exception as e:
+            self._expect_final = False
+            logger.warn("Endpoint callback failed", stream=self.name, exc=e)
+
+    def close(self) -> None:
+        """上报统计"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.stats.endpoints or self.stats.provider_finals:
+            self.stats.threshold_ms = self.threshold_ms
+            metrics.track(
+                "orchestrator.endpointing", "endpoint_summary",
+                dimensions={"stream": self.name},
+                metrics=self.stats.to_dict()
+            )
+
+
+def create_endpointer(
+    on_endpoint: Callable[[], Awaitable[None]],
+    config,
+    initial_silence_ms: float,
+    name: str = "stream"
+) -> Optional[Endpointer]:
+    """按 SttConfig 创建断句引擎；initial_silence_ms <= 0 或缺少 numpy 时返回 None"""
+    if initial_silence_ms <= 0:
+        return None
+    try:
+        return Endpointer(
+            on_endpoint,
+            sample_rate=config.sample_rate,
+            initial_silence_ms=min(initial_silence_ms, config.max_sentence_silence),
+            provider_silence_ms=config.max_sentence_silence,
+            name=name,
+        )
+    except ImportError:
+        logger.warn("numpy not installed, local endpointing disabled")
+        return None
@@ -4,15 +4,17 @@
 协调多模态输入与 Agent 执行，实现端到端任务处理
 """
 
+import os
 import uuid
 import asyncio
+from contextlib import aclosing
 from typing import AsyncIterator, Optional, Dict, Any, Callable
 
 from .task import Task, TaskStatus, TaskResult, TaskContext, ExecutionStep, StepType
 from .session import Session
 from .events import PerceptionEvent, ModalityType, EventStage
 from .trigger import TriggerEngine
-from ..infra import get_logger, generate_trace_id
+from ..infra import get_logger, generate_trace_id, multiplex
 
 logger = get_logger(__name__)
 
@@ -20,12 +22,21 @@ logger = get_logger(__name__)
 class Orchestrator:
     """编排引擎 - 协调多模态输入与 Agent 执行"""
     
-    def __init__(self, use_llm_trigger: bool = False):
+    def __init__(
+        self,
+        use_llm_trigger: bool = False,
+        stt_provider: str = "aliyun",
+        llm_provider: str = "qwen"
+    ):
         """
         Args:
             use_llm_trigger: 是否使用 LLM 进行触发判断
+            stt_provider: STT Provider 名称（如 fake 用于离线压测）
+            llm_provider: LLM Provider 名称
         """
         self.trigger = TriggerEngine(use_llm_judge=use_llm_trigger)
+        self.stt_provider = stt_provider
+        self.llm_provider = llm_provider
         self._agent = None
     
     def _get_agent(self):
@@ -127,11 +138,17 @@ class Orchestrator:
     ) -> AsyncIterator[Dict[str, Any]]:
         """处理音频流"""
         from ..perception.stt import SttRegistry, SttConfig
+        from ..perception.channel import EventChannel
+        from .endpointing import create_endpointer
         
-        stt_service = SttRegistry.get_service("aliyun")
-        result_queue: asyncio.Queue = asyncio.Queue()
+        stt_service = SttRegistry.get_service(self.stt_provider)
+        # STT 回调来自 SDK 线程，经通道线程安全地转入事件循环
+        result_queue = EventChannel(name="orchestrator_stt")
+        endpointer = None
         
         def on_partial(result):
+            if endpointer:
+                endpointer.observe_partial(result.text)
             event = PerceptionEvent(
                 event_id=f"evt_{uuid.uuid4().hex[:8]}",
                 modality=ModalityType.AUDIO,
@@ -139,23 +156,27 @@ class Orchestrator:
                 content=result.text,
                 confidence=result.confidence if hasattr(result, 'confidence') else 0.0,
             )
-            result_queue.put_nowait(("partial", event))
+            result_queue.put(("partial", event), partial=True)
         
         def on_final(result):
+            if endpointer:
+                endpointer.observe_final(result.text)
             event = PerceptionEvent(
                 event_id=f"evt_{uuid.uuid4().hex[:8]}",
                 modality=ModalityType.AUDIO,
                 stage=EventStage.FINAL,
                 content=result.text,
                 confidence=result.confidence if hasattr(result, 'confidence') else 1.0,
+                # 修正提前结束发出的同一句（整句替换上一条最终结果）
+                metadata={"correction": True} if result.is_correction else {},
             )
-            result_queue.put_nowait(("final", event))
+            result_queue.put(("final", event))
         
         def on_ready():
-            result_queue.put_nowait(("ready", None))
+            result_queue.put(("ready", None))
         
         def on_error(error):
-            result_queue.put_nowait(("error", error))
+            result_queue.put(("error", error))
         
         # 注册回调
         stt_service.on_partial(on_partial)
@@ -170,6 +191,11 @@ class Orchestrator:
             sample_rate=16000,
             enable_punctuation=True,
         )
+        # 本地断句：提前结束当前句，触发引擎收到（合成）最终结果后即可调用 Agent
+        endpointer = create_endpointer(
+            stt_service.flush, stt_config,
+            float(os.getenv('STT_ENDPOINT_SILENCE_MS', '0')), name="orchestrator"
+        )
         await stt_service.start_session(task.task_id, stt_config)
         
         try:
@@ -177,18 +203,15 @@ class Orchestrator:
             async def send_audio():
                 async for chunk in audio_stream:
                     await stt_service.send_audio(chunk)
+                    if endpointer:
+                        await endpointer.push_audio(chunk)
                 await stt_service.stop_session()
             
             send_task = asyncio.create_task(send_audio())
             
-            # 处理结果
-            while True:
-                try:
-                    event_type, event_data = await asyncio.wait_for(
-                        result_queue.get(), 
-                        timeout=0.1
-                    )
-                    
+            # 处理结果：发送结束且结果读空后退出
+            async with aclosing(multiplex(result_queue, send_task)) as events:
+                async for event_type, event_data in events:
                     if event_type == "ready":
                         yield {"type": "stt_ready"}
                     elif event_type == "partial":
@@ -196,22 +219,27 @@ class Orchestrator:
                             on_perception(event_data)
                         yield {"type": "perception", "event": event_data.to_dict()}
                     elif event_type == "final":
-                        task.add_perception(event_data)
+                        if not event_data.metadata.get("correction"):
+                            task.add_perception(event_data)
+                        else:
+                            # 修正提前结束的句子：尚未触发 Agent 时整句替换缓冲的最终结果，
+                            # 已回答（缓冲区已清空）时只通知调用方，不再次触发
+                            buffer = task.perception_buffer
+                            if buffer and buffer[-1].stage == EventStage.FINAL:
+                                buffer[-1] = event_data
                         if on_perception:
                             on_perception(event_data)
                         yield {"type": "perception", "event": event_data.to_dict()}
                     elif event_type == "error":
                         yield {"type": "error", "error": str(event_data)}
                         break
-                        
-                except asyncio.TimeoutError:
-                    if send_task.done():
-                        break
-                    continue
             
             await send_task
             
         finally:
+            result_queue.close()
+            if endpointer:
+                endpointer.close()
             try:
                 await stt_service.stop_session()
             except:
@@ -224,7 +252,8 @@ class Orchestrator:
         on_thinking: Optional[Callable[[str], None]] = None,
     ) -> AsyncIterator[Dict[str, Any]]:
         """调用 Agent 进行推理"""
-        from ..reasoning.llm import LlmRegistry, Message, MessageRole, LlmConfig
+        from ..reasoning.llm import LlmRegistry, Message, MessageRole, LlmConfig, LlmPriority
+        from ..reasoning.context_window import get_context_window
         
         # 构建 system prompt
         system_prompt = self._build_system_prompt(task)
@@ -238,6 +267,14 @@ class Orchestrator:
             role = MessageRole.USER if msg.get("role") == "user" else MessageRole.ASSISTANT
             llm_messages.append(Message(role=role, content=msg.get("content", "")))
         
+        llm_service = LlmRegistry.get_service(self.llm_provider)
+        config = LlmConfig(model="qwen-turbo", temperature=0.7, max_tokens=2048, priority=LlmPriority.INTERACTIVE)
+        
+        # 按模型的 token 预算裁剪会话历史
+        window = get_context_window(config.model, llm_service)
+        if window:
+            llm_messages = window.fit_messages(llm_messages)
+        
         # 创建执行步骤
         step = ExecutionStep(
             step_id=step_id,
@@ -246,9 +283,6 @@ class Orchestrator:
         )
         
         # 调用 LLM
-        llm_service = LlmRegistry.get_service("qwen")
-        config = LlmConfig(model="qwen-turbo", temperature=0.7, max_tokens=2048)
-        
         full_content = ""
         async for chunk in llm_service.chat_stream(llm_messages, config):
             if chunk.delta:
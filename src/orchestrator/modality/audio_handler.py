@@ -35,10 +35,14 @@ class AudioPerceptionHandler:
             感知事件
         """
         from ...perception.stt import SttRegistry, SttConfig
+        from ...perception.channel import EventChannel
+        from ...infra import multiplex
+        from contextlib import aclosing
         import asyncio
         
         stt_service = SttRegistry.get_service(provider)
-        result_queue: asyncio.Queue = asyncio.Queue()
+        # STT 回调来自 SDK 线程，经通道线程安全地转入事件循环
+        result_queue = EventChannel(name="audio_handler_stt")
         
         def on_partial(result):
             event = PerceptionEvent(
@@ -49,7 +53,7 @@ class AudioPerceptionHandler:
                 confidence=getattr(result, 'confidence', 0.0),
                 timestamp=datetime.now(),
             )
-            result_queue.put_nowait(event)
+            result_queue.put(event, partial=True)
         
         def on_final(result):
             event = PerceptionEvent(
@@ -60,7 +64,7 @@ class AudioPerceptionHandler:
                 confidence=getattr(result, 'confidence', 1.0),
                 timestamp=datetime.now(),
             )
-            result_queue.put_nowait(event)
+            result_queue.put(event)
         
         def on_error(error):
             event = PerceptionEvent(
@@ -71,7 +75,7 @@ class AudioPerceptionHandler:
                 confidence=0.0,
                 timestamp=datetime.now(),
             )
-            result_queue.put_nowait(event)
+            result_queue.put(event)
         
         # 注册回调
         stt_service.on_partial(on_partial)
@@ -96,26 +100,18 @@ class AudioPerceptionHandler:
             
             send_task = asyncio.create_task(send_audio())
             
-            # 处理结果
-            while True:
-                try:
-                    event = await asyncio.wait_for(result_queue.get(), timeout=0.1)
+            # 处理结果：发送结束且结果读空后退出
+            async with aclosing(multiplex(result_queue, send_task)) as events:
+                async for event in events:
                     yield event
                     
                     if event.stage == EventStage.ERROR:
                         break
-                        
-                except asyncio.TimeoutError:
-                    if send_task.done():
-                        # 等待队列中剩余的事件
-                        while not result_queue.empty():
-                            yield result_queue.get_nowait()
-                        break
-                    continue
             
             await send_task
             
         finally:
+            result_queue.close()
             try:
                 await stt_service.stop_session()
             except:
@@ -4,22 +4,31 @@ Session 定义
 Session 是 Task 的容器，用于多轮对话场景（可选）
 """
 
+import os
+import time
 import uuid
+import heapq
 import asyncio
-import threading
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from enum import Enum
-from typing import Dict, Any, Optional, List
+from typing import Deque, Dict, Any, Optional, List, Tuple
 
 from .task import Task, TaskContext, TaskStatus
 from .events import ModalityType
+from .conversation import ConversationLog
 from ..infra import get_logger, get_metrics, generate_trace_id
 
 logger = get_logger(__name__)
 metrics = get_metrics()
 
 
+def _task_history() -> int:
+    """每个会话保留的最近 Task 数（SESSION_TASK_HISTORY，默认 50）"""
+    return max(1, int(os.getenv('SESSION_TASK_HISTORY', '50')))
+
+
 class SessionStatus(Enum):
     """会话状态"""
     CREATED = "created"
@@ -74,7 +83,7 @@ class SessionConfig:
     """会话配置"""
     stt: SttConfig = field(default_factory=SttConfig)
     llm: LlmConfig = field(default_factory=LlmConfig)
-    timeout_seconds: int = 3600  # 默认1小时超时
+    timeout_seconds: int = 3600  # 空闲超时，每次 touch 顺延（默认1小时）
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'SessionConfig':
@@ -136,8 +145,11 @@ class Session:
     config: SessionConfig
     status: SessionStatus
     
-    # 任务历史
-    tasks: List[Task] = field(default_factory=list)
+    # 任务历史（只保留最近 SESSION_TASK_HISTORY 个，对话内容在 conversation 中）
+    tasks: Deque[Task] = field(default_factory=lambda: deque(maxlen=_task_history()))
+    
+    # 对话日志（只追加，完成的任务结果增量并入）
+    conversation: ConversationLog = field(default_factory=ConversationLog)
     
     # 统计
     stats: SessionStats = field(default_factory=SessionStats)
@@ -153,15 +165,28 @@ class Session:
     def __post_init__(self):
         if self.expires_at is None:
             self.expires_at = self.created_at + timedelta(seconds=self.config.timeout_seconds)
+        # 尚未并入对话日志的任务（超出保留数量的最旧任务被丢弃）
+        self._unmerged: Deque[Task] = deque(maxlen=self.tasks.maxlen)
     
     @property
     def context(self) -> TaskContext:
-        """从历史任务聚合上下文"""
-        messages = []
-        for task in self.tasks:
+        """对话日志的只读快照（不复制消息）"""
+        self._merge_results()
+        return TaskContext(messages=self.conversation.view())
+    
+    def _merge_results(self) -> None:
+        """将已完成任务的结果按创建顺序并入对话日志，失败或取消的任务直接丢弃
+        
+        只检查尚未并入的任务（通常不超过一个）；晚于后续任务完成的任务按完成时的顺序追加。
+        """
+        remaining = []
+        for task in self._unmerged:
             if task.result:
-                messages.extend(task.result.messages)
-        return TaskContext(messages=messages)
+                self.conversation.extend(task.result.messages)
+            elif task.status not in (TaskStatus.FAILED, TaskStatus.CANCELLED):
+                remaining.append(task)
+        if len(remaining) != len(self._unmerged):
+            self._unmerged = deque(remaining, maxlen=self._unmerged.maxlen)
     
     def create_task(
         self, 
@@ -178,6 +203,7 @@ class Session:
             **kwargs
         )
         self.tasks.append(task)
+        self._unmerged.append(task)
         self.stats.tasks_count += 1
         self.touch()
         return task
@@ -193,8 +219,9 @@ class Session:
         return self.status == SessionStatus.ACTIVE and not self.is_expired()
     
     def touch(self) -> None:
-        """更新活跃时间"""
+        """更新活跃时间，并顺延过期时间（timeout_seconds 为空闲超时）"""
         self.updated_at = datetime.now(timezone.utc)
+        self.expires_at = self.updated_at + timedelta(seconds=self.config.timeout_seconds)
     
     def close(self) -> None:
         """关闭会话"""
@@ -208,7 +235,8 @@ class Session:
             "client_id": self.client_id,
             "config": self.config.to_dict(),
             "status": self.status.value,
-            "tasks_count": len(self.tasks),
+            "tasks_count": self.stats.tasks_count,
+            "messages_count": len(self.conversation),
             "stats": self.stats.to_dict(),
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
@@ -216,16 +244,36 @@ class Session:
         }
 
 
+class _Shard:
+    """会话注册表分片"""
+    
+    __slots__ = ('sessions', 'expiry')
+    
+    def __init__(self):
+        self.sessions: Dict[str, Session] = {}
+        # (过期时间戳, session_id) 最小堆；touch 顺延的过期时间在出堆时惰性重排
+        self.expiry: List[Tuple[float, str]] = []
+
+
 class SessionManager:
-    """会话管理器"""
+    """会话管理器
+    
+    会话按 session_id 的哈希分片保存，每个分片维护一个按过期时间排序的最小堆：
+    - 读取（get / get_active）只做一次字典查找，不加锁
+    - Session.touch() 只更新会话自身的过期时间，不访问注册表；清理时出堆发现已顺延则重新入堆
+    - 清理只处理堆顶已到期的条目（O(k log n)，k 为到期数），不扫描全部会话
+    
+    所有方法都应在事件循环线程中调用（HTTP / gRPC 处理函数均为协程）。
+    """
     
     def __init__(
         self,
-        cleanup_interval: int = 60,
-        max_sessions: int = 1000
+        cleanup_interval: float = 1.0,
+        max_sessions: int = 1000,
+        shards: int = 16
     ):
-        self._sessions: Dict[str, Session] = {}
-        self._lock = threading.RLock()
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._count = 0
         self._cleanup_interval = cleanup_interval
         self._max_sessions = max_sessions
         self._running = False
@@ -235,7 +283,7 @@ class SessionManager:
         """启动会话管理器"""
         self._running = True
         self._cleanup_task = asyncio.create_task(self._cleanup_loop())
-        logger.info("SessionManager started")
+        logger.info("SessionManager started", shards=len(self._shards))
     
     async def stop(self) -> None:
         """停止会话管理器"""
@@ -248,6 +296,9 @@ class SessionManager:
                 pass
         logger.info("SessionManager stopped")
     
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[hash(session_id) % len(self._shards)]
+    
     def create(
         self,
         client_id: str,
@@ -255,41 +306,42 @@ class SessionManager:
         metadata: Optional[Dict[str, Any]] = None
     ) -> Session:
         """创建会话"""
-        with self._lock:
-            if len(self._sessions) >= self._max_sessions:
-                self._cleanup_expired()
-                if len(self._sessions) >= self._max_sessions:
-                    raise RuntimeError(f"Max sessions limit reached: {self._max_sessions}")
-            
-            config = config or SessionConfig()
-            
-            session = Session(
-                session_id=f"sess_{uuid.uuid4().hex[:16]}",
-                trace_id=generate_trace_id(),
-                client_id=client_id,
-                config=config,
-                status=SessionStatus.ACTIVE,
-                metadata=metadata or {},
-            )
-            
-            self._sessions[session.session_id] = session
-            
-            metrics.track(
-                "session", "session_created",
-                dimensions={"client_id": client_id},
-            )
-            
-            logger.info("Session created", session_id=session.session_id, client_id=client_id)
-            
-            return session
+        if self._count >= self._max_sessions:
+            self._cleanup_expired()
+            if self._count >= self._max_sessions:
+                raise RuntimeError(f"Max sessions limit reached: {self._max_sessions}")
+        
+        config = config or SessionConfig()
+        
+        session = Session(
+            session_id=f"sess_{uuid.uuid4().hex[:16]}",
+            trace_id=generate_trace_id(),
+            client_id=client_id,
+            config=config,
+            status=SessionStatus.ACTIVE,
+            metadata=metadata or {},
+        )
+        
+        shard = self._shard(session.session_id)
+        shard.sessions[session.session_id] = session
+        heapq.heappush(shard.expiry, (session.expires_at.timestamp(), session.session_id))
+        self._count += 1
+        
+        metrics.track(
+            "session", "session_created",
+            dimensions={"client_id": client_id},
+        )
+        
+        logger.info("Session created", session_id=session.session_id, client_id=client_id)
+        
+        return session
     
     def get(self, session_id: str) -> Optional[Session]:
         """获取会话"""
-        with self._lock:
-            session = self._sessions.get(session_id)
-            if session and session.is_expired():
-                session.status = SessionStatus.EXPIRED
-            return session
+        session = self._shard(session_id).sessions.get(session_id)
+        if session and session.is_expired():
+            session.status = SessionStatus.EXPIRED
+        return session
     
     def get_active(self, session_id: str) -> Optional[Session]:
         """获取活跃会话"""
@@ -299,36 +351,36 @@ class SessionManager:
         return None
     
     def close(self, session_id: str) -> Optional[Session]:
-        """关闭会话"""
-        with self._lock:
-            session = self._sessions.get(session_id)
-            if not session:
-                return None
-            
-            session.close()
-            
-            duration_ms = int(
-                (session.updated_at - session.created_at).total_seconds() * 1000
-            )
-            
-            metrics.track(
-                "session", "session_closed",
-                dimensions={"client_id": session.client_id},
-                duration_ms=duration_ms,
-                metrics={"tasks_count": session.stats.tasks_count}
-            )
-            
-            logger.info("Session closed", session_id=session_id, duration_ms=duration_ms)
-            
-            return session
+        """关闭会话（下一次清理时移出注册表）"""
+        shard = self._shard(session_id)
+        session = shard.sessions.get(session_id)
+        if not session:
+            return None
+        
+        session.close()
+        heapq.heappush(shard.expiry, (session.updated_at.timestamp(), session_id))
+        
+        duration_ms = int(
+            (session.updated_at - session.created_at).total_seconds() * 1000
+        )
+        
+        metrics.track(
+            "session", "session_closed",
+            dimensions={"client_id": session.client_id},
+            duration_ms=duration_ms,
+            metrics={"tasks_count": session.stats.tasks_count}
+        )
+        
+        logger.info("Session closed", session_id=session_id, duration_ms=duration_ms)
+        
+        return session
     
     def delete(self, session_id: str) -> bool:
-        """删除会话"""
-        with self._lock:
-            if session_id in self._sessions:
-                del self._sessions[session_id]
-                return True
+        """删除会话（堆中的条目在到期出堆时丢弃）"""
+        if self._shard(session_id).sessions.pop(session_id, None) is None:
             return False
+        self._count -= 1
+        return True
     
     def list(
         self,
@@ -336,44 +388,52 @@ class SessionManager:
         status: Optional[SessionStatus] = None
     ) -> List[Session]:
         """列出会话"""
-        with self._lock:
-            sessions = list(self._sessions.values())
-            
-            if client_id:
-                sessions = [s for s in sessions if s.client_id == client_id]
-            if status:
-                sessions = [s for s in sessions if s.status == status]
-            
-            return sessions
+        sessions = [s for shard in self._shards for s in shard.sessions.values()]
+        
+        if client_id:
+            sessions = [s for s in sessions if s.client_id == client_id]
+        if status:
+            sessions = [s for s in sessions if s.status == status]
+        
+        return sessions
     
     def count(self) -> int:
         """获取会话数量"""
-        with self._lock:
-            return len(self._sessions)
+        return self._count
     
-    def _cleanup_expired(self) -> int:
-        """清理过期会话"""
-        expired_ids = []
+    def _cleanup_expired(self, now: Optional[float] = None) -> int:
+        """清理过期与已关闭的会话，只处理各分片堆顶已到期的条目"""
+        now = time.time() if now is None else now
+        removed = 0
         
-        for session_id, session in self._sessions.items():
-            if session.is_expired() or session.status == SessionStatus.CLOSED:
-                expired_ids.append(session_id)
+        for shard in self._shards:
+            expiry = shard.expiry
+            while expiry and expiry[0][0] <= now:
+                _, session_id = heapq.heappop(expiry)
+                session = shard.sessions.get(session_id)
+                if session is None:
+                    continue
+                if session.status != SessionStatus.CLOSED:
+                    deadline = session.expires_at.timestamp()
+                    if deadline > now:
+                        # touch 顺延了过期时间：按新的截止时间重新入堆
+                        heapq.heappush(expiry, (deadline, session_id))
+                        continue
+                del shard.sessions[session_id]
+                removed += 1
         
-        for session_id in expired_ids:
-            del self._sessions[session_id]
+        self._count -= removed
+        if removed:
+            logger.info(f"Cleaned up {removed} expired sessions")
         
-        if expired_ids:
-            logger.info(f"Cleaned up {len(expired_ids)} expired sessions")
-        
-        return len(expired_ids)
+        return removed
     
     async def _cleanup_loop(self) -> None:
         """定期清理循环"""
         while self._running:
             try:
                 await asyncio.sleep(self._cleanup_interval)
-                with self._lock:
-                    self._cleanup_expired()
+                self._cleanup_expired()
             except asyncio.CancelledError:
                 break
             except Exception as e:
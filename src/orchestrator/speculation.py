@@ -0,0 +1,281 @@
+"""
+推测生成
+
+ProcessStream 默认在 STT 最终结果（句尾静音 max_sentence_silence + 定稿）之后才调用 LLM。
+推测模式下，中间结果文本保持不变超过稳定窗口即以该文本提前开始生成，输出先缓冲：
+- 最终结果与推测文本一致（忽略标点与空白）：提交推测生成，缓冲的输出立即下发并继续流式输出
+- 不一致，或推测期间中间结果又发生变化：取消推测，之后按新文本重新推测或按最终结果正常生成
+
+推测只在上一轮回答结束、没有待处理句子时开始，保证对话历史与正常生成一致。
+埋点：orchestrator.speculation 的 speculation_commit（提前量 saved_ms）、
+speculation_cancel（浪费的输出片段数）与会话结束时的 speculation_summary（浪费比例）。
+"""
+
+import time
+import asyncio
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+from ..infra import get_logger, get_metrics
+from ..perception.stt.stabilizer import normalize_text
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+_DONE = object()
+
+
+@dataclass
+class SpeculationStats:
+    """推测生成统计（片段数为 LLM 流式输出的 chunk 数，近似 token 数）"""
+    started: int = 0
+    committed: int = 0
+    cancelled: int = 0
+    committed_chunks: int = 0
+    wasted_chunks: int = 0
+    saved_ms: float = 0.0        # 已提交推测的累计提前量
+
+    @property
+    def wasted_ratio(self) -> float:
+        total = self.committed_chunks + self.wasted_chunks
+        return self.wasted_chunks / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'started': self.started,
+            'committed': self.committed,
+            'cancelled': self.cancelled,
+            'committed_chunks': self.committed_chunks,
+            'wasted_chunks': self.wasted_chunks,
+            'wasted_ratio': round(self.wasted_ratio, 4),
+            'saved_ms': round(self.saved_ms, 1),
+        }
+
+
+class Speculation:
+    """一次推测生成：后台消费 LLM 流，输出缓冲在队列中直到提交"""
+
+    def __init__(self, text: str, stream: AsyncIterator[str]):
+        self.text = text
+        self.started_at = time.monotonic()
+        self.final_at: Optional[float] = None
+        self.chunks = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(stream))
+
+    async def _run(self, stream: AsyncIterator[str]) -> None:
+        try:
+            async for delta in stream:
+                self.chunks += 1
+                self._queue.put_nowait(delta)
+            self._queue.put_nowait(_DONE)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._queue.put_nowait(e)
+
+    async def stream(self) -> AsyncIterator[str]:
+        """提交后读取输出：先读出已缓冲的部分，再跟随后续输出"""
+        while True:
+            item = await self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+
+class SpeculativeGenerator:
+    """基于稳定中间结果的推测生成（每个流式会话一个实例）
+
+    observe_partial / observe_final 可在 SDK 线程调用；claim / release 在事件循环中由回答任务调用，
+    且 claim 与最终结果一一对应（只为非空最终结果调用 observe_final）。
+
+    Usage:
+        speculator = SpeculativeGenerator(generate=open_stream, stable_ms=300)
+        stt_service.on_partial(lambda r: speculator.observe_partial(r.text))
+        stt_service.on_final(lambda r: speculator.observe_final(r.text))   # 先于句子入队
+
+        speculation = speculator.claim(sentence)
+        try:
+            async for delta in (speculation.stream() if speculation else open_stream(sentence)):
+                ...
+        finally:
+            speculator.release()
+        speculator.close()
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str], AsyncIterator[str]],
+        stable_ms: float,
+        name: str = "stream"
+    ):
+        """
+        Args:
+            generate: 按用户文本打开 LLM 输出流（只产出增量文本）
+            stable_ms: 中间结果稳定窗口（毫秒）
+            name: 名称（用于埋点）
+        """
+        self._generate = generate
+        self.stable = stable_ms / 1000
+        self.name = name
+        self.stats = SpeculationStats()
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._partial = ""
+        self._changed_at = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._current: Optional[Speculation] = None
+        self._resolved: Deque[Optional[Speculation]] = deque()   # 已定稿、待 claim 的句子
+        self._committed: Optional[Speculation] = None             # 当前回答使用的推测
+        self._busy = False
+        self._closed = False
+
+    # ---------- STT 回调（线程安全）----------
+
+    def observe_partial(self, text: str) -> None:
+        self._call(self._on_partial, text)
+
+    def observe_final(self, text: str) -> None:
+        self._call(self._on_final, text)
+
+    def _call(self, callback, text: str) -> None:
+        if threading.get_ident() == self._loop_thread_id:
+            callback(text)
+        else:
+            self._loop.call_soon_threadsafe(callback, text)
+
+    def _on_partial(self, text: str) -> None:
+        if self._closed or not text.strip() or text == self._partial:
+            return
+        self._partial = text
+        self._changed_at = time.monotonic()
+        if self._current is not None and normalize_text(self._current.text) != normalize_text(text):
+            self._cancel(self._current, "diverged")
+            self._current = None
+        self._schedule()
+
+    def _on_final(self, text: str) -> None:
+        if self._closed:
+            return
+        self._cancel_timer()
+        speculation, self._current = self._current, None
+        self._partial = ""
+        if speculation is not None and normalize_text(speculation.text) != normalize_text(text):
+            self._cancel(speculation, "mismatch")
+            speculation = None
+        if speculation is not None:
+            speculation.final_at = time.monotonic()
+        self._resolved.append(speculation)
+
+    # ---------- 回答任务 ----------
+
+    def claim(self, sentence: str) -> Optional[Speculation]:
+        """取出该句对应的已提交推测，没有则返回 None（调用方正常生成）"""
+        self._busy = True
+        self._cancel_timer()
+        speculation = self._resolved.popleft() if self._resolved else None
+        if speculation is None:
+            return None
+
+        saved_ms = (speculation.final_at - speculation.started_at) * 1000
+        self.stats.committed += 1
+        self.stats.saved_ms += saved_ms
+        metrics.track(
+            "orchestrator.speculation", "speculation_commit",
+            dimensions={"stream": self.name},
+            metrics={"saved_ms": saved_ms, "buffered_chunks": speculation.chunks}
+        )
+        logger.debug("Speculation committed", stream=self.name, saved_ms=int(saved_ms), text=sentence[:30])
+        self._committed = speculation
+        return speculation
+
+    def claim_turn(self, sentences: List[str], merged: bool = False) -> Optional[Speculation]:
+        """按轮次取出推测（orchestrator.turns）：sentences 为首次参与轮次的句子
+
+        只有单句轮次可提交推测；合并轮次的文本与任何推测都不同，各句的推测直接取消。
+        """
+        if not merged and len(sentences) == 1:
+            return self.claim(sentences[0])
+        self._busy = True
+        self._cancel_timer()
+        for _ in sentences:
+            speculation = self._resolved.popleft() if self._resolved else None
+            if speculation is not None:
+                self._cancel(speculation, "merged")
+        return None
+
+    def release(self) -> None:
+        """本轮回答结束（对话历史已更新，或被打断），允许开始下一次推测"""
+        if self._committed is not None:
+            # 被打断时停止仍在进行的生成
+            self._committed.cancel()
+            self.stats.committed_chunks += self._committed.chunks
+            self._committed = None
+        self._busy = False
+        self._schedule()
+
+    # ---------- 内部 ----------
+
+    def _schedule(self) -> None:
+        """中间结果稳定满窗口后开始推测"""
+        self._cancel_timer()
+        if self._closed or self._busy or self._resolved or self._current is not None or not self._partial:
+            return
+        delay = max(0.0, self._changed_at + self.stable - time.monotonic())
+        self._timer = self._loop.call_later(delay, self._start)
+
+    def _start(self) -> None:
+        self._timer = None
+        if self._closed or self._busy or self._resolved or self._current is not None or not self._partial:
+            return
+        self.stats.started += 1
+        self._current = Speculation(self._partial, self._generate(self._partial))
+        logger.debug("Speculation started", stream=self.name, text=self._partial[:30])
+
+    def _cancel(self, speculation: Speculation, reason: str) -> None:
+        speculation.cancel()
+        self.stats.cancelled += 1
+        self.stats.wasted_chunks += speculation.chunks
+        metrics.track(
+            "orchestrator.speculation", "speculation_cancel",
+            dimensions={"stream": self.name, "reason": reason},
+            metrics={"wasted_chunks": speculation.chunks}
+        )
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def close(self) -> None:
+        """取消未提交的推测并上报统计"""
+        if self._closed:
+            return
+        self._closed = True
+        self._cancel_timer()
+        if self._current is not None:
+            self._cancel(self._current, "closed")
+            self._current = None
+        while self._resolved:
+            speculation = self._resolved.popleft()
+            if speculation is not None:
+                self._cancel(speculation, "closed")
+        if self._committed is not None:
+            # 回答任务被中断时停止仍在进行的生成
+            self._committed.cancel()
+            self.stats.committed_chunks += self._committed.chunks
+            self._committed = None
+        if self.stats.started:
+            metrics.track(
+                "orchestrator.speculation", "speculation_summary",
+                dimensions={"stream": self.name},
+                metrics=self.stats.to_dict()
+            )
@@ -7,7 +7,7 @@ Task 是 Agent 执行的原子单位，可以独立存在，不依赖 Session
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Mapping, Sequence
 
 from .events import PerceptionEvent, ModalityType
 
@@ -76,12 +76,18 @@ class ExecutionStep:
 
 @dataclass
 class TaskContext:
-    """任务上下文（可选，来自 Session 或外部传入）"""
+    """任务上下文（可选，来自 Session 或外部传入）
+
+    来自 Session 时 messages 为对话日志的只读快照（ConversationView），与会话共享、不复制；
+    add_message 时才复制为本任务私有的列表。
+    """
     
-    messages: List[Dict[str, str]] = field(default_factory=list)
+    messages: Sequence[Mapping[str, Any]] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def add_message(self, role: str, content: str):
+        if not isinstance(self.messages, list):
+            self.messages = list(self.messages)
         self.messages.append({
             "role": role,
             "content": content,
@@ -47,7 +47,7 @@ class TriggerEngine:
             logger.debug(f"Text input triggers agent | task_id={task.task_id}")
             return True
         
-        # 规则 3: 语音识别到完整句子
+        # 规则 3: 语音识别到完整句子（Provider 断句，或 orchestrator.endpointing 本地断句的合成最终结果）
         if event.modality == ModalityType.AUDIO and event.stage == EventStage.FINAL:
             if self.use_llm_judge:
                 return await self._is_actionable_speech(task, event)
@@ -0,0 +1,191 @@
+"""
+对话轮次调度
+
+ProcessStream 默认逐句串行生成回答：用户连说三句短句会得到三个完整回答，最后一句要等前两个回答结束。
+TurnScheduler 负责把 STT 最终结果组织成 LLM 轮次，以下模式均需显式开启：
+- 合并（merge）：生成进行中到达的句子排队，当前回答结束后合并为一个轮次
+- 打断（barge_in）：新句子到达时取消进行中的生成，被打断轮次的句子与新句子合并后重新生成
+
+埋点：orchestrator.turns 的 turn_start（每句排队时长 queue_delay_ms、合并句数）、
+turn_interrupted 与会话结束时的 turn_summary。
+"""
+
+import time
+import asyncio
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..infra import get_logger, get_metrics, multiplex
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+@dataclass
+class Sentence:
+    """一条待回答的句子"""
+    text: str
+    received_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0            # 参与过的轮次数（被打断后重新生成时递增）
+
+
+@dataclass
+class Turn:
+    """一个 LLM 轮次（一条或多条合并的句子）"""
+    sentences: List[Sentence]
+    interrupted: bool = False    # 被新句子打断（handle 随后收到 CancelledError）
+
+    @property
+    def text(self) -> str:
+        return " ".join(s.text for s in self.sentences)
+
+    @property
+    def fresh(self) -> List[str]:
+        """首次参与轮次的句子"""
+        return [s.text for s in self.sentences if s.attempts == 1]
+
+    @property
+    def merged(self) -> bool:
+        return len(self.sentences) > 1
+
+
+@dataclass
+class TurnStats:
+    """轮次统计"""
+    turns: int = 0
+    sentences: int = 0
+    merged: int = 0              # 与更早的句子合并回答的句子数
+    interrupted: int = 0
+    queue_delay_ms: float = 0.0  # 累计排队时长
+    max_queue_delay_ms: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'turns': self.turns,
+            'sentences': self.sentences,
+            'merged': self.merged,
+            'interrupted': self.interrupted,
+            'avg_queue_delay_ms': round(self.queue_delay_ms / self.sentences, 1) if self.sentences else 0.0,
+            'max_queue_delay_ms': round(self.max_queue_delay_ms, 1),
+        }
+
+
+class TurnScheduler:
+    """对话轮次调度器（每个流式会话一个实例，在事件循环中运行）
+
+    Usage:
+        scheduler = TurnScheduler(pending_sentences, merge=True, barge_in=False)
+
+        async def answer(turn: Turn):
+            ...   # 被打断时在 await 处收到 CancelledError，turn.interrupted 为真
+
+        await scheduler.run(answer)   # 句子源关闭且读空、最后一个轮次结束后返回
+        scheduler.close()
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        merge: bool = False,
+        barge_in: bool = False,
+        name: str = "stream"
+    ):
+        """
+        Args:
+            source: 句子源，需提供 `async get()` 与 `get_nowait()`（perception.channel.EventChannel 等）
+            merge: 是否合并排队的句子（默认逐句回答）
+            barge_in: 新句子到达时是否打断进行中的生成（被打断的句子总是与新句子合并）
+            name: 名称（用于埋点）
+        """
+        self._source = source
+        self.merge = merge
+        self.barge_in = barge_in
+        self.name = name
+        self.stats = TurnStats()
+
+        self._pending: List[Sentence] = []
+        self._wakeup = asyncio.Event()
+        self._current: Optional[asyncio.Task] = None
+        self._turn: Optional[Turn] = None
+        self._reading = True
+
+    async def run(self, handle: Callable[[Turn], Awaitable[None]]) -> None:
+        """按轮次调用 handle，直到句子源关闭且全部句子处理完"""
+        reader = asyncio.create_task(self._read())
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self._pending:
+                    turn = self._turn = self._take()
+                    self._current = asyncio.create_task(handle(turn))
+                    await asyncio.wait({self._current})
+                    if self._current.cancelled():
+                        # 被打断：句子回到队首，与新句子合并重新生成
+                        self._pending[:0] = turn.sentences
+                        self.stats.interrupted += 1
+                        metrics.track(
+                            "orchestrator.turns", "turn_interrupted",
+                            dimensions={"stream": self.name},
+                            metrics={"sentences": len(turn.sentences)}
+                        )
+                    elif self._current.exception() is not None:
+                        logger.error("Turn handler failed", stream=self.name, exc=self._current.exception())
+                    self._current = self._turn = None
+                if not self._reading:
+                    break
+        finally:
+            for task in (self._current, reader):
+                if task is not None and not task.done():
+                    task.cancel()
+            self._current = None
+
+    async def _read(self) -> None:
+        try:
+            async with aclosing(multiplex(self._source)) as sentences:
+                async for text in sentences:
+                    self._pending.append(Sentence(text))
+                    if self.barge_in and self._current is not None and not self._current.done():
+                        logger.debug("Barge-in, cancelling generation", stream=self.name)
+                        self._turn.interrupted = True
+                        self._current.cancel()
+                    self._wakeup.set()
+        finally:
+            self._reading = False
+            self._wakeup.set()
+
+    def _take(self) -> Turn:
+        """取出下一个轮次的句子"""
+        if self.merge or self.barge_in:
+            sentences, self._pending = self._pending, []
+        else:
+            sentences = [self._pending.pop(0)]
+
+        now = time.monotonic()
+        for index, sentence in enumerate(sentences):
+            sentence.attempts += 1
+            if sentence.attempts > 1:
+                continue
+            delay_ms = (now - sentence.received_at) * 1000
+            self.stats.sentences += 1
+            if index:
+                self.stats.merged += 1
+            self.stats.queue_delay_ms += delay_ms
+            self.stats.max_queue_delay_ms = max(self.stats.max_queue_delay_ms, delay_ms)
+            metrics.track(
+                "orchestrator.turns", "turn_start",
+                dimensions={"stream": self.name},
+                metrics={"queue_delay_ms": delay_ms, "turn_sentences": len(sentences)}
+            )
+        self.stats.turns += 1
+        return Turn(sentences)
+
+    def close(self) -> None:
+        """上报统计"""
+        if self.stats.turns:
+            metrics.track(
+                "orchestrator.turns", "turn_summary",
+                dimensions={"stream": self.name, "barge_in": self.barge_in},
+                metrics=self.stats.to_dict()
+            )
@@ -11,6 +11,16 @@ from .base import (
     PerceptionPipeline,
 )
 
+from .channel import EventChannel, ChannelClosed
+
+from .timer_wheel import TimerWheel, SessionDeadlines, get_timer_wheel
+
+from .vad import VoiceActivityDetector
+
+from .audio import AudioFormat, AudioFormatError, AudioIngest, normalize_audio
+
+from .jitter import JitterBuffer
+
 from .stt import (
     SttService,
     SttConfig,
@@ -27,6 +37,21 @@ __all__ = [
     'ModalityType',
     'EventStage',
     'PerceptionPipeline',
+    # Channel
+    'EventChannel',
+    'ChannelClosed',
+    # Timers
+    'TimerWheel',
+    'SessionDeadlines',
+    'get_timer_wheel',
+    # VAD
+    'VoiceActivityDetector',
+    # Audio ingest
+    'AudioFormat',
+    'AudioFormatError',
+    'AudioIngest',
+    'normalize_audio',
+    'JitterBuffer',
     # STT
     'SttService',
     'SttConfig',
@@ -0,0 +1,412 @@
+"""
+音频接入
+
+客户端音频格式各异（WAV 容器、立体声、44.1/48kHz、8/24/32 位、浮点），
+而识别服务与本地 VAD 只接受 16kHz 单声道 PCM 16bit。接入层负责：
+- 解析 WAV 头（支持流式，头部可跨多个分块）
+- 向量化转换：位深归一、下混为单声道、线性插值重采样（降采样前做滑动平均抗混叠）
+- 把任意大小的客户端分块重组为固定 100ms 帧；整帧直接切片引用输入，
+  只有跨越帧边界的零头拷贝进环形槽位
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from ..infra import get_logger
+
+logger = get_logger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+FRAME_MS = 100
+
+# WAV 头最大缓冲字节数（超过仍未找到 data 块视为非法）
+_MAX_WAV_HEADER = 64 * 1024
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class AudioFormatError(ValueError):
+    """不支持或无法解析的音频格式"""
+    pass
+
+
+@dataclass
+class AudioFormat:
+    """输入音频格式
+
+    encoding:
+    - pcm: 有符号整数 PCM 小端（8 位按 WAV 约定为无符号）
+    - float: 32 位浮点 PCM 小端
+    - wav: WAV 容器，采样参数以文件头为准
+    """
+    encoding: str = "pcm"
+    sample_rate: int = TARGET_SAMPLE_RATE
+    channels: int = 1
+    bits_per_sample: int = 16
+
+    @classmethod
+    def from_proto(cls, audio: Any) -> 'AudioFormat':
+        """从 AudioInput（proto）构建，未设置的字段取默认值"""
+        return cls.from_hints(
+            encoding=audio.format,
+            sample_rate=audio.sample_rate,
+            channels=audio.channels,
+            bits_per_sample=audio.bits_per_sample,
+        )
+
+    @classmethod
+    def from_hints(
+        cls,
+        encoding: Optional[str] = None,
+        sample_rate: Optional[int] = None,
+        channels: Optional[int] = None,
+        bits_per_sample: Optional[int] = None
+    ) -> 'AudioFormat':
+        """从请求头 / extra 参数等零散提示构建，空值取默认值"""
+        return cls(
+            encoding=(encoding or "pcm").lower(),
+            sample_rate=int(sample_rate or TARGET_SAMPLE_RATE),
+            channels=int(channels or 1),
+            bits_per_sample=int(bits_per_sample or (32 if (encoding or "").lower() == "float" else 16)),
+        )
+
+    @property
+    def block_align(self) -> int:
+        """一个采样帧（全部声道）的字节数"""
+        return self.channels * self.bits_per_sample // 8
+
+    def is_target(self, sample_rate: int = TARGET_SAMPLE_RATE) -> bool:
+        return (self.encoding == "pcm" and self.sample_rate == sample_rate
+                and self.channels == 1 and self.bits_per_sample == 16)
+
+    def validate(self) -> None:
+        if self.encoding not in ("pcm", "float", "wav"):
+            raise AudioFormatError(f"Unsupported audio format: {self.encoding}")
+        if self.encoding == "wav":
+            return
+        if self.sample_rate <= 0 or self.channels <= 0:
+            raise AudioFormatError(
+                f"Invalid audio parameters: sample_rate={self.sample_rate} channels={self.channels}"
+            )
+        valid_bits = (32,) if self.encoding == "float" else (8, 16, 24, 32)
+        if self.bits_per_sample not in valid_bits:
+            raise AudioFormatError(
+                f"Unsupported bits_per_sample for {self.encoding}: {self.bits_per_sample}"
+            )
+
+
+def is_wav(data: bytes) -> bool:
+    return len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def parse_wav_header(data: bytes) -> Optional[Tuple[AudioFormat, int, Optional[int]]]:
+    """解析 WAV 头
+
+    Returns:
+        (格式, data 块偏移, data 块长度)；头部不完整时返回 None。
+        流式写出的 WAV 常把 data 长度写为 0 或 0xFFFFFFFF，此时长度为 None（读到流结束）。
+    """
+    if len(data) < 12:
+        return None
+    if not is_wav(data):
+        raise AudioFormatError("Invalid WAV header")
+
+    fmt: Optional[AudioFormat] = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = bytes(data[pos:pos + 4])
+        chunk_size, = struct.unpack_from("<I", data, pos + 4)
+        body = pos + 8
+        if chunk_id == b"data":
+            if fmt is None:
+                raise AudioFormatError("WAV data chunk before fmt chunk")
+            size = chunk_size if chunk_size not in (0, 0xFFFFFFFF) else None
+            return fmt, body, size
+        if body + chunk_size > len(data):
+            return None
+        if chunk_id == b"fmt ":
+            if chunk_size < 16:
+                raise AudioFormatError("Invalid WAV fmt chunk")
+            tag, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", data, body)
+            if tag == _WAVE_FORMAT_EXTENSIBLE and chunk_size >= 26:
+                tag, = struct.unpack_from("<H", data, body + 24)
+            if tag == _WAVE_FORMAT_PCM:
+                encoding = "pcm"
+            elif tag == _WAVE_FORMAT_FLOAT:
+                encoding = "float"
+            else:
+                raise AudioFormatError(f"Unsupported WAV encoding tag: {tag:#06x}")
+            fmt = AudioFormat(encoding=encoding, sample_rate=sample_rate, channels=channels, bits_per_sample=bits)
+            fmt.validate()
+        pos = body + chunk_size + (chunk_size & 1)  # 块按偶数字节对齐
+    return None
+
+
+class PcmNormalizer:
+    """把 PCM 流转换为目标采样率的单声道 int16（有状态，跨分块连续）
+
+    - 不足一个采样帧的字节留到下一块
+    - 降采样时先做宽度为 round(降采样比) 的滑动平均抗混叠，保留前一块末尾的历史样点
+    - 线性插值的输出位置与上一块的最后一个样点连续衔接，分块方式不影响结果
+    """
+
+    def __init__(self, fmt: AudioFormat, target_rate: int = TARGET_SAMPLE_RATE):
+        fmt.validate()
+        self.format = fmt
+        self.target_rate = target_rate
+        self.passthrough = fmt.is_target(target_rate)
+        self._carry = b""
+        self._step = fmt.sample_rate / target_rate
+        self._width = int(round(self._step)) if self._step >= 2 else 1
+        self._pos = (self._width - 1) / 2   # 补偿滑动平均的群延迟
+        self._prev = None       # 上一块最后一个（滤波后）样点
+        self._history = None    # 抗混叠滤波历史样点
+        if not self.passthrough:
+            import numpy as np
+            self._np = np
+
+    def process(self, data) -> bytes:
+        if self.passthrough:
+            return data
+        block = self.format.block_align
+        if self._carry:
+            data = self._carry + data
+        usable = len(data) - len(data) % block
+        self._carry = bytes(data[usable:])
+        if not usable:
+            return b""
+        samples = self._decode(memoryview(data)[:usable])
+        if self.format.channels > 1:
+            samples = samples.reshape(-1, self.format.channels).mean(axis=1)
+        if self.format.sample_rate != self.target_rate:
+            samples = self._resample(samples)
+        return self._np.clip(self._np.rint(samples), -32768, 32767).astype('<i2').tobytes()
+
+    def _decode(self, data):
+        """解码为 int16 量程的 float32"""
+        np = self._np
+        bits = self.format.bits_per_sample
+        if self.format.encoding == "float":
+            return np.frombuffer(data, dtype='<f4') * np.float32(32768.0)
+        if bits == 16:
+            return np.frombuffer(data, dtype='<i2').astype(np.float32)
+        if bits == 8:
+            return (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+        if bits == 24:
+            raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            value = (raw[:, 0] << 8) | (raw[:, 1] << 16) | (raw[:, 2] << 24)
+            return (value >> 8).astype(np.float32) / 256.0
+        return np.frombuffer(data, dtype='<i4').astype(np.float32) / 65536.0
+
+    def _resample(self, samples):
+        np = self._np
+        if self._width > 1:
+            history = self._history if self._history is not None else \
+                np.full(self._width - 1, samples[0], dtype=np.float32)
+            extended = np.concatenate((history, samples))
+            self._history = extended[-(self._width - 1):]
+            cumsum = np.cumsum(extended, dtype=np.float64)
+            cumsum[self._width:] = cumsum[self._width:] - cumsum[:-self._width]
+            samples = (cumsum[self._width - 1:] / self._width).astype(np.float32)
+
+        if self._prev is not None:
+            samples = np.concatenate(((self._prev,), samples))
+        last = len(samples) - 1
+        if last < self._pos:
+            # 样点不足以产生下一个输出（上采样时的小分块）
+            self._pos -= last
+            self._prev = samples[-1]
+            return samples[:0]
+        count = int((last - self._pos) // self._step) + 1
+        positions = self._pos + self._step * np.arange(count)
+        out = np.interp(positions, np.arange(len(samples)), samples)
+        self._pos = self._pos + self._step * count - last
+        self._prev = samples[-1]
+        return out
+
+
+class FrameRing:
+    """固定帧长重组
+
+    整帧直接以 memoryview 切片引用输入，不拷贝；跨越帧边界的零头拷贝进环形槽位拼成整帧。
+    产出的帧均为只读视图：引用输入的帧随输入对象存活，槽位帧在之后 slots 次拼帧内有效，
+    需要长期持有（例如交给会在后台排队的 SDK）时请 bytes(frame)。
+    """
+
+    def __init__(self, frame_bytes: int, slots: int = 8):
+        self.frame_bytes = frame_bytes
+        self.slots = slots
+        self._buffer = bytearray(frame_bytes * slots)
+        self._view = memoryview(self._buffer)
+        self._slot = 0
+        self._fill = 0          # 当前槽位已填充字节数
+        self.copied_bytes = 0
+        self.frames = 0
+
+    @property
+    def pending(self) -> int:
+        return self._fill
+
+    def _take_slot(self, size: int) -> memoryview:
+        start = self._slot * self.frame_bytes
+        frame = self._view[start:start + size].toreadonly()
+        self._slot = (self._slot + 1) % self.slots
+        self._fill = 0
+        self.frames += 1
+        return frame
+
+    def push(self, data) -> List[memoryview]:
+        """写入任意长度的数据，返回凑满的整帧"""
+        size = self.frame_bytes
+        src = memoryview(data).cast('B')
+        frames: List[memoryview] = []
+        offset = 0
+
+        if self._fill:
+            take = min(size - self._fill, len(src))
+            start = self._slot * size + self._fill
+            self._view[start:start + take] = src[:take]
+            self._fill += take
+            self.copied_bytes += take
+            offset = take
+            if self._fill == size:
+                frames.append(self._take_slot(size))
+
+        whole = (len(src) - offset) // size
+        for i in range(whole):
+            frames.append(src[offset + i * size:offset + (i + 1) * size].toreadonly())
+        offset += whole * size
+        self.frames += whole
+
+        tail = len(src) - offset
+        if tail:
+            start = self._slot * size
+            self._view[start:start + tail] = src[offset:]
+            self._fill = tail
+            self.copied_bytes += tail
+        return frames
+
+    def flush(self) -> Optional[memoryview]:
+        """取出不足一帧的剩余数据"""
+        if not self._fill:
+            return None
+        return self._take_slot(self._fill)
+
+
+class AudioIngest:
+    """音频接入流水线：解码容器 → 转换为 16kHz 单声道 int16 → 重组为固定 100ms 帧
+
+    声明为 pcm 但首块以 RIFF/WAVE 开头时按 WAV 处理。
+
+    Usage:
+        ingest = AudioIngest(AudioFormat.from_proto(audio_input))
+        for frame in ingest.push(chunk):
+            await stt_service.send_audio(frame)
+        for frame in ingest.flush():
+            await stt_service.send_audio(frame)
+    """
+
+    def __init__(
+        self,
+        fmt: Optional[AudioFormat] = None,
+        target_rate: int = TARGET_SAMPLE_RATE,
+        frame_ms: int = FRAME_MS
+    ):
+        self.format = fmt or AudioFormat()
+        self.format.validate()
+        self.target_rate = target_rate
+        self.frame_bytes = target_rate * frame_ms // 1000 * 2
+        self._ring = FrameRing(self.frame_bytes)
+        self._normalizer: Optional[PcmNormalizer] = None
+        self._header: Optional[bytearray] = None
+        self._remaining: Optional[int] = None   # WAV data 块剩余字节
+        self._started = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @property
+    def frames(self) -> int:
+        return self._ring.frames
+
+    @property
+    def header_pending(self) -> bool:
+        """已按 WAV 处理但头部尚未接收完整"""
+        return self._header is not None
+
+    def decode(self, data) -> bytes:
+        """把一段输入转换为目标格式（不分帧）"""
+        if not data:
+            return b""
+        self.bytes_in += len(data)
+        if not self._started:
+            self._started = True
+            if self.format.encoding == "wav" or is_wav(bytes(data[:12])):
+                self._header = bytearray()
+            else:
+                self._normalizer = PcmNormalizer(self.format, self.target_rate)
+
+        if self._header is not None:
+            data = self._read_header(data)
+            if not data:
+                return b""
+        if self._remaining is not None:
+            data = data[:self._remaining]
+            self._remaining -= len(data)
+        out = self._normalizer.process(data)
+        self.bytes_out += len(out)
+        return out
+
+    def _read_header(self, data) -> bytes:
+        """缓冲到 WAV 头完整，返回头部之后的音频数据"""
+        self._header += data
+        parsed = parse_wav_header(self._header)
+        if parsed is None:
+            if len(self._header) > _MAX_WAV_HEADER:
+                raise AudioFormatError("WAV header too large or data chunk missing")
+            return b""
+        fmt, offset, size = parsed
+        payload = bytes(self._header[offset:])
+        self._header = None
+        self.format = fmt
+        self._remaining = size
+        self._normalizer = PcmNormalizer(fmt, self.target_rate)
+        logger.debug(
+            "WAV header parsed",
+            encoding=fmt.encoding, sample_rate=fmt.sample_rate,
+            channels=fmt.channels, bits_per_sample=fmt.bits_per_sample
+        )
+        return payload
+
+    def push(self, data) -> List[memoryview]:
+        """写入客户端音频分块，返回可发送的 100ms 帧（只读视图）"""
+        out = self.decode(data)
+        return self._ring.push(out) if out else []
+
+    def flush(self) -> List[memoryview]:
+        """取出剩余不足一帧的音频（输入结束或客户端要求立即断句时调用，之后可继续写入）"""
+        tail = self._ring.flush()
+        return [tail] if tail is not None else []
+
+    def stats(self) -> dict:
+        return {
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'frames': self._ring.frames,
+            'copied_bytes': self._ring.copied_bytes,
+        }
+
+
+def normalize_audio(
+    data: bytes,
+    fmt: Optional[AudioFormat] = None,
+    target_rate: int = TARGET_SAMPLE_RATE
+) -> bytes:
+    """整段音频转换为 16kHz 单声道 int16（非流式）"""
+    ingest = AudioIngest(fmt, target_rate=target_rate)
+    out = ingest.decode(data)
+    if ingest.header_pending:
+        raise AudioFormatError("Incomplete WAV header")
+    return bytes(out)
@@ -0,0 +1,217 @@
+"""
+线程 → 事件循环 事件通道
+
+STT SDK（如 DashScope WebSocket）在自己的线程中回调结果，
+直接调用 asyncio.Queue.put_nowait 不是线程安全的。
+EventChannel 在锁保护的缓冲区中暂存事件，并通过 call_soon_threadsafe
+批量唤醒事件循环侧的消费者。
+"""
+
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from ..infra import get_logger, get_metrics
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+class ChannelClosed(Exception):
+    """通道已关闭且缓冲区已读空"""
+    pass
+
+
+class EventChannel:
+    """有界的线程安全事件通道
+
+    - put() 可在任意线程调用；一批连续写入只触发一次事件循环唤醒
+    - PARTIAL 事件可合并：缓冲区尾部仍是未消费的 PARTIAL 时，新的 PARTIAL 直接替换它
+      （STT 中间结果总是携带整句文本，最新一条即可覆盖旧的）
+    - 缓冲区满时丢弃 PARTIAL；非 PARTIAL 事件（FINAL/错误等）从不丢弃，
+      必要时挤掉最早的 PARTIAL
+    - get() 只能在创建通道的事件循环中调用
+
+    Usage:
+        channel = EventChannel(capacity=256)
+        stt_service.on_partial(lambda r: channel.put(r, partial=True))
+        stt_service.on_final(channel.put)
+
+        async for item in channel:
+            ...
+    """
+
+    def __init__(
+        self,
+        capacity: int = 256,
+        merge_partials: bool = True,
+        name: str = "stt",
+        loop: Optional[asyncio.AbstractEventLoop] = None
+    ):
+        """
+        Args:
+            capacity: 缓冲区容量（PARTIAL 事件受此限制）
+            merge_partials: 是否合并连续的 PARTIAL 事件
+            name: 通道名称（用于埋点）
+            loop: 消费者所在的事件循环，默认当前运行中的循环
+        """
+        self._loop = loop or asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._capacity = capacity
+        self._merge_partials = merge_partials
+        self._name = name
+
+        self._items: Deque[Tuple[Any, bool]] = deque()
+        self._lock = threading.Lock()
+        self._waiter: Optional[asyncio.Future] = None
+        self._wakeup_pending = False
+        self._closed = False
+
+        # 统计
+        self._merged = 0
+        self._dropped = 0
+        self._max_depth = 0
+        self._wakeups = 0
+
+    def put(self, item: Any, partial: bool = False) -> bool:
+        """写入事件（线程安全）
+
+        Args:
+            item: 事件
+            partial: 是否为可合并/可丢弃的中间结果
+
+        Returns:
+            事件是否被接收（合并也视为接收）
+        """
+        with self._lock:
+            if self._closed:
+                return False
+
+            if partial and self._merge_partials and self._items and self._items[-1][1]:
+                self._items[-1] = (item, True)
+                self._merged += 1
+            elif len(self._items) >= self._capacity:
+                if partial:
+                    self._dropped += 1
+                    return False
+                # 非 PARTIAL 事件不丢弃：优先挤掉最早的 PARTIAL，否则允许超出容量
+                self._evict_partial()
+                self._items.append((item, partial))
+            else:
+                self._items.append((item, partial))
+
+            self._max_depth = max(self._max_depth, len(self._items))
+            schedule = not self._wakeup_pending
+            self._wakeup_pending = True
+
+        if schedule:
+            self._schedule_wakeup()
+        return True
+
+    def _evict_partial(self) -> bool:
+        """挤掉最早的 PARTIAL 事件（需持有锁）"""
+        for index, (_, is_partial) in enumerate(self._items):
+            if is_partial:
+                del self._items[index]
+                self._dropped += 1
+                return True
+        return False
+
+    def _schedule_wakeup(self) -> None:
+        if threading.get_ident() == self._loop_thread_id:
+            self._wakeup()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup)
+        except RuntimeError:
+            # 事件循环已关闭，消费者不再存在
+            logger.debug("Event loop closed, channel wakeup skipped", channel=self._name)
+
+    def _wakeup(self) -> None:
+        """在事件循环中唤醒等待的消费者"""
+        with self._lock:
+            self._wakeup_pending = False
+            self._wakeups += 1
+            waiter = self._waiter
+            self._waiter = None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def get(self) -> Any:
+        """读取下一个事件
+
+        Raises:
+            ChannelClosed: 通道已关闭且无剩余事件
+        """
+        while True:
+            with self._lock:
+                if self._items:
+                    return self._items.popleft()[0]
+                if self._closed:
+                    raise ChannelClosed(self._name)
+                waiter = self._loop.create_future()
+                self._waiter = waiter
+            await waiter
+
+    def get_nowait(self) -> Any:
+        """非阻塞读取
+
+        Raises:
+            asyncio.QueueEmpty: 缓冲区为空
+        """
+        with self._lock:
+            if not self._items:
+                raise asyncio.QueueEmpty()
+            return self._items.popleft()[0]
+
+    def empty(self) -> bool:
+        with self._lock:
+            return not self._items
+
+    def qsize(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """关闭通道（线程安全）
+
+        已缓冲的事件仍可被读出，之后 get() 抛出 ChannelClosed
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            schedule = not self._wakeup_pending
+            self._wakeup_pending = True
+        if schedule:
+            self._schedule_wakeup()
+
+        if self._merged or self._dropped:
+            metrics.track(
+                "perception.channel", "channel_closed",
+                dimensions={"channel": self._name},
+                metrics=self.stats()
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """通道统计"""
+        return {
+            "merged": self._merged,
+            "dropped": self._dropped,
+            "max_depth": self._max_depth,
+            "wakeups": self._wakeups,
+        }
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self.get()
+        except ChannelClosed:
+            raise StopAsyncIteration
@@ -0,0 +1,218 @@
+"""
+音频帧抖动缓冲
+
+弱网移动端会重传、乱序或重复投递音频帧。抖动缓冲位于 gRPC 请求处理与 STT 之间：
+按序列号重排，丢弃重复帧；缺帧等待超过 max_delay_ms（或缓冲超过 max_depth 帧）后
+以等长静音补齐并继续放行，补齐之后才到达的帧记为迟到并丢弃。
+
+序列号未设置（从未出现非零序列号、首帧之后又出现 sequence=0）的客户端自动切换为直通。
+"""
+
+import os
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..infra import get_logger, get_metrics
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+AudioSink = Callable[[bytes], Awaitable[None]]
+
+
+@dataclass
+class JitterStats:
+    """抖动缓冲统计"""
+    received: int = 0
+    forwarded: int = 0
+    reordered: int = 0      # 先于前序帧到达、进入缓冲等待的帧
+    duplicates: int = 0
+    late: int = 0           # 已被静音补齐后才到达的帧
+    concealed: int = 0      # 以静音补齐的缺帧数
+    resyncs: int = 0        # 序列号跳变过大、直接跳过的次数
+    max_depth: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'received': self.received,
+            'forwarded': self.forwarded,
+            'reordered': self.reordered,
+            'duplicates': self.duplicates,
+            'late': self.late,
+            'concealed': self.concealed,
+            'resyncs': self.resyncs,
+            'max_depth': self.max_depth,
+        }
+
+
+class JitterBuffer:
+    """按序列号重排的音频抖动缓冲
+
+    放行的帧按序列号顺序交给 sink（协程），push 与超时放行共用一把锁，保证顺序。
+    静音以零字节填充（适用于有符号 PCM 与浮点），长度与缺口后的首帧相同。
+
+    Usage:
+        jitter = JitterBuffer(sink=forward_audio)
+        await jitter.push(frame.sequence, frame.data)
+        await jitter.flush()   # 输入结束：放行全部缓冲帧
+        jitter.close()
+    """
+
+    def __init__(
+        self,
+        sink: AudioSink,
+        max_delay_ms: Optional[float] = None,
+        max_depth: Optional[int] = None,
+        name: str = "audio"
+    ):
+        self._sink = sink
+        self.max_delay = (max_delay_ms if max_delay_ms is not None
+                          else float(os.getenv('JITTER_MAX_DELAY_MS', '200'))) / 1000
+        self.max_depth = max_depth if max_depth is not None else int(os.getenv('JITTER_MAX_DEPTH', '50'))
+        self.name = name
+        self.stats = JitterStats()
+
+        self._expected: Optional[int] = None          # 下一个应放行的序列号
+        self._pending: Dict[int, Tuple[bytes, float]] = {}   # 序列号 -> (数据, 到达时间)
+        self._concealed: Dict[int, None] = {}         # 最近补齐的序列号（判定迟到帧）
+        self._sequenced = True
+        self._numbered = False                        # 是否出现过非零序列号
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._expire_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        """当前缓冲帧数"""
+        return len(self._pending)
+
+    async def push(self, sequence: int, data: bytes) -> None:
+        """写入一帧，按序放行可放行的帧"""
+        if self._closed:
+            return
+        self.stats.received += 1
+        async with self._lock:
+            for chunk in self._accept(sequence, data):
+                await self._forward(chunk)
+
+    def _accept(self, sequence: int, data: bytes) -> List[bytes]:
+        if not self._sequenced:
+            return [data]
+        if self._expected is None:
+            self._expected = sequence
+        elif sequence == 0 and not self._numbered:
+            # 客户端未设置序列号：之后全部直通（出现过非零序列号后，序列号 0 只是重传 / 重复帧）
+            self._sequenced = False
+            ready: List[bytes] = []
+            while self._pending:
+                ready.extend(self._release(force=True))
+            ready.append(data)
+            return ready
+        if sequence:
+            self._numbered = True
+
+        if sequence < self._expected or sequence in self._pending:
+            if sequence in self._concealed:
+                self.stats.late += 1
+                logger.debug("Late audio frame dropped", buffer=self.name, sequence=sequence)
+            else:
+                self.stats.duplicates += 1
+            return []
+
+        if sequence > self._expected:
+            self.stats.reordered += 1
+        self._pending[sequence] = (data, time.monotonic())
+        self.stats.max_depth = max(self.stats.max_depth, len(self._pending))
+        ready = self._release(force=len(self._pending) > self.max_depth)
+        self._schedule()
+        return ready
+
+    def _release(self, force: bool = False, now: Optional[float] = None) -> List[bytes]:
+        """放行连续帧；缺口超时（或 force）时以静音补齐"""
+        ready: List[bytes] = []
+        now = now if now is not None else time.monotonic()
+        while self._pending:
+            item = self._pending.pop(self._expected, None)
+            if item is not None:
+                ready.append(item[0])
+                self._expected += 1
+                continue
+            first = min(self._pending)
+            data, arrived = self._pending[first]
+            if not force and now - arrived < self.max_delay:
+                break
+            # 缺口 [expected, first) 视为丢失；跳变超过缓冲上限（客户端重启计数等）时不补静音
+            gap = first - self._expected
+            if gap <= self.max_depth:
+                ready.extend(bytes(len(data)) for _ in range(gap))
+                for seq in range(self._expected, first):
+                    self._concealed[seq] = None
+                self.stats.concealed += gap
+            else:
+                self.stats.resyncs += 1
+                logger.debug("Audio sequence resynced", buffer=self.name, expected=self._expected, sequence=first)
+            self._expected = first
+            force = False
+        while len(self._concealed) > 1024:
+            del self._concealed[next(iter(self._concealed))]
+        return ready
+
+    async def _forward(self, chunk: bytes) -> None:
+        self.stats.forwarded += 1
+        await self._sink(chunk)
+
+    # ---------- 超时放行 ----------
+
+    def _schedule(self) -> None:
+        """缓冲非空时在最早到达帧的截止时间触发放行，保证缺帧不阻塞后续音频"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending or self._closed:
+            return
+        oldest = min(arrived for _, arrived in self._pending.values())
+        delay = max(0.0, oldest + self.max_delay - time.monotonic())
+        self._timer = asyncio.get_running_loop().call_later(delay, self._on_deadline)
+
+    def _on_deadline(self) -> None:
+        self._timer = None
+        if self._expire_task is None or self._expire_task.done():
+            self._expire_task = asyncio.get_running_loop().create_task(self._expire())
+
+    async def _expire(self) -> None:
+        try:
+            async with self._lock:
+                for chunk in self._release():
+                    await self._forward(chunk)
+                self._schedule()
+        except Exception as e:
+            logger.error("Jitter buffer release failed", exc=e, buffer=self.name)
+
+    async def flush(self) -> None:
+        """放行全部缓冲帧（缺口以静音补齐），用于输入结束或立即断句"""
+        async with self._lock:
+            while self._pending:
+                for chunk in self._release(force=True):
+                    await self._forward(chunk)
+            self._schedule()
+
+    def close(self) -> None:
+        """停止超时放行并上报统计（缓冲中的帧被丢弃）"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._expire_task is not None and not self._expire_task.done():
+            self._expire_task.cancel()
+        self._pending.clear()
+        if self.stats.received:
+            metrics.track(
+                "perception.audio", "jitter_summary",
+                dimensions={"buffer": self.name, "sequenced": self._sequenced},
+                metrics=self.stats.to_dict()
+            )
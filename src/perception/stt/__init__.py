@@ -6,6 +6,11 @@ STT (Speech-to-Text) 服务
 
 from .base import SttService, SttConfig, SttResult, WordInfo
 from .aliyun import AliyunSttService, MockSttService, SttRegistry
+from .fake import FakeSttService
+from .pool import SttSessionPool, get_stt_pool, close_stt_pool
+from .batch import BatchTranscriber, BatchTranscript
+from .cache import TranscriptCache, get_stt_cache
+from .stabilizer import PartialStabilizer
 
 __all__ = [
     'SttService',
@@ -14,5 +19,14 @@ __all__ = [
     'WordInfo',
     'AliyunSttService',
     'MockSttService',
+    'FakeSttService',
+    'SttSessionPool',
+    'get_stt_pool',
+    'close_stt_pool',
+    'BatchTranscriber',
+    'BatchTranscript',
+    'TranscriptCache',
+    'get_stt_cache',
+    'PartialStabilizer',
     'SttRegistry',
 ]
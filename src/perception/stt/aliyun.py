@@ -7,15 +7,21 @@
 import os
 import json
 import asyncio
-from typing import Optional
+from typing import List, Optional
 import time
 
 from .base import SttService, SttConfig, SttResult, WordInfo
-from ...infra import get_logger, get_metrics, EventStatus
+from .pool import get_stt_pool, stt_pool_enabled
+from .cache import cached_transcription, transcript_key
+from ..timer_wheel import SessionDeadlines
+from ...infra import get_logger, get_metrics, EventStatus, SingleFlight
 
 logger = get_logger(__name__)
 metrics = get_metrics()
 
+# 单次识别的在途合并（服务实例按请求创建，合并表需模块级共享）
+_transcribe_flight = SingleFlight()
+
 
 class AliyunSttService(SttService):
     """阿里云 DashScope 实时语音识别
@@ -43,7 +49,11 @@ class AliyunSttService(SttService):
         self._recognition = None
         self._running = False
         self._last_audio_time = 0.0
-        self._keepalive_task: Optional[asyncio.Task] = None
+        self._deadlines: Optional[SessionDeadlines] = None
+        self._expire_task: Optional[asyncio.Task] = None
+        self._lease = None  # 从会话池租用的连接
+        self._started_at = 0.0
+        self._first_result = False
     
     @property
     def provider_name(self) -> str:
@@ -60,6 +70,9 @@ class AliyunSttService(SttService):
             dimensions={"provider": "aliyun", "model": config.model}
         )
         
+        start = self._started_at = time.monotonic()
+        self._first_result = False
+        model = config.model or 'paraformer-realtime-v2'
         try:
             import dashscope
             from dashscope.audio.asr import Recognition, RecognitionCallback
@@ -69,23 +82,47 @@ class AliyunSttService(SttService):
             # 创建回调处理器
             callback = self._create_callback()
             
-            # 创建识别实例
-            self._recognition = Recognition(
-                model=config.model or 'paraformer-realtime-v2',
-                format='pcm',
-                sample_rate=config.sample_rate,
-                callback=callback
-            )
+            # 优先从会话池租用已预热的连接
+            if stt_pool_enabled():
+                self._lease = await get_stt_pool().acquire((model, config.sample_rate), callback)
             
-            # 启动识别
-            self._recognition.start()
+            if self._lease is not None:
+                self._recognition = self._lease.recognition
+            else:
+                # 创建识别实例
+                self._recognition = Recognition(
+                    model=model,
+                    format='pcm',
+                    sample_rate=config.sample_rate,
+                    callback=callback
+                )
+                
+                # 启动识别
+                self._recognition.start()
             self._running = True
             self._last_audio_time = time.time()
             
-            # 启动保活任务
-            self._keepalive_task = asyncio.create_task(self._keepalive_loop())
+            self._start_vad(config)
             
-            logger.info("STT session started", session_id=session_id)
+            # 在全局时间轮上登记保活、空闲超时与最长时长
+            self._deadlines = SessionDeadlines(
+                on_keepalive=self._on_keepalive,
+                keepalive_interval=self.KEEPALIVE_INTERVAL,
+                on_expire=self._on_expire,
+                idle_timeout=config.idle_timeout_s,
+                max_duration=config.max_duration_s,
+            )
+            
+            # SDK 的 start() 在后台线程建立连接，握手耗时体现在首个识别结果上（见 stt_first_result）
+            metrics.track(
+                "perception.stt", "stt_ready",
+                dimensions={
+                    "provider": "aliyun", "model": model,
+                    "pooled": "true" if self._lease is not None else "false"
+                },
+                duration_ms=(time.monotonic() - start) * 1000
+            )
+            logger.info("STT session started", session_id=session_id, pooled=self._lease is not None)
             self._emit_ready()
             
         except ImportError:
@@ -127,6 +164,17 @@ class AliyunSttService(SttService):
                     end_time = sentence.get('end_time')
                     is_final = end_time is not None and end_time > 0
                     
+                    if not service._first_result:
+                        service._first_result = True
+                        metrics.track(
+                            "perception.stt", "stt_first_result",
+                            dimensions={
+                                "provider": "aliyun",
+                                "pooled": "true" if service._lease is not None else "false"
+                            },
+                            duration_ms=(time.monotonic() - service._started_at) * 1000
+                        )
+                    
                     stt_result = SttResult(
                         text=text,
                         is_final=is_final,
@@ -181,13 +229,21 @@ class AliyunSttService(SttService):
             return
         
         try:
-            self._recognition.send_audio_frame(audio_chunk)
-            self._last_audio_time = time.time()  # 更新最后音频时间
+            # 本地 VAD 丢弃静音；全部丢弃时不推后保活，由保活静音帧维持连接
+            forwarded = self._filter_audio(audio_chunk)
+            if self._deadlines is not None:
+                self._deadlines.touch(forwarded=bool(forwarded))
             
             metrics.track(
                 "perception.stt", "stt_audio_received",
-                metrics={"chunk_size": len(audio_chunk)}
+                metrics={"chunk_size": len(audio_chunk), "forwarded_size": len(forwarded)}
             )
+            if not forwarded:
+                return
+            
+            # SDK 在后台线程排队发送，传入的缓冲区会被持有：视图需转为 bytes（bytes 对象本身不拷贝）
+            self._recognition.send_audio_frame(bytes(forwarded))
+            self._last_audio_time = time.time()  # 更新最后音频时间
         except Exception as e:
             # 如果是 "Speech recognition has stopped" 错误，静默忽略
             if "has stopped" in str(e):
@@ -197,30 +253,36 @@ class AliyunSttService(SttService):
             self._emit_error(e)
             raise
     
-    async def _keepalive_loop(self) -> None:
-        """保活循环：定期发送静音帧防止空闲超时"""
+    def _on_keepalive(self) -> None:
+        """时间轮回调：保活间隔内没有音频，发送静音帧防止空闲超时"""
+        if not self._running or self._recognition is None:
+            return
         try:
-            while self._running and self._recognition is not None:
-                await asyncio.sleep(self.KEEPALIVE_INTERVAL)
-                
-                # 如果超过保活间隔没有收到音频，发送静音帧
-                if self._running and self._recognition is not None:
-                    elapsed = time.time() - self._last_audio_time
-                    if elapsed >= self.KEEPALIVE_INTERVAL:
-                        try:
-                            self._recognition.send_audio_frame(self.SILENCE_FRAME)
-                            logger.debug("Sent keepalive silence frame", 
-                                       session_id=self._session_id, idle_seconds=elapsed)
-                        except Exception as e:
-                            logger.warn("Failed to send keepalive frame", exc=e)
-        except asyncio.CancelledError:
-            pass
+            self._recognition.send_audio_frame(self.SILENCE_FRAME)
+            logger.debug("Sent keepalive silence frame", session_id=self._session_id,
+                         idle_seconds=time.time() - self._last_audio_time)
         except Exception as e:
-            logger.error("Keepalive loop error", exc=e)
+            logger.warn("Failed to send keepalive frame", exc=e)
+    
+    def _on_expire(self, reason: str) -> None:
+        """时间轮回调：空闲超时或超过最长时长，结束会话"""
+        if not self._running:
+            return
+        logger.warn("STT session deadline reached", session_id=self._session_id, reason=reason)
+        metrics.track(
+            "perception.stt", "stt_session_timeout",
+            status=EventStatus.ERROR,
+            dimensions={"provider": "aliyun", "reason": reason}
+        )
+        self._emit_error(TimeoutError(f"STT session {reason}"))
+        self._expire_task = asyncio.create_task(self.stop_session())
     
     async def transcribe_once(self, audio_data: bytes, config: SttConfig) -> str:
         """单次语音识别（非流式）
         
+        并发的相同音频（内容哈希 + 模型 + 语言 + 采样率一致）共享一次识别；
+        启用转写缓存（STT_CACHE_ENABLED）时命中直接返回。
+        
         Args:
             audio_data: 完整音频数据
             config: STT 配置
@@ -228,14 +290,39 @@ class AliyunSttService(SttService):
         Returns:
             识别出的文本
         """
+        key = transcript_key(audio_data, config, "aliyun")
+        text, shared = await _transcribe_flight.do(
+            key, lambda: self._transcribe_once(audio_data, config, key)
+        )
+        if shared:
+            metrics.track(
+                "stt.singleflight", "transcribe_coalesced",
+                dimensions={"provider": "aliyun", "model": config.model},
+                metrics={"audio_bytes": len(audio_data)}
+            )
+        return text
+    
+    async def _transcribe_once(self, audio_data: bytes, config: SttConfig, key: str) -> str:
+        """执行单次识别（经转写缓存）"""
+        results = await cached_transcription(audio_data, config, "aliyun", self.transcribe_segment, key=key)
+        return " ".join(r.text for r in results)
+    
+    async def transcribe_segment(self, audio_data: bytes, config: SttConfig) -> List[SttResult]:
+        """非实时识别一段音频
+        
+        使用独立的识别实例（不占用当前会话，可并发调用）。SDK 在后台线程排队发送，
+        这里不按实时节奏限速，一次性交出全部分块；等待时长随音频时长放宽，
+        超时抛出 asyncio.TimeoutError，不返回不完整的结果。
+        """
         import dashscope
         from dashscope.audio.asr import Recognition
         
+        from ..channel import EventChannel
+        
         dashscope.api_key = self.api_key
         
-        results = []
-        completed = asyncio.Event()
-        error_msg = None
+        # SDK 回调运行在 WebSocket 线程，通过通道安全地传回事件循环
+        channel = EventChannel(name="stt_once")
         
         class OnceCallback:
             def on_open(self):
@@ -251,74 +338,95 @@ class AliyunSttService(SttService):
                     end_time = sentence.get('end_time')
                     is_final = end_time is not None and end_time > 0
                     if is_final and text:
-                        results.append(text)
+                        channel.put(SttResult(
+                            text=text,
+                            is_final=True,
+                            confidence=sentence.get('confidence', 1.0),
+                            start_time_ms=sentence.get('begin_time', 0) or 0,
+                            end_time_ms=end_time
+                        ))
             
             def on_error(self, result):
-                nonlocal error_msg
-                error_msg = str(result)
-                completed.set()
+                channel.put(Exception(f"STT error: {result}"))
+                channel.close()
             
             def on_complete(self):
-                completed.set()
+                channel.close()
+        
+        results: List[SttResult] = []
         
+        async def collect():
+            async for item in channel:
+                if isinstance(item, Exception):
+                    raise item
+                results.append(item)
+        
+        sample_rate = config.sample_rate or 16000
         try:
             recognition = Recognition(
                 model=config.model or 'paraformer-realtime-v2',
                 format='pcm',
-                sample_rate=config.sample_rate or 16000,
+                sample_rate=sample_rate,
                 callback=OnceCallback()
             )
             
             recognition.start()
             
-            # 分块发送音频（避免单次发送过大）
-            chunk_size = 3200  # 100ms at 16kHz
+            # 分块交给 SDK（单帧不宜过大），SDK 线程按连接吞吐发送
+            chunk_size = sample_rate * 2 // 10  # 100ms
             for i in range(0, len(audio_data), chunk_size):
-                chunk = audio_data[i:i+chunk_size]
-                recognition.send_audio_frame(chunk)
-                await asyncio.sleep(0.01)  # 小延迟避免过快发送
+                recognition.send_audio_frame(bytes(audio_data[i:i + chunk_size]))
             
-            recognition.stop()
+            # stop() 会等待 SDK 线程发完音频并结束任务，放到线程池中避免阻塞事件循环（多段并发识别）
+            await asyncio.get_running_loop().run_in_executor(None, recognition.stop)
             
-            # 等待完成
+            # 等待完成：识别耗时随音频时长增长；超时的结果不完整，不能当作整段结果返回（会被缓存）
+            timeout = 10.0 + len(audio_data) / (sample_rate * 2)
             try:
-                await asyncio.wait_for(completed.wait(), timeout=10.0)
+                await asyncio.wait_for(collect(), timeout=timeout)
             except asyncio.TimeoutError:
-                logger.warn("Transcribe once timeout")
-            
-            if error_msg:
-                raise Exception(f"STT error: {error_msg}")
+                logger.warn("Transcribe once timeout", timeout_s=round(timeout, 1), partial_results=len(results))
+                raise asyncio.TimeoutError(
+                    f"STT transcription did not complete within {timeout:.1f}s"
+                ) from None
             
-            return " ".join(results)
+            return results
             
         except Exception as e:
             logger.error("Transcribe once failed", exc=e)
             raise
     
     async def flush(self) -> None:
-        """刷新当前音频缓冲"""
-        # Aliyun SDK 不支持显式 flush，静默忽略
-        pass
+        """立即结束当前句子"""
+        # Aliyun SDK 不支持显式 flush：以最近的中间结果作为合成最终结果，服务端随后的同句结果去重
+        if self._running:
+            self._flush_partial()
     
     async def stop_session(self) -> None:
         """结束 STT 会话"""
-        # 先取消保活任务
-        if self._keepalive_task is not None:
-            self._keepalive_task.cancel()
+        # 先从时间轮注销
+        if self._deadlines is not None:
+            self._deadlines.cancel()
+            self._deadlines = None
+        if self._recognition is None:
+            self._stop_vad()
+        else:
             try:
-                await self._keepalive_task
-            except asyncio.CancelledError:
-                pass
-            self._keepalive_task = None
-        
-        if self._recognition is not None:
-            try:
-                self._recognition.stop()
+                try:
+                    tail = self._stop_vad()
+                    if tail and self._running:
+                        self._recognition.send_audio_frame(tail)
+                finally:
+                    # 尾部发送失败也要结束识别并归还租约
+                    self._recognition.stop()
             except Exception as e:
                 logger.error("Error stopping STT", exc=e)
             finally:
                 self._recognition = None
                 self._running = False
+                if self._lease is not None:
+                    get_stt_pool().release(self._lease)
+                    self._lease = None
         
         metrics.track("perception.stt", "stt_session_end")
         logger.info("STT session stopped", session_id=self._session_id)
@@ -395,3 +503,6 @@ class SttRegistry:
         cls._providers['aliyun'] = AliyunSttService
         cls._providers['dashscope'] = AliyunSttService
         cls._providers['mock'] = MockSttService
+        
+        from .fake import FakeSttService
+        cls._providers['fake'] = FakeSttService
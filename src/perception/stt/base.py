@@ -4,9 +4,11 @@ STT 服务抽象基类
 按照 docs/01_FEATURES/感知层设计.md 实现
 """
 
+import os
+import threading
 from abc import ABC, abstractmethod
 from typing import Callable, Optional, List
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 
 
 @dataclass
@@ -23,6 +25,20 @@ class SttConfig:
     max_sentence_silence: int = 800      # 句子间静音时长(ms)
     enable_words: bool = False           # 是否返回词级时间戳
     
+    # 会话截止时间（由 perception.timer_wheel 统一调度，0 表示不限制）
+    idle_timeout_s: float = field(default_factory=lambda: float(os.getenv('STT_IDLE_TIMEOUT_S', '0')))  # 无音频超过该时长则结束会话
+    max_duration_s: float = field(default_factory=lambda: float(os.getenv('STT_MAX_DURATION_S', '0')))  # 会话最长时长
+    
+    # 本地 VAD（perception.vad）：只转发语音段，静音期间由保活静音帧维持连接
+    enable_vad: bool = field(default_factory=lambda: os.getenv('STT_VAD_ENABLED', 'false').lower() == 'true')
+    vad_threshold_db: float = -45.0      # 语音能量阈值(dBFS)
+    vad_hangover_ms: int = 0             # 语音结束后继续转发的时长，0 表示 max_sentence_silence + 200
+    vad_padding_ms: int = 200            # 语音开始前补发的时长
+    
+    # 中间结果下发（perception.stt.stabilizer，由下行协议按连接启用）
+    enable_partial_delta: bool = False   # 中间结果只下发变化的后缀
+    partial_interval_ms: int = 0         # 中间结果最短下发间隔，0 表示不节流
+    
     def to_dict(self) -> dict:
         result = {
             'model': self.model,
@@ -32,6 +48,11 @@ class SttConfig:
             'enable_itn': self.enable_itn,
             'max_sentence_silence': self.max_sentence_silence,
             'enable_words': self.enable_words,
+            'idle_timeout_s': self.idle_timeout_s,
+            'max_duration_s': self.max_duration_s,
+            'enable_vad': self.enable_vad,
+            'enable_partial_delta': self.enable_partial_delta,
+            'partial_interval_ms': self.partial_interval_ms,
         }
         if self.hotwords:
             result['hotwords'] = self.hotwords
@@ -56,6 +77,9 @@ class SttResult:
     start_time_ms: int = 0
     end_time_ms: int = 0
     words: Optional[List[WordInfo]] = None
+    stable_prefix_len: int = 0           # 沿用上一条下发文本的前缀长度（增量模式）
+    is_delta: bool = False               # text 为变化的后缀，整句 = 已收文本[:stable_prefix_len] + text
+    is_correction: bool = False          # 最终结果改写了提前发出的合成最终结果，text 为整句，替换该句已发出的内容
     
     def to_dict(self) -> dict:
         result = {
@@ -65,6 +89,11 @@ class SttResult:
             'start_time_ms': self.start_time_ms,
             'end_time_ms': self.end_time_ms,
         }
+        if self.is_delta:
+            result['stable_prefix_len'] = self.stable_prefix_len
+            result['is_delta'] = True
+        if self.is_correction:
+            result['is_correction'] = True
         if self.words:
             result['words'] = [
                 {
@@ -76,9 +105,23 @@ class SttResult:
                 for w in self.words
             ]
         return result
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SttResult':
+        words = data.get('words')
+        return cls(
+            text=data.get('text', ''),
+            is_final=data.get('is_final', True),
+            confidence=data.get('confidence', 1.0),
+            start_time_ms=data.get('start_time_ms', 0),
+            end_time_ms=data.get('end_time_ms', 0),
+            words=[WordInfo(**w) for w in words] if words else None,
+            is_correction=data.get('is_correction', False),
+        )
 
 
 # 回调类型
+# 注意：回调可能在 SDK 线程中触发，消费者应通过 perception.channel.EventChannel 转入事件循环
 PartialCallback = Callable[[SttResult], None]
 FinalCallback = Callable[[SttResult], None]
 ErrorCallback = Callable[[Exception], None]
@@ -96,6 +139,11 @@ class SttService(ABC):
         self._on_final: Optional[FinalCallback] = None
         self._on_error: Optional[ErrorCallback] = None
         self._on_ready: Optional[ReadyCallback] = None
+        self._vad = None
+        # 合成最终结果（见 flush）：结果回调可能来自 SDK 线程，与 flush 共用锁保证顺序
+        self._result_lock = threading.Lock()
+        self._last_partial: Optional[SttResult] = None
+        self._flushed: Optional[SttResult] = None
     
     @property
     @abstractmethod
@@ -131,6 +179,97 @@ class SttService(ABC):
         """结束 STT 会话"""
         ...
     
+    async def flush(self) -> None:
+        """立即结束当前句子
+        
+        默认实现以最近一条中间结果作为合成最终结果立即发出（见 _flush_partial），
+        能在服务端结束句子的 Provider 可覆盖为真正的刷新。
+        """
+        self._flush_partial()
+    
+    async def transcribe_once(self, audio_data: bytes, config: SttConfig) -> str:
+        """单次语音识别（非流式）
+        
+        默认实现见 transcribe_segment，返回全部最终结果拼接的文本；
+        启用转写缓存（STT_CACHE_ENABLED）时相同音频直接返回缓存结果。
+        长音频请使用 perception.stt.batch.BatchTranscriber（静音切分 + 并发识别）。
+        
+        Args:
+            audio_data: 完整音频数据（PCM 16bit）
+            config: STT 配置
+            
+        Returns:
+            识别出的文本
+        """
+        from .cache import cached_transcription
+        results = await cached_transcription(audio_data, config, self.provider_name, self.transcribe_segment)
+        return " ".join(r.text for r in results)
+    
+    async def transcribe_segment(self, audio_data: bytes, config: SttConfig) -> List[SttResult]:
+        """非实时识别一段音频，返回带时间戳的最终结果
+        
+        默认实现基于流式会话：不按实时节奏，连续发送 100ms 分块后结束会话，收集全部最终结果。
+        要求 stop_session 返回前已发出全部最终结果；会覆盖当前实例已注册的回调。
+        Provider 可覆盖为更高效的实现。
+        
+        Args:
+            audio_data: 音频数据（PCM 16bit 单声道）
+            config: STT 配置
+            
+        Returns:
+            最终结果列表（时间戳相对本段起点）
+        """
+        import uuid
+        
+        results: List[SttResult] = []
+        errors: List[Exception] = []
+        self.on_partial(lambda r: None)
+        self.on_final(lambda r: results.append(r) if r.text else None)
+        self.on_error(errors.append)
+        self.on_ready(lambda: None)
+        
+        await self.start_session(f"once_{uuid.uuid4().hex[:12]}", config)
+        try:
+            chunk_size = config.sample_rate * 2 // 10
+            view = memoryview(audio_data)
+            for i in range(0, len(view), chunk_size):
+                await self.send_audio(view[i:i + chunk_size])
+        finally:
+            await self.stop_session()
+        
+        if errors:
+            raise errors[0]
+        return results
+    
+    def _start_vad(self, config: SttConfig) -> None:
+        """按配置启用本地 VAD（Provider 在 start_session 中调用）"""
+        from ..vad import create_vad
+        self._vad = create_vad(config)
+    
+    def _filter_audio(self, audio_chunk: bytes) -> bytes:
+        """经过 VAD 过滤，返回应发送给识别服务的音频（可能为空）"""
+        if self._vad is None:
+            return audio_chunk
+        return self._vad.process(audio_chunk)
+    
+    def _stop_vad(self) -> bytes:
+        """上报 VAD 丢弃比例并释放（Provider 在 stop_session 中调用）
+
+        Returns:
+            VAD 中不足一帧的尾部音频（补零后按规则过滤），应在结束识别前发送
+        """
+        vad, self._vad = self._vad, None
+        if vad is None:
+            return b""
+        tail = vad.flush()
+        from ...infra import get_metrics
+        get_metrics().track(
+            "perception.stt", "vad_summary",
+            dimensions={"provider": self.provider_name},
+            metrics=vad.stats.to_dict()
+        )
+        return tail
+    
     def on_partial(self, callback: PartialCallback) -> None:
         """注册部分结果回调"""
         self._on_partial = callback
@@ -149,13 +288,78 @@ class SttService(ABC):
     
     def _emit_partial(self, result: SttResult) -> None:
         """发射部分结果"""
-        if self._on_partial:
-            self._on_partial(result)
+        with self._result_lock:
+            result = self._after_flush(result)
+            if result is None:
+                return
+            self._last_partial = result
+            if self._on_partial:
+                self._on_partial(result)
     
     def _emit_final(self, result: SttResult) -> None:
         """发射最终结果"""
-        if self._on_final:
-            self._on_final(result)
+        with self._result_lock:
+            result = self._after_flush(result)
+            self._last_partial = None
+            self._flushed = None
+            if result is None:
+                return
+            if self._on_final:
+                self._on_final(result)
+    
+    def _flush_partial(self) -> bool:
+        """以最近一条中间结果作为合成最终结果发出，返回是否发出
+        
+        同一句（start_time_ms 相同）随后到达的 Provider 结果去掉已发出的部分：
+        只剩标点时丢弃，用户接着说的内容作为新句子发出；改写了已发出内容的中间结果丢弃，
+        最终结果以整句发出并标记 is_correction（替换该句已发出的内容）。
+        """
+        with self._result_lock:
+            partial, self._last_partial = self._last_partial, None
+            if partial is None or not partial.text.strip():
+                return False
+            final = replace(partial, is_final=True, stable_prefix_len=0, is_delta=False)
+            flushed = self._flushed
+            if flushed is not None and flushed.start_time_ms == final.start_time_ms:
+                # 同一句再次提前结束：记录累计发出的内容
+                self._flushed = replace(final, text=flushed.text + final.text)
+            else:
+                self._flushed = final
+            if self._on_final:
+                self._on_final(final)
+        from ...infra import get_metrics
+        get_metrics().track(
+            "perception.stt", "stt_synthetic_final",
+            dimensions={"provider": self.provider_name},
+            metrics={"char_count": len(final.text)}
+        )
+        return True
+    
+    def _after_flush(self, result: SttResult) -> Optional[SttResult]:
+        """去掉已作为合成最终结果发出的内容，返回 None 表示丢弃（调用方持有 _result_lock）
+
+        改写了已发出内容的最终结果原样返回并标记 is_correction，不丢弃 Provider 的识别结果。
+        """
+        flushed = self._flushed
+        if flushed is None:
+            return result
+        if result.start_time_ms != flushed.start_time_ms:
+            self._flushed = None
+            return result
+        from .stabilizer import strip_content_prefix
+        rest = strip_content_prefix(result.text, flushed.text)
+        if rest is None:
+            if result.is_final:
+                from ...infra import get_metrics
+                get_metrics().track(
+                    "perception.stt", "stt_synthetic_final_revised",
+                    dimensions={"provider": self.provider_name}
+                )
+                return replace(result, is_correction=True)
+            return None
+        if not rest:
+            return None
+        return replace(result, text=rest)
     
     def _emit_error(self, error: Exception) -> None:
         """发射错误"""
@@ -0,0 +1,229 @@
+"""
+非实时批量识别
+
+单次识别（Process、文件识别）不需要按实时节奏送音频：
+- 每个识别会话尽快发送全部音频（SttService.transcribe_segment）
+- 长音频在静音处切分为若干段，多个会话并发识别（进程内按 provider 共享并发上限）
+- 各段结果按原始顺序拼接，时间戳换算回整段音频的时间轴
+- 启用转写缓存时整段音频命中直接返回
+"""
+
+import os
+import time
+import asyncio
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .base import SttService, SttConfig, SttResult
+from .cache import get_stt_cache, transcript_key
+from ...infra import get_logger, get_metrics, EventStatus
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+_FRAME_MS = 20
+
+
+# 全局并发上限：(provider, 并发数) -> (事件循环, Semaphore)，所有批量识别请求共享
+_limiters: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+
+def get_batch_limiter(provider: str, max_concurrency: int) -> asyncio.Semaphore:
+    """获取 provider 的批量识别并发限制（Semaphore 绑定事件循环，循环变化时重建）"""
+    key = (provider, max_concurrency)
+    loop = asyncio.get_running_loop()
+    entry = _limiters.get(key)
+    if entry is None or entry[0] is not loop:
+        entry = (loop, asyncio.Semaphore(max_concurrency))
+        _limiters[key] = entry
+    return entry[1]
+
+
+@dataclass
+class BatchTranscript:
+    """批量识别结果"""
+    text: str
+    results: List[SttResult] = field(default_factory=list)  # 按时间顺序的最终结果（整段时间轴）
+    segments: int = 0                  # 识别分段数，命中缓存时为 0
+    audio_ms: int = 0
+
+    @property
+    def confidence(self) -> float:
+        if not self.results:
+            return 0.0
+        return sum(r.confidence for r in self.results) / len(self.results)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'text': self.text,
+            'results': [r.to_dict() for r in self.results],
+            'segments': self.segments,
+            'audio_ms': self.audio_ms,
+        }
+
+
+def split_at_silence(
+    audio: bytes,
+    sample_rate: int = 16000,
+    target_ms: int = 20000,
+    max_ms: Optional[int] = None,
+    min_silence_ms: int = 300,
+    threshold_db: float = -45.0
+) -> List[Tuple[int, int]]:
+    """在静音处切分 PCM 16bit 单声道音频
+
+    从每段起点 target_ms 之后寻找第一个不短于 min_silence_ms 的静音区间，在其中点切分；
+    max_ms（默认 2 * target_ms）内找不到时：剩余音频不超过 max_ms 则不再切分，
+    否则取该范围内最后一个静音区间，仍没有则硬切。
+
+    Returns:
+        [(起始字节, 结束字节)]，覆盖整段音频
+    """
+    max_ms = max_ms or target_ms * 2
+    samples = len(audio) // 2
+    if samples * 1000 <= max_ms * sample_rate:
+        return [(0, len(audio))]
+
+    from ..vad import VoiceActivityDetector
+    import numpy as np
+
+    vad = VoiceActivityDetector(sample_rate=sample_rate, threshold_db=threshold_db, frame_ms=_FRAME_MS)
+    size = vad.frame_samples
+    count = samples // size
+    speech = vad.classify(np.frombuffer(audio, dtype='<i2', count=count * size).reshape(count, size))
+
+    # 静音区间 [starts, ends)，取足够长的区间中点作为候选切点
+    silent = np.concatenate(([False], ~speech, [False]))
+    edges = np.flatnonzero(silent[1:] != silent[:-1])
+    starts, ends = edges[::2], edges[1::2]
+    long_enough = (ends - starts) * _FRAME_MS >= min_silence_ms
+    cuts = (starts[long_enough] + ends[long_enough]) // 2
+
+    target, limit = target_ms // _FRAME_MS, max_ms // _FRAME_MS
+    bounds: List[Tuple[int, int]] = []
+    begin = 0
+    while count - begin > target:
+        window = cuts[(cuts > begin) & (cuts <= begin + limit)]
+        preferred = window[window >= begin + target]
+        if len(preferred):
+            cut = int(preferred[0])
+        elif count - begin <= limit:
+            break
+        elif len(window):
+            cut = int(window[-1])
+        else:
+            cut = begin + limit
+        bounds.append((begin * size * 2, cut * size * 2))
+        begin = cut
+    bounds.append((begin * size * 2, len(audio)))
+    return bounds
+
+
+class BatchTranscriber:
+    """非实时批量识别
+
+    - provider: STT 提供商，每段使用独立的服务实例
+    - max_concurrency: 并发识别会话数（STT_BATCH_CONCURRENCY），同一 provider 的所有请求共享
+    - segment_s: 目标分段时长，秒（STT_BATCH_SEGMENT_S），最长为其两倍
+
+    Usage:
+        transcript = await BatchTranscriber("aliyun").transcribe(audio, config)
+        transcript.text, transcript.results
+    """
+
+    def __init__(
+        self,
+        provider: str = "aliyun",
+        max_concurrency: Optional[int] = None,
+        segment_s: Optional[float] = None,
+        service_factory: Optional[Callable[[], SttService]] = None
+    ):
+        self.provider = provider
+        self.max_concurrency = max_concurrency or int(os.getenv('STT_BATCH_CONCURRENCY', '4'))
+        self.segment_s = segment_s or float(os.getenv('STT_BATCH_SEGMENT_S', '20'))
+        if service_factory is None:
+            from .aliyun import SttRegistry
+            service_factory = lambda: SttRegistry.get_service(provider)
+        self._factory = service_factory
+
+    def split(self, audio: bytes, config: SttConfig) -> List[Tuple[int, int]]:
+        try:
+            return split_at_silence(
+                audio,
+                sample_rate=config.sample_rate,
+                target_ms=int(self.segment_s * 1000),
+                min_silence_ms=min(config.max_sentence_silence, 500),
+                threshold_db=config.vad_threshold_db,
+            )
+        except ImportError:
+            logger.warn("numpy not installed, batch transcription uses a single segment")
+            return [(0, len(audio))]
+
+    async def transcribe(self, audio: bytes, config: SttConfig) -> BatchTranscript:
+        """识别整段音频（PCM 16bit 单声道，采样率为 config.sample_rate）"""
+        start = time.monotonic()
+        bytes_per_ms = config.sample_rate * 2 / 1000
+        audio_ms = int(len(audio) / bytes_per_ms)
+
+        cache = get_stt_cache()
+        key = transcript_key(audio, config, self.provider) if cache is not None else None
+        if cache is not None:
+            cached = await cache.get(key, provider=self.provider)
+            if cached is not None:
+                return BatchTranscript(
+                    text=" ".join(r.text for r in cached), results=cached, segments=0, audio_ms=audio_ms
+                )
+
+        bounds = self.split(audio, config)
+        semaphore = get_batch_limiter(self.provider, self.max_concurrency)
+        view = memoryview(audio)
+
+        async def run_segment(begin: int, end: int) -> List[SttResult]:
+            async with semaphore:
+                results = await self._factory().transcribe_segment(view[begin:end], config)
+            offset = int(begin / bytes_per_ms)
+            return [
+                replace(r, start_time_ms=r.start_time_ms + offset, end_time_ms=r.end_time_ms + offset)
+                for r in results if r.text
+            ]
+
+        tasks = [asyncio.ensure_future(run_segment(b, e)) for b, e in bounds]
+        try:
+            segments = await asyncio.gather(*tasks)
+        except BaseException as e:
+            # 任一段失败（或调用方取消）时取消其余段，避免继续占用识别会话
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if not isinstance(e, Exception):
+                raise
+            metrics.track(
+                "perception.stt", "stt_batch",
+                status=EventStatus.ERROR,
+                dimensions={"provider": self.provider},
+                metrics={"segments": len(bounds), "audio_ms": audio_ms},
+                duration_ms=(time.monotonic() - start) * 1000,
+                error={"code": type(e).__name__, "message": str(e)}
+            )
+            raise
+
+        results = [r for segment in segments for r in segment]
+        if cache is not None and results:
+            await cache.set(key, results)
+        metrics.track(
+            "perception.stt", "stt_batch",
+            dimensions={"provider": self.provider},
+            metrics={"segments": len(bounds), "audio_ms": audio_ms, "results": len(results)},
+            duration_ms=(time.monotonic() - start) * 1000
+        )
+        logger.debug(
+            "Batch transcription done",
+            provider=self.provider, segments=len(bounds), audio_ms=audio_ms,
+            elapsed_ms=int((time.monotonic() - start) * 1000)
+        )
+        return BatchTranscript(
+            text=" ".join(r.text for r in results),
+            results=results,
+            segments=len(bounds),
+            audio_ms=audio_ms,
+        )
@@ -0,0 +1,172 @@
+"""
+转写结果缓存
+
+以「PCM 内容哈希 + Provider + 影响识别结果的配置（模型、语言、采样率、标点、ITN、热词、断句、词级时间戳、VAD）」为键缓存完整识别结果
+（带时间戳的最终结果列表）。IVR 提示音、测试音频、重试上传等重复音频直接返回。
+
+- 内存层：infra.LruCache，按字节预算 LRU 淘汰
+- 磁盘层（可选，STT_CACHE_DIR）：每个键一个 JSON 文件，进程重启后仍可命中，
+  读写在线程池中执行；超过 TTL 的文件视为未命中
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from typing import Awaitable, Callable, List, Optional
+
+from .base import SttConfig, SttResult
+from ...infra import get_logger, get_metrics, LruCache
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+def transcript_key(audio_data: bytes, config: SttConfig, provider: str) -> str:
+    """计算转写缓存键（sha256 十六进制摘要）
+
+    包含所有会改变识别结果的配置；会话截止时间、中间结果下发方式等只影响传输的字段不参与。
+    """
+    digest = hashlib.sha256(audio_data)
+    digest.update(json.dumps(
+        [
+            provider, config.model, config.language, config.sample_rate,
+            config.enable_punctuation, config.enable_itn, config.hotwords,
+            config.max_sentence_silence, config.enable_words,
+            config.enable_vad, config.vad_threshold_db, config.vad_hangover_ms, config.vad_padding_ms,
+        ],
+        ensure_ascii=False
+    ).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _results_size(key: str, results: List[SttResult]) -> int:
+    """估算条目占用字节数"""
+    return len(key) + sum(len(r.text.encode('utf-8')) + 64 for r in results) + 64
+
+
+class TranscriptCache:
+    """转写结果缓存（内存 LRU + 可选磁盘层）
+
+    Usage:
+        cache = get_stt_cache()
+        if cache is not None:
+            results = await cache.get(key, provider="aliyun")
+            ...
+            await cache.set(key, results)
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        directory: Optional[str] = None
+    ):
+        self.ttl = ttl if ttl is not None else float(os.getenv('STT_CACHE_TTL', '86400'))
+        self.memory = LruCache(
+            max_bytes=max_bytes if max_bytes is not None
+            else int(os.getenv('STT_CACHE_MAX_BYTES', str(16 * 1024 * 1024))),
+            ttl=self.ttl,
+        )
+        self.directory = directory if directory is not None else os.getenv('STT_CACHE_DIR') or None
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        self.disk_hits = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    async def get(self, key: str, provider: str = "") -> Optional[List[SttResult]]:
+        """读取缓存，未命中返回 None"""
+        results = self.memory.get(key)
+        tier = "memory"
+        if results is None and self.directory:
+            results = await asyncio.get_running_loop().run_in_executor(None, self._read, key)
+            if results is not None:
+                tier = "disk"
+                self.disk_hits += 1
+                self.memory.set(key, results, size=_results_size(key, results))
+
+        metrics.track(
+            "stt.cache", "cache_hit" if results is not None else "cache_miss",
+            dimensions={"provider": provider, "tier": tier if results is not None else "none"},
+            metrics={"entries": len(self.memory), "bytes": self.memory.size_bytes}
+        )
+        return list(results) if results is not None else None
+
+    async def set(self, key: str, results: List[SttResult]) -> None:
+        """写入缓存"""
+        results = list(results)
+        self.memory.set(key, results, size=_results_size(key, results))
+        if self.directory:
+            await asyncio.get_running_loop().run_in_executor(None, self._write, key, results)
+
+    def _read(self, key: str) -> Optional[List[SttResult]]:
+        path = self._path(key)
+        try:
+            if self.ttl is not None and time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return [SttResult.from_dict(item) for item in data['results']]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warn("Failed to read STT cache file", path=path, error=str(e))
+            return None
+
+    def _write(self, key: str, results: List[SttResult]) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'results': [r.to_dict() for r in results]}, f, ensure_ascii=False)
+            os.replace(tmp, path)  # 原子替换，并发读不会读到半个文件
+        except Exception as e:
+            logger.warn("Failed to write STT cache file", path=path, error=str(e))
+
+    def stats(self) -> dict:
+        return {**self.memory.stats(), 'disk_hits': self.disk_hits, 'directory': self.directory}
+
+
+_cache: Optional[TranscriptCache] = None
+
+
+def stt_cache_enabled() -> bool:
+    return os.getenv('STT_CACHE_ENABLED', 'false').lower() == 'true'
+
+
+def get_stt_cache() -> Optional[TranscriptCache]:
+    """获取全局转写缓存，未启用（STT_CACHE_ENABLED）时返回 None"""
+    global _cache
+    if not stt_cache_enabled():
+        return None
+    if _cache is None:
+        _cache = TranscriptCache()
+    return _cache
+
+
+async def cached_transcription(
+    audio_data: bytes,
+    config: SttConfig,
+    provider: str,
+    compute: Callable[[bytes, SttConfig], Awaitable[List[SttResult]]],
+    key: Optional[str] = None
+) -> List[SttResult]:
+    """命中缓存直接返回，否则调用 compute 识别并写入缓存
+
+    compute 只应返回完整的识别结果：识别未完成（超时等）时应抛出异常，异常时不写入缓存。
+    """
+    cache = get_stt_cache()
+    if cache is None:
+        return await compute(audio_data, config)
+
+    key = key or transcript_key(audio_data, config, provider)
+    results = await cache.get(key, provider=provider)
+    if results is None:
+        results = await compute(audio_data, config)
+        if results:  # 空结果可能来自异常音频或识别失败，不缓存
+            await cache.set(key, results)
+    return results
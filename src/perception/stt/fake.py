@@ -0,0 +1,230 @@
+"""
+本地 Fake STT 服务
+
+不访问网络，按收到的音频时长推进识别进度，输出确定性的部分/最终结果，
+用于离线压测与 CI 中跑通完整的 gRPC/HTTP 链路。
+"""
+
+import os
+import random
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from .base import SttService, SttConfig, SttResult
+from ..timer_wheel import SessionDeadlines
+from ...infra import get_logger, get_metrics, LatencyDistribution
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+_DEFAULT_SENTENCES = (
+    "你好，请帮我查一下明天的天气。",
+    "我想预订一张去上海的机票。",
+    "请介绍一下这个产品的主要功能。",
+    "今天的会议改到下午三点。",
+)
+
+
+class FakeSttError(Exception):
+    """注入的识别错误（可重试）"""
+    status_code = 503
+    code = "FakeSttUnavailable"
+    retryable = True
+
+
+class FakeSttService(SttService):
+    """Fake STT 服务
+
+    识别进度由音频时长（字节数 / (采样率 × 2)）驱动，与发送速度无关：
+    - 每累计 partial_interval_ms 音频输出一次部分结果，逐步揭示当前句子
+    - 每累计 sentence_ms 音频结束一句，经过 final_latency 后输出最终结果
+    - stop_session / flush 时立即结束当前句子
+
+    配置（构造参数优先，其次环境变量）：
+    - ready: 会话就绪延迟（FAKE_STT_READY_MS / _JITTER / _DIST / _TAIL_PROB / _TAIL_MS）
+    - final_latency: 句尾到最终结果的延迟（FAKE_STT_FINAL_LATENCY_MS / ...）
+    - partial_interval_ms: 部分结果间隔（FAKE_STT_PARTIAL_INTERVAL_MS）
+    - sentence_ms: 每句音频时长（FAKE_STT_SENTENCE_MS）
+    - error_rate: 会话中途出错的概率（FAKE_STT_ERROR_RATE）
+    - sentences: 识别文本，按会话 ID 与种子确定性地选取（FAKE_STT_SENTENCES，以 | 分隔）
+    - seed: 随机种子（FAKE_STT_SEED）
+
+    Usage:
+        SttRegistry.get_service("fake")
+    """
+
+    def __init__(
+        self,
+        ready: Optional[LatencyDistribution] = None,
+        final_latency: Optional[LatencyDistribution] = None,
+        partial_interval_ms: Optional[int] = None,
+        sentence_ms: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        sentences: Optional[List[str]] = None,
+        seed: Optional[int] = None
+    ):
+        super().__init__()
+        self.ready = ready or LatencyDistribution.from_env('FAKE_STT_READY', 100, 0.2)
+        self.final_latency = final_latency or LatencyDistribution.from_env('FAKE_STT_FINAL_LATENCY', 150, 0.2)
+        self.partial_interval_ms = partial_interval_ms if partial_interval_ms is not None else \
+            int(os.getenv('FAKE_STT_PARTIAL_INTERVAL_MS', '200'))
+        self.sentence_ms = sentence_ms if sentence_ms is not None else \
+            int(os.getenv('FAKE_STT_SENTENCE_MS', '2000'))
+        self.error_rate = error_rate if error_rate is not None else \
+            float(os.getenv('FAKE_STT_ERROR_RATE', '0'))
+        if sentences is None:
+            env_sentences = os.getenv('FAKE_STT_SENTENCES', '')
+            sentences = [s for s in env_sentences.split('|') if s.strip()] or list(_DEFAULT_SENTENCES)
+        self.sentences = sentences
+        self.seed = seed if seed is not None else int(os.getenv('FAKE_STT_SEED', '0'))
+
+        self._session_id: Optional[str] = None
+        self._config: Optional[SttConfig] = None
+        self._running = False
+        self._rng: Optional[random.Random] = None
+        self._audio_ms = 0.0           # 会话累计音频时长
+        self._sentence_start_ms = 0.0  # 当前句子起点
+        self._last_partial_ms = 0.0
+        self._text = ""                # 当前句子的完整文本
+        self._fail_at_ms: Optional[float] = None
+        self._pending: Dict[int, Tuple[asyncio.TimerHandle, SttResult]] = {}
+        self._seq = 0
+        self._deadlines: Optional[SessionDeadlines] = None
+        self._expire_task: Optional[asyncio.Task] = None
+
+    @property
+    def provider_name(self) -> str:
+        return "fake"
+
+    async def start_session(self, session_id: str, config: SttConfig) -> None:
+        if self._running:
+            await self.stop_session()
+
+        digest = hashlib.sha256(f"{self.seed}|{session_id}".encode('utf-8')).digest()
+        self._rng = random.Random(int.from_bytes(digest[:8], 'big'))
+        self._session_id = session_id
+        self._config = config
+        self._audio_ms = 0.0
+        self._sentence_start_ms = 0.0
+        self._last_partial_ms = 0.0
+        self._text = ""
+        self._pending = {}
+        self._fail_at_ms = None
+        if self._rng.random() < self.error_rate:
+            self._fail_at_ms = self._rng.uniform(0, self.sentence_ms)
+
+        await asyncio.sleep(self.ready.sample(self._rng))
+        self._running = True
+        self._start_vad(config)
+        self._deadlines = SessionDeadlines(
+            on_expire=self._on_expire,
+            idle_timeout=config.idle_timeout_s,
+            max_duration=config.max_duration_s,
+        )
+        metrics.track("perception.stt", "stt_session_start", dimensions={"provider": "fake"})
+        logger.debug("Fake STT session started", session_id=session_id)
+        self._emit_ready()
+
+    async def send_audio(self, audio_chunk: bytes) -> None:
+        if not self._running:
+            # 与 AliyunSttService 一致：会话已停止（出错或超时）时静默忽略
+            logger.debug("Fake STT session not running, ignoring audio chunk")
+            return
+
+        audio_chunk = self._filter_audio(audio_chunk)
+        self._deadlines.touch(forwarded=bool(audio_chunk))
+        if not audio_chunk:
+            return
+        self._audio_ms += len(audio_chunk) * 1000 / (self._config.sample_rate * 2)
+
+        if self._fail_at_ms is not None and self._audio_ms >= self._fail_at_ms:
+            self._fail_at_ms = None
+            self._running = False
+            self._emit_error(FakeSttError("Injected fake STT error"))
+            return
+
+        while self._audio_ms - self._sentence_start_ms >= self.sentence_ms:
+            self._end_sentence(self._sentence_start_ms + self.sentence_ms, delay=True)
+
+        if self._audio_ms - self._last_partial_ms >= self.partial_interval_ms:
+            self._last_partial_ms = self._audio_ms
+            self._emit_partial(self._result(self._audio_ms, is_final=False))
+
+    async def flush(self) -> None:
+        self._drain_pending()
+        if self._running and self._audio_ms > self._sentence_start_ms:
+            self._end_sentence(self._audio_ms, delay=False)
+
+    async def stop_session(self) -> None:
+        if self._deadlines is not None:
+            self._deadlines.cancel()
+            self._deadlines = None
+        tail = self._stop_vad()
+        if self._running and tail:
+            self._audio_ms += len(tail) * 1000 / (self._config.sample_rate * 2)
+        if not self._running and not self._pending:
+            return
+
+        # 尚未到期的最终结果立即按序发出，保证 stop_session 返回前结果完整
+        self._drain_pending()
+        if self._running and self._audio_ms > self._sentence_start_ms:
+            self._end_sentence(self._audio_ms, delay=False)
+        self._running = False
+
+        metrics.track("perception.stt", "stt_session_end", dimensions={"provider": "fake"})
+        logger.debug("Fake STT session stopped", session_id=self._session_id)
+        self._session_id = None
+
+    # ---------- 内部 ----------
+
+    def _on_expire(self, reason: str) -> None:
+        if self._running:
+            self._emit_error(TimeoutError(f"STT session {reason}"))
+            self._expire_task = asyncio.get_running_loop().create_task(self.stop_session())
+
+    def _current_text(self) -> str:
+        if not self._text:
+            self._text = self._rng.choice(self.sentences)
+        return self._text
+
+    def _result(self, end_ms: float, is_final: bool) -> SttResult:
+        text = self._current_text()
+        if not is_final:
+            progress = (end_ms - self._sentence_start_ms) / self.sentence_ms
+            text = text[:max(1, int(len(text) * min(progress, 1.0)))]
+        return SttResult(
+            text=text,
+            is_final=is_final,
+            confidence=0.95,
+            start_time_ms=int(self._sentence_start_ms),
+            end_time_ms=int(end_ms)
+        )
+
+    def _end_sentence(self, end_ms: float, delay: bool) -> None:
+        result = self._result(end_ms, is_final=True)
+        self._sentence_start_ms = end_ms
+        self._last_partial_ms = end_ms
+        self._text = ""
+
+        if not delay:
+            self._emit_final(result)
+            return
+        self._seq += 1
+        handle = asyncio.get_running_loop().call_later(
+            self.final_latency.sample(self._rng), self._deliver, self._seq
+        )
+        self._pending[self._seq] = (handle, result)
+
+    def _drain_pending(self) -> None:
+        pending, self._pending = self._pending, {}
+        for seq in sorted(pending):
+            handle, result = pending[seq]
+            handle.cancel()
+            self._emit_final(result)
+
+    def _deliver(self, seq: int) -> None:
+        entry = self._pending.pop(seq, None)
+        if entry is not None:
+            self._emit_final(entry[1])
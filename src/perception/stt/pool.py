@@ -0,0 +1,335 @@
+"""
+STT 识别会话预热池
+
+预先建立 DashScope Recognition（WebSocket 握手 + 任务启动），按 (模型, 采样率) 分组，
+会话启动时直接租用，省去就绪前的 TLS / WebSocket 握手。
+
+Recognition 任务在 stop() 后即结束，不能复用：租出的连接用完即丢弃，
+池在后台按目标大小补充。空闲连接按回调状态做健康检查，超过最大空闲时间的连接
+会被关闭并替换；stop() 会等待 SDK 线程结束，在线程池中执行。
+静音帧保活需显式开启（STT_POOL_KEEPALIVE）：服务端按音频时长计费，保活帧同样计费。
+"""
+
+import os
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ...infra import get_logger, get_metrics, EventStatus
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+PoolKey = Tuple[str, int]  # (模型, 采样率)
+
+# 静音帧：16kHz 采样率，16位 PCM，100ms
+SILENCE_FRAME = bytes(3200)
+
+
+class _ForwardingCallback:
+    """转发回调：空闲时吞掉事件并记录健康状态，租出后转发给会话的回调"""
+
+    def __init__(self):
+        self.target = None
+        self.healthy = True
+
+    def on_open(self):
+        pass
+
+    def on_close(self):
+        if self.target is not None:
+            self.target.on_close()
+        else:
+            self.healthy = False
+
+    def on_event(self, result):
+        if self.target is not None:
+            self.target.on_event(result)
+
+    def on_error(self, result):
+        if self.target is not None:
+            self.target.on_error(result)
+        else:
+            self.healthy = False
+            logger.warn("Pooled STT recognition failed while idle", error=str(result))
+
+    def on_complete(self):
+        if self.target is not None:
+            self.target.on_complete()
+        else:
+            self.healthy = False
+
+
+@dataclass
+class PooledRecognition:
+    """池中的识别连接"""
+    key: PoolKey
+    recognition: Any
+    callback: _ForwardingCallback
+    created_at: float = field(default_factory=time.monotonic)
+    idle_since: float = field(default_factory=time.monotonic)
+
+    @property
+    def healthy(self) -> bool:
+        # 空闲期间收到 close / error / complete 回调即视为不可用
+        return self.callback.healthy
+
+
+def _open_recognition(key: PoolKey, callback: _ForwardingCallback, api_key: Optional[str]) -> Any:
+    """建立 DashScope 识别连接（阻塞，在线程池中执行）"""
+    import dashscope
+    from dashscope.audio.asr import Recognition
+
+    if api_key:
+        dashscope.api_key = api_key
+    model, sample_rate = key
+    recognition = Recognition(
+        model=model,
+        format='pcm',
+        sample_rate=sample_rate,
+        callback=callback
+    )
+    recognition.start()
+    return recognition
+
+
+class SttSessionPool:
+    """STT 识别会话预热池
+
+    - size: 每个 (模型, 采样率) 保持的空闲连接数（STT_POOL_SIZE）
+    - max_total: 全部分组的空闲 + 建立中连接上限（STT_POOL_MAX_TOTAL）
+    - max_idle: 空闲连接最长存活时间（秒），超过后关闭并替换（STT_POOL_MAX_IDLE）
+    - keepalive: 是否向空闲连接发送静音帧保活（STT_POOL_KEEPALIVE，默认关闭；保活音频计费）
+    - keepalive_interval: 空闲连接保活 / 健康检查间隔（秒）
+    - warm_keys: 启动时预热的分组，格式 "model:sample_rate,..."（STT_POOL_WARM_KEYS）
+
+    Usage:
+        pool = get_stt_pool()
+        entry = await pool.acquire(("paraformer-realtime-v2", 16000), callback)
+        if entry is None:
+            ...  # 池中无可用连接，直接建立
+        ...
+        pool.release(entry)
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_total: Optional[int] = None,
+        max_idle: Optional[float] = None,
+        keepalive: Optional[bool] = None,
+        keepalive_interval: float = 10.0,
+        warm_keys: Optional[List[PoolKey]] = None,
+        api_key: Optional[str] = None,
+        opener: Optional[Callable[[PoolKey, _ForwardingCallback], Any]] = None
+    ):
+        self.size = size if size is not None else int(os.getenv('STT_POOL_SIZE', '4'))
+        self.max_total = max_total if max_total is not None else int(os.getenv('STT_POOL_MAX_TOTAL', '32'))
+        if keepalive is None:
+            keepalive = os.getenv('STT_POOL_KEEPALIVE', 'false').lower() == 'true'
+        self.keepalive = keepalive
+        # 不保活时服务端会断开长时间无音频的连接，默认空闲上限随之缩短
+        self.max_idle = max_idle if max_idle is not None else \
+            float(os.getenv('STT_POOL_MAX_IDLE', '300' if keepalive else '20'))
+        self.keepalive_interval = keepalive_interval
+        if warm_keys is None:
+            warm_keys = self._parse_keys(os.getenv('STT_POOL_WARM_KEYS', 'paraformer-realtime-v2:16000'))
+        self.api_key = api_key or os.getenv('DASHSCOPE_API_KEY')
+        self._opener = opener or (lambda key, cb: _open_recognition(key, cb, self.api_key))
+
+        self._idle: Dict[PoolKey, List[PooledRecognition]] = {}
+        self._opening: Dict[PoolKey, int] = {}
+        self._keys: Dict[PoolKey, None] = dict.fromkeys(warm_keys)  # 需要维持的分组（有序集合）
+        self._maintain_task: Optional[asyncio.Task] = None
+        self._refill_tasks: set = set()
+        self._stop_tasks: set = set()
+        self._closed = False
+        self._stats = {'hits': 0, 'misses': 0, 'opened': 0, 'open_failures': 0, 'evicted': 0}
+
+    @staticmethod
+    def _parse_keys(spec: str) -> List[PoolKey]:
+        keys = []
+        for item in spec.split(','):
+            model, _, rate = item.strip().partition(':')
+            if model:
+                keys.append((model, int(rate or 16000)))
+        return keys
+
+    # ---------- 租用 ----------
+
+    async def acquire(self, key: PoolKey, target) -> Optional[PooledRecognition]:
+        """租用一个空闲连接，并将回调转发给 target；无可用连接时返回 None"""
+        self._ensure_started()
+        if key not in self._keys:
+            self._keys[key] = None
+
+        entries = self._idle.get(key, [])
+        while entries:
+            entry = entries.pop()
+            if entry.healthy:
+                entry.callback.target = target
+                self._stats['hits'] += 1
+                self._refill(key)
+                return entry
+            self._discard(entry, reason="unhealthy")
+
+        self._stats['misses'] += 1
+        self._refill(key)
+        return None
+
+    def release(self, entry: PooledRecognition) -> None:
+        """归还租用的连接（识别任务已结束，连接被丢弃并在后台补充）"""
+        entry.callback.target = None
+        self._refill(entry.key)
+
+    # ---------- 维护 ----------
+
+    def _ensure_started(self) -> None:
+        if self._maintain_task is None and not self._closed:
+            self._maintain_task = asyncio.create_task(self._maintain_loop())
+
+    async def start(self) -> None:
+        """启动后台维护并预热配置的分组"""
+        self._ensure_started()
+        for key in list(self._keys):
+            self._refill(key)
+
+    def _total(self) -> int:
+        return sum(len(v) for v in self._idle.values()) + sum(self._opening.values())
+
+    def _refill(self, key: PoolKey) -> None:
+        if self._closed:
+            return
+        missing = self.size - len(self._idle.get(key, [])) - self._opening.get(key, 0)
+        for _ in range(max(0, min(missing, self.max_total - self._total()))):
+            self._opening[key] = self._opening.get(key, 0) + 1
+            task = asyncio.create_task(self._open(key))
+            self._refill_tasks.add(task)
+            task.add_done_callback(self._refill_tasks.discard)
+
+    async def _open(self, key: PoolKey) -> None:
+        callback = _ForwardingCallback()
+        start = time.monotonic()
+        try:
+            recognition = await asyncio.get_running_loop().run_in_executor(None, self._opener, key, callback)
+        except Exception as e:
+            self._stats['open_failures'] += 1
+            metrics.track(
+                "perception.stt", "stt_pool_open_failed",
+                status=EventStatus.ERROR,
+                dimensions={"model": key[0], "sample_rate": key[1]},
+                error={"code": type(e).__name__, "message": str(e)}
+            )
+            logger.warn("Failed to open pooled STT recognition", model=key[0], error=str(e))
+            return
+        finally:
+            self._opening[key] -= 1
+
+        entry = PooledRecognition(key=key, recognition=recognition, callback=callback)
+        if self._closed:
+            self._discard(entry, reason="closed")
+            return
+        self._idle.setdefault(key, []).append(entry)
+        self._stats['opened'] += 1
+        metrics.track(
+            "perception.stt", "stt_pool_opened",
+            dimensions={"model": key[0], "sample_rate": key[1]},
+            duration_ms=(time.monotonic() - start) * 1000
+        )
+
+    async def _maintain_loop(self) -> None:
+        """保活、健康检查与过期淘汰"""
+        try:
+            while not self._closed:
+                await asyncio.sleep(self.keepalive_interval)
+                self.maintain()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error("STT pool maintenance error", exc=e)
+
+    def maintain(self) -> None:
+        now = time.monotonic()
+        for key, entries in self._idle.items():
+            alive = []
+            for entry in entries:
+                if not entry.healthy:
+                    self._discard(entry, reason="unhealthy")
+                elif now - entry.idle_since >= self.max_idle:
+                    self._discard(entry, reason="max_idle")
+                elif not self.keepalive:
+                    alive.append(entry)
+                else:
+                    try:
+                        entry.recognition.send_audio_frame(SILENCE_FRAME)
+                        alive.append(entry)
+                    except Exception as e:
+                        logger.debug("Pooled STT keepalive failed", error=str(e))
+                        self._discard(entry, reason="keepalive_failed")
+            entries[:] = alive
+        for key in list(self._keys):
+            self._refill(key)
+
+    def _discard(self, entry: PooledRecognition, reason: str) -> None:
+        self._stats['evicted'] += 1
+        metrics.track(
+            "perception.stt", "stt_pool_evicted",
+            dimensions={"model": entry.key[0], "sample_rate": entry.key[1], "reason": reason}
+        )
+        # stop() 会等待 SDK 线程结束，放到线程池中避免阻塞事件循环
+        task = asyncio.ensure_future(self._stop(entry))
+        self._stop_tasks.add(task)
+        task.add_done_callback(self._stop_tasks.discard)
+
+    @staticmethod
+    async def _stop(entry: PooledRecognition) -> None:
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, entry.recognition.stop)
+        except Exception as e:
+            logger.debug("Failed to stop pooled STT recognition", error=str(e))
+
+    async def close(self) -> None:
+        """关闭所有空闲连接并停止后台维护"""
+        self._closed = True
+        if self._maintain_task is not None:
+            self._maintain_task.cancel()
+            self._maintain_task = None
+        for task in list(self._refill_tasks):
+            task.cancel()
+        for entries in self._idle.values():
+            for entry in entries:
+                self._discard(entry, reason="closed")
+        self._idle.clear()
+        if self._stop_tasks:
+            await asyncio.gather(*self._stop_tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            'idle': {f"{m}:{r}": len(v) for (m, r), v in self._idle.items()},
+            'opening': sum(self._opening.values()),
+        }
+
+
+_pool: Optional[SttSessionPool] = None
+
+
+def stt_pool_enabled() -> bool:
+    return os.getenv('STT_POOL_ENABLED', 'false').lower() == 'true'
+
+
+def get_stt_pool() -> SttSessionPool:
+    """获取全局 STT 会话池"""
+    global _pool
+    if _pool is None:
+        _pool = SttSessionPool()
+    return _pool
+
+
+async def close_stt_pool() -> None:
+    """关闭全局 STT 会话池"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -0,0 +1,216 @@
+"""
+STT 中间结果稳定化
+
+DashScope 每条中间结果都携带整句已识别文本，长句逐条全量下发时传输字节数随句长平方增长。
+PartialStabilizer 位于 STT 回调与下行协议之间（按连接启用，默认关闭）：
+- 增量模式：记录客户端已收到的文本，每条中间结果只下发变化的后缀，
+  stable_prefix_len 为沿用的前缀长度（按字符计），客户端以
+  text[:stable_prefix_len] + delta 还原整句
+- 节流：中间结果最短间隔 partial_interval_ms，间隔内的中间结果暂存，
+  间隔到期时经 on_trailing 补发最新的一条（期间收到最终结果则不再补发）
+- 最终结果总是立即全量下发，并重置句子状态
+"""
+
+import time
+import asyncio
+import threading
+import unicodedata
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Optional
+
+from .base import SttConfig, SttResult
+from ...infra import get_metrics
+
+metrics = get_metrics()
+
+
+def common_prefix_len(a: str, b: str) -> int:
+    """两个字符串的最长公共前缀长度"""
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _is_content(ch: str) -> bool:
+    return not ch.isspace() and not unicodedata.category(ch).startswith('P')
+
+
+def normalize_text(text: str) -> str:
+    """去除标点与空白，用于比较同一句话的不同识别版本"""
+    return "".join(ch for ch in text if _is_content(ch))
+
+
+def strip_content_prefix(text: str, prefix: str) -> Optional[str]:
+    """去掉 text 开头与 prefix 内容一致（忽略标点与空白）的部分及其后的标点，返回剩余后缀；
+    不以 prefix 开头时返回 None"""
+    target = normalize_text(prefix)
+    if not normalize_text(text).startswith(target):
+        return None
+    matched = i = 0
+    while matched < len(target):
+        if _is_content(text[i]):
+            matched += 1
+        i += 1
+    while i < len(text) and not _is_content(text[i]):
+        i += 1
+    return text[i:]
+
+
+@dataclass
+class StabilizerStats:
+    """稳定化统计"""
+    partials_in: int = 0
+    partials_out: int = 0
+    throttled: int = 0       # 节流暂存的中间结果
+    trailing: int = 0        # 间隔到期后补发的中间结果
+    unchanged: int = 0       # 与已下发文本相同、跳过的中间结果
+    finals: int = 0
+    full_chars: int = 0      # 全量下发时的字符数
+    sent_chars: int = 0      # 实际下发的字符数
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'partials_in': self.partials_in,
+            'partials_out': self.partials_out,
+            'throttled': self.throttled,
+            'trailing': self.trailing,
+            'unchanged': self.unchanged,
+            'finals': self.finals,
+            'full_chars': self.full_chars,
+            'sent_chars': self.sent_chars,
+        }
+
+
+class PartialStabilizer:
+    """中间结果增量化与节流
+
+    partial / final 可在 SDK 线程调用（内部加锁）；返回 None 表示该中间结果不下发。
+    增量帧必须全部按序送达客户端，经 EventChannel 转发时不能作为可合并的 PARTIAL 写入。
+    节流时需提供 on_trailing（在事件循环中调用），间隔到期后补发被暂存的最新中间结果，
+    未提供时被节流的中间结果直接丢弃。
+
+    Usage:
+        stabilizer = PartialStabilizer.from_config(stt_config, on_trailing=send)   # 未启用时为 None
+        out = stabilizer.partial(result)
+        if out is not None:
+            send(out)
+        send(stabilizer.final(result))
+        stabilizer.close()
+    """
+
+    def __init__(
+        self,
+        enable_delta: bool = True,
+        interval_ms: int = 0,
+        name: str = "stt",
+        on_trailing: Optional[Callable[[SttResult], None]] = None
+    ):
+        self.enable_delta = enable_delta
+        self.interval = max(0, interval_ms) / 1000
+        self.name = name
+        self.stats = StabilizerStats()
+        self._sent = ""                    # 客户端当前句已还原出的文本
+        self._last_partial_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._on_trailing = on_trailing
+        self._loop = asyncio.get_running_loop() if on_trailing and self.interval else None
+        self._pending: Optional[SttResult] = None    # 节流期间最新的中间结果
+        self._timer_gen = 0                          # 已排期的补发定时器代号，0 表示未排期
+        self._next_gen = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        config: SttConfig,
+        name: str = "stt",
+        on_trailing: Optional[Callable[[SttResult], None]] = None
+    ) -> Optional['PartialStabilizer']:
+        """按 SttConfig 创建，未启用增量与节流时返回 None（保持原有全量下发）"""
+        if not config.enable_partial_delta and config.partial_interval_ms <= 0:
+            return None
+        return cls(config.enable_partial_delta, config.partial_interval_ms, name=name, on_trailing=on_trailing)
+
+    def partial(self, result: SttResult) -> Optional[SttResult]:
+        """处理中间结果，返回应下发的结果（增量模式下 text 为变化的后缀）"""
+        with self._lock:
+            self.stats.partials_in += 1
+            now = time.monotonic()
+            if (self.interval and self._last_partial_at is not None
+                    and now - self._last_partial_at < self.interval):
+                self.stats.throttled += 1
+                if self._loop is not None:
+                    self._pending = result
+                    if not self._timer_gen:
+                        self._schedule(self._last_partial_at + self.interval - now)
+                return None
+            self._pending = None
+            self._timer_gen = 0
+            return self._emit(result, now)
+
+    def _emit(self, result: SttResult, now: float) -> Optional[SttResult]:
+        """下发一条中间结果（调用方持有锁）"""
+        text = result.text
+        if text == self._sent:
+            self.stats.unchanged += 1
+            return None
+
+        self._last_partial_at = now
+        self.stats.partials_out += 1
+        self.stats.full_chars += len(text)
+        if not self.enable_delta:
+            self._sent = text
+            self.stats.sent_chars += len(text)
+            return result
+
+        stable = common_prefix_len(self._sent, text)
+        self._sent = text
+        self.stats.sent_chars += len(text) - stable
+        return replace(result, text=text[stable:], stable_prefix_len=stable, is_delta=True)
+
+    def _schedule(self, delay: float) -> None:
+        """排期补发（调用方持有锁，可在 SDK 线程调用）"""
+        self._next_gen += 1
+        gen = self._timer_gen = self._next_gen
+        self._loop.call_soon_threadsafe(self._loop.call_later, max(0.0, delay), self._flush_trailing, gen)
+
+    def _flush_trailing(self, gen: int) -> None:
+        """间隔到期：补发暂存的最新中间结果"""
+        with self._lock:
+            if gen != self._timer_gen:
+                return
+            self._timer_gen = 0
+            pending, self._pending = self._pending, None
+            if pending is None:
+                return
+            out = self._emit(pending, time.monotonic())
+            if out is not None:
+                # 持锁下发，保证与随后的中间/最终结果顺序一致（on_trailing 不能阻塞）
+                self.stats.trailing += 1
+                self._on_trailing(out)
+
+    def final(self, result: SttResult) -> SttResult:
+        """处理最终结果：全量下发，stable_prefix_len 为与已下发中间结果的公共前缀长度"""
+        with self._lock:
+            stable = common_prefix_len(self._sent, result.text)
+            self._sent = ""
+            self._last_partial_at = None
+            self._pending = None
+            self._timer_gen = 0
+            self.stats.finals += 1
+            self.stats.full_chars += len(result.text)
+            self.stats.sent_chars += len(result.text)
+            return replace(result, stable_prefix_len=stable, is_delta=False)
+
+    def close(self) -> None:
+        """停止补发并上报统计"""
+        with self._lock:
+            self._pending = None
+            self._timer_gen = 0
+        if self.stats.partials_in or self.stats.finals:
+            metrics.track(
+                "perception.stt", "partial_summary",
+                dimensions={"stream": self.name, "delta": self.enable_delta},
+                metrics=self.stats.to_dict()
+            )
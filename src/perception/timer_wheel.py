@@ -0,0 +1,240 @@
+"""
+哈希时间轮
+
+为大量会话的保活、空闲超时、最长时长等截止时间提供统一调度：
+全局只有一个驱动任务，按固定刻度推进，代替每个会话一个休眠任务。
+
+截止时间在收到音频时只做一次属性赋值（惰性推后），到达槽位时再检查是否真正到期，
+未到期的定时器重新落槽。
+"""
+
+import math
+import time
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+
+from ..infra import get_logger
+
+logger = get_logger(__name__)
+
+
+class WheelTimer:
+    """时间轮定时器"""
+
+    __slots__ = ('deadline', 'callback', 'args', '_wheel', '_slot', '_active', 'cancelled')
+
+    def __init__(self, wheel: 'TimerWheel', deadline: float, callback: Callable, args: tuple):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self._wheel = wheel
+        self._slot = -1
+        self._active = False
+        self.cancelled = False
+
+    def touch(self, delay: float) -> None:
+        """将截止时间设为 delay 秒后
+
+        定时器仍在轮上且截止时间推后时只更新属性（O(1)，不移动槽位）；
+        提前或已触发的定时器重新落槽。
+        """
+        if self.cancelled:
+            return
+        deadline = time.monotonic() + delay
+        if self._active and deadline >= self.deadline:
+            self.deadline = deadline
+            return
+        self._wheel._remove(self)
+        self.deadline = deadline
+        self._wheel._insert(self)
+
+    def cancel(self) -> None:
+        if not self.cancelled:
+            self.cancelled = True
+            self._wheel._remove(self)
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+
+class TimerWheel:
+    """哈希时间轮
+
+    - tick: 刻度（秒），决定触发精度
+    - slots: 槽位数；超过一圈的定时器在每圈经过时检查一次
+
+    回调在事件循环中同步执行，应保持轻量（需要 I/O 时自行创建任务）。
+
+    Usage:
+        wheel = get_timer_wheel()
+        timer = wheel.call_later(10, on_keepalive)
+        timer.touch(10)   # 收到音频，推后截止时间
+        timer.cancel()
+    """
+
+    def __init__(self, tick: float = 0.1, slots: int = 512):
+        self.tick = tick
+        self.slots = slots
+        self._buckets: List[Dict[WheelTimer, None]] = [{} for _ in range(slots)]
+        self._origin = time.monotonic()
+        self._cursor = 0          # 下一个待处理的刻度
+        self._count = 0
+        self._fired = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def call_later(self, delay: float, callback: Callable, *args: Any) -> WheelTimer:
+        """delay 秒后在事件循环中调用 callback(*args)"""
+        timer = WheelTimer(self, time.monotonic() + delay, callback, args)
+        self._insert(timer)
+        return timer
+
+    # ---------- 内部 ----------
+
+    def _insert(self, timer: WheelTimer) -> None:
+        index = max(self._cursor, math.ceil((timer.deadline - self._origin) / self.tick))
+        timer._slot = index % self.slots
+        timer._active = True
+        self._buckets[timer._slot][timer] = None
+        self._count += 1
+        self._ensure_running()
+
+    def _remove(self, timer: WheelTimer) -> None:
+        if timer._active:
+            timer._active = False
+            self._buckets[timer._slot].pop(timer, None)
+            self._count -= 1
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._task = self._loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        try:
+            while self._count:
+                next_tick = self._origin + self._cursor * self.tick
+                await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+                self.advance(time.monotonic())
+        except asyncio.CancelledError:
+            pass
+
+    def advance(self, now: float) -> None:
+        """处理截止到 now 的所有刻度"""
+        target = math.floor((now - self._origin) / self.tick)
+        if target - self._cursor >= self.slots:
+            self._catch_up(now, target)
+            return
+        while self._cursor <= target:
+            slot = self._cursor % self.slots
+            bucket = self._buckets[slot]
+            self._buckets[slot] = {}
+            self._cursor += 1
+            for timer in bucket:
+                if not timer._active:
+                    continue
+                if timer.deadline > now:
+                    # 截止时间已被推后或不在本圈：重新落槽
+                    self._count -= 1
+                    self._insert(timer)
+                    continue
+                timer._active = False
+                self._count -= 1
+                self._fire(timer)
+
+    def _catch_up(self, now: float, target: int) -> None:
+        """长时间停顿（超过一圈）：取出全部定时器，按截止时间顺序触发已到期的，其余重新落槽"""
+        timers = sorted((t for bucket in self._buckets for t in bucket), key=lambda t: t.deadline)
+        for timer in timers:
+            self._remove(timer)
+        self._cursor = target + 1
+        for timer in timers:
+            # 已被先触发的回调取消或重新落槽
+            if timer.cancelled or timer._active:
+                continue
+            if timer.deadline > now:
+                self._insert(timer)
+            else:
+                self._fire(timer)
+
+    def _fire(self, timer: WheelTimer) -> None:
+        self._fired += 1
+        try:
+            timer.callback(*timer.args)
+        except Exception as e:
+            logger.error("Timer wheel callback error", exc=e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {'timers': self._count, 'fired': self._fired, 'tick': self.tick, 'slots': self.slots}
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+_wheel: Optional[TimerWheel] = None
+
+
+def get_timer_wheel() -> TimerWheel:
+    """获取当前事件循环的全局时间轮"""
+    global _wheel
+    loop = asyncio.get_running_loop()
+    if _wheel is None or _wheel._loop not in (None, loop):
+        _wheel = TimerWheel()
+    return _wheel
+
+
+class SessionDeadlines:
+    """单个 STT 会话的截止时间：保活、空闲超时、最长时长
+
+    - keepalive_interval 秒内没有音频发往上游时调用 on_keepalive（之后按同样间隔重复）
+    - idle_timeout 秒内没有音频时调用 on_expire("idle_timeout")
+    - 会话开始 max_duration 秒后调用 on_expire("max_duration")
+    间隔为 0 表示不启用。收到音频时调用 touch()，会话结束时调用 cancel()。
+    """
+
+    def __init__(
+        self,
+        on_keepalive: Optional[Callable[[], None]] = None,
+        keepalive_interval: float = 0.0,
+        on_expire: Optional[Callable[[str], None]] = None,
+        idle_timeout: float = 0.0,
+        max_duration: float = 0.0,
+        wheel: Optional[TimerWheel] = None
+    ):
+        wheel = wheel if wheel is not None else get_timer_wheel()
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self._on_keepalive = on_keepalive
+        self._on_expire = on_expire
+        self._keepalive = wheel.call_later(keepalive_interval, self._fire_keepalive) \
+            if on_keepalive and keepalive_interval > 0 else None
+        self._idle = wheel.call_later(idle_timeout, self._fire_expire, "idle_timeout") \
+            if on_expire and idle_timeout > 0 else None
+        self._max = wheel.call_later(max_duration, self._fire_expire, "max_duration") \
+            if on_expire and max_duration > 0 else None
+
+    def touch(self, forwarded: bool = True) -> None:
+        """收到音频：推后空闲截止时间；音频实际发往上游（forwarded）时同时推后保活"""
+        if forwarded and self._keepalive is not None:
+            self._keepalive.touch(self.keepalive_interval)
+        if self._idle is not None:
+            self._idle.touch(self.idle_timeout)
+
+    def cancel(self) -> None:
+        for timer in (self._keepalive, self._idle, self._max):
+            if timer is not None:
+                timer.cancel()
+
+    def _fire_keepalive(self) -> None:
+        self._keepalive.touch(self.keepalive_interval)
+        self._on_keepalive()
+
+    def _fire_expire(self, reason: str) -> None:
+        self.cancel()
+        self._on_expire(reason)
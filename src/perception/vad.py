@@ -0,0 +1,166 @@
+"""
+本地语音活动检测（VAD）
+
+在音频送入 STT 之前丢弃长时间静音，节省带宽与识别计费。
+按 20ms 帧向量化计算能量（dBFS）与过零率判定语音帧，语音结束后保留 hangover，
+语音开始前补 padding，只转发语音段。输入为 PCM 16bit 单声道。
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from ..infra import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class VadStats:
+    """VAD 统计"""
+    bytes_in: int = 0
+    bytes_out: int = 0
+    speech_frames: int = 0
+    frames: int = 0
+
+    @property
+    def dropped_ratio(self) -> float:
+        return 1 - self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'dropped_ratio': round(self.dropped_ratio, 4),
+            'speech_frames': self.speech_frames,
+            'frames': self.frames,
+        }
+
+
+class VoiceActivityDetector:
+    """能量 + 过零率 VAD（带 hangover 与 padding）
+
+    判定规则（逐帧、向量化）：
+    - 能量高于 threshold_db 且过零率低于 max_zcr（排除高频噪声），或
+    - 能量高于 threshold_db + loud_margin_db（响亮的清辅音等）
+
+    hangover_ms 应不小于 STT 的断句静音时长（max_sentence_silence），
+    否则服务端可能因收不到足够的静音而无法断句。
+
+    Usage:
+        vad = VoiceActivityDetector(sample_rate=16000)
+        forwarded = vad.process(chunk)   # 可能为 b''
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        threshold_db: float = -45.0,
+        max_zcr: float = 0.35,
+        loud_margin_db: float = 15.0,
+        hangover_ms: int = 1000,
+        padding_ms: int = 200,
+        frame_ms: int = 20
+    ):
+        import numpy as np
+        self._np = np
+
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.max_zcr = max_zcr
+        self.loud_margin_db = loud_margin_db
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self.hangover_frames = max(0, hangover_ms // frame_ms)
+        self.padding_frames = max(0, padding_ms // frame_ms)
+
+        self.stats = VadStats()
+        self._remainder = b""
+        self._frame_no = 0                                   # 已处理帧数
+        self._last_speech = -(self.hangover_frames + 1)      # 最近语音帧序号
+        self._padding: deque = deque(maxlen=self.padding_frames or 1)  # 最近被丢弃的帧
+
+    def classify(self, frames) -> Any:
+        """逐帧判定是否为语音（frames: int16 [n, frame_samples]）"""
+        np = self._np
+        x = frames.astype(np.float32)
+        power = np.einsum('ij,ij->i', x, x) / frames.shape[1]
+        energy_db = 10 * np.log10(power / (32768.0 ** 2) + 1e-12)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frames.shape[1] - 1)
+        return ((energy_db > self.threshold_db) & (zcr < self.max_zcr)) | \
+            (energy_db > self.threshold_db + self.loud_margin_db)
+
+    def process(self, chunk: bytes) -> bytes:
+        """处理一段音频，返回应转发的部分
+
+        chunk 可以是 memoryview（FrameRing 复用的缓冲区），剩余的不足一帧部分总是复制为 bytes 保存。
+        """
+        self.stats.bytes_in += len(chunk)
+        data = self._remainder + bytes(chunk) if self._remainder else chunk
+        count = len(data) // self.frame_bytes
+        self._remainder = bytes(data[count * self.frame_bytes:])
+        if not count:
+            return b""
+        return self._forward(data, count)
+
+    def flush(self) -> bytes:
+        """结束时处理不足一帧的剩余音频（补零到整帧），返回应转发的部分"""
+        if not self._remainder:
+            return b""
+        data = self._remainder + bytes(self.frame_bytes - len(self._remainder))
+        self._remainder = b""
+        return self._forward(data, 1)
+
+    def _forward(self, data: bytes, count: int) -> bytes:
+        """判定 data 中的 count 个整帧，返回应转发的部分"""
+        np = self._np
+        frames = np.frombuffer(data, dtype=np.int16, count=count * self.frame_samples)
+        speech = self.classify(frames.reshape(count, self.frame_samples))
+
+        # 每帧距最近语音帧的距离（含上一段的状态），在 hangover 内的帧保留
+        numbers = np.arange(self._frame_no, self._frame_no + count)
+        last = np.maximum.accumulate(np.where(speech, numbers, self._last_speech))
+        keep = numbers - last <= self.hangover_frames
+
+        out = []
+        view = memoryview(data)
+        for i in range(count):
+            frame = view[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            if keep[i]:
+                if self._padding and speech[i]:
+                    # 语音开始：先补发之前的 padding
+                    out.extend(self._padding)
+                    self._padding.clear()
+                out.append(frame)
+            elif self.padding_frames:
+                self._padding.append(bytes(frame))
+
+        self._frame_no += count
+        self._last_speech = int(last[-1])
+        self.stats.frames += count
+        self.stats.speech_frames += int(np.count_nonzero(speech))
+        result = b"".join(out)
+        self.stats.bytes_out += len(result)
+        return result
+
+    def reset(self) -> None:
+        self._remainder = b""
+        self._padding.clear()
+        self._last_speech = self._frame_no - self.hangover_frames - 1
+
+
+def create_vad(config) -> Optional[VoiceActivityDetector]:
+    """按 SttConfig 创建 VAD；未启用或缺少 numpy 时返回 None"""
+    if not getattr(config, 'enable_vad', False):
+        return None
+    try:
+        return VoiceActivityDetector(
+            sample_rate=config.sample_rate,
+            threshold_db=config.vad_threshold_db,
+            hangover_ms=config.vad_hangover_ms or config.max_sentence_silence + 200,
+            padding_ms=config.vad_padding_ms,
+        )
+    except ImportError:
+        logger.warn("numpy not installed, VAD disabled")
+        return None
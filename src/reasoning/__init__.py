@@ -13,6 +13,7 @@ from .llm import (
     StreamChunk,
     LlmRegistry,
 )
+from .context_window import ContextWindow, LlmSummarizer, get_context_window
 from .agent import OmniAgent
 
 __all__ = [
@@ -24,6 +25,10 @@ __all__ = [
     'LlmResponse',
     'StreamChunk',
     'LlmRegistry',
+    # Context
+    'ContextWindow',
+    'LlmSummarizer',
+    'get_context_window',
     # Agent
     'OmniAgent',
 ]
@@ -0,0 +1,258 @@
+"""
+上下文窗口管理
+
+长会话把全部历史原样发给模型，输入 token 与延迟随轮数线性增长，最终超出模型上下文长度而失败。
+ContextWindow 在每次 LLM 调用前按模型的输入 token 预算裁剪消息：
+- 保留开头的 system 消息与当前输入，从最近的消息往前尽量多地保留完整轮次
+- 更早的轮次丢弃；开启摘要时以一条「更早对话摘要」的 system 消息代替
+- 摘要在后台异步生成，按被丢弃前缀的内容哈希缓存，后续轮次直接复用，
+  并在已有摘要的基础上只总结新增的消息（不重复总结整段历史）
+
+调用方在构建请求后直接调用 fit / fit_messages（gRPC、HTTP 对话接口与 Orchestrator 均如此接入）。
+埋点：llm.context 的 context_trimmed（裁剪前后 token 数、节省的 token 数）与 summary_created。
+
+配置（环境变量）：
+- LLM_CONTEXT_ENABLED: 是否启用（默认 true）
+- LLM_CONTEXT_MAX_TOKENS: 默认输入 token 预算（默认 8000）
+- LLM_CONTEXT_MODEL_TOKENS: 按模型覆盖预算，如 qwen-max:24000,qwen-plus:100000
+- LLM_CONTEXT_SUMMARY_ENABLED: 是否为丢弃的轮次生成摘要（默认 false，只丢弃）
+- LLM_CONTEXT_SUMMARY_MODEL / LLM_CONTEXT_SUMMARY_MAX_TOKENS: 摘要使用的模型与长度上限
+"""
+
+import os
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .llm.base import LlmService, LlmConfig, LlmPriority, Message, MessageRole
+from ..infra import get_logger, get_metrics, LruCache
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+SUMMARY_PREFIX = "以下是更早对话的摘要：\n"
+
+# 未被摘要覆盖的丢弃消息达到该条数才生成新摘要（约两轮，避免每轮都多一次 LLM 调用）
+_SUMMARY_MIN_MESSAGES = 4
+
+# 摘要缓存：被摘要前缀的内容哈希 -> 摘要文本（所有窗口共享）
+_summaries = LruCache(max_bytes=8 * 1024 * 1024, ttl=6 * 3600)
+
+# 摘要器：(已有摘要, 需要并入的消息) -> 新摘要
+Summarizer = Callable[[Optional[str], Sequence[Mapping[str, Any]]], Awaitable[str]]
+
+
+def _chain_digests(messages: Sequence[Mapping[str, Any]], digest: bytes = b"") -> List[bytes]:
+    """前缀哈希链：第 i 项覆盖 messages[:i + 1]（digest 为之前前缀的哈希，用于续算）"""
+    digests = []
+    for message in messages:
+        h = hashlib.blake2b(digest, digest_size=16)
+        h.update(str(message.get("role", "")).encode('utf-8'))
+        h.update(b"\x00")
+        h.update(str(message.get("content", "")).encode('utf-8'))
+        digest = h.digest()
+        digests.append(digest)
+    return digests
+
+
+class LlmSummarizer:
+    """以 LLM 生成对话摘要（BATCH 优先级，让位于实时对话）"""
+
+    def __init__(self, service: LlmService, model: str, max_tokens: int = 300):
+        self.service = service
+        self.model = model
+        self.max_tokens = max_tokens
+
+    async def __call__(self, previous: Optional[str], messages: Sequence[Mapping[str, Any]]) -> str:
+        lines = [f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages]
+        prompt = "请将以下对话压缩为简洁的摘要，保留用户的需求、关键事实与已达成的结论，不要编造内容。\n\n"
+        if previous:
+            prompt += f"已有摘要：\n{previous}\n\n新增对话：\n"
+        prompt += "\n".join(lines)
+        response = await self.service.chat(
+            [Message(role=MessageRole.USER, content=prompt)],
+            LlmConfig(model=self.model, temperature=0.3, max_tokens=self.max_tokens, priority=LlmPriority.BATCH)
+        )
+        return response.content.strip()
+
+
+class ContextWindow:
+    """按 token 预算裁剪消息的上下文窗口（可多会话共享，在事件循环中使用）
+
+    Usage:
+        window = ContextWindow(budget_tokens=8000, count=service.count_tokens_batch)
+        messages = window.fit(messages)          # 字典消息
+        llm_messages = window.fit_messages(llm_messages)
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int,
+        count: Callable[[List[Message]], List[int]],
+        summarizer: Optional[Summarizer] = None,
+        name: str = "default"
+    ):
+        """
+        Args:
+            budget_tokens: 输入 token 预算
+            count: 逐条消息的 token 计数（一次调用计数整个请求，如 LlmService.count_tokens_batch）
+            summarizer: 摘要器，None 表示直接丢弃更早的轮次
+            name: 名称（用于埋点，一般为模型名）
+        """
+        self.budget_tokens = budget_tokens
+        self.count = count
+        self.summarizer = summarizer
+        self.name = name
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+
+    def fit_messages(self, messages: List[Message]) -> List[Message]:
+        """裁剪 Message 列表（未超出预算时原样返回）"""
+        dicts = [m.to_dict() for m in messages]
+        fitted = self._fit(dicts, self.count(list(messages)))
+        if fitted is dicts:
+            return messages
+        return [Message.from_dict(m) for m in fitted]
+
+    def fit(self, messages: Sequence[Mapping[str, Any]]) -> List[Mapping[str, Any]]:
+        """裁剪消息列表使其不超过预算
+
+        开头的 system 消息与最后一条消息总是保留；历史按完整轮次从新到旧保留。
+        未超出预算时原样返回（列表则为同一对象）。
+        """
+        return self._fit(messages, self.count([Message.from_dict(m) for m in messages]))
+
+    def _fit(self, messages: Sequence[Mapping[str, Any]], counts: List[int]) -> List[Mapping[str, Any]]:
+        """按逐条 token 数裁剪（counts 与 messages 一一对应，整个请求一次计数）"""
+        head = 0
+        while head < len(messages) - 1 and messages[head].get("role") == "system":
+            head += 1
+        system, history, current = messages[:head], messages[head:-1], messages[-1:]
+
+        costs = counts[head:len(messages) - 1]
+        fixed = sum(counts[:head]) + sum(counts[len(messages) - 1:])
+        total = fixed + sum(costs)
+        if total <= self.budget_tokens or not history:
+            return messages if isinstance(messages, list) else list(messages)
+
+        cut = self._cut(history, costs, self.budget_tokens - fixed)
+        digests = _chain_digests(history[:cut])
+        covered, summary = self._lookup(digests)
+        if summary is not None:
+            summary_message = {"role": "system", "content": SUMMARY_PREFIX + summary}
+            summary_cost = self.count([Message.from_dict(summary_message)])[0]
+            # 摘要最多占用历史预算的一半，为它让出空间时多丢弃最旧的轮次
+            if summary_cost <= (self.budget_tokens - fixed) // 2:
+                cut = max(cut, self._cut(history, costs, self.budget_tokens - fixed - summary_cost))
+                digests += _chain_digests(history[len(digests):cut], digests[-1] if digests else b"")
+            else:
+                summary = None
+        if self.summarizer is not None and cut - covered >= _SUMMARY_MIN_MESSAGES:
+            self._summarize(history, digests, covered, cut)
+
+        fitted = list(system)
+        if summary is not None:
+            fitted.append(summary_message)
+        fitted.extend(history[cut:])
+        fitted.extend(current)
+
+        after = fixed + sum(costs[cut:]) + (summary_cost if summary is not None else 0)
+        metrics.track(
+            "llm.context", "context_trimmed",
+            dimensions={"model": self.name, "summarized": summary is not None},
+            metrics={
+                "prompt_tokens_before": total,
+                "prompt_tokens_after": after,
+                "prompt_tokens_saved": total - after,
+                "dropped_messages": cut,
+                "summarized_messages": covered if summary is not None else 0,
+            }
+        )
+        return fitted
+
+    @staticmethod
+    def _cut(history: Sequence[Mapping[str, Any]], costs: List[int], budget: int) -> int:
+        """从新到旧保留历史，返回被丢弃的前缀长度（保留部分从 user 消息开始，不拆开轮次）"""
+        cut = len(costs)
+        used = 0
+        while cut > 0 and used + costs[cut - 1] <= budget:
+            cut -= 1
+            used += costs[cut]
+        while 0 < cut < len(history) and history[cut].get("role") != "user":
+            cut += 1
+        return cut
+
+    def _lookup(self, digests: List[bytes]) -> Tuple[int, Optional[str]]:
+        """查找覆盖最长前缀的已缓存摘要，返回 (覆盖的消息数, 摘要)"""
+        for index in range(len(digests) - 1, -1, -1):
+            if digests[index] in _summaries:
+                return index + 1, _summaries.get(digests[index])
+        return 0, None
+
+    def _summarize(
+        self,
+        history: Sequence[Mapping[str, Any]],
+        digests: List[bytes],
+        covered: int,
+        cut: int
+    ) -> None:
+        """后台把 history[covered:cut] 并入已有摘要，结果缓存供后续轮次使用"""
+        key = digests[cut - 1]
+        if key in self._inflight:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        previous = _summaries.get(digests[covered - 1]) if covered else None
+        pending = [dict(m) for m in history[covered:cut]]
+
+        async def run():
+            try:
+                summary = await self.summarizer(previous, pending)
+                if summary:
+                    _summaries.set(key, summary, size=len(summary.encode('utf-8')) + 64)
+                    metrics.track(
+                        "llm.context", "summary_created",
+                        dimensions={"model": self.name},
+                        metrics={"messages": len(pending), "summary_chars": len(summary)}
+                    )
+            except Exception as e:
+                logger.warn("Context summary failed", window=self.name, exc=e)
+            finally:
+                self._inflight.pop(key, None)
+
+        self._inflight[key] = loop.create_task(run())
+
+
+def _model_budgets() -> Dict[str, int]:
+    budgets = {}
+    for item in os.getenv('LLM_CONTEXT_MODEL_TOKENS', '').split(','):
+        model, _, tokens = item.strip().rpartition(':')
+        if model and tokens.isdigit():
+            budgets[model] = int(tokens)
+    return budgets
+
+
+# 按 (provider, model) 复用窗口实例
+_windows: Dict[Tuple[str, str], ContextWindow] = {}
+
+
+def get_context_window(model: str, service: LlmService) -> Optional[ContextWindow]:
+    """获取模型对应的上下文窗口，未启用（LLM_CONTEXT_ENABLED=false）时返回 None"""
+    if os.getenv('LLM_CONTEXT_ENABLED', 'true').lower() != 'true':
+        return None
+    key = (service.provider_name, model)
+    window = _windows.get(key)
+    if window is None:
+        budget = _model_budgets().get(model, int(os.getenv('LLM_CONTEXT_MAX_TOKENS', '8000')))
+        summarizer = None
+        if os.getenv('LLM_CONTEXT_SUMMARY_ENABLED', 'false').lower() == 'true':
+            summarizer = LlmSummarizer(
+                service,
+                model=os.getenv('LLM_CONTEXT_SUMMARY_MODEL', 'qwen-turbo'),
+                max_tokens=int(os.getenv('LLM_CONTEXT_SUMMARY_MAX_TOKENS', '300')),
+            )
+        window = _windows[key] = ContextWindow(
+            budget, count=service.count_tokens_batch, summarizer=summarizer, name=model
+        )
+    return window
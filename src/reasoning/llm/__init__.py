@@ -11,9 +11,18 @@ from .base import (
     MessageRole,
     LlmResponse,
     StreamChunk,
+    LlmServiceWrapper,
+    LlmPriority,
 )
 
 from .registry import LlmRegistry
+from .cache import CachedLlmService, get_llm_cache
+from .singleflight import SingleFlightLlmService
+from .limiter import LimitedLlmService, RateLimitExceeded, limiter_stats
+from .hedging import HedgedLlmService
+from .router import LlmRouter, RouteBackend
+from .fake import FakeLlmService
+from .tokenizer import Tokenizer, get_tokenizer, warm_tokenizer
 
 __all__ = [
     'LlmService',
@@ -22,5 +31,20 @@ __all__ = [
     'MessageRole',
     'LlmResponse',
     'StreamChunk',
+    'LlmServiceWrapper',
+    'LlmPriority',
     'LlmRegistry',
+    'CachedLlmService',
+    'get_llm_cache',
+    'SingleFlightLlmService',
+    'LimitedLlmService',
+    'RateLimitExceeded',
+    'limiter_stats',
+    'HedgedLlmService',
+    'LlmRouter',
+    'RouteBackend',
+    'FakeLlmService',
+    'Tokenizer',
+    'get_tokenizer',
+    'warm_tokenizer',
 ]
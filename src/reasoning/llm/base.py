@@ -7,7 +7,7 @@ LLM 服务抽象基类
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, AsyncIterator, Optional, Union
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, IntEnum
 
 
 class MessageRole(Enum):
@@ -59,6 +59,13 @@ class Message:
         )
 
 
+class LlmPriority(IntEnum):
+    """调用优先级（数值越小越优先获得并发配额）"""
+    INTERACTIVE = 0   # 实时对话轮次（ProcessStream、流式对话）
+    NORMAL = 1
+    BATCH = 2         # 非实时批处理（Process）
+
+
 @dataclass
 class LlmConfig:
     """LLM 配置"""
@@ -73,6 +80,8 @@ class LlmConfig:
     # 扩展配置
     timeout: float = 60.0
     retry_times: int = 3
+    use_cache: bool = True                # 是否允许复用缓存结果或并发的相同请求
+    priority: LlmPriority = LlmPriority.NORMAL  # 并发受限时的排队优先级
     
     def to_dict(self) -> Dict[str, Any]:
         result = {
@@ -191,14 +200,18 @@ class LlmService(ABC):
         ...
     
     def count_tokens(self, messages: List[Message]) -> int:
-        """计算 token 数量（估算）
+        """计算 token 数量
         
-        子类可覆盖此方法使用精确的 tokenizer
+        默认使用本地 Qwen 词表（见 tokenizer.Tokenizer，按消息缓存）；
+        词表不同的 Provider 可覆盖此方法
         """
-        total_chars = sum(len(m.content) for m in messages)
-        # 中文约 2 字符/token，英文约 4 字符/token
-        # 这里取一个折中值
-        return total_chars // 2
+        from .tokenizer import get_tokenizer
+        return get_tokenizer().count_messages(messages)
+    
+    def count_tokens_batch(self, messages: List[Message]) -> List[int]:
+        """逐条消息的 token 数（一次调用计数整段历史，与 count_tokens 使用同一词表）"""
+        from .tokenizer import get_tokenizer
+        return get_tokenizer().count_batch(messages)
     
     def _messages_to_dicts(self, messages: List[Message]) -> List[Dict]:
         """将 Message 列表转换为字典列表"""
@@ -207,3 +220,46 @@ class LlmService(ABC):
     def _ensure_config(self, config: Optional[LlmConfig]) -> LlmConfig:
         """确保配置存在"""
         return config or LlmConfig()
+
+
+class LlmServiceWrapper(LlmService):
+    """LLM 服务包装基类
+    
+    缓存、合并请求等横切能力通过包装实现，默认全部委托给被包装的服务。
+    由 LlmRegistry.add_wrapper 统一挂载到注册表创建的服务上。
+    """
+    
+    def __init__(self, inner: LlmService):
+        self.inner = inner
+    
+    @property
+    def provider_name(self) -> str:
+        return self.inner.provider_name
+    
+    async def chat(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> LlmResponse:
+        return await self.inner.chat(messages, config)
+    
+    async def chat_stream(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> AsyncIterator[StreamChunk]:
+        async for chunk in self.inner.chat_stream(messages, config):
+            yield chunk
+    
+    def count_tokens(self, messages: List[Message]) -> int:
+        return self.inner.count_tokens(messages)
+    
+    def count_tokens_batch(self, messages: List[Message]) -> List[int]:
+        return self.inner.count_tokens_batch(messages)
+    
+    def unwrap(self) -> LlmService:
+        """获取最内层的 Provider 实例"""
+        service = self.inner
+        while isinstance(service, LlmServiceWrapper):
+            service = service.inner
+        return service
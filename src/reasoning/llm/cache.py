@@ -0,0 +1,172 @@
+"""
+LLM 响应缓存
+
+以「消息 + 影响输出的配置」的规范化哈希为键，缓存完整响应；
+命中时 chat 直接返回，chat_stream 以流式片段回放。
+"""
+
+import os
+import json
+import hashlib
+import dataclasses
+from typing import List, Optional, AsyncIterator
+
+from .base import (
+    LlmService, LlmServiceWrapper, LlmConfig, Message,
+    LlmResponse, StreamChunk
+)
+from ...infra import get_logger, get_metrics, LruCache
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+# 可缓存的结束原因（被截断/过滤等异常结果不缓存）
+CACHEABLE_FINISH_REASONS = {"stop", "length", "tool_calls"}
+
+
+def request_key(provider: str, messages: List[Message], config: LlmConfig) -> str:
+    """计算请求的规范化哈希
+
+    只包含会影响输出的字段；timeout、retry_times 等调用控制参数不参与计算。
+
+    Args:
+        provider: Provider 名称
+        messages: 消息列表
+        config: LLM 配置
+
+    Returns:
+        sha256 十六进制摘要
+    """
+    canonical = {
+        'provider': provider,
+        'messages': [m.to_dict() for m in messages],
+        'model': config.model,
+        'temperature': config.temperature,
+        'top_p': config.top_p,
+        'max_tokens': config.max_tokens,
+        'stop': config.stop,
+        'tools': config.tools,
+        'tool_choice': config.tool_choice,
+    }
+    raw = json.dumps(canonical, ensure_ascii=False, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def _response_size(key: str, response: LlmResponse) -> int:
+    """估算条目占用字节数"""
+    size = len(key) + len(response.content.encode('utf-8')) + 128
+    if response.tool_calls:
+        size += len(json.dumps(response.tool_calls, ensure_ascii=False, default=str).encode('utf-8'))
+    return size
+
+
+# 全局缓存（所有 Provider 共享同一字节预算）
+_cache: Optional[LruCache] = None
+
+
+def get_llm_cache() -> LruCache:
+    """获取全局 LLM 响应缓存"""
+    global _cache
+    if _cache is None:
+        _cache = LruCache(
+            max_bytes=int(os.getenv('LLM_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+            ttl=float(os.getenv('LLM_CACHE_TTL', '3600')),
+        )
+    return _cache
+
+
+class CachedLlmService(LlmServiceWrapper):
+    """带响应缓存的 LLM 服务
+
+    - 键：request_key(provider, messages, config)
+    - 单次请求可通过 LlmConfig(use_cache=False) 跳过缓存
+    - 流式请求完整结束后同样写入缓存；含工具调用增量的流不缓存
+
+    Usage:
+        service = CachedLlmService(QwenLlmService())
+        response = await service.chat(messages, LlmConfig(model="qwen-turbo"))
+    """
+
+    def __init__(self, inner: LlmService, cache: Optional[LruCache] = None):
+        super().__init__(inner)
+        self.cache = cache if cache is not None else get_llm_cache()
+
+    async def chat(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> LlmResponse:
+        config = self._ensure_config(config)
+        if not config.use_cache:
+            return await self.inner.chat(messages, config)
+
+        key = request_key(self.provider_name, messages, config)
+        cached = self.cache.get(key)
+        self._track(cached is not None, config, streaming=False)
+        if cached is not None:
+            return dataclasses.replace(cached)
+
+        response = await self.inner.chat(messages, config)
+        self._store(key, response)
+        return response
+
+    async def chat_stream(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> AsyncIterator[StreamChunk]:
+        config = self._ensure_config(config)
+        if not config.use_cache:
+            async for chunk in self.inner.chat_stream(messages, config):
+                yield chunk
+            return
+
+        key = request_key(self.provider_name, messages, config)
+        cached = self.cache.get(key)
+        self._track(cached is not None, config, streaming=True)
+        if cached is not None:
+            # 回放：一次性下发完整内容与结束原因
+            yield StreamChunk(
+                delta=cached.content,
+                finish_reason=cached.finish_reason,
+                tool_calls=cached.tool_calls
+            )
+            return
+
+        content_parts = []
+        finish_reason = None
+        has_tool_calls = False
+        async for chunk in self.inner.chat_stream(messages, config):
+            content_parts.append(chunk.delta)
+            if chunk.finish_reason and chunk.finish_reason != 'null':
+                finish_reason = chunk.finish_reason
+            if chunk.tool_calls:
+                has_tool_calls = True
+            yield chunk
+
+        if not has_tool_calls:
+            self._store(key, LlmResponse(
+                content=''.join(content_parts),
+                finish_reason=finish_reason,
+                model=config.model
+            ))
+
+    def _store(self, key: str, response: LlmResponse) -> None:
+        if response.finish_reason not in CACHEABLE_FINISH_REASONS:
+            return
+        self.cache.set(key, response, size=_response_size(key, response))
+
+    def _track(self, hit: bool, config: LlmConfig, streaming: bool) -> None:
+        metrics.track(
+            "llm.cache", "cache_hit" if hit else "cache_miss",
+            dimensions={
+                "provider": self.provider_name,
+                "model": config.model,
+                "streaming": "true" if streaming else "false",
+            },
+            metrics={
+                "entries": len(self.cache),
+                "bytes": self.cache.size_bytes,
+            }
+        )
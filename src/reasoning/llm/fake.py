@@ -0,0 +1,132 @@
+"""
+本地 Fake LLM 服务
+
+不访问网络，按可配置的时间分布输出确定性的 token 流，
+用于离线压测与 CI 中跑通完整的 gRPC/HTTP 链路。
+"""
+
+import os
+import random
+import asyncio
+import hashlib
+from typing import List, Optional, AsyncIterator
+
+from .base import (
+    LlmService, LlmConfig, Message, MessageRole,
+    LlmResponse, StreamChunk, TokenUsage
+)
+from ...infra import get_logger, get_metrics, LatencyDistribution
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+# 输出词表：中英文混合，保证 token 长度有变化
+_VOCAB = (
+    "好的", "我", "理解", "你的", "问题", "这里", "是", "一个", "简短", "的", "回答", "。",
+    "The", " quick", " answer", " is", " here", ",", " with", " some", " details", ".",
+)
+
+
+class FakeLlmError(Exception):
+    """注入的上游错误（可重试）"""
+    status_code = 503
+    code = "FakeServiceUnavailable"
+    retryable = True
+
+
+class FakeLlmService(LlmService):
+    """Fake LLM 服务
+
+    时间与错误由以下配置控制（构造参数优先，其次环境变量）：
+    - ttft: 首 token 延迟分布（FAKE_LLM_TTFT_MS / _JITTER / _DIST / _TAIL_PROB / _TAIL_MS）
+    - token_gap: token 间隔分布（FAKE_LLM_TOKEN_GAP_MS / _JITTER / _DIST）
+    - tokens: 每次回答的 token 数（FAKE_LLM_TOKENS）
+    - error_rate: 首 token 前失败的概率（FAKE_LLM_ERROR_RATE）
+    - seed: 随机种子（FAKE_LLM_SEED）；相同的种子与输入得到相同的输出和时间序列
+
+    Usage:
+        LlmRegistry.get_service("fake")
+        FakeLlmService(ttft=LatencyDistribution(200, 0.3), tokens=50)
+    """
+
+    def __init__(
+        self,
+        ttft: Optional[LatencyDistribution] = None,
+        token_gap: Optional[LatencyDistribution] = None,
+        tokens: Optional[int] = None,
+        error_rate: Optional[float] = None,
+        seed: Optional[int] = None
+    ):
+        self.ttft = ttft or LatencyDistribution.from_env('FAKE_LLM_TTFT', 200, 0.2)
+        self.token_gap = token_gap or LatencyDistribution.from_env('FAKE_LLM_TOKEN_GAP', 20, 0.2)
+        self.tokens = tokens if tokens is not None else int(os.getenv('FAKE_LLM_TOKENS', '30'))
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv('FAKE_LLM_ERROR_RATE', '0'))
+        self.seed = seed if seed is not None else int(os.getenv('FAKE_LLM_SEED', '0'))
+        self._calls = 0
+
+    @property
+    def provider_name(self) -> str:
+        return "fake"
+
+    def _rng(self, messages: List[Message], config: LlmConfig) -> random.Random:
+        """按种子 + 输入 + 调用序号构造随机源"""
+        self._calls += 1
+        digest = hashlib.sha256(
+            f"{self.seed}|{config.model}|{self._calls}|".encode('utf-8')
+            + "\x00".join(m.content for m in messages).encode('utf-8')
+        ).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+
+    def _reply_tokens(self, messages: List[Message], config: LlmConfig) -> List[str]:
+        """确定性的回答内容（只由输入决定，与调用序号无关）"""
+        last_user = next((m.content for m in reversed(messages) if m.role == MessageRole.USER), "")
+        digest = hashlib.sha256(f"{self.seed}|{config.model}|{last_user}".encode('utf-8')).digest()
+        rng = random.Random(int.from_bytes(digest[:8], 'big'))
+        count = max(1, min(self.tokens, config.max_tokens))
+        return [rng.choice(_VOCAB) for _ in range(count)]
+
+    async def chat(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> LlmResponse:
+        config = self._ensure_config(config)
+        rng = self._rng(messages, config)
+        tokens = self._reply_tokens(messages, config)
+
+        await asyncio.sleep(self.ttft.sample(rng))
+        if rng.random() < self.error_rate:
+            raise FakeLlmError("Injected fake LLM error")
+        await asyncio.sleep(sum(self.token_gap.sample(rng) for _ in tokens[1:]))
+
+        prompt_tokens = self.count_tokens(messages)
+        return LlmResponse(
+            content="".join(tokens),
+            finish_reason="stop",
+            usage=TokenUsage(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=len(tokens),
+                total_tokens=prompt_tokens + len(tokens)
+            ),
+            model=config.model
+        )
+
+    async def chat_stream(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> AsyncIterator[StreamChunk]:
+        config = self._ensure_config(config)
+        rng = self._rng(messages, config)
+        tokens = self._reply_tokens(messages, config)
+
+        await asyncio.sleep(self.ttft.sample(rng))
+        if rng.random() < self.error_rate:
+            raise FakeLlmError("Injected fake LLM error")
+
+        last = len(tokens) - 1
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(self.token_gap.sample(rng))
+            yield StreamChunk(delta=token, finish_reason="stop" if i == last else None)
@@ -0,0 +1,378 @@
+"""
+LLM 对冲请求与重试
+
+- 对冲：首 token 时间（流式）/ 响应时间（非流式）超过该模型近期 p95 仍未返回时，
+  发出一个备份请求，采用先产出结果的一路，取消另一路
+- 重试：仅对可重试的临时错误（限流/服务端 5xx/连接错误/超时）按抖动指数退避重试；
+  流式调用一旦已向调用方输出内容便不再重试
+- 非流式调用与流式的首个片段（含排队与重试）受 LlmConfig.timeout 约束；
+  之后相邻片段的间隔不超过 idle_timeout，长回答不会因总时长超时而中断
+"""
+
+import os
+import time
+import random
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, AsyncIterator, Set, Tuple
+
+from .base import (
+    LlmService, LlmServiceWrapper, LlmConfig, Message,
+    LlmResponse, StreamChunk
+)
+from ...infra import get_logger, get_metrics, EventStatus
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """是否为可安全重试的临时错误
+
+    LLM 生成请求没有副作用，只要上游没有产出内容即可视为幂等。
+    本地限流（RateLimitExceeded）不重试，避免放大排队。
+    """
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    retryable = getattr(error, 'retryable', None)
+    if retryable is not None:
+        return bool(retryable)
+    try:
+        import aiohttp
+        return isinstance(error, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+    except ImportError:
+        return False
+
+
+class LatencyTracker:
+    """按键统计最近窗口内的延迟分位数"""
+
+    def __init__(self, window: int = 200, quantile: float = 0.95, min_samples: int = 20):
+        self.window = window
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._cached: Dict[str, Tuple[int, float]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def observe(self, key: str, seconds: float) -> None:
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def value(self, key: str) -> Optional[float]:
+        """当前分位数；样本不足时返回 None"""
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        count = self._counts[key]
+        cached = self._cached.get(key)
+        # 每 10 个新样本重新排序一次
+        if cached is None or count - cached[0] >= 10:
+            ordered = sorted(samples)
+            value = ordered[min(len(ordered) - 1, int(len(ordered) * self.quantile))]
+            self._cached[key] = (count, value)
+            return value
+        return cached[1]
+
+
+class _Attempt:
+    """一路流式请求：首个片段由独立任务拉取，便于与其他路竞争"""
+
+    def __init__(self, stream: AsyncIterator[StreamChunk], hedge: bool):
+        self.stream = stream
+        self.hedge = hedge
+        self.started_at = time.monotonic()
+        self.first: asyncio.Task = asyncio.ensure_future(stream.__anext__())
+
+    async def discard(self) -> None:
+        """取消并关闭该路请求"""
+        if not self.first.done():
+            self.first.cancel()
+        try:
+            await self.first
+        except BaseException:
+            pass
+        try:
+            await self.stream.aclose()
+        except Exception:
+            pass
+
+
+class HedgedLlmService(LlmServiceWrapper):
+    """带对冲与重试的 LLM 服务
+
+    Usage:
+        service = HedgedLlmService(QwenLlmService())
+        async for chunk in service.chat_stream(messages, LlmConfig(timeout=30, retry_times=2)):
+            ...
+    """
+
+    # 路由时按后端挂载，而不是包在路由外层
+    per_backend = True
+
+    def __init__(
+        self,
+        inner: LlmService,
+        hedge_enabled: Optional[bool] = None,
+        min_hedge_delay: Optional[float] = None,
+        max_hedge_ratio: Optional[float] = None,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 2.0,
+        idle_timeout: Optional[float] = None,
+        tracker: Optional[LatencyTracker] = None
+    ):
+        """
+        Args:
+            inner: 被包装的服务
+            hedge_enabled: 是否发送对冲请求（默认 LLM_HEDGE_ENABLED）
+            min_hedge_delay: 对冲等待下限（秒，默认 LLM_HEDGE_MIN_DELAY_MS）
+            max_hedge_ratio: 对冲请求占总请求的最大比例（默认 LLM_HEDGE_MAX_RATIO）
+            backoff_base: 重试退避基数（秒）
+            backoff_cap: 重试退避上限（秒）
+            idle_timeout: 流式输出中相邻片段的最大间隔（秒，默认 LLM_STREAM_IDLE_TIMEOUT）
+            tracker: 延迟统计
+        """
+        super().__init__(inner)
+        if hedge_enabled is None:
+            hedge_enabled = os.getenv('LLM_HEDGE_ENABLED', 'true').lower() == 'true'
+        self.hedge_enabled = hedge_enabled
+        self.min_hedge_delay = min_hedge_delay if min_hedge_delay is not None else \
+            float(os.getenv('LLM_HEDGE_MIN_DELAY_MS', '50')) / 1000
+        self.max_hedge_ratio = max_hedge_ratio if max_hedge_ratio is not None else \
+            float(os.getenv('LLM_HEDGE_MAX_RATIO', '0.1'))
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.idle_timeout = idle_timeout if idle_timeout is not None else \
+            float(os.getenv('LLM_STREAM_IDLE_TIMEOUT', '30'))
+        self.tracker = tracker or LatencyTracker()
+
+        self._requests = 0
+        self._hedges = 0
+        self._discards: Set[asyncio.Task] = set()
+
+    # ---------- 对冲预算 ----------
+
+    def _hedge_delay(self, key: str) -> Optional[float]:
+        """本次请求的对冲等待时间；不对冲时返回 None"""
+        if not self.hedge_enabled:
+            return None
+        p95 = self.tracker.value(key)
+        if p95 is None:
+            return None
+        # 对冲请求数不超过总请求数的 max_hedge_ratio
+        if self._hedges + 1 > self.max_hedge_ratio * self._requests:
+            return None
+        return max(self.min_hedge_delay, p95)
+
+    def _count_request(self) -> None:
+        self._requests += 1
+        if self._requests >= 10000:
+            self._requests //= 2
+            self._hedges //= 2
+
+    def _backoff(self, attempt: int) -> float:
+        """全抖动指数退避"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    async def _retry(
+        self,
+        config: LlmConfig,
+        deadline: float,
+        attempt_fn: Callable[[float], Awaitable[Any]]
+    ) -> Any:
+        """按重试策略执行 attempt_fn(remaining_seconds)"""
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"LLM call exceeded timeout of {config.timeout}s")
+            try:
+                return await attempt_fn(remaining)
+            except Exception as e:
+                delay = self._backoff(attempt)
+                if (
+                    attempt >= config.retry_times
+                    or not is_retryable_error(e)
+                    or time.monotonic() + delay >= deadline
+                ):
+                    raise
+                attempt += 1
+                metrics.track(
+                    "llm.retry", "retry_attempt",
+                    status=EventStatus.ERROR,
+                    dimensions={
+                        "provider": self.provider_name, "model": config.model,
+                        "error_code": str(getattr(e, 'code', type(e).__name__)),
+                    },
+                    metrics={"attempt": attempt, "backoff_ms": int(delay * 1000)}
+                )
+                logger.warn(
+                    "LLM call failed, retrying",
+                    model=config.model, attempt=attempt, error=str(e)
+                )
+                await asyncio.sleep(delay)
+
+    def _track_hedge(self, event: str, config: LlmConfig, streaming: bool, **values) -> None:
+        metrics.track(
+            "llm.hedge", event,
+            dimensions={
+                "provider": self.provider_name, "model": config.model,
+                "streaming": "true" if streaming else "false",
+            },
+            metrics=values
+        )
+
+    # ---------- 非流式 ----------
+
+    async def chat(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> LlmResponse:
+        config = self._ensure_config(config)
+        deadline = time.monotonic() + config.timeout
+        self._count_request()
+        return await self._retry(
+            config, deadline,
+            lambda remaining: self._hedged_chat(messages, config, remaining)
+        )
+
+    async def _hedged_chat(self, messages: List[Message], config: LlmConfig, remaining: float) -> LlmResponse:
+        key = f"chat:{config.model}"
+        start = time.monotonic()
+        tasks = [asyncio.ensure_future(self.inner.chat(messages, config))]
+        hedge_delay = self._hedge_delay(key)
+        errors: List[BaseException] = []
+
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=min(hedge_delay, remaining) if hedge_delay else remaining)
+            if not done and hedge_delay and time.monotonic() - start < remaining:
+                self._hedges += 1
+                tasks.append(asyncio.ensure_future(self.inner.chat(messages, config)))
+                self._track_hedge("hedge_sent", config, streaming=False, delay_ms=int(hedge_delay * 1000))
+
+            pending = set(tasks)
+            while pending:
+                timeout = remaining - (time.monotonic() - start)
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.tracker.observe(key, time.monotonic() - start)
+                        if task is not tasks[0]:
+                            self._track_hedge("hedge_won", config, streaming=False)
+                        return task.result()
+                    errors.append(task.exception())
+                if not done:
+                    break
+
+            if errors:
+                raise errors[0]
+            raise asyncio.TimeoutError(f"LLM call exceeded timeout of {config.timeout}s")
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    # ---------- 流式 ----------
+
+    async def chat_stream(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> AsyncIterator[StreamChunk]:
+        config = self._ensure_config(config)
+        deadline = time.monotonic() + config.timeout
+        self._count_request()
+
+        # 首个片段到达前的失败可以重试；之后的错误直接抛给调用方
+        attempt, first = await self._retry(
+            config, deadline,
+            lambda remaining: self._hedged_first_chunk(messages, config, remaining)
+        )
+
+        stream = attempt.stream
+        try:
+            yield first
+            while True:
+                try:
+                    async with asyncio.timeout(self.idle_timeout):
+                        chunk = await stream.__anext__()
+                except StopAsyncIteration:
+                    break
+                except TimeoutError:
+                    raise asyncio.TimeoutError(
+                        f"LLM stream produced no output for {self.idle_timeout}s"
+                    ) from None
+                yield chunk
+        finally:
+            try:
+                await stream.aclose()
+            except Exception:
+                pass
+
+    async def _hedged_first_chunk(
+        self,
+        messages: List[Message],
+        config: LlmConfig,
+        remaining: float
+    ) -> Tuple[_Attempt, StreamChunk]:
+        """发起（可能对冲的）流式请求，返回先产出首个片段的一路"""
+        key = f"stream:{config.model}"
+        start = time.monotonic()
+        attempts = [_Attempt(self.inner.chat_stream(messages, config), hedge=False)]
+        hedge_delay = self._hedge_delay(key)
+        winner: Optional[_Attempt] = None
+        errors: List[BaseException] = []
+
+        try:
+            first_wait = min(hedge_delay, remaining) if hedge_delay else remaining
+            await asyncio.wait([attempts[0].first], timeout=first_wait)
+            if not attempts[0].first.done() and hedge_delay and time.monotonic() - start < remaining:
+                self._hedges += 1
+                attempts.append(_Attempt(self.inner.chat_stream(messages, config), hedge=True))
+                self._track_hedge("hedge_sent", config, streaming=True, delay_ms=int(hedge_delay * 1000))
+
+            pending = {a.first: a for a in attempts}
+            while pending:
+                timeout = remaining - (time.monotonic() - start)
+                if timeout <= 0:
+                    break
+                done, _ = await asyncio.wait(list(pending), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    attempt = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        winner = attempt
+                        break
+                    if isinstance(error, StopAsyncIteration):
+                        # 上游无任何输出即结束
+                        error = RuntimeError("LLM stream ended without output")
+                    errors.append(error)
+                if winner is not None:
+                    break
+
+            if winner is None:
+                if errors:
+                    raise errors[0]
+                raise asyncio.TimeoutError(f"LLM stream produced no output within {config.timeout}s")
+
+            ttft = time.monotonic() - winner.started_at
+            self.tracker.observe(key, ttft)
+            if winner.hedge:
+                self._track_hedge("hedge_won", config, streaming=True, ttft_ms=int(ttft * 1000))
+            return winner, winner.first.result()
+
+        finally:
+            for attempt in attempts:
+                if attempt is not winner:
+                    # 后台关闭落败的一路，不阻塞胜出流
+                    task = asyncio.ensure_future(attempt.discard())
+                    self._discards.add(task)
+                    task.add_done_callback(self._discards.discard)
@@ -0,0 +1,336 @@
+"""
+LLM 自适应并发限制
+
+按 (provider, model) 维护 AIMD 并发上限：
+- 调用成功且并发接近上限时，上限加性增长（每个「窗口」约 +1）
+- 上游过载（429/503/超时）时，上限乘性下降
+超出上限的调用进入按优先级排序的等待队列，等待超过上限时间即拒绝（限流）。
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Dict, List, Optional, AsyncIterator, Tuple
+
+from .base import (
+    LlmService, LlmServiceWrapper, LlmConfig, LlmPriority, Message,
+    LlmResponse, StreamChunk
+)
+from ...infra import get_logger, get_metrics, EventStatus
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+# 视为上游过载的 HTTP 状态码
+OVERLOAD_STATUS = {429, 503}
+
+
+class RateLimitExceeded(Exception):
+    """并发配额等待超时或等待队列已满"""
+
+    def __init__(self, provider: str, model: str, reason: str, waited_ms: int = 0):
+        self.provider = provider
+        self.model = model
+        self.reason = reason
+        self.waited_ms = waited_ms
+        super().__init__(f"LLM rate limit exceeded: {provider}/{model} ({reason})")
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """是否为上游过载信号"""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    return getattr(error, 'status_code', None) in OVERLOAD_STATUS
+
+
+class AdaptiveLimiter:
+    """AIMD 自适应并发限制器 + 优先级等待队列
+
+    Usage:
+        limiter = AdaptiveLimiter("qwen", "qwen-turbo")
+        await limiter.acquire(LlmPriority.INTERACTIVE, max_wait=5.0)
+        try:
+            ...
+        finally:
+            limiter.release(overloaded=False)
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        initial_limit: float = 32,
+        min_limit: float = 2,
+        max_limit: float = 256,
+        backoff: float = 0.7,
+        max_queue: int = 1000,
+        decrease_cooldown: float = 1.0
+    ):
+        """
+        Args:
+            provider: Provider 名称
+            model: 模型名称
+            initial_limit: 初始并发上限
+            min_limit: 并发上限下界
+            max_limit: 并发上限上界
+            backoff: 过载时的乘性下降系数
+            max_queue: 等待队列最大长度
+            decrease_cooldown: 两次下降的最小间隔（秒），避免一次突发被重复惩罚
+        """
+        self.provider = provider
+        self.model = model
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.max_queue = max_queue
+        self.decrease_cooldown = decrease_cooldown
+
+        self._limit = float(initial_limit)
+        self._inflight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._waiting = 0
+        self._seq = itertools.count()
+        self._last_decrease = 0.0
+
+        # 统计
+        self._admitted = 0
+        self._rejected = 0
+        self._overloads = 0
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._limit))
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    async def acquire(self, priority: int = LlmPriority.NORMAL, max_wait: Optional[float] = None) -> None:
+        """获取一个并发配额
+
+        Args:
+            priority: 优先级（LlmPriority）
+            max_wait: 最长排队时间（秒），None 表示不限
+
+        Raises:
+            RateLimitExceeded: 排队超时或队列已满
+        """
+        if self._inflight < self.limit and self._waiting == 0:
+            self._inflight += 1
+            self._admitted += 1
+            return
+
+        if self._waiting >= self.max_queue:
+            self._reject("queue_full", 0, priority)
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), waiter))
+        self._waiting += 1
+        start = time.monotonic()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), max_wait)
+        except asyncio.TimeoutError:
+            if not (waiter.done() and not waiter.cancelled()):
+                self._abandon(waiter)
+                self._reject("wait_timeout", int((time.monotonic() - start) * 1000), priority)
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 已分得配额但调用方被取消：归还配额，没有上游调用结果，不调整上限
+                self.release(completed=False)
+            else:
+                self._abandon(waiter)
+            raise
+
+        waited_ms = int((time.monotonic() - start) * 1000)
+        self._admitted += 1
+        metrics.track(
+            "llm.limiter", "limiter_admitted",
+            dimensions={"provider": self.provider, "model": self.model, "priority": LlmPriority(priority).name},
+            metrics={
+                "wait_ms": waited_ms,
+                "queue_depth": self._waiting,
+                "limit": self.limit,
+                "inflight": self._inflight,
+            }
+        )
+
+    def release(self, overloaded: bool = False, completed: bool = True) -> None:
+        """归还配额，并根据调用结果调整并发上限
+
+        Args:
+            overloaded: 本次调用是否收到上游过载信号
+            completed: 上游调用是否有结果；被取消（未开始或中途放弃）时只归还配额，不调整上限
+        """
+        saturated = self._inflight >= self.limit * 0.8
+        self._inflight -= 1
+
+        if not completed:
+            self._dispatch()
+            return
+
+        if overloaded:
+            self._overloads += 1
+            now = time.monotonic()
+            if now - self._last_decrease >= self.decrease_cooldown:
+                old_limit = self.limit
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                self._last_decrease = now
+                metrics.track(
+                    "llm.limiter", "limit_decreased",
+                    dimensions={"provider": self.provider, "model": self.model},
+                    metrics={"old_limit": old_limit, "limit": self.limit, "inflight": self._inflight}
+                )
+                logger.warn(
+                    "LLM concurrency limit decreased",
+                    provider=self.provider, model=self.model,
+                    old_limit=old_limit, limit=self.limit
+                )
+        elif saturated:
+            # 仅在接近上限时增长，空闲时上限不会无限膨胀
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """按优先级唤醒等待者"""
+        while self._waiters and self._inflight < self.limit:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue
+            self._waiting -= 1
+            self._inflight += 1
+            waiter.set_result(None)
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """放弃排队（堆中的条目惰性删除）"""
+        if not waiter.done():
+            waiter.cancel()
+            self._waiting -= 1
+
+    def _reject(self, reason: str, waited_ms: int, priority: int) -> None:
+        self._rejected += 1
+        metrics.track(
+            "llm.limiter", "limiter_rejected",
+            status=EventStatus.ERROR,
+            dimensions={
+                "provider": self.provider, "model": self.model,
+                "priority": LlmPriority(priority).name, "reason": reason,
+            },
+            metrics={
+                "wait_ms": waited_ms,
+                "queue_depth": self._waiting,
+                "limit": self.limit,
+                "inflight": self._inflight,
+            }
+        )
+        raise RateLimitExceeded(self.provider, self.model, reason, waited_ms)
+
+    def stats(self) -> Dict[str, float]:
+        """限制器统计"""
+        return {
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "queue_depth": self._waiting,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "overloads": self._overloads,
+        }
+
+
+# 全局限制器表：(provider, model) -> AdaptiveLimiter
+_limiters: Dict[Tuple[str, str], AdaptiveLimiter] = {}
+
+
+def get_limiter(provider: str, model: str) -> AdaptiveLimiter:
+    """获取 (provider, model) 对应的限制器"""
+    key = (provider, model)
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = AdaptiveLimiter(
+            provider, model,
+            initial_limit=float(os.getenv('LLM_LIMITER_INITIAL', '32')),
+            min_limit=float(os.getenv('LLM_LIMITER_MIN', '2')),
+            max_limit=float(os.getenv('LLM_LIMITER_MAX', '256')),
+            max_queue=int(os.getenv('LLM_LIMITER_MAX_QUEUE', '1000')),
+        )
+        _limiters[key] = limiter
+    return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, float]]:
+    """所有限制器的统计"""
+    return {f"{p}/{m}": limiter.stats() for (p, m), limiter in _limiters.items()}
+
+
+class LimitedLlmService(LlmServiceWrapper):
+    """带自适应并发限制的 LLM 服务
+
+    排队时间上限取 LLM_LIMITER_MAX_WAIT 与 LlmConfig.timeout 的较小值；
+    流式调用在整个流结束前持有配额。
+    """
+
+    # 路由时按后端挂载，而不是包在路由外层
+    per_backend = True
+
+    def __init__(self, inner: LlmService, max_wait: Optional[float] = None):
+        super().__init__(inner)
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv('LLM_LIMITER_MAX_WAIT', '10'))
+
+    def _max_wait(self, config: LlmConfig) -> float:
+        return min(self.max_wait, config.timeout) if config.timeout else self.max_wait
+
+    async def chat(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> LlmResponse:
+        config = self._ensure_config(config)
+        limiter = get_limiter(self.provider_name, config.model)
+        await limiter.acquire(config.priority, self._max_wait(config))
+
+        overloaded = False
+        completed = True
+        try:
+            return await self.inner.chat(messages, config)
+        except Exception as e:
+            overloaded = is_overload_error(e)
+            raise
+        except BaseException:
+            # 被取消：没有上游调用结果
+            completed = False
+            raise
+        finally:
+            limiter.release(overloaded, completed)
+
+    async def chat_stream(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> AsyncIterator[StreamChunk]:
+        config = self._ensure_config(config)
+        limiter = get_limiter(self.provider_name, config.model)
+        await limiter.acquire(config.priority, self._max_wait(config))
+
+        overloaded = False
+        completed = True
+        try:
+            async for chunk in self.inner.chat_stream(messages, config):
+                yield chunk
+        except Exception as e:
+            overloaded = is_overload_error(e)
+            raise
+        except BaseException:
+            # 被取消或提前 aclose：流未完成
+            completed = False
+            raise
+        finally:
+            limiter.release(overloaded, completed)
@@ -1,11 +1,10 @@
 """
 阿里云 Qwen (通义千问) LLM 服务实现
 
-基于 DashScope API
+基于 DashScope HTTP API，通过共享连接池异步调用
 """
 
 import os
-import json
 import time
 from typing import List, Dict, Any, AsyncIterator, Optional
 
@@ -13,6 +12,7 @@ from .base import (
     LlmService, LlmConfig, Message, MessageRole,
     LlmResponse, StreamChunk, TokenUsage
 )
+from .transport import get_dashscope_transport
 from ...infra import get_logger, get_metrics, EventStatus
 
 logger = get_logger(__name__)
@@ -22,30 +22,51 @@ metrics = get_metrics()
 class QwenLlmService(LlmService):
     """阿里云 Qwen 大模型服务
     
-    支持 DashScope API，包括流式和非流式调用
+    支持 DashScope API，包括流式和非流式调用。
+    所有请求都走 DashScopeTransport 的异步连接池，不阻塞事件循环。
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
         """初始化
         
         Args:
             api_key: DashScope API Key，默认从环境变量 DASHSCOPE_API_KEY 获取
+            base_url: DashScope 接入点，默认使用传输层配置（DASHSCOPE_HTTP_BASE_URL）
         """
         self.api_key = api_key or os.getenv('DASHSCOPE_API_KEY')
         if not self.api_key:
             logger.warn("DASHSCOPE_API_KEY not set, Qwen service may not work")
         
-        self._init_dashscope()
+        self.base_url = base_url
+        self._transport = get_dashscope_transport()
     
-    def _init_dashscope(self):
-        """初始化 DashScope SDK"""
-        try:
-            import dashscope
-            dashscope.api_key = self.api_key
-            self._dashscope = dashscope
-        except ImportError:
-            logger.error("dashscope package not installed, run: pip install dashscope")
-            self._dashscope = None
+    def _build_payload(
+        self,
+        messages: List[Message],
+        config: LlmConfig,
+        stream: bool
+    ) -> Dict[str, Any]:
+        """构建 DashScope 请求体"""
+        parameters = {
+            'temperature': config.temperature,
+            'top_p': config.top_p,
+            'max_tokens': config.max_tokens,
+            'result_format': 'message',
+        }
+        if stream:
+            parameters['incremental_output'] = True  # 增量输出
+        if config.stop:
+            parameters['stop'] = config.stop
+        if config.tools:
+            parameters['tools'] = config.tools
+        if config.tool_choice:
+            parameters['tool_choice'] = config.tool_choice
+        
+        return {
+            'model': config.model,
+            'input': {'messages': self._messages_to_dicts(messages)},
+            'parameters': parameters,
+        }
     
     @property
     def provider_name(self) -> str:
@@ -68,55 +89,32 @@ class QwenLlmService(LlmService):
         start_time = time.time()
         
         try:
-            from dashscope import Generation
-            
-            # 构建请求参数
-            request_params = {
-                'model': config.model,
-                'messages': self._messages_to_dicts(messages),
-                'temperature': config.temperature,
-                'top_p': config.top_p,
-                'max_tokens': config.max_tokens,
-                'result_format': 'message'
-            }
-            
-            if config.stop:
-                request_params['stop'] = config.stop
-            if config.tools:
-                request_params['tools'] = config.tools
-            if config.tool_choice:
-                request_params['tool_choice'] = config.tool_choice
-            
             # 调用 API
-            response = Generation.call(**request_params)
+            response = await self._transport.generate(
+                self._build_payload(messages, config, stream=False),
+                api_key=self.api_key,
+                timeout=config.timeout,
+                base_url=self.base_url
+            )
             
             duration_ms = int((time.time() - start_time) * 1000)
             
-            # 检查响应
-            if response.status_code != 200:
-                error_msg = f"Qwen API error: {response.code} - {response.message}"
-                logger.error(error_msg, status_code=response.status_code)
-                metrics.track(
-                    "llm.call", "llm_call_error",
-                    status=EventStatus.ERROR,
-                    dimensions={"model": config.model, "error_code": str(response.code)},
-                    duration_ms=duration_ms
-                )
-                raise Exception(error_msg)
-            
             # 解析响应
-            choice = response.output.choices[0]
-            message = choice.message
+            choice = response['output']['choices'][0]
+            message = choice.get('message', {})
+            usage = response.get('usage', {})
+            input_tokens = usage.get('input_tokens', 0)
+            output_tokens = usage.get('output_tokens', 0)
             
             # 构建返回
             result = LlmResponse(
                 content=message.get('content', '') or '',
-                finish_reason=choice.finish_reason,
+                finish_reason=choice.get('finish_reason'),
                 tool_calls=message.get('tool_calls'),
                 usage=TokenUsage(
-                    prompt_tokens=response.usage.input_tokens,
-                    completion_tokens=response.usage.output_tokens,
-                    total_tokens=response.usage.input_tokens + response.usage.output_tokens
+                    prompt_tokens=input_tokens,
+                    completion_tokens=output_tokens,
+                    total_tokens=input_tokens + output_tokens
                 ),
                 model=config.model
             )
@@ -147,7 +145,7 @@ class QwenLlmService(LlmService):
             metrics.track(
                 "llm.call", "llm_call_error",
                 status=EventStatus.ERROR,
-                dimensions={"model": config.model, "error_code": type(e).__name__},
+                dimensions={"model": config.model, "error_code": str(getattr(e, 'code', type(e).__name__))},
                 duration_ms=duration_ms,
                 error={"code": type(e).__name__, "message": str(e)}
             )
@@ -172,45 +170,20 @@ class QwenLlmService(LlmService):
         first_token_time = None
         total_content = ""
         finish_reason = None
+        events = None
         
         try:
-            from dashscope import Generation
-            
-            # 构建请求参数
-            request_params = {
-                'model': config.model,
-                'messages': self._messages_to_dicts(messages),
-                'temperature': config.temperature,
-                'top_p': config.top_p,
-                'max_tokens': config.max_tokens,
-                'result_format': 'message',
-                'stream': True,
-                'incremental_output': True  # 增量输出
-            }
-            
-            if config.stop:
-                request_params['stop'] = config.stop
-            if config.tools:
-                request_params['tools'] = config.tools
-            if config.tool_choice:
-                request_params['tool_choice'] = config.tool_choice
-            
             # 流式调用
-            responses = Generation.call(**request_params)
+            events = self._transport.stream(
+                self._build_payload(messages, config, stream=True),
+                api_key=self.api_key,
+                timeout=config.timeout,
+                base_url=self.base_url
+            )
             
-            for response in responses:
-                if response.status_code != 200:
-                    error_msg = f"Qwen stream error: {response.code} - {response.message}"
-                    logger.error(error_msg)
-                    metrics.track(
-                        "llm.call", "llm_call_error",
-                        status=EventStatus.ERROR,
-                        dimensions={"model": config.model, "error_code": str(response.code)}
-                    )
-                    raise Exception(error_msg)
-                
-                choice = response.output.choices[0]
-                message = choice.message
+            async for response in events:
+                choice = response['output']['choices'][0]
+                message = choice.get('message', {})
                 delta = message.get('content', '') or ''
                 
                 # 首 token 计时
@@ -226,8 +199,8 @@ class QwenLlmService(LlmService):
                 total_content += delta
                 
                 # 检查结束
-                if choice.finish_reason and choice.finish_reason != 'null':
-                    finish_reason = choice.finish_reason
+                if choice.get('finish_reason') and choice['finish_reason'] != 'null':
+                    finish_reason = choice['finish_reason']
                 
                 yield StreamChunk(
                     delta=delta,
@@ -256,18 +229,14 @@ class QwenLlmService(LlmService):
             metrics.track(
                 "llm.call", "llm_call_error",
                 status=EventStatus.ERROR,
-                dimensions={"model": config.model, "error_code": type(e).__name__},
+                dimensions={"model": config.model, "error_code": str(getattr(e, 'code', type(e).__name__))},
                 duration_ms=duration_ms,
                 error={"code": type(e).__name__, "message": str(e)}
             )
             logger.error("LLM stream failed", exc=e, model=config.model)
             raise
-    
-    def count_tokens(self, messages: List[Message]) -> int:
-        """计算 token 数量
         
-        Qwen 使用 qwen tokenizer，这里使用简单估算
-        """
-        total_chars = sum(len(m.content) for m in messages)
-        # Qwen 中文约 1.5-2 字符/token
-        return int(total_chars / 1.8)
+        finally:
+            # 调用方提前退出或被取消时，立即释放上游连接
+            if events is not None:
+                await events.aclose()
@@ -4,10 +4,15 @@ LLM 服务注册表
 管理和获取不同 Provider 的 LLM 服务实例
 """
 
-from typing import Dict, Type, Optional, Any
+import os
+from typing import Callable, Dict, List, Tuple, Type, Optional, Any
 from .base import LlmService
 
 
+# 包装器：接收一个服务，返回包装后的服务
+LlmWrapper = Callable[[LlmService], LlmService]
+
+
 class LlmRegistry:
     """LLM 服务注册表
     
@@ -17,10 +22,15 @@ class LlmRegistry:
         
         # 注册新 Provider
         LlmRegistry.register("custom", CustomLlmService)
+        
+        # 为所有服务挂载包装器（order 越小越靠近 Provider）
+        LlmRegistry.add_wrapper(CachedLlmService, order=100)
     """
     
     _providers: Dict[str, Type[LlmService]] = {}
     _instances: Dict[str, LlmService] = {}
+    _wrappers: List[Tuple[int, str, LlmWrapper]] = []
+    _builtin_wrappers_registered: bool = False
     
     @classmethod
     def register(cls, name: str, provider_class: Type[LlmService]) -> None:
@@ -32,11 +42,36 @@ class LlmRegistry:
         """
         cls._providers[name] = provider_class
     
+    @classmethod
+    def add_wrapper(cls, wrapper: LlmWrapper, order: int = 0, name: Optional[str] = None) -> None:
+        """挂载服务包装器
+        
+        之后通过 get_service 创建的服务都会按 order 从小到大依次包装，
+        order 越小越靠近 Provider。同名包装器会被替换。
+        
+        Args:
+            wrapper: 包装器（如 CachedLlmService）
+            order: 包装顺序
+            name: 包装器名称，默认取 wrapper.__name__
+        """
+        name = name or getattr(wrapper, '__name__', repr(wrapper))
+        cls._wrappers = [w for w in cls._wrappers if w[1] != name]
+        cls._wrappers.append((order, name, wrapper))
+        cls._wrappers.sort(key=lambda w: w[0])
+        cls._instances.clear()
+    
+    @classmethod
+    def remove_wrapper(cls, name: str) -> None:
+        """移除服务包装器"""
+        cls._wrappers = [w for w in cls._wrappers if w[1] != name]
+        cls._instances.clear()
+    
     @classmethod
     def get_service(
         cls,
         provider: str = "qwen",
         singleton: bool = True,
+        wrap: bool = True,
         **kwargs
     ) -> LlmService:
         """获取 LLM 服务实例
@@ -44,6 +79,7 @@ class LlmRegistry:
         Args:
             provider: Provider 名称
             singleton: 是否使用单例模式
+            wrap: 是否挂载已注册的包装器（缓存等）
             **kwargs: 传递给 Provider 构造函数的参数
         
         Returns:
@@ -57,14 +93,42 @@ class LlmRegistry:
             raise ValueError(f"Unknown LLM provider: {provider}. "
                            f"Available: {list(cls._providers.keys())}")
         
+        cls._register_builtin_wrappers()
+        
         # 单例模式
         if singleton:
-            cache_key = f"{provider}_{hash(frozenset(kwargs.items()))}"
+            cache_key = f"{provider}_{wrap}_{hash(frozenset(kwargs.items()))}"
             if cache_key not in cls._instances:
-                cls._instances[cache_key] = cls._providers[provider](**kwargs)
+                cls._instances[cache_key] = cls._create(provider, wrap, **kwargs)
             return cls._instances[cache_key]
         
-        return cls._providers[provider](**kwargs)
+        return cls._create(provider, wrap, **kwargs)
+    
+    @classmethod
+    def _create(cls, provider: str, wrap: bool, **kwargs) -> LlmService:
+        """创建服务并按顺序挂载包装器
+
+        路由类 Provider（wraps_backends=True）自行为每个后端挂载 per_backend 包装器，
+        这里只挂载其余包装器。
+        """
+        provider_class = cls._providers[provider]
+        service = provider_class(**kwargs)
+        if wrap:
+            routed = getattr(provider_class, 'wraps_backends', False)
+            for _, _, wrapper in cls._wrappers:
+                if routed and getattr(wrapper, 'per_backend', False):
+                    continue
+                service = wrapper(service)
+        return service
+    
+    @classmethod
+    def wrap_backend(cls, service: LlmService) -> LlmService:
+        """为路由后端挂载按后端生效的包装器（per_backend=True，如并发限制、重试与对冲）"""
+        cls._register_builtin_wrappers()
+        for _, _, wrapper in cls._wrappers:
+            if getattr(wrapper, 'per_backend', False):
+                service = wrapper(service)
+        return service
     
     @classmethod
     def list_providers(cls) -> list:
@@ -83,6 +147,41 @@ class LlmRegistry:
         cls._providers['qwen'] = QwenLlmService
         cls._providers['dashscope'] = QwenLlmService
         cls._providers['tongyi'] = QwenLlmService
+        
+        # 多后端路由（后端由 LLM_ROUTER_BACKENDS 配置）
+        from .router import LlmRouter
+        cls._providers['router'] = LlmRouter
+        
+        # 本地 Fake（离线压测与 CI）
+        from .fake import FakeLlmService
+        cls._providers['fake'] = FakeLlmService
+    
+    @classmethod
+    def _register_builtin_wrappers(cls) -> None:
+        """按环境变量挂载内置包装器"""
+        if cls._builtin_wrappers_registered:
+            return
+        cls._builtin_wrappers_registered = True
+        
+        # 自适应并发限制（默认开启）
+        if os.getenv('LLM_LIMITER_ENABLED', 'true').lower() == 'true':
+            from .limiter import LimitedLlmService
+            cls.add_wrapper(LimitedLlmService, order=40)
+        
+        # 重试与对冲（默认开启，对冲由 LLM_HEDGE_ENABLED 单独控制）
+        if os.getenv('LLM_RETRY_ENABLED', 'true').lower() == 'true':
+            from .hedging import HedgedLlmService
+            cls.add_wrapper(HedgedLlmService, order=60)
+        
+        # 在途请求合并（默认开启）
+        if os.getenv('LLM_SINGLEFLIGHT_ENABLED', 'true').lower() == 'true':
+            from .singleflight import SingleFlightLlmService
+            cls.add_wrapper(SingleFlightLlmService, order=80)
+        
+        # 响应缓存（默认关闭）
+        if os.getenv('LLM_CACHE_ENABLED', 'false').lower() == 'true':
+            from .cache import CachedLlmService
+            cls.add_wrapper(CachedLlmService, order=100)
 
 
 # 便捷函数
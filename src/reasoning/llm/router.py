@@ -0,0 +1,340 @@
+"""
+LLM 多后端路由
+
+将请求分发到多个已注册的后端（不同模型、不同地域接入点等），
+按首 token 时间 EWMA、错误率与在途请求数打分选择后端，
+并提供失败转移与熔断。
+"""
+
+import os
+import time
+import random
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, AsyncIterator, Union
+
+from .base import (
+    LlmService, LlmConfig, Message,
+    LlmResponse, StreamChunk
+)
+from ...infra import get_logger, get_metrics, EventStatus
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+class CircuitState:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class RouteBackend:
+    """路由后端"""
+    provider: str                          # LlmRegistry 中的 Provider 名称
+    model: Optional[str] = None            # 覆盖请求中的模型，None 表示沿用
+    kwargs: Dict[str, Any] = field(default_factory=dict)  # Provider 构造参数（如 base_url）
+    weight: float = 1.0                    # 打分权重，越大越容易被选中
+
+    @property
+    def name(self) -> str:
+        name = f"{self.provider}/{self.model or '*'}"
+        if self.kwargs.get('base_url'):
+            name += f"@{self.kwargs['base_url']}"
+        return name
+
+    @classmethod
+    def parse(cls, spec: str) -> 'RouteBackend':
+        """解析后端描述：provider[/model][@base_url]
+
+        例如 "qwen/qwen-turbo"、"qwen/qwen-plus@https://dashscope-intl.aliyuncs.com/api/v1"
+        """
+        spec = spec.strip()
+        kwargs = {}
+        if '@' in spec:
+            spec, base_url = spec.split('@', 1)
+            kwargs['base_url'] = base_url.strip()
+        provider, _, model = spec.partition('/')
+        return cls(provider=provider.strip(), model=model.strip() or None, kwargs=kwargs)
+
+
+@dataclass
+class BackendStats:
+    """后端运行统计"""
+    ewma_ttft: Optional[float] = None      # 流式首 token 时间（秒）
+    ewma_latency: Optional[float] = None   # 非流式响应时间（秒）
+    error_rate: float = 0.0                # 错误率 EWMA
+    inflight: int = 0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    state: str = CircuitState.CLOSED
+    opened_at: float = 0.0
+    probing: bool = False                  # 半开状态下是否已有试探请求
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ewma_ttft_ms': round(self.ewma_ttft * 1000, 1) if self.ewma_ttft is not None else None,
+            'ewma_latency_ms': round(self.ewma_latency * 1000, 1) if self.ewma_latency is not None else None,
+            'error_rate': round(self.error_rate, 4),
+            'inflight': self.inflight,
+            'requests': self.requests,
+            'failures': self.failures,
+            'state': self.state,
+        }
+
+
+class LlmRouter(LlmService):
+    """延迟感知的多后端 LLM 路由
+
+    - 打分：延迟 EWMA ×（1 + 在途数 / inflight_scale）×（1 + error_penalty × 错误率）/ 权重，
+      分数最低者胜出；尚无样本的后端优先被探索
+    - 失败转移：首个片段产出前失败时换下一个后端，直到所有后端都试过
+    - 熔断：连续失败 failure_threshold 次后打开，cooldown 秒后半开放行一个试探请求
+
+    Usage:
+        LlmRegistry.get_service("router")  # 后端来自 LLM_ROUTER_BACKENDS
+
+        router = LlmRouter("qwen/qwen-turbo,qwen/qwen-plus")
+    """
+
+    def __init__(
+        self,
+        backends: Optional[Union[str, List[Union[str, RouteBackend]]]] = None,
+        alpha: float = 0.2,
+        inflight_scale: float = 8.0,
+        error_penalty: float = 5.0,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None
+    ):
+        """
+        Args:
+            backends: 后端列表或逗号分隔的描述，默认读取 LLM_ROUTER_BACKENDS
+            alpha: EWMA 平滑系数
+            inflight_scale: 在途请求数对分数的影响尺度
+            error_penalty: 错误率对分数的惩罚系数
+            failure_threshold: 熔断阈值（连续失败次数），默认 LLM_ROUTER_FAILURE_THRESHOLD
+            cooldown: 熔断冷却时间（秒），默认 LLM_ROUTER_COOLDOWN
+        """
+        if backends is None:
+            backends = os.getenv('LLM_ROUTER_BACKENDS', 'qwen')
+        if isinstance(backends, str):
+            backends = [b for b in backends.split(',') if b.strip()]
+        self.backends: List[RouteBackend] = [
+            b if isinstance(b, RouteBackend) else RouteBackend.parse(b) for b in backends
+        ]
+        if not self.backends:
+            raise ValueError("LlmRouter requires at least one backend")
+
+        self.alpha = alpha
+        self.inflight_scale = inflight_scale
+        self.error_penalty = error_penalty
+        self.failure_threshold = failure_threshold if failure_threshold is not None else \
+            int(os.getenv('LLM_ROUTER_FAILURE_THRESHOLD', '5'))
+        self.cooldown = cooldown if cooldown is not None else \
+            float(os.getenv('LLM_ROUTER_COOLDOWN', '30'))
+
+        self._services: Dict[str, LlmService] = {}
+        self._stats: Dict[str, BackendStats] = {b.name: BackendStats() for b in self.backends}
+
+    # 按后端挂载 per_backend 包装器（见 LlmRegistry.wrap_backend）
+    wraps_backends = True
+
+    @property
+    def provider_name(self) -> str:
+        return "router"
+
+    def _service(self, backend: RouteBackend) -> LlmService:
+        """获取后端服务
+
+        并发限制与重试/对冲按后端挂载（限流窗口与延迟统计按后端的 provider/model 区分），
+        缓存与请求合并在路由层统一生效。
+        """
+        service = self._services.get(backend.name)
+        if service is None:
+            from .registry import LlmRegistry
+            service = LlmRegistry.get_service(backend.provider, wrap=False, **backend.kwargs)
+            service = LlmRegistry.wrap_backend(service)
+            self._services[backend.name] = service
+        return service
+
+    # ---------- 选择 ----------
+
+    def _available(self, stats: BackendStats, now: float) -> bool:
+        if stats.state == CircuitState.CLOSED:
+            return True
+        if stats.state == CircuitState.OPEN and now - stats.opened_at >= self.cooldown:
+            stats.state = CircuitState.HALF_OPEN
+            stats.probing = False
+        return stats.state == CircuitState.HALF_OPEN and not stats.probing
+
+    def _score(self, backend: RouteBackend, stats: BackendStats, streaming: bool) -> float:
+        latency = stats.ewma_ttft if streaming else stats.ewma_latency
+        if latency is None:
+            latency = stats.ewma_latency if streaming else stats.ewma_ttft
+        if latency is None:
+            # 尚无样本：优先探索
+            return -1.0 + random.random() * 1e-3
+        score = latency * (1 + stats.inflight / self.inflight_scale) * (1 + self.error_penalty * stats.error_rate)
+        return score / max(backend.weight, 1e-6) + random.random() * 1e-6
+
+    def _select(self, exclude: set, streaming: bool) -> Optional[RouteBackend]:
+        now = time.monotonic()
+        candidates = [
+            b for b in self.backends
+            if b.name not in exclude and self._available(self._stats[b.name], now)
+        ]
+        if not candidates:
+            # 全部熔断：退而选择最早熔断的后端，避免直接失败
+            remaining = [b for b in self.backends if b.name not in exclude]
+            if not remaining:
+                return None
+            return min(remaining, key=lambda b: self._stats[b.name].opened_at)
+        return min(candidates, key=lambda b: self._score(b, self._stats[b.name], streaming))
+
+    # ---------- 反馈 ----------
+
+    def _begin(self, backend: RouteBackend) -> BackendStats:
+        stats = self._stats[backend.name]
+        stats.inflight += 1
+        stats.requests += 1
+        if stats.state == CircuitState.HALF_OPEN:
+            stats.probing = True
+        return stats
+
+    def _end(self, stats: BackendStats, probe: bool) -> None:
+        """调用结束：半开探测既未成功也未失败（被取消、提前 aclose）时允许再次探测"""
+        stats.inflight -= 1
+        if probe and stats.state == CircuitState.HALF_OPEN:
+            stats.probing = False
+
+    def _ewma(self, old: Optional[float], value: float) -> float:
+        return value if old is None else self.alpha * value + (1 - self.alpha) * old
+
+    def _on_success(self, backend: RouteBackend, stats: BackendStats, latency: float, streaming: bool) -> None:
+        if streaming:
+            stats.ewma_ttft = self._ewma(stats.ewma_ttft, latency)
+        else:
+            stats.ewma_latency = self._ewma(stats.ewma_latency, latency)
+        stats.error_rate = (1 - self.alpha) * stats.error_rate
+        stats.consecutive_failures = 0
+        if stats.state != CircuitState.CLOSED:
+            stats.state = CircuitState.CLOSED
+            stats.probing = False
+            metrics.track(
+                "llm.router", "circuit_closed",
+                dimensions={"backend": backend.name}
+            )
+            logger.info("LLM backend circuit closed", backend=backend.name)
+
+    def _on_failure(self, backend: RouteBackend, stats: BackendStats, error: BaseException) -> None:
+        stats.failures += 1
+        stats.consecutive_failures += 1
+        stats.error_rate = self.alpha + (1 - self.alpha) * stats.error_rate
+        if stats.state == CircuitState.HALF_OPEN or (
+            stats.state == CircuitState.CLOSED and stats.consecutive_failures >= self.failure_threshold
+        ):
+            stats.state = CircuitState.OPEN
+            stats.opened_at = time.monotonic()
+            stats.probing = False
+            metrics.track(
+                "llm.router", "circuit_opened",
+                status=EventStatus.ERROR,
+                dimensions={"backend": backend.name},
+                metrics={"consecutive_failures": stats.consecutive_failures},
+                error={"code": type(error).__name__, "message": str(error)}
+            )
+            logger.warn("LLM backend circuit opened", backend=backend.name, error=str(error))
+
+    def _failover(self, backend: RouteBackend, config: LlmConfig, error: BaseException) -> None:
+        metrics.track(
+            "llm.router", "backend_failover",
+            status=EventStatus.ERROR,
+            dimensions={"backend": backend.name, "model": config.model},
+            error={"code": type(error).__name__, "message": str(error)}
+        )
+        logger.warn("LLM backend failed, failing over", backend=backend.name, error=str(error))
+
+    def _backend_config(self, backend: RouteBackend, config: LlmConfig) -> LlmConfig:
+        return dataclasses.replace(config, model=backend.model) if backend.model else config
+
+    # ---------- 调用 ----------
+
+    async def chat(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> LlmResponse:
+        config = self._ensure_config(config)
+        tried: set = set()
+        last_error: Optional[BaseException] = None
+
+        while True:
+            backend = self._select(tried, streaming=False)
+            if backend is None:
+                raise last_error or RuntimeError("No LLM backend available")
+            tried.add(backend.name)
+
+            stats = self._begin(backend)
+            probe = stats.probing
+            start = time.monotonic()
+            try:
+                response = await self._service(backend).chat(messages, self._backend_config(backend, config))
+            except Exception as e:
+                self._on_failure(backend, stats, e)
+                self._failover(backend, config, e)
+                last_error = e
+                continue
+            finally:
+                self._end(stats, probe)
+            self._on_success(backend, stats, time.monotonic() - start, streaming=False)
+            return response
+
+    async def chat_stream(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> AsyncIterator[StreamChunk]:
+        config = self._ensure_config(config)
+        tried: set = set()
+        last_error: Optional[BaseException] = None
+
+        while True:
+            backend = self._select(tried, streaming=True)
+            if backend is None:
+                raise last_error or RuntimeError("No LLM backend available")
+            tried.add(backend.name)
+
+            stats = self._begin(backend)
+            probe = stats.probing
+            start = time.monotonic()
+            stream = self._service(backend).chat_stream(messages, self._backend_config(backend, config))
+            first = True
+            try:
+                async for chunk in stream:
+                    if first:
+                        first = False
+                        self._on_success(backend, stats, time.monotonic() - start, streaming=True)
+                    yield chunk
+                return
+            except Exception as e:
+                self._on_failure(backend, stats, e)
+                if not first:
+                    # 已向调用方输出内容，不能再换后端
+                    raise
+                self._failover(backend, config, e)
+                last_error = e
+            finally:
+                self._end(stats, probe)
+                await stream.aclose()
+
+    def count_tokens(self, messages: List[Message]) -> int:
+        return self._service(self.backends[0]).count_tokens(messages)
+
+    def count_tokens_batch(self, messages: List[Message]) -> List[int]:
+        return self._service(self.backends[0]).count_tokens_batch(messages)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """各后端统计"""
+        return {name: s.to_dict() for name, s in self._stats.items()}
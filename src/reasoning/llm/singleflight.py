@@ -0,0 +1,94 @@
+"""
+LLM 在途请求合并
+
+并发的相同确定性请求（消息与生成参数一致，temperature == 0）共享一次上游生成：
+- chat: 所有调用方等待同一个响应
+- chat_stream: 后加入者先收到已生成的增量，再接收实时增量
+"""
+
+import dataclasses
+from typing import List, Optional, AsyncIterator
+
+from .base import (
+    LlmService, LlmServiceWrapper, LlmConfig, Message,
+    LlmResponse, StreamChunk
+)
+from .cache import request_key
+from ...infra import get_logger, get_metrics, SingleFlight, StreamSingleFlight
+
+logger = get_logger(__name__)
+metrics = get_metrics()
+
+
+class SingleFlightLlmService(LlmServiceWrapper):
+    """合并并发相同请求的 LLM 服务
+
+    合并键与响应缓存一致（request_key）。只合并确定性请求（temperature == 0）：
+    采样生成的请求各自独立生成，避免并发的相同提问得到完全相同的回答；
+    LlmConfig(use_cache=False) 的请求同样不参与合并。
+
+    Usage:
+        service = SingleFlightLlmService(QwenLlmService())
+    """
+
+    def __init__(self, inner: LlmService):
+        super().__init__(inner)
+        self._calls = SingleFlight()
+        self._streams = StreamSingleFlight()
+
+    async def chat(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> LlmResponse:
+        config = self._ensure_config(config)
+        if not self._coalescable(config):
+            return await self.inner.chat(messages, config)
+
+        key = request_key(self.provider_name, messages, config)
+        response, shared = await self._calls.do(key, lambda: self.inner.chat(messages, config))
+        if shared:
+            self._track(config, streaming=False, buffered=0)
+            return dataclasses.replace(response)
+        return response
+
+    async def chat_stream(
+        self,
+        messages: List[Message],
+        config: Optional[LlmConfig] = None
+    ) -> AsyncIterator[StreamChunk]:
+        config = self._ensure_config(config)
+        if not self._coalescable(config):
+            async for chunk in self.inner.chat_stream(messages, config):
+                yield chunk
+            return
+
+        key = request_key(self.provider_name, messages, config)
+        subscription, shared = self._streams.join(key, lambda: self.inner.chat_stream(messages, config))
+        if shared:
+            self._track(config, streaming=True, buffered=subscription.flight.buffered)
+
+        try:
+            async for chunk in subscription:
+                yield chunk
+        finally:
+            await subscription.aclose()
+
+    @staticmethod
+    def _coalescable(config: LlmConfig) -> bool:
+        """是否可与其他请求共享生成结果"""
+        return config.use_cache and not config.temperature
+
+    def _track(self, config: LlmConfig, streaming: bool, buffered: int) -> None:
+        metrics.track(
+            "llm.singleflight", "request_coalesced",
+            dimensions={
+                "provider": self.provider_name,
+                "model": config.model,
+                "streaming": "true" if streaming else "false",
+            },
+            metrics={
+                "buffered_chunks": buffered,
+                "inflight": len(self._streams) if streaming else len(self._calls),
+            }
+        )
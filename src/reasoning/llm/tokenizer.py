@@ -0,0 +1,223 @@
+"""
+Token 计数
+
+LlmService.count_tokens 原先按字符数除以 2（Qwen 为 1.8）估算，中英混合文本误差很大，
+上下文预算、限流与成本估算都不可靠。Tokenizer 用本地词表做真实的 BPE 编码：
+- 词表从本地文件加载（LLM_TOKENIZER_VOCAB，默认使用 dashscope 包自带的 qwen.tiktoken），不访问网络
+- 按消息计数（内容 + Qwen 对话模板开销），结果按 (role, name, content) 缓存；
+  对增长中的对话重复计数时只编码新增的消息
+- count_batch 一次计数多条消息：一次查缓存、相同内容只编码一次，未命中的内容多核时并行编码
+- 词表加载约 0.5 秒，服务启动时经 warm_tokenizer 在线程池中预先加载，不阻塞事件循环
+
+未安装 tiktoken 或词表不存在时退化为按字符估算，并记录一次告警。
+"""
+
+import os
+import json
+import asyncio
+import threading
+import importlib.util
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .base import Message, MessageRole
+from ...infra import get_logger, LruCache
+
+logger = get_logger(__name__)
+
+# Qwen 词表的正则切分规则（与 dashscope / qwen_agent 的 QwenTokenizer 一致）
+PAT_STR = r"""(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\r\n\p{L}\p{N}]?\p{L}+|\p{N}| ?[^\s\p{L}\p{N}]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"""
+
+# 对话模板 <|im_start|>{role}\n{content}<|im_end|>\n 中除内容外的 token 数
+MESSAGE_OVERHEAD = 5
+
+# 批量编码的线程数（编码在 Rust 中释放 GIL；单核时逐条编码）
+_THREADS = min(8, os.cpu_count() or 1)
+
+# tiktoken 在 Rust 中递归合并，超长的单个切分片段可能栈溢出，先按该长度分块
+_CHUNK_CHARS = 100_000
+
+
+def _default_vocab_file() -> Optional[str]:
+    path = os.getenv('LLM_TOKENIZER_VOCAB')
+    if path:
+        return path
+    spec = importlib.util.find_spec('dashscope')
+    if spec is None or not spec.origin:
+        return None
+    return os.path.join(os.path.dirname(spec.origin), 'resources', 'qwen.tiktoken')
+
+
+# 已加载的词表（按文件路径共享，多个 Tokenizer 实例不重复加载）
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+
+
+def _load_encoding(vocab_file: str):
+    """加载 tiktoken 格式的词表（每行：base64 token 与 rank）"""
+    with _encodings_lock:
+        encoding = _encodings.get(vocab_file)
+        if encoding is None:
+            encoding = _encodings[vocab_file] = _read_encoding(vocab_file)
+            logger.info("Tokenizer loaded", vocab=vocab_file, size=encoding.n_vocab)
+        return encoding
+
+
+def _read_encoding(vocab_file: str):
+    import base64
+    import tiktoken
+
+    with open(vocab_file, 'rb') as f:
+        ranks = {
+            base64.b64decode(token): int(rank)
+            for token, rank in (line.split() for line in f.read().splitlines() if line)
+        }
+    return tiktoken.Encoding(
+        name=os.path.basename(vocab_file), pat_str=PAT_STR, mergeable_ranks=ranks, special_tokens={}
+    )
+
+
+def _message_text(message: Message) -> str:
+    if not message.tool_calls:
+        return message.content or ""
+    return (message.content or "") + json.dumps(message.tool_calls, ensure_ascii=False, default=str)
+
+
+class Tokenizer:
+    """带缓存的 token 计数器（线程安全）
+
+    Usage:
+        tokenizer = get_tokenizer()
+        tokenizer.count_text("你好，world")
+        tokenizer.count_messages(messages)        # 整个请求
+        tokenizer.count_batch(messages)           # 每条消息的 token 数
+    """
+
+    def __init__(self, vocab_file: Optional[str] = None, cache_chars: int = 32 * 1024 * 1024):
+        """
+        Args:
+            vocab_file: 词表文件，None 表示 LLM_TOKENIZER_VOCAB 或 dashscope 自带的 qwen.tiktoken
+            cache_chars: 缓存的消息内容总字符数上限（LRU 淘汰）
+        """
+        self.vocab_file = vocab_file or _default_vocab_file()
+        self._encoding = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._cache = LruCache(max_bytes=cache_chars, ttl=None)
+
+    @property
+    def exact(self) -> bool:
+        """是否使用真实词表（否则为按字符估算）"""
+        return self._get_encoding() is not None
+
+    def warm(self) -> bool:
+        """加载词表（阻塞），返回是否使用真实词表"""
+        return self.exact
+
+    def _get_encoding(self):
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    try:
+                        if not self.vocab_file or not os.path.exists(self.vocab_file):
+                            raise FileNotFoundError(f"Tokenizer vocab not found: {self.vocab_file}")
+                        self._encoding = _load_encoding(self.vocab_file)
+                    except Exception as e:
+                        logger.warn("Tokenizer unavailable, falling back to estimation", exc=e)
+                    self._loaded = True
+        return self._encoding
+
+    def count_text(self, text: str) -> int:
+        """文本的 token 数（不缓存）"""
+        return self._encode_counts([text])[0]
+
+    def count_message(self, message: Message) -> int:
+        """单条消息的 token 数（含模板开销）"""
+        return self.count_batch([message])[0]
+
+    def count_messages(self, messages: Sequence[Message]) -> int:
+        """一次请求的输入 token 数（各消息之和）"""
+        return sum(self.count_batch(messages))
+
+    def count_batch(self, messages: Sequence[Message]) -> List[int]:
+        """每条消息的 token 数；未命中缓存的消息一次批量编码"""
+        counts: List[Optional[int]] = [None] * len(messages)
+        misses: Dict[Tuple, List[int]] = {}
+        texts: Dict[Tuple, str] = {}
+        with self._lock:
+            for index, message in enumerate(messages):
+                key = self._key(message)
+                cached = self._cache.get(key) if key is not None else None
+                if cached is not None:
+                    counts[index] = cached
+                    continue
+                key = key or (index,)
+                misses.setdefault(key, []).append(index)
+                texts[key] = _message_text(message)
+
+        if misses:
+            keys = list(misses)
+            encoded = self._encode_counts([texts[key] for key in keys])
+            with self._lock:
+                for key, count in zip(keys, encoded):
+                    count += MESSAGE_OVERHEAD
+                    for index in misses[key]:
+                        counts[index] = count
+                    if len(key) > 1:
+                        self._cache.set(key, count, size=len(key[2]) + 64)
+        return counts
+
+    @staticmethod
+    def _key(message: Message) -> Optional[Tuple[Any, ...]]:
+        """缓存键；str 的哈希值缓存在对象上，同一内容对象重复计数时无需重新哈希"""
+        if message.tool_calls:
+            return None
+        role = message.role.value if isinstance(message.role, MessageRole) else message.role
+        return (role, message.name, message.content or "")
+
+    def _encode_counts(self, texts: List[str]) -> List[int]:
+        encoding = self._get_encoding()
+        if encoding is None:
+            return [_estimate(text) for text in texts]
+        chunks, owners = [], []
+        for index, text in enumerate(texts):
+            for start in range(0, len(text), _CHUNK_CHARS):
+                chunks.append(text[start:start + _CHUNK_CHARS])
+                owners.append(index)
+        if len(chunks) > 1 and _THREADS > 1:
+            encoded = encoding.encode_ordinary_batch(chunks, num_threads=_THREADS)
+        else:
+            encoded = [encoding.encode_ordinary(chunk) for chunk in chunks]
+        counts = [0] * len(texts)
+        for index, tokens in zip(owners, encoded):
+            counts[index] += len(tokens)
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        with self._lock:
+            return {'exact': self._encoding is not None, **self._cache.stats()}
+
+
+def _estimate(text: str) -> int:
+    """无词表时的估算：中文约 1.5 字符/token，其余约 4 字符/token"""
+    cjk = sum(1 for ch in text if '一' <= ch <= '鿿')
+    return int(cjk / 1.5 + (len(text) - cjk) / 4 + 0.5)
+
+
+# 全局实例（词表在 warm_tokenizer 或首次计数时加载）
+_tokenizer: Optional[Tokenizer] = None
+
+
+def get_tokenizer() -> Tokenizer:
+    """获取全局 Tokenizer"""
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = Tokenizer(cache_chars=int(os.getenv('LLM_TOKENIZER_CACHE_CHARS', str(32 * 1024 * 1024))))
+    return _tokenizer
+
+
+async def warm_tokenizer() -> bool:
+    """在线程池中加载全局 Tokenizer 的词表（服务启动时调用），返回是否使用真实词表"""
+    tokenizer = get_tokenizer()
+    return await asyncio.get_running_loop().run_in_executor(None, tokenizer.warm)
@@ -0,0 +1,263 @@
+"""
+DashScope 异步 HTTP 传输层
+
+基于 aiohttp 的共享连接池，提供非阻塞的普通调用与 SSE 流式调用，
+替代在事件循环中直接调用阻塞的 dashscope.Generation.call
+"""
+
+import os
+import json
+import asyncio
+from typing import Dict, Any, AsyncIterator, Optional
+
+from ...infra import get_logger
+
+logger = get_logger(__name__)
+
+
+DEFAULT_BASE_URL = "https://dashscope.aliyuncs.com/api/v1"
+GENERATION_PATH = "/services/aigc/text-generation/generation"
+
+# 可重试的 HTTP 状态码（限流 / 服务端临时错误）
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class DashScopeError(Exception):
+    """DashScope API 错误"""
+
+    def __init__(
+        self,
+        status_code: int,
+        code: str,
+        message: str,
+        request_id: Optional[str] = None
+    ):
+        self.status_code = status_code
+        self.code = code
+        self.message = message
+        self.request_id = request_id
+        super().__init__(f"DashScope API error: {code} - {message}")
+
+    @property
+    def retryable(self) -> bool:
+        """是否为可重试的临时错误"""
+        return self.status_code in RETRYABLE_STATUS
+
+
+class DashScopeTransport:
+    """DashScope HTTP 传输
+
+    同一事件循环内的所有请求共享一个 aiohttp.ClientSession，
+    连接保持 keep-alive 并按 pool_size 限制并发连接数。
+
+    Usage:
+        transport = get_dashscope_transport()
+        result = await transport.generate(payload, api_key)
+
+        async for event in transport.stream(payload, api_key):
+            ...
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        pool_size: int = 100,
+        keepalive_timeout: float = 30.0,
+        connect_timeout: float = 10.0
+    ):
+        self.base_url = (base_url or os.getenv('DASHSCOPE_HTTP_BASE_URL') or DEFAULT_BASE_URL).rstrip('/')
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.connect_timeout = connect_timeout
+
+        self._session = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self):
+        """获取当前事件循环的共享会话（懒加载）"""
+        import aiohttp
+
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    def _headers(self, api_key: Optional[str], stream: bool) -> Dict[str, str]:
+        headers = {
+            'Authorization': f'Bearer {api_key or ""}',
+            'Content-Type': 'application/json; charset=utf-8',
+            'Cache-Control': 'no-cache',
+        }
+        if stream:
+            headers['Accept'] = 'text/event-stream'
+            headers['X-DashScope-SSE'] = 'enable'
+            headers['X-Accel-Buffering'] = 'no'
+        else:
+            headers['Accept'] = 'application/json; charset=utf-8'
+        return headers
+
+    def _url(self, base_url: Optional[str]) -> str:
+        return (base_url.rstrip('/') if base_url else self.base_url) + GENERATION_PATH
+
+    async def generate(
+        self,
+        payload: Dict[str, Any],
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        base_url: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """非流式生成
+
+        Args:
+            payload: 请求体 {"model", "input", "parameters"}
+            api_key: DashScope API Key
+            timeout: 整体超时（秒）
+            base_url: 覆盖默认接入点（如其他地域）
+
+        Returns:
+            响应 JSON
+        """
+        import aiohttp
+
+        session = self._get_session()
+        client_timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=self.connect_timeout)
+
+        async with session.post(
+            self._url(base_url),
+            json=payload,
+            headers=self._headers(api_key, stream=False),
+            timeout=client_timeout
+        ) as resp:
+            body = await resp.read()
+            data = self._parse_json(body, resp.status)
+            if resp.status != 200:
+                raise DashScopeError(
+                    resp.status,
+                    data.get('code', str(resp.status)),
+                    data.get('message', ''),
+                    data.get('request_id')
+                )
+            return data
+
+    async def stream(
+        self,
+        payload: Dict[str, Any],
+        api_key: Optional[str] = None,
+        timeout: Optional[float] = None,
+        base_url: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """SSE 流式生成
+
+        调用方停止迭代或任务被取消时，底层连接会被直接关闭，
+        不会将读了一半的连接放回连接池。
+
+        Args:
+            payload: 请求体
+            api_key: DashScope API Key
+            timeout: 两个事件之间的最大等待时间（秒）
+            base_url: 覆盖默认接入点
+
+        Yields:
+            每个 SSE data 事件解析后的 JSON
+        """
+        import aiohttp
+
+        session = self._get_session()
+        client_timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=self.connect_timeout, sock_read=timeout
+        )
+
+        resp = await session.post(
+            self._url(base_url),
+            json=payload,
+            headers=self._headers(api_key, stream=True),
+            timeout=client_timeout
+        )
+        completed = False
+        try:
+            if resp.status != 200:
+                data = self._parse_json(await resp.read(), resp.status)
+                raise DashScopeError(
+                    resp.status,
+                    data.get('code', str(resp.status)),
+                    data.get('message', ''),
+                    data.get('request_id')
+                )
+
+            is_error = False
+            status_code = 200
+            async for raw_line in resp.content:
+                line = raw_line.decode('utf-8').rstrip('\r\n')
+                if not line:
+                    is_error = False
+                    status_code = 200
+                    continue
+
+                if line.startswith('event:'):
+                    is_error = line[len('event:'):].strip() == 'error'
+                elif line.startswith(':HTTP_STATUS/'):
+                    status_code = self._parse_status(line[len(':HTTP_STATUS/'):])
+                elif line.startswith('status:'):
+                    status_code = self._parse_status(line[len('status:'):])
+                elif line.startswith('data:'):
+                    data = self._parse_json(line[len('data:'):].encode('utf-8'), status_code)
+                    if is_error or status_code != 200:
+                        raise DashScopeError(
+                            status_code if status_code != 200 else 500,
+                            data.get('code', 'Unknown'),
+                            data.get('message', ''),
+                            data.get('request_id')
+                        )
+                    yield data
+
+            completed = True
+        finally:
+            if completed:
+                resp.release()
+            else:
+                # 未读完的连接不能复用
+                resp.close()
+
+    @staticmethod
+    def _parse_status(value: str) -> int:
+        """解析 SSE 事件中的状态码行（空值视为 200）"""
+        value = value.strip()
+        try:
+            return int(value) if value else 200
+        except ValueError:
+            raise DashScopeError(500, 'InvalidResponse', f"Malformed SSE status line: {value[:50]}")
+
+    def _parse_json(self, body: bytes, status: int) -> Dict[str, Any]:
+        try:
+            return json.loads(body) if body else {}
+        except (ValueError, UnicodeDecodeError):
+            text = body.decode('utf-8', errors='replace')[:200]
+            raise DashScopeError(status if status != 200 else 500, 'InvalidResponse', text)
+
+    async def close(self) -> None:
+        """关闭连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+
+# 全局单例
+_transport: Optional[DashScopeTransport] = None
+
+
+def get_dashscope_transport() -> DashScopeTransport:
+    """获取全局 DashScope 传输实例"""
+    global _transport
+    if _transport is None:
+        _transport = DashScopeTransport(
+            pool_size=int(os.getenv('DASHSCOPE_HTTP_POOL_SIZE', '100')),
+            keepalive_timeout=float(os.getenv('DASHSCOPE_HTTP_KEEPALIVE', '30')),
+        )
+    return _transport
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10multimodal.proto\x12\tomniagent\"~\n\x11MultiModalRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12(\n\x06inputs\x18\x02 \x03(\x0b\x32\x18.omniagent.ModalityInput\x12+\n\x06\x63onfig\x18\x03 \x01(\x0b\x32\x1b.omniagent.ProcessingConfig\"\x90\x01\n\rModalityInput\x12$\n\x04text\x18\x01 \x01(\x0b\x32\x14.omniagent.TextInputH\x00\x12&\n\x05\x61udio\x18\x02 \x01(\x0b\x32\x15.omniagent.AudioInputH\x00\x12&\n\x05image\x18\x03 \x01(\x0b\x32\x15.omniagent.ImageInputH\x00\x42\t\n\x07\x63ontent\"*\n\tTextInput\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\t\x12\x0c\n\x04role\x18\x02 \x01(\t\"j\n\nAudioInput\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06\x66ormat\x18\x02 \x01(\t\x12\x13\n\x0bsample_rate\x18\x03 \x01(\x05\x12\x10\n\x08\x63hannels\x18\x04 \x01(\x05\x12\x17\n\x0f\x62its_per_sample\x18\x05 \x01(\x05\":\n\nImageInput\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06\x66ormat\x18\x02 \x01(\t\x12\x0e\n\x06prompt\x18\x03 \x01(\t\"\xf3\x01\n\x10ProcessingConfig\x12\x14\n\x0cstt_provider\x18\x01 \x01(\t\x12\x11\n\tstt_model\x18\x02 \x01(\t\x12\x10\n\x08language\x18\x03 \x01(\t\x12\x14\n\x0cllm_provider\x18\x04 \x01(\t\x12\x11\n\tllm_model\x18\x05 \x01(\t\x12\x13\n\x0btemperature\x18\x06 \x01(\x02\x12\x12\n\nmax_tokens\x18\x07 \x01(\x05\x12\x15\n\rsystem_prompt\x18\x08 \x01(\t\x12\x12\n\nenable_tts\x18\t \x01(\x08\x12\x14\n\x0ctts_provider\x18\n \x01(\t\x12\x11\n\ttts_voice\x18\x0b \x01(\t\"\x85\x01\n\x12MultiModalResponse\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12*\n\x07outputs\x18\x02 \x03(\x0b\x32\x19.omniagent.ModalityOutput\x12/\n\x08metadata\x18\x03 \x01(\x0b\x32\x1d.omniagent.ProcessingMetadata\"k\n\x0eModalityOutput\x12%\n\x04text\x18\x01 \x01(\x0b\x32\x15.omniagent.TextOutputH\x00\x12\'\n\x05\x61udio\x18\x02 \x01(\x0b\x32\x16.omniagent.AudioOutputH\x00\x42\t\n\x07\x63ontent\"+\n\nTextOutput\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\t\x12\x0c\n\x04role\x18\x02 \x01(\t\"@\n\x0b\x41udioOutput\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06\x66ormat\x18\x02 \x01(\t\x12\x13\n\x0bsample_rate\x18\x03 \x01(\x05\"\xa6\x01\n\x12ProcessingMetadata\x12\x15\n\rfinish_reason\x18\x01 \x01(\t\x12\x15\n\rprompt_tokens\x18\x02 \x01(\x05\x12\x19\n\x11\x63ompletion_tokens\x18\x03 \x01(\x05\x12\x19\n\x11\x61udio_duration_ms\x18\x04 \x01(\x05\x12\x18\n\x10transcribed_text\x18\x05 \x01(\t\x12\x12\n\nlatency_ms\x18\x06 \x01(\x03\"\xb0\x01\n\x17MultiModalStreamRequest\x12,\n\x05start\x18\x01 \x01(\x0b\x32\x1b.omniagent.StreamStartFrameH\x00\x12,\n\x05\x61udio\x18\x02 \x01(\x0b\x32\x1b.omniagent.StreamAudioFrameH\x00\x12\x30\n\x07\x63ontrol\x18\x03 \x01(\x0b\x32\x1d.omniagent.StreamControlFrameH\x00\x42\x07\n\x05\x66rame\"\x85\x01\n\x10StreamStartFrame\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12+\n\x06\x63onfig\x18\x02 \x01(\x0b\x32\x1b.omniagent.ProcessingConfig\x12\x30\n\x0einitial_inputs\x18\x03 \x03(\x0b\x32\x18.omniagent.ModalityInput\"H\n\x10StreamAudioFrame\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x14\n\x0ctimestamp_ms\x18\x02 \x01(\x03\x12\x10\n\x08sequence\x18\x03 \x01(\x05\"\x8a\x01\n\x12StreamControlFrame\x12\x36\n\x07\x63ommand\x18\x01 \x01(\x0e\x32%.omniagent.StreamControlFrame.Command\"<\n\x07\x43ommand\x12\x0b\n\x07UNKNOWN\x10\x00\x12\t\n\x05\x46LUSH\x10\x01\x12\r\n\tEND_AUDIO\x10\x02\x12\n\n\x06\x43\x41NCEL\x10\x03\"\xb1\x02\n\x18MultiModalStreamResponse\x12,\n\x05ready\x18\x01 \x01(\x0b\x32\x1b.omniagent.StreamReadyFrameH\x00\x12(\n\x03stt\x18\x02 \x01(\x0b\x32\x19.omniagent.StreamSttFrameH\x00\x12(\n\x03llm\x18\x03 \x01(\x0b\x32\x19.omniagent.StreamLlmFrameH\x00\x12(\n\x03tts\x18\x04 \x01(\x0b\x32\x19.omniagent.StreamTtsFrameH\x00\x12\x32\n\x08\x63omplete\x18\x05 \x01(\x0b\x32\x1e.omniagent.StreamCompleteFrameH\x00\x12,\n\x05\x65rror\x18\x06 \x01(\x0b\x32\x1b.omniagent.StreamErrorFrameH\x00\x42\x07\n\x05\x66rame\"7\n\x10StreamReadyFrame\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"D\n\x0eStreamSttFrame\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x10\n\x08is_final\x18\x02 \x01(\x08\x12\x12\n\nconfidence\x18\x03 \x01(\x02\".\n\x0eStreamLlmFrame\x12\r\n\x05\x64\x65lta\x18\x01 \x01(\t\x12\r\n\x05index\x18\x02 \x01(\x05\"0\n\x0eStreamTtsFrame\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x10\n\x08sequence\x18\x02 \x01(\x05\"]\n\x13StreamCompleteFrame\x12\x15\n\rfinish_reason\x18\x01 \x01(\t\x12/\n\x08metadata\x18\x02 \x01(\x0b\x32\x1d.omniagent.ProcessingMetadata\"F\n\x10StreamErrorFrame\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x13\n\x0brecoverable\x18\x03 \x01(\x08\x42\x1f\n\x1b\x63om.deepknow.omniagent.grpcP\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10multimodal.proto\x12\tomniagent\"~\n\x11MultiModalRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12(\n\x06inputs\x18\x02 \x03(\x0b\x32\x18.omniagent.ModalityInput\x12+\n\x06\x63onfig\x18\x03 \x01(\x0b\x32\x1b.omniagent.ProcessingConfig\"\x90\x01\n\rModalityInput\x12$\n\x04text\x18\x01 \x01(\x0b\x32\x14.omniagent.TextInputH\x00\x12&\n\x05\x61udio\x18\x02 \x01(\x0b\x32\x15.omniagent.AudioInputH\x00\x12&\n\x05image\x18\x03 \x01(\x0b\x32\x15.omniagent.ImageInputH\x00\x42\t\n\x07\x63ontent\"*\n\tTextInput\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\t\x12\x0c\n\x04role\x18\x02 \x01(\t\"j\n\nAudioInput\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06\x66ormat\x18\x02 \x01(\t\x12\x13\n\x0bsample_rate\x18\x03 \x01(\x05\x12\x10\n\x08\x63hannels\x18\x04 \x01(\x05\x12\x17\n\x0f\x62its_per_sample\x18\x05 \x01(\x05\":\n\nImageInput\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06\x66ormat\x18\x02 \x01(\t\x12\x0e\n\x06prompt\x18\x03 \x01(\t\"\x9e\x03\n\x10ProcessingConfig\x12\x14\n\x0cstt_provider\x18\x01 \x01(\t\x12\x11\n\tstt_model\x18\x02 \x01(\t\x12\x10\n\x08language\x18\x03 \x01(\t\x12\x14\n\x0cllm_provider\x18\x04 \x01(\t\x12\x11\n\tllm_model\x18\x05 \x01(\t\x12\x13\n\x0btemperature\x18\x06 \x01(\x02\x12\x12\n\nmax_tokens\x18\x07 \x01(\x05\x12\x15\n\rsystem_prompt\x18\x08 \x01(\t\x12\x12\n\nenable_tts\x18\t \x01(\x08\x12\x14\n\x0ctts_provider\x18\n \x01(\t\x12\x11\n\ttts_voice\x18\x0b \x01(\t\x12\x1c\n\x14\x65nable_partial_delta\x18\x0c \x01(\x08\x12\x1b\n\x13partial_interval_ms\x18\r \x01(\x05\x12\x1d\n\x15speculative_stable_ms\x18\x0e \x01(\x05\x12\x1b\n\x13\x65ndpoint_silence_ms\x18\x0f \x01(\x05\x12\x17\n\x0f\x65nable_barge_in\x18\x10 \x01(\x08\x12\x19\n\x11\x65nable_turn_merge\x18\x11 \x01(\x08\"\x85\x01\n\x12MultiModalResponse\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12*\n\x07outputs\x18\x02 \x03(\x0b\x32\x19.omniagent.ModalityOutput\x12/\n\x08metadata\x18\x03 \x01(\x0b\x32\x1d.omniagent.ProcessingMetadata\"k\n\x0eModalityOutput\x12%\n\x04text\x18\x01 \x01(\x0b\x32\x15.omniagent.TextOutputH\x00\x12\'\n\x05\x61udio\x18\x02 \x01(\x0b\x32\x16.omniagent.AudioOutputH\x00\x42\t\n\x07\x63ontent\"+\n\nTextOutput\x12\x0f\n\x07\x63ontent\x18\x01 \x01(\t\x12\x0c\n\x04role\x18\x02 \x01(\t\"@\n\x0b\x41udioOutput\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x0e\n\x06\x66ormat\x18\x02 \x01(\t\x12\x13\n\x0bsample_rate\x18\x03 \x01(\x05\"\xa6\x01\n\x12ProcessingMetadata\x12\x15\n\rfinish_reason\x18\x01 \x01(\t\x12\x15\n\rprompt_tokens\x18\x02 \x01(\x05\x12\x19\n\x11\x63ompletion_tokens\x18\x03 \x01(\x05\x12\x19\n\x11\x61udio_duration_ms\x18\x04 \x01(\x05\x12\x18\n\x10transcribed_text\x18\x05 \x01(\t\x12\x12\n\nlatency_ms\x18\x06 \x01(\x03\"\xb0\x01\n\x17MultiModalStreamRequest\x12,\n\x05start\x18\x01 \x01(\x0b\x32\x1b.omniagent.StreamStartFrameH\x00\x12,\n\x05\x61udio\x18\x02 \x01(\x0b\x32\x1b.omniagent.StreamAudioFrameH\x00\x12\x30\n\x07\x63ontrol\x18\x03 \x01(\x0b\x32\x1d.omniagent.StreamControlFrameH\x00\x42\x07\n\x05\x66rame\"\xb2\x01\n\x10StreamStartFrame\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12+\n\x06\x63onfig\x18\x02 \x01(\x0b\x32\x1b.omniagent.ProcessingConfig\x12\x30\n\x0einitial_inputs\x18\x03 \x03(\x0b\x32\x18.omniagent.ModalityInput\x12+\n\x0c\x61udio_format\x18\x04 \x01(\x0b\x32\x15.omniagent.AudioInput\"H\n\x10StreamAudioFrame\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x14\n\x0ctimestamp_ms\x18\x02 \x01(\x03\x12\x10\n\x08sequence\x18\x03 \x01(\x05\"\x8a\x01\n\x12StreamControlFrame\x12\x36\n\x07\x63ommand\x18\x01 \x01(\x0e\x32%.omniagent.StreamControlFrame.Command\"<\n\x07\x43ommand\x12\x0b\n\x07UNKNOWN\x10\x00\x12\t\n\x05\x46LUSH\x10\x01\x12\r\n\tEND_AUDIO\x10\x02\x12\n\n\x06\x43\x41NCEL\x10\x03\"\xb1\x02\n\x18MultiModalStreamResponse\x12,\n\x05ready\x18\x01 \x01(\x0b\x32\x1b.omniagent.StreamReadyFrameH\x00\x12(\n\x03stt\x18\x02 \x01(\x0b\x32\x19.omniagent.StreamSttFrameH\x00\x12(\n\x03llm\x18\x03 \x01(\x0b\x32\x19.omniagent.StreamLlmFrameH\x00\x12(\n\x03tts\x18\x04 \x01(\x0b\x32\x19.omniagent.StreamTtsFrameH\x00\x12\x32\n\x08\x63omplete\x18\x05 \x01(\x0b\x32\x1e.omniagent.StreamCompleteFrameH\x00\x12,\n\x05\x65rror\x18\x06 \x01(\x0b\x32\x1b.omniagent.StreamErrorFrameH\x00\x42\x07\n\x05\x66rame\"7\n\x10StreamReadyFrame\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"\x88\x01\n\x0eStreamSttFrame\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x10\n\x08is_final\x18\x02 \x01(\x08\x12\x12\n\nconfidence\x18\x03 \x01(\x02\x12\x19\n\x11stable_prefix_len\x18\x04 \x01(\x05\x12\x10\n\x08is_delta\x18\x05 \x01(\x08\x12\x15\n\ris_correction\x18\x06 \x01(\x08\".\n\x0eStreamLlmFrame\x12\r\n\x05\x64\x65lta\x18\x01 \x01(\t\x12\r\n\x05index\x18\x02 \x01(\x05\"0\n\x0eStreamTtsFrame\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x10\n\x08sequence\x18\x02 \x01(\x05\"]\n\x13StreamCompleteFrame\x12\x15\n\rfinish_reason\x18\x01 \x01(\t\x12/\n\x08metadata\x18\x02 \x01(\x0b\x32\x1d.omniagent.ProcessingMetadata\"F\n\x10StreamErrorFrame\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x13\n\x0brecoverable\x18\x03 \x01(\x08\x42\x1f\n\x1b\x63om.deepknow.omniagent.grpcP\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -43,39 +43,39 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_IMAGEINPUT']._serialized_start=458
   _globals['_IMAGEINPUT']._serialized_end=516
   _globals['_PROCESSINGCONFIG']._serialized_start=519
-  _globals['_PROCESSINGCONFIG']._serialized_end=762
-  _globals['_MULTIMODALRESPONSE']._serialized_start=765
-  _globals['_MULTIMODALRESPONSE']._serialized_end=898
-  _globals['_MODALITYOUTPUT']._serialized_start=900
-  _globals['_MODALITYOUTPUT']._serialized_end=1007
-  _globals['_TEXTOUTPUT']._serialized_start=1009
-  _globals['_TEXTOUTPUT']._serialized_end=1052
-  _globals['_AUDIOOUTPUT']._serialized_start=1054
-  _globals['_AUDIOOUTPUT']._serialized_end=1118
-  _globals['_PROCESSINGMETADATA']._serialized_start=1121
-  _globals['_PROCESSINGMETADATA']._serialized_end=1287
-  _globals['_MULTIMODALSTREAMREQUEST']._serialized_start=1290
-  _globals['_MULTIMODALSTREAMREQUEST']._serialized_end=1466
-  _globals['_STREAMSTARTFRAME']._serialized_start=1469
-  _globals['_STREAMSTARTFRAME']._serialized_end=1602
-  _globals['_STREAMAUDIOFRAME']._serialized_start=1604
-  _globals['_STREAMAUDIOFRAME']._serialized_end=1676
-  _globals['_STREAMCONTROLFRAME']._serialized_start=1679
-  _globals['_STREAMCONTROLFRAME']._serialized_end=1817
-  _globals['_STREAMCONTROLFRAME_COMMAND']._serialized_start=1757
-  _globals['_STREAMCONTROLFRAME_COMMAND']._serialized_end=1817
-  _globals['_MULTIMODALSTREAMRESPONSE']._serialized_start=1820
-  _globals['_MULTIMODALSTREAMRESPONSE']._serialized_end=2125
-  _globals['_STREAMREADYFRAME']._serialized_start=2127
-  _globals['_STREAMREADYFRAME']._serialized_end=2182
-  _globals['_STREAMSTTFRAME']._serialized_start=2184
-  _globals['_STREAMSTTFRAME']._serialized_end=2252
-  _globals['_STREAMLLMFRAME']._serialized_start=2254
-  _globals['_STREAMLLMFRAME']._serialized_end=2300
-  _globals['_STREAMTTSFRAME']._serialized_start=2302
-  _globals['_STREAMTTSFRAME']._serialized_end=2350
-  _globals['_STREAMCOMPLETEFRAME']._serialized_start=2352
-  _globals['_STREAMCOMPLETEFRAME']._serialized_end=2445
-  _globals['_STREAMERRORFRAME']._serialized_start=2447
-  _globals['_STREAMERRORFRAME']._serialized_end=2517
+  _globals['_PROCESSINGCONFIG']._serialized_end=933
+  _globals['_MULTIMODALRESPONSE']._serialized_start=936
+  _globals['_MULTIMODALRESPONSE']._serialized_end=1069
+  _globals['_MODALITYOUTPUT']._serialized_start=1071
+  _globals['_MODALITYOUTPUT']._serialized_end=1178
+  _globals['_TEXTOUTPUT']._serialized_start=1180
+  _globals['_TEXTOUTPUT']._serialized_end=1223
+  _globals['_AUDIOOUTPUT']._serialized_start=1225
+  _globals['_AUDIOOUTPUT']._serialized_end=1289
+  _globals['_PROCESSINGMETADATA']._serialized_start=1292
+  _globals['_PROCESSINGMETADATA']._serialized_end=1458
+  _globals['_MULTIMODALSTREAMREQUEST']._serialized_start=1461
+  _globals['_MULTIMODALSTREAMREQUEST']._serialized_end=1637
+  _globals['_STREAMSTARTFRAME']._serialized_start=1640
+  _globals['_STREAMSTARTFRAME']._serialized_end=1818
+  _globals['_STREAMAUDIOFRAME']._serialized_start=1820
+  _globals['_STREAMAUDIOFRAME']._serialized_end=1892
+  _globals['_STREAMCONTROLFRAME']._serialized_start=1895
+  _globals['_STREAMCONTROLFRAME']._serialized_end=2033
+  _globals['_STREAMCONTROLFRAME_COMMAND']._serialized_start=1973
+  _globals['_STREAMCONTROLFRAME_COMMAND']._serialized_end=2033
+  _globals['_MULTIMODALSTREAMRESPONSE']._serialized_start=2036
+  _globals['_MULTIMODALSTREAMRESPONSE']._serialized_end=2341
+  _globals['_STREAMREADYFRAME']._serialized_start=2343
+  _globals['_STREAMREADYFRAME']._serialized_end=2398
+  _globals['_STREAMSTTFRAME']._serialized_start=2401
+  _globals['_STREAMSTTFRAME']._serialized_end=2537
+  _globals['_STREAMLLMFRAME']._serialized_start=2539
+  _globals['_STREAMLLMFRAME']._serialized_end=2585
+  _globals['_STREAMTTSFRAME']._serialized_start=2587
+  _globals['_STREAMTTSFRAME']._serialized_end=2635
+  _globals['_STREAMCOMPLETEFRAME']._serialized_start=2637
+  _globals['_STREAMCOMPLETEFRAME']._serialized_end=2730
+  _globals['_STREAMERRORFRAME']._serialized_start=2732
+  _globals['_STREAMERRORFRAME']._serialized_end=2802
 # @@protoc_insertion_point(module_scope)
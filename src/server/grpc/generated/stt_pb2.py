@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tstt.proto\x12\tomniagent\"\x96\x01\n\nSttRequest\x12&\n\x06\x63onfig\x18\x01 \x01(\x0b\x32\x14.omniagent.SttConfigH\x00\x12&\n\x05\x61udio\x18\x02 \x01(\x0b\x32\x15.omniagent.AudioFrameH\x00\x12(\n\x07\x63ontrol\x18\x03 \x01(\x0b\x32\x15.omniagent.SttControlH\x00\x42\x0e\n\x0crequest_type\"\xe1\x01\n\tSttConfig\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x10\n\x08provider\x18\x02 \x01(\t\x12\r\n\x05model\x18\x03 \x01(\t\x12\x10\n\x08language\x18\x04 \x01(\t\x12\x13\n\x0bsample_rate\x18\x05 \x01(\x05\x12\x1a\n\x12\x65nable_punctuation\x18\x06 \x01(\x08\x12.\n\x05\x65xtra\x18\x07 \x03(\x0b\x32\x1f.omniagent.SttConfig.ExtraEntry\x1a,\n\nExtraEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"B\n\nAudioFrame\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x14\n\x0ctimestamp_ms\x18\x02 \x01(\x03\x12\x10\n\x08sequence\x18\x03 \x01(\x05\"t\n\nSttControl\x12.\n\x07\x63ommand\x18\x01 \x01(\x0e\x32\x1d.omniagent.SttControl.Command\"6\n\x07\x43ommand\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x07\n\x03\x45ND\x10\x01\x12\t\n\x05PAUSE\x10\x02\x12\n\n\x06RESUME\x10\x03\"\xbe\x01\n\x0bSttResponse\x12$\n\x05ready\x18\x01 \x01(\x0b\x32\x13.omniagent.SttReadyH\x00\x12&\n\x06result\x18\x02 \x01(\x0b\x32\x14.omniagent.SttResultH\x00\x12$\n\x05\x65rror\x18\x03 \x01(\x0b\x32\x13.omniagent.SttErrorH\x00\x12*\n\x08\x63omplete\x18\x04 \x01(\x0b\x32\x16.omniagent.SttCompleteH\x00\x42\x0f\n\rresponse_type\"/\n\x08SttReady\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"k\n\tSttResult\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x10\n\x08is_final\x18\x02 \x01(\x08\x12\x12\n\nconfidence\x18\x03 \x01(\x02\x12\x15\n\rstart_time_ms\x18\x04 \x01(\x03\x12\x13\n\x0b\x65nd_time_ms\x18\x05 \x01(\x03\")\n\x08SttError\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"J\n\x0bSttComplete\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x16\n\x0etotal_audio_ms\x18\x03 \x01(\x05\x42\x1f\n\x1b\x63om.deepknow.omniagent.grpcP\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tstt.proto\x12\tomniagent\"\x96\x01\n\nSttRequest\x12&\n\x06\x63onfig\x18\x01 \x01(\x0b\x32\x14.omniagent.SttConfigH\x00\x12&\n\x05\x61udio\x18\x02 \x01(\x0b\x32\x15.omniagent.AudioFrameH\x00\x12(\n\x07\x63ontrol\x18\x03 \x01(\x0b\x32\x15.omniagent.SttControlH\x00\x42\x0e\n\x0crequest_type\"\x9c\x02\n\tSttConfig\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x10\n\x08provider\x18\x02 \x01(\t\x12\r\n\x05model\x18\x03 \x01(\t\x12\x10\n\x08language\x18\x04 \x01(\t\x12\x13\n\x0bsample_rate\x18\x05 \x01(\x05\x12\x1a\n\x12\x65nable_punctuation\x18\x06 \x01(\x08\x12.\n\x05\x65xtra\x18\x07 \x03(\x0b\x32\x1f.omniagent.SttConfig.ExtraEntry\x12\x1c\n\x14\x65nable_partial_delta\x18\x08 \x01(\x08\x12\x1b\n\x13partial_interval_ms\x18\t \x01(\x05\x1a,\n\nExtraEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"B\n\nAudioFrame\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x14\n\x0ctimestamp_ms\x18\x02 \x01(\x03\x12\x10\n\x08sequence\x18\x03 \x01(\x05\"t\n\nSttControl\x12.\n\x07\x63ommand\x18\x01 \x01(\x0e\x32\x1d.omniagent.SttControl.Command\"6\n\x07\x43ommand\x12\x0b\n\x07UNKNOWN\x10\x00\x12\x07\n\x03\x45ND\x10\x01\x12\t\n\x05PAUSE\x10\x02\x12\n\n\x06RESUME\x10\x03\"\xbe\x01\n\x0bSttResponse\x12$\n\x05ready\x18\x01 \x01(\x0b\x32\x13.omniagent.SttReadyH\x00\x12&\n\x06result\x18\x02 \x01(\x0b\x32\x14.omniagent.SttResultH\x00\x12$\n\x05\x65rror\x18\x03 \x01(\x0b\x32\x13.omniagent.SttErrorH\x00\x12*\n\x08\x63omplete\x18\x04 \x01(\x0b\x32\x16.omniagent.SttCompleteH\x00\x42\x0f\n\rresponse_type\"/\n\x08SttReady\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\"\xaf\x01\n\tSttResult\x12\x0c\n\x04text\x18\x01 \x01(\t\x12\x10\n\x08is_final\x18\x02 \x01(\x08\x12\x12\n\nconfidence\x18\x03 \x01(\x02\x12\x15\n\rstart_time_ms\x18\x04 \x01(\x03\x12\x13\n\x0b\x65nd_time_ms\x18\x05 \x01(\x03\x12\x19\n\x11stable_prefix_len\x18\x06 \x01(\x05\x12\x10\n\x08is_delta\x18\x07 \x01(\x08\x12\x15\n\ris_correction\x18\x08 \x01(\x08\")\n\x08SttError\x12\x0c\n\x04\x63ode\x18\x01 \x01(\x05\x12\x0f\n\x07message\x18\x02 \x01(\t\"J\n\x0bSttComplete\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x16\n\x0etotal_audio_ms\x18\x03 \x01(\x05\x42\x1f\n\x1b\x63om.deepknow.omniagent.grpcP\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -37,23 +37,23 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_STTREQUEST']._serialized_start=25
   _globals['_STTREQUEST']._serialized_end=175
   _globals['_STTCONFIG']._serialized_start=178
-  _globals['_STTCONFIG']._serialized_end=403
-  _globals['_STTCONFIG_EXTRAENTRY']._serialized_start=359
-  _globals['_STTCONFIG_EXTRAENTRY']._serialized_end=403
-  _globals['_AUDIOFRAME']._serialized_start=405
-  _globals['_AUDIOFRAME']._serialized_end=471
-  _globals['_STTCONTROL']._serialized_start=473
-  _globals['_STTCONTROL']._serialized_end=589
-  _globals['_STTCONTROL_COMMAND']._serialized_start=535
-  _globals['_STTCONTROL_COMMAND']._serialized_end=589
-  _globals['_STTRESPONSE']._serialized_start=592
-  _globals['_STTRESPONSE']._serialized_end=782
-  _globals['_STTREADY']._serialized_start=784
-  _globals['_STTREADY']._serialized_end=831
-  _globals['_STTRESULT']._serialized_start=833
-  _globals['_STTRESULT']._serialized_end=940
-  _globals['_STTERROR']._serialized_start=942
-  _globals['_STTERROR']._serialized_end=983
-  _globals['_STTCOMPLETE']._serialized_start=985
-  _globals['_STTCOMPLETE']._serialized_end=1059
+  _globals['_STTCONFIG']._serialized_end=462
+  _globals['_STTCONFIG_EXTRAENTRY']._serialized_start=418
+  _globals['_STTCONFIG_EXTRAENTRY']._serialized_end=462
+  _globals['_AUDIOFRAME']._serialized_start=464
+  _globals['_AUDIOFRAME']._serialized_end=530
+  _globals['_STTCONTROL']._serialized_start=532
+  _globals['_STTCONTROL']._serialized_end=648
+  _globals['_STTCONTROL_COMMAND']._serialized_start=594
+  _globals['_STTCONTROL_COMMAND']._serialized_end=648
+  _globals['_STTRESPONSE']._serialized_start=651
+  _globals['_STTRESPONSE']._serialized_end=841
+  _globals['_STTREADY']._serialized_start=843
+  _globals['_STTREADY']._serialized_end=890
+  _globals['_STTRESULT']._serialized_start=893
+  _globals['_STTRESULT']._serialized_end=1068
+  _globals['_STTERROR']._serialized_start=1070
+  _globals['_STTERROR']._serialized_end=1111
+  _globals['_STTCOMPLETE']._serialized_start=1113
+  _globals['_STTCOMPLETE']._serialized_end=1187
 # @@protoc_insertion_point(module_scope)
@@ -37,7 +37,8 @@ class GrpcServer:
             OmniAgentServicer(), self.server
         )
         
-        self.server.add_insecure_port(f'[::]:{self.port}')
+        # port=0 时由系统分配端口，回写实际端口
+        self.port = self.server.add_insecure_port(f'[::]:{self.port}')
         await self.server.start()
         logger.info(f"gRPC server started on port {self.port}")
     
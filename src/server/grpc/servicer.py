@@ -3,13 +3,18 @@ Omni-Agent gRPC Servicer 实现
 """
 import asyncio
 import uuid
+from contextlib import aclosing
 from typing import AsyncIterator
 
-from ...infra import get_logger, generate_trace_id
-from ...reasoning.llm.base import Message, MessageRole, LlmConfig
+from ...infra import get_logger, generate_trace_id, multiplex
+from ...reasoning.llm.base import Message, MessageRole, LlmConfig, LlmPriority
+from ...reasoning.llm.limiter import RateLimitExceeded
+from ...reasoning.context_window import get_context_window
 
 logger = get_logger(__name__)
 
+# 与 HTTP ErrorCode.RATE_LIMIT 保持一致
+RATE_LIMIT_CODE = 3001
 
 
 def _convert_messages(messages: list) -> list:
@@ -38,40 +43,63 @@ class OmniAgentServicer:
         客户端发送音频帧，服务端返回识别结果
         """
         from .generated import stt_pb2
-        from ...perception.stt.aliyun import AliyunSttService
+        from ...perception.stt import SttRegistry
+        from ...perception.audio import AudioFormat, AudioIngest, TARGET_SAMPLE_RATE
+        from ...perception.jitter import JitterBuffer
+        from ...perception.stt.stabilizer import PartialStabilizer
+        
+        from ...perception.channel import EventChannel
         
         trace_id = generate_trace_id()
         session_id = None
         stt_service = None
-        result_queue: asyncio.Queue = asyncio.Queue()
+        ingest = None
+        jitter = None
+        stabilizer = None
+        # STT 回调来自 SDK 线程，经通道线程安全地转入事件循环
+        result_queue = EventChannel(name="grpc_stream_stt")
         
         def on_partial(result):
             """处理中间识别结果"""
-            result_queue.put_nowait(stt_pb2.SttResponse(
+            if stabilizer:
+                result = stabilizer.partial(result)
+                if result is None:
+                    return
+            send_partial(result)
+        
+        def send_partial(result):
+            """下发中间结果（节流到期的补发也经此下发）"""
+            result_queue.put(stt_pb2.SttResponse(
                 result=stt_pb2.SttResult(
                     text=result.text,
                     is_final=False,
                     confidence=result.confidence or 0.0,
                     start_time_ms=result.start_time_ms or 0,
                     end_time_ms=result.end_time_ms or 0,
+                    stable_prefix_len=result.stable_prefix_len,
+                    is_delta=result.is_delta,
                 )
-            ))
+            ), partial=not result.is_delta)  # 增量帧不能被合并或丢弃
         
         def on_final(result):
             """处理最终识别结果"""
-            result_queue.put_nowait(stt_pb2.SttResponse(
+            if stabilizer:
+                result = stabilizer.final(result)
+            result_queue.put(stt_pb2.SttResponse(
                 result=stt_pb2.SttResult(
                     text=result.text,
                     is_final=True,
                     confidence=result.confidence or 0.0,
                     start_time_ms=result.start_time_ms or 0,
                     end_time_ms=result.end_time_ms or 0,
+                    stable_prefix_len=result.stable_prefix_len,
+                    is_correction=result.is_correction,
                 )
             ))
         
         def on_ready():
             """STT 准备就绪"""
-            result_queue.put_nowait(stt_pb2.SttResponse(
+            result_queue.put(stt_pb2.SttResponse(
                 ready=stt_pb2.SttReady(
                     session_id=session_id,
                     message="STT ready"
@@ -80,28 +108,30 @@ class OmniAgentServicer:
         
         def on_error(error):
             """处理错误"""
-            result_queue.put_nowait(stt_pb2.SttResponse(
+            result_queue.put(stt_pb2.SttResponse(
                 error=stt_pb2.SttError(
                     code=5000,
                     message=str(error)
                 )
             ))
         
-        # 结果发送协程
-        async def result_sender():
-            """异步发送结果到客户端"""
-            while True:
-                try:
-                    response = await asyncio.wait_for(result_queue.get(), timeout=0.05)
-                    yield response
-                except asyncio.TimeoutError:
-                    yield None  # 超时返回 None，继续循环
-                except asyncio.CancelledError:
-                    break
+        async def forward_audio(data):
+            """抖动缓冲按序放行的音频：转换为 16kHz 单声道并重组为 100ms 帧后送入 STT"""
+            if stt_service:
+                for frame in ingest.push(data):
+                    await stt_service.send_audio(frame)
         
-        sender = result_sender()
+        async def drain_audio():
+            """放行抖动缓冲与分帧缓冲中剩余的音频"""
+            await jitter.flush()
+            if stt_service:
+                for frame in ingest.flush():
+                    await stt_service.send_audio(frame)
         
-        try:
+        async def request_processor():
+            """处理输入请求的协程"""
+            nonlocal session_id, stt_service, ingest, jitter, stabilizer
+            
             async for request in request_iterator:
                 # 处理配置请求
                 if request.HasField('config'):
@@ -116,24 +146,36 @@ class OmniAgentServicer:
                     
                     # 创建 STT 服务并注册回调
                     from ...perception.stt.base import SttConfig
-                    stt_service = AliyunSttService()
+                    stt_service = SttRegistry.get_service(config.provider or "aliyun")
                     stt_service.on_partial(on_partial)
                     stt_service.on_final(on_final)
                     stt_service.on_ready(on_ready)
                     stt_service.on_error(on_error)
                     
+                    # 客户端音频统一转换为 16kHz 单声道 PCM，格式提示放在 extra 中
+                    ingest = AudioIngest(AudioFormat.from_hints(
+                        encoding=config.extra.get('format'),
+                        sample_rate=config.sample_rate,
+                        channels=config.extra.get('channels'),
+                        bits_per_sample=config.extra.get('bits_per_sample'),
+                    ))
+                    # 按序列号重排乱序 / 重复的音频帧
+                    jitter = JitterBuffer(forward_audio, name="stream_stt")
                     stt_config = SttConfig(
                         model=config.model or 'paraformer-realtime-v2',
                         language=config.language or 'zh-CN',
-                        sample_rate=config.sample_rate or 16000,
+                        sample_rate=TARGET_SAMPLE_RATE,
                         enable_punctuation=config.enable_punctuation,
+                        enable_partial_delta=config.enable_partial_delta,
+                        partial_interval_ms=config.partial_interval_ms,
                     )
+                    stabilizer = PartialStabilizer.from_config(stt_config, name="stream_stt", on_trailing=send_partial)
                     await stt_service.start_session(session_id, stt_config)
                 
                 # 处理音频帧
                 elif request.HasField('audio'):
                     if stt_service:
-                        await stt_service.send_audio(request.audio.data)
+                        await jitter.push(request.audio.sequence, request.audio.data)
                 
                 # 处理控制命令
                 elif request.HasField('control'):
@@ -143,24 +185,25 @@ class OmniAgentServicer:
                     if cmd == SttControl.END:
                         logger.info(f"STT stream ending | session_id={session_id}")
                         if stt_service:
+                            await drain_audio()
                             await stt_service.stop_session()
                         
-                        # 发送完成消息
-                        yield stt_pb2.SttResponse(
+                        # 发送完成消息（排在所有识别结果之后）
+                        result_queue.put(stt_pb2.SttResponse(
                             complete=stt_pb2.SttComplete(
                                 session_id=session_id,
                                 message="STT complete"
                             )
-                        )
-                        break
-                
-                # 检查并发送待处理的结果
-                while not result_queue.empty():
-                    try:
-                        response = result_queue.get_nowait()
-                        yield response
-                    except asyncio.QueueEmpty:
-                        break
+                        ))
+                        return
+        
+        request_task = asyncio.create_task(request_processor())
+        
+        try:
+            # 识别结果到达即发送，请求处理结束且结果读空后退出
+            async with aclosing(multiplex(result_queue, request_task)) as responses:
+                async for response in responses:
+                    yield response
         
         except Exception as e:
             logger.error(f"STT stream error | session_id={session_id}", exc_info=e)
@@ -172,11 +215,22 @@ class OmniAgentServicer:
             )
         
         finally:
+            if not request_task.done():
+                request_task.cancel()
+                try:
+                    await request_task
+                except (asyncio.CancelledError, Exception):
+                    pass
+            if jitter:
+                jitter.close()
+            result_queue.close()
             if stt_service:
                 try:
                     await stt_service.stop_session()
                 except Exception as e:
                     logger.warning(f"Error stopping STT session | session_id={session_id}", exc_info=e)
+            if stabilizer:
+                stabilizer.close()
             logger.info(f"STT stream closed | session_id={session_id}")
     
     async def StreamChat(
@@ -189,7 +243,7 @@ class OmniAgentServicer:
         客户端发送问题，服务端流式返回答案
         """
         from .generated import llm_pb2
-        from ...reasoning.llm.qwen import QwenLlmService
+        from ...reasoning.llm import LlmRegistry
         
         session_id = request.session_id or f"chat_{uuid.uuid4().hex[:12]}"
         
@@ -215,10 +269,14 @@ class OmniAgentServicer:
                 model=request.model or "qwen-turbo",
                 temperature=request.temperature or 0.7,
                 max_tokens=request.max_tokens or 2048,
+                priority=LlmPriority.INTERACTIVE,
             )
             
-            # 创建 LLM 服务并调用
-            llm_service = QwenLlmService()
+            # 获取 LLM 服务并调用
+            llm_service = LlmRegistry.get_service(request.provider or "qwen")
+            window = get_context_window(llm_config.model, llm_service)
+            if window:
+                typed_messages = window.fit_messages(typed_messages)
             index = 0
             
             async for chunk in llm_service.chat_stream(typed_messages, llm_config):
@@ -245,7 +303,7 @@ class OmniAgentServicer:
             logger.error(f"Chat stream error | session_id={session_id}", exc_info=e)
             yield llm_pb2.ChatResponse(
                 error=llm_pb2.ChatError(
-                    code=5000,
+                    code=RATE_LIMIT_CODE if isinstance(e, RateLimitExceeded) else 5000,
                     message=str(e)
                 )
             )
@@ -259,8 +317,7 @@ class OmniAgentServicer:
         支持 text + audio + image 组合输入
         """
         from .generated import multimodal_pb2
-        from ...perception.stt.aliyun import AliyunSttService
-        from ...reasoning.llm.qwen import QwenLlmService
+        from ...reasoning.llm import LlmRegistry
         import time
         
         start_time = time.time()
@@ -274,6 +331,7 @@ class OmniAgentServicer:
             text_inputs = []
             audio_inputs = []
             transcribed_text = ""
+            audio_duration_ms = 0
             
             for inp in request.inputs:
                 if inp.HasField('text'):
@@ -286,21 +344,24 @@ class OmniAgentServicer:
             
             # 2. 处理音频输入（STT）
             if audio_inputs:
-                stt_service = AliyunSttService()
                 from ...perception.stt.base import SttConfig
+                from ...perception.stt.batch import BatchTranscriber
+                from ...perception.audio import AudioFormat, normalize_audio, TARGET_SAMPLE_RATE
                 
                 stt_config = SttConfig(
                     model=config.stt_model or 'paraformer-realtime-v2',
                     language=config.language or 'zh-CN',
-                    sample_rate=16000,
+                    sample_rate=TARGET_SAMPLE_RATE,
                     enable_punctuation=True,
                 )
                 
-                # 合并所有音频数据
-                all_audio = b''.join([a.data for a in audio_inputs])
+                # 各段音频按各自声明的格式转换为 16kHz 单声道 PCM 后合并
+                all_audio = b''.join([normalize_audio(a.data, AudioFormat.from_proto(a)) for a in audio_inputs])
                 
-                # 单次识别
-                transcribed_text = await stt_service.transcribe_once(all_audio, stt_config)
+                # 非实时批量识别：长音频在静音处切分后并发识别
+                transcript = await BatchTranscriber(config.stt_provider or "aliyun").transcribe(all_audio, stt_config)
+                transcribed_text = transcript.text
+                audio_duration_ms = transcript.audio_ms
                 logger.info(f"STT result | session_id={session_id} text={transcribed_text[:50]}...")
                 
                 # 将转写结果添加到消息中
@@ -330,9 +391,10 @@ class OmniAgentServicer:
                 model=config.llm_model or "qwen-turbo",
                 temperature=config.temperature or 0.7,
                 max_tokens=config.max_tokens or 2048,
+                priority=LlmPriority.BATCH,
             )
             
-            llm_service = QwenLlmService()
+            llm_service = LlmRegistry.get_service(config.llm_provider or "qwen")
             full_response = ""
             
             async for chunk in llm_service.chat_stream(typed_messages, llm_config):
@@ -356,6 +418,7 @@ class OmniAgentServicer:
                     finish_reason="stop",
                     prompt_tokens=0,  # TODO: 从 LLM 响应中获取实际值
                     completion_tokens=0,  # TODO: 从 LLM 响应中获取实际值
+                    audio_duration_ms=audio_duration_ms,
                     transcribed_text=transcribed_text,
                     latency_ms=latency_ms
                 )
@@ -367,7 +430,7 @@ class OmniAgentServicer:
                 session_id=session_id,
                 outputs=[],
                 metadata=multimodal_pb2.ProcessingMetadata(
-                    finish_reason="error",
+                    finish_reason="rate_limited" if isinstance(e, RateLimitExceeded) else "error",
                     latency_ms=int((time.time() - start_time) * 1000)
                 )
             )
@@ -384,9 +447,18 @@ class OmniAgentServicer:
         使用并行任务架构确保 LLM 能及时响应。
         """
         from .generated import multimodal_pb2
-        from ...perception.stt.aliyun import AliyunSttService
-        from ...reasoning.llm.qwen import QwenLlmService
+        from ...perception.stt import SttRegistry
+        from ...reasoning.llm import LlmRegistry
         from ...perception.stt.base import SttConfig
+        from ...perception.audio import AudioFormat, AudioIngest, TARGET_SAMPLE_RATE
+        from ...perception.jitter import JitterBuffer
+        from ...perception.stt.stabilizer import PartialStabilizer
+        from ...perception.channel import EventChannel
+        from ...orchestrator.speculation import SpeculativeGenerator
+        from ...orchestrator.endpointing import create_endpointer
+        from ...orchestrator.turns import TurnScheduler
+        from ...orchestrator.conversation import ConversationLog
+        import os
         import time
         
         start_time = time.time()
@@ -394,14 +466,21 @@ class OmniAgentServicer:
         config = None
         initial_inputs = []
         stt_service = None
+        ingest = None
+        jitter = None
+        stabilizer = None
+        speculator = None
+        endpointer = None
+        scheduler = None
         stream_ended = False
         
         # 统一的输出队列 - 所有响应都通过这个队列返回
-        output_queue: asyncio.Queue = asyncio.Queue()
+        # STT 回调来自 SDK 线程，经通道线程安全地转入事件循环
+        output_queue = EventChannel(capacity=1024, name="process_stream")
         # 待处理的 STT 句子队列
-        pending_sentences: asyncio.Queue = asyncio.Queue()
-        # 对话历史
-        conversation_history = []
+        pending_sentences = EventChannel(merge_partials=False, name="process_stream_sentences")
+        # 对话历史（只追加日志，构建请求时取快照，不复制历史消息）
+        conversation = ConversationLog()
         # 回答计数
         answer_index = 0
         # LLM 生成任务
@@ -409,31 +488,57 @@ class OmniAgentServicer:
         
         def on_partial(result):
             """STT 中间结果"""
-            output_queue.put_nowait(multimodal_pb2.MultiModalStreamResponse(
+            if speculator:
+                speculator.observe_partial(result.text)
+            if endpointer:
+                endpointer.observe_partial(result.text)
+            if stabilizer:
+                result = stabilizer.partial(result)
+                if result is None:
+                    return
+            send_partial(result)
+        
+        def send_partial(result):
+            """下发中间结果（节流到期的补发也经此下发）"""
+            output_queue.put(multimodal_pb2.MultiModalStreamResponse(
                 stt=multimodal_pb2.StreamSttFrame(
                     text=result.text,
                     is_final=False,
-                    confidence=result.confidence or 0.0
+                    confidence=result.confidence or 0.0,
+                    stable_prefix_len=result.stable_prefix_len,
+                    is_delta=result.is_delta
                 )
-            ))
+            ), partial=not result.is_delta)  # 增量帧不能被合并或丢弃
         
         def on_final(result):
             """STT 最终结果 - 句子结束，加入待处理队列"""
-            output_queue.put_nowait(multimodal_pb2.MultiModalStreamResponse(
+            if endpointer:
+                endpointer.observe_final(result.text)
+            if stabilizer:
+                result = stabilizer.final(result)
+            output_queue.put(multimodal_pb2.MultiModalStreamResponse(
                 stt=multimodal_pb2.StreamSttFrame(
                     text=result.text,
                     is_final=True,
-                    confidence=result.confidence or 0.0
+                    confidence=result.confidence or 0.0,
+                    stable_prefix_len=result.stable_prefix_len,
+                    is_correction=result.is_correction
                 )
             ))
+            if result.is_correction:
+                # 该句已按提前结束的文本排队回答，修正只下发给客户端，不重复生成
+                logger.info(f"Sentence corrected by provider | session_id={session_id} text='{result.text[:30]}...'")
+                return
             # 将完整句子放入待处理队列，触发 LLM 生成
             if result.text.strip():
+                if speculator:
+                    speculator.observe_final(result.text)
                 logger.info(f"Sentence completed, queuing for LLM | session_id={session_id} text='{result.text[:30]}...'")
-                pending_sentences.put_nowait(result.text.strip())
+                pending_sentences.put(result.text.strip())
         
         def on_error(error):
             """STT 错误"""
-            output_queue.put_nowait(multimodal_pb2.MultiModalStreamResponse(
+            output_queue.put(multimodal_pb2.MultiModalStreamResponse(
                 error=multimodal_pb2.StreamErrorFrame(
                     code=5000,
                     message=str(error),
@@ -441,85 +546,138 @@ class OmniAgentServicer:
                 )
             ))
         
-        async def llm_worker():
-            """后台任务：监听句子队列并生成回答"""
-            nonlocal answer_index, conversation_history
+        async def open_stream(sentence, priority=LlmPriority.INTERACTIVE):
+            """以当前对话历史为上下文调用 LLM，产出增量文本"""
+            # 构建消息
+            messages = []
+            if config and config.system_prompt:
+                messages.append({"role": "system", "content": config.system_prompt})
+            messages.extend(conversation.view())
+            messages.append({"role": "user", "content": sentence})
             
-            while not stream_ended or not pending_sentences.empty():
-                try:
-                    # 等待新句子，超时后检查是否结束
-                    try:
-                        sentence = await asyncio.wait_for(pending_sentences.get(), timeout=0.1)
-                    except asyncio.TimeoutError:
-                        continue
-                    
-                    logger.info(f"LLM worker processing | session_id={session_id} sentence='{sentence[:30]}...' answer_idx={answer_index}")
-                    
-                    # 构建消息
-                    messages = []
-                    if config and config.system_prompt:
-                        messages.append({"role": "system", "content": config.system_prompt})
-                    messages.extend(conversation_history)
-                    messages.append({"role": "user", "content": sentence})
-                    
-                    # 调用 LLM
-                    typed_messages = _convert_messages(messages)
-                    llm_config = LlmConfig(
-                        model=config.llm_model or "qwen-turbo" if config else "qwen-turbo",
-                        temperature=config.temperature or 0.7 if config else 0.7,
-                        max_tokens=config.max_tokens or 2048 if config else 2048,
+            # 调用 LLM
+            llm_config = LlmConfig(
+                model=config.llm_model or "qwen-turbo" if config else "qwen-turbo",
+                temperature=config.temperature or 0.7 if config else 0.7,
+                max_tokens=config.max_tokens or 2048 if config else 2048,
+                priority=priority,
+            )
+            
+            llm_service = LlmRegistry.get_service(config.llm_provider or "qwen" if config else "qwen")
+            # 按模型的 token 预算裁剪历史（对话日志本身保持完整）
+            window = get_context_window(llm_config.model, llm_service)
+            if window:
+                messages = window.fit(messages)
+            typed_messages = _convert_messages(messages)
+            async for chunk in llm_service.chat_stream(typed_messages, llm_config):
+                if chunk.delta:
+                    yield chunk.delta
+        
+        def open_speculative_stream(sentence):
+            """推测生成让位于已确认的对话轮次"""
+            return open_stream(sentence, priority=LlmPriority.NORMAL)
+        
+        async def answer(turn):
+            """生成一个轮次的回答（排队期间到达的句子合并为一个轮次）"""
+            nonlocal answer_index
+            sentence = turn.text
+            # 中间结果稳定期间已按同一文本开始的推测生成直接提交
+            speculation = speculator.claim_turn(turn.fresh, merged=turn.merged) if speculator else None
+            try:
+                logger.info(f"LLM worker processing | session_id={session_id} sentence='{sentence[:30]}...' answer_idx={answer_index} sentences={len(turn.sentences)} speculative={speculation is not None}")
+                
+                full_response = ""
+                token_index = 0
+                
+                deltas = speculation.stream() if speculation else open_stream(sentence)
+                async with aclosing(deltas):
+                    async for delta in deltas:
+                        full_response += delta
+                        output_queue.put(multimodal_pb2.MultiModalStreamResponse(
+                            llm=multimodal_pb2.StreamLlmFrame(
+                                delta=delta,
+                                index=token_index
+                            )
+                        ))
+                        token_index += 1
+                
+                # 更新对话历史
+                conversation.append("user", sentence)
+                conversation.append("assistant", full_response)
+                
+                # 发送本轮回答完成事件
+                output_queue.put(multimodal_pb2.MultiModalStreamResponse(
+                    complete=multimodal_pb2.StreamCompleteFrame(
+                        finish_reason="sentence_complete",
+                        metadata=multimodal_pb2.ProcessingMetadata(
+                            transcribed_text=sentence,
+                            latency_ms=int((time.time() - start_time) * 1000)
+                        )
                     )
-                    
-                    llm_service = QwenLlmService()
-                    full_response = ""
-                    token_index = 0
-                    
-                    async for chunk in llm_service.chat_stream(typed_messages, llm_config):
-                        if chunk.delta:
-                            full_response += chunk.delta
-                            output_queue.put_nowait(multimodal_pb2.MultiModalStreamResponse(
-                                llm=multimodal_pb2.StreamLlmFrame(
-                                    delta=chunk.delta,
-                                    index=token_index
-                                )
-                            ))
-                            token_index += 1
-                    
-                    # 更新对话历史
-                    conversation_history.append({"role": "user", "content": sentence})
-                    conversation_history.append({"role": "assistant", "content": full_response})
-                    
-                    # 发送本轮回答完成事件
-                    output_queue.put_nowait(multimodal_pb2.MultiModalStreamResponse(
+                ))
+                
+                answer_index += 1
+                logger.info(f"LLM worker completed | session_id={session_id} answer_idx={answer_index-1} response_len={len(full_response)}")
+                
+            except asyncio.CancelledError:
+                if turn.interrupted:
+                    # 被新句子打断：已下发的部分回答作废（不计入对话历史），与新句子合并后重新生成
+                    logger.info(f"LLM worker interrupted | session_id={session_id} answer_idx={answer_index}")
+                    output_queue.put(multimodal_pb2.MultiModalStreamResponse(
                         complete=multimodal_pb2.StreamCompleteFrame(
-                            finish_reason="sentence_complete",
+                            finish_reason="interrupted",
                             metadata=multimodal_pb2.ProcessingMetadata(
                                 transcribed_text=sentence,
                                 latency_ms=int((time.time() - start_time) * 1000)
                             )
                         )
                     ))
-                    
-                    answer_index += 1
-                    logger.info(f"LLM worker completed | session_id={session_id} answer_idx={answer_index-1} response_len={len(full_response)}")
-                    
-                except asyncio.CancelledError:
-                    break
-                except Exception as e:
-                    logger.error(f"LLM worker error | session_id={session_id}", exc_info=e)
-                    output_queue.put_nowait(multimodal_pb2.MultiModalStreamResponse(
-                        error=multimodal_pb2.StreamErrorFrame(
-                            code=5001,
-                            message=f"LLM generation failed: {str(e)}",
-                            recoverable=True
-                        )
-                    ))
+                raise
+            except Exception as e:
+                logger.error(f"LLM worker error | session_id={session_id}", exc_info=e)
+                output_queue.put(multimodal_pb2.MultiModalStreamResponse(
+                    error=multimodal_pb2.StreamErrorFrame(
+                        code=RATE_LIMIT_CODE if isinstance(e, RateLimitExceeded) else 5001,
+                        message=f"LLM generation failed: {str(e)}",
+                        recoverable=True
+                    )
+                ))
+            finally:
+                if speculator:
+                    speculator.release()
+        
+        async def llm_worker():
+            """后台任务：按轮次生成回答，句子队列关闭（END_AUDIO）且处理完后退出"""
+            try:
+                await scheduler.run(answer)
+            except asyncio.CancelledError:
+                pass
             
             logger.info(f"LLM worker exiting | session_id={session_id}")
         
+        async def forward_audio(data):
+            """抖动缓冲按序放行的音频：转换为 16kHz 单声道并重组为 100ms 帧后送入 STT"""
+            if stt_service:
+                for frame in ingest.push(data):
+                    await stt_service.send_audio(frame)
+                    if endpointer:
+                        await endpointer.push_audio(frame)
+        
+        async def end_sentence():
+            """本地断句：立即结束当前句"""
+            if stt_service:
+                await stt_service.flush()
+        
+        async def drain_audio():
+            """放行抖动缓冲与分帧缓冲中剩余的音频"""
+            await jitter.flush()
+            if stt_service:
+                for frame in ingest.flush():
+                    await stt_service.send_audio(frame)
+        
         async def request_processor():
             """处理输入请求的协程"""
-            nonlocal session_id, config, initial_inputs, stt_service, stream_ended, llm_worker_task
+            nonlocal session_id, config, initial_inputs, stt_service, ingest, jitter, stabilizer, speculator, endpointer, scheduler, stream_ended, llm_worker_task
             
             async for request in request_iterator:
                 # 处理开始帧
@@ -532,24 +690,46 @@ class OmniAgentServicer:
                     logger.info(f"ProcessStream started (auto-trigger mode) | session_id={session_id}")
                     
                     # 创建 STT 服务
-                    stt_service = AliyunSttService()
+                    stt_service = SttRegistry.get_service(config.stt_provider or "aliyun")
                     stt_service.on_partial(on_partial)
                     stt_service.on_final(on_final)
                     stt_service.on_error(on_error)
                     
+                    # 客户端音频统一转换为 16kHz 单声道 PCM
+                    ingest = AudioIngest(AudioFormat.from_proto(start_frame.audio_format))
+                    # 按序列号重排乱序 / 重复的音频帧
+                    jitter = JitterBuffer(forward_audio, name="process_stream")
                     stt_config = SttConfig(
                         model=config.stt_model or 'paraformer-realtime-v2',
                         language=config.language or 'zh-CN',
-                        sample_rate=16000,
+                        sample_rate=TARGET_SAMPLE_RATE,
                         enable_punctuation=True,
+                        enable_partial_delta=config.enable_partial_delta,
+                        partial_interval_ms=config.partial_interval_ms,
                     )
+                    stabilizer = PartialStabilizer.from_config(stt_config, name="process_stream", on_trailing=send_partial)
+                    # 推测生成：中间结果稳定后提前调用 LLM（<0 关闭，0 使用服务端默认）
+                    stable_ms = config.speculative_stable_ms or int(os.getenv('LLM_SPECULATIVE_STABLE_MS', '0'))
+                    if stable_ms > 0:
+                        speculator = SpeculativeGenerator(open_speculative_stream, stable_ms, name="process_stream")
+                    # 本地断句：静音、中间结果稳定与标点判定句子结束后立即 flush（<0 关闭，0 使用服务端默认）
+                    silence_ms = config.endpoint_silence_ms or int(os.getenv('STT_ENDPOINT_SILENCE_MS', '0'))
+                    endpointer = create_endpointer(end_sentence, stt_config, silence_ms, name="process_stream")
                     await stt_service.start_session(session_id, stt_config)
                     
+                    # 对话轮次：合并模式下生成期间到达的句子合并为一个轮次（默认逐句回答）；打断模式下新句子取消进行中的生成
+                    scheduler = TurnScheduler(
+                        pending_sentences,
+                        merge=config.enable_turn_merge or os.getenv('LLM_TURN_MERGE_ENABLED', 'false').lower() == 'true',
+                        barge_in=config.enable_barge_in or os.getenv('LLM_BARGE_IN_ENABLED', 'false').lower() == 'true',
+                        name="process_stream",
+                    )
+                    
                     # 启动 LLM 后台工作任务
                     llm_worker_task = asyncio.create_task(llm_worker())
                     
                     # 发送就绪事件
-                    output_queue.put_nowait(multimodal_pb2.MultiModalStreamResponse(
+                    output_queue.put(multimodal_pb2.MultiModalStreamResponse(
                         ready=multimodal_pb2.StreamReadyFrame(
                             session_id=session_id,
                             message="Ready for audio (auto-trigger mode)"
@@ -559,7 +739,7 @@ class OmniAgentServicer:
                 # 处理音频帧
                 elif request.HasField('audio'):
                     if stt_service:
-                        await stt_service.send_audio(request.audio.data)
+                        await jitter.push(request.audio.sequence, request.audio.data)
                 
                 # 处理控制帧
                 elif request.HasField('control'):
@@ -567,6 +747,7 @@ class OmniAgentServicer:
                     
                     if cmd == multimodal_pb2.StreamControlFrame.FLUSH:
                         if stt_service:
+                            await drain_audio()
                             await stt_service.flush()
                     
                     elif cmd == multimodal_pb2.StreamControlFrame.END_AUDIO:
@@ -574,8 +755,11 @@ class OmniAgentServicer:
                         stream_ended = True
                         
                         if stt_service:
+                            await drain_audio()
                             await stt_service.stop_session()
                             stt_service = None
+                        # 不再有新句子，LLM 工作任务处理完剩余句子后退出
+                        pending_sentences.close()
                         
                         # 等待 LLM 工作任务完成
                         if llm_worker_task:
@@ -586,7 +770,7 @@ class OmniAgentServicer:
                                 llm_worker_task.cancel()
                         
                         # 发送最终完成事件
-                        output_queue.put_nowait(multimodal_pb2.MultiModalStreamResponse(
+                        output_queue.put(multimodal_pb2.MultiModalStreamResponse(
                             complete=multimodal_pb2.StreamCompleteFrame(
                                 finish_reason="stop",
                                 metadata=multimodal_pb2.ProcessingMetadata(
@@ -607,27 +791,10 @@ class OmniAgentServicer:
             # 启动请求处理任务
             request_task = asyncio.create_task(request_processor())
             
-            # 同时监听输出队列和请求处理任务
-            while not stream_ended or not output_queue.empty():
-                # 使用 wait_for 来定期检查输出队列
-                try:
-                    response = await asyncio.wait_for(output_queue.get(), timeout=0.05)
+            # 同时监听输出队列和请求处理任务：有输出即发送，请求处理结束且输出读空后退出
+            async with aclosing(multiplex(output_queue, request_task)) as responses:
+                async for response in responses:
                     yield response
-                except asyncio.TimeoutError:
-                    # 检查请求处理是否已完成
-                    if request_task.done():
-                        # 如果有异常，抛出
-                        if request_task.exception():
-                            raise request_task.exception()
-                        # 输出剩余的响应
-                        while not output_queue.empty():
-                            try:
-                                response = output_queue.get_nowait()
-                                yield response
-                            except asyncio.QueueEmpty:
-                                break
-                        break
-                    continue
         
         except Exception as e:
             logger.error(f"ProcessStream error | session_id={session_id}", exc_info=e)
@@ -654,11 +821,23 @@ class OmniAgentServicer:
                     await request_task
                 except asyncio.CancelledError:
                     pass
+            if jitter:
+                jitter.close()
             if stt_service:
                 try:
                     await stt_service.stop_session()
                 except Exception:
                     pass
+            output_queue.close()
+            pending_sentences.close()
+            if stabilizer:
+                stabilizer.close()
+            if speculator:
+                speculator.close()
+            if endpointer:
+                endpointer.close()
+            if scheduler:
+                scheduler.close()
             logger.info(f"ProcessStream closed | session_id={session_id} total_answers={answer_index}")
     
     async def HealthCheck(self, request, context):
@@ -10,7 +10,8 @@ from pydantic import BaseModel, Field
 
 from ...response import success, error, session_not_found, ErrorCode
 from .....orchestrator import get_session_manager
-from .....reasoning.llm import LlmRegistry, Message, MessageRole, LlmConfig
+from .....reasoning.llm import LlmRegistry, Message, MessageRole, LlmConfig, RateLimitExceeded
+from .....reasoning.context_window import get_context_window
 from .....infra import get_logger, log_context, generate_trace_id
 
 logger = get_logger(__name__)
@@ -73,6 +74,11 @@ async def chat(
                 if 'max_tokens' in request.config:
                     llm_config.max_tokens = request.config['max_tokens']
             
+            # 按模型的 token 预算裁剪历史
+            window = get_context_window(llm_config.model, llm_service)
+            if window:
+                llm_messages = window.fit_messages(llm_messages)
+            
             # 调用 LLM
             response = await llm_service.chat(llm_messages, llm_config)
             session.stats.llm_requests += 1
@@ -89,6 +95,12 @@ async def chat(
                 trace_id=trace_id
             ).to_json_response()
             
+        except RateLimitExceeded as e:
+            return error(
+                ErrorCode.RATE_LIMIT,
+                str(e),
+                trace_id=trace_id
+            ).to_json_response()
         except ValueError as e:
             if "not found" in str(e).lower():
                 return session_not_found(x_session_id, trace_id).to_json_response()
@@ -154,6 +166,11 @@ async def chat_stream(
                     if 'max_tokens' in request.config:
                         llm_config.max_tokens = request.config['max_tokens']
                 
+                # 按模型的 token 预算裁剪历史
+                window = get_context_window(llm_config.model, llm_service)
+                if window:
+                    llm_messages = window.fit_messages(llm_messages)
+                
                 # 流式调用
                 async for chunk in llm_service.chat_stream(llm_messages, llm_config):
                     if chunk.delta:
@@ -166,6 +183,9 @@ async def chat_stream(
                 
                 session.stats.llm_requests += 1
                 
+            except RateLimitExceeded as e:
+                data = json.dumps({"code": int(ErrorCode.RATE_LIMIT), "message": str(e)}, ensure_ascii=False)
+                yield f"event: error\ndata: {data}\n\n"
             except ValueError as e:
                 data = json.dumps({"code": 1003, "message": str(e)}, ensure_ascii=False)
                 yield f"event: error\ndata: {data}\n\n"
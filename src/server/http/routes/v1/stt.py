@@ -2,14 +2,15 @@
 STT (语音识别) API
 """
 
-import asyncio
 from typing import Optional
 from fastapi import APIRouter, Header, Request, UploadFile, File
 from pydantic import BaseModel
 
 from ...response import success, error, session_not_found, ErrorCode
 from .....orchestrator import get_session_manager
-from .....perception.stt import SttRegistry, SttConfig
+from .....perception.stt import SttConfig
+from .....perception.stt.batch import BatchTranscriber
+from .....perception.audio import AudioFormat, normalize_audio, TARGET_SAMPLE_RATE
 from .....infra import get_logger, log_context, generate_trace_id
 
 logger = get_logger(__name__)
@@ -22,11 +23,14 @@ async def recognize_speech(
     x_session_id: str = Header(..., alias="X-Session-ID"),
     x_trace_id: Optional[str] = Header(None, alias="X-Trace-ID"),
     x_audio_format: str = Header("pcm", alias="X-Audio-Format"),
-    x_sample_rate: int = Header(16000, alias="X-Sample-Rate")
+    x_sample_rate: int = Header(16000, alias="X-Sample-Rate"),
+    x_audio_channels: int = Header(1, alias="X-Audio-Channels"),
+    x_bits_per_sample: Optional[int] = Header(None, alias="X-Bits-Per-Sample")
 ):
     """单次语音识别
     
-    请求体为二进制音频数据 (PCM 16bit)
+    请求体为二进制音频数据：PCM（由 X-Audio-Format / X-Sample-Rate / X-Audio-Channels /
+    X-Bits-Per-Sample 描述，默认 16kHz 单声道 16bit）、float 或 WAV 文件
     """
     trace_id = x_trace_id or generate_trace_id()
     
@@ -48,42 +52,28 @@ async def recognize_speech(
             if not session:
                 return session_not_found(x_session_id, trace_id).to_json_response()
             
-            # 创建 STT 服务
-            stt_service = SttRegistry.get_service(session.config.stt.provider)
             stt_config = SttConfig(
                 model=session.config.stt.model,
                 language=session.config.stt.language,
-                sample_rate=x_sample_rate,
+                sample_rate=TARGET_SAMPLE_RATE,
                 enable_punctuation=session.config.stt.enable_punctuation,
             )
             
-            # 使用 Future 收集结果
-            result_future: asyncio.Future = asyncio.Future()
-            
-            def on_final(r):
-                if not result_future.done():
-                    result_future.set_result(r)
-            
-            def on_error(e):
-                if not result_future.done():
-                    result_future.set_exception(e)
-            
-            stt_service.on_final(on_final)
-            stt_service.on_error(on_error)
-            
-            # 调用识别
-            await stt_service.start_session(x_session_id, stt_config)
-            await stt_service.send_audio(audio_data)
-            await stt_service.stop_session()
-            
-            result = await asyncio.wait_for(result_future, timeout=10.0)
+            # 与文件识别共用批量识别路径（启用转写缓存时重复音频直接命中）
+            audio = normalize_audio(audio_data, AudioFormat.from_hints(
+                encoding=x_audio_format,
+                sample_rate=x_sample_rate,
+                channels=x_audio_channels,
+                bits_per_sample=x_bits_per_sample,
+            ))
+            transcript = await BatchTranscriber(session.config.stt.provider).transcribe(audio, stt_config)
             session.stats.stt_requests += 1
             
             return success(
                 data={
-                    "text": result.text,
-                    "confidence": result.confidence,
-                    "duration_ms": result.end_time_ms - result.start_time_ms
+                    "text": transcript.text,
+                    "confidence": transcript.confidence,
+                    "duration_ms": transcript.audio_ms
                 },
                 trace_id=trace_id
             ).to_json_response()
@@ -119,7 +109,7 @@ async def recognize_speech_file(
 ):
     """从文件识别语音
     
-    支持上传音频文件
+    支持上传 WAV 文件（按文件头转换）或裸 PCM（按会话配置的采样率）
     """
     trace_id = x_trace_id or generate_trace_id()
     
@@ -141,42 +131,24 @@ async def recognize_speech_file(
             if not session:
                 return session_not_found(x_session_id, trace_id).to_json_response()
             
-            # 创建 STT 服务
-            stt_service = SttRegistry.get_service(session.config.stt.provider)
             stt_config = SttConfig(
                 model=session.config.stt.model,
                 language=session.config.stt.language,
-                sample_rate=session.config.stt.sample_rate,
+                sample_rate=TARGET_SAMPLE_RATE,
                 enable_punctuation=session.config.stt.enable_punctuation,
             )
             
-            # 使用 Future 收集结果
-            result_future: asyncio.Future = asyncio.Future()
-            
-            def on_final(r):
-                if not result_future.done():
-                    result_future.set_result(r)
-            
-            def on_error(e):
-                if not result_future.done():
-                    result_future.set_exception(e)
-            
-            stt_service.on_final(on_final)
-            stt_service.on_error(on_error)
-            
-            # 调用识别
-            await stt_service.start_session(x_session_id, stt_config)
-            await stt_service.send_audio(audio_data)
-            await stt_service.stop_session()
-            
-            result = await asyncio.wait_for(result_future, timeout=10.0)
+            # 非实时批量识别：转换为 16kHz 单声道后在静音处切分，多个会话并发识别
+            audio = normalize_audio(audio_data, AudioFormat.from_hints(sample_rate=session.config.stt.sample_rate))
+            transcript = await BatchTranscriber(session.config.stt.provider).transcribe(audio, stt_config)
             session.stats.stt_requests += 1
             
             return success(
                 data={
-                    "text": result.text,
-                    "confidence": result.confidence,
-                    "duration_ms": result.end_time_ms - result.start_time_ms,
+                    "text": transcript.text,
+                    "confidence": transcript.confidence,
+                    "duration_ms": transcript.audio_ms,
+                    "segments": [r.to_dict() for r in transcript.results],
                     "filename": file.filename
                 },
                 trace_id=trace_id
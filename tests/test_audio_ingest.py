@@ -0,0 +1,45 @@
+"""
+音频接入测试
+"""
+
+import io
+import os
+import sys
+import wave
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+
+from src.perception.audio import AudioIngest, AudioFormatError, normalize_audio
+
+
+def wav_bytes(pcm: bytes, rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def test_normalize_wav_strips_header():
+    pcm = bytes(range(256)) * 25
+    assert normalize_audio(wav_bytes(pcm)) == pcm
+
+
+def test_header_pending_until_complete():
+    data = wav_bytes(bytes(6400))
+    ingest = AudioIngest()
+    assert ingest.push(data[:20]) == []
+    assert ingest.header_pending
+    frames = ingest.push(data[20:])
+    assert not ingest.header_pending
+    assert sum(len(f) for f in frames) == 6400
+
+
+def test_normalize_incomplete_header_raises():
+    with pytest.raises(AudioFormatError):
+        normalize_audio(wav_bytes(bytes(3200))[:30])
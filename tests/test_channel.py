@@ -0,0 +1,150 @@
+"""
+线程 → 事件循环事件通道测试
+"""
+
+import os
+import sys
+import asyncio
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.channel import EventChannel, ChannelClosed
+
+
+def drain(channel):
+    items = []
+    while not channel.empty():
+        items.append(channel.get_nowait())
+    return items
+
+
+def test_thread_puts_are_delivered_in_order():
+    async def main():
+        channel = EventChannel(capacity=16)
+
+        def produce():
+            for i in range(1000):
+                channel.put(i)
+            channel.close()
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        received = [item async for item in channel]
+        producer.join()
+        return received, channel.stats()
+
+    received, stats = asyncio.run(main())
+    # 非 PARTIAL 事件即使超出容量也不丢弃
+    assert received == list(range(1000))
+    assert stats["dropped"] == 0
+
+
+def test_consecutive_partials_are_merged():
+    async def main():
+        channel = EventChannel()
+        for text in ("你", "你好", "你好世"):
+            channel.put(text, partial=True)
+        channel.put("你好世界")
+        channel.put("再", partial=True)
+        first = drain(channel)
+
+        # 已被读走的 PARTIAL 不再被替换
+        channel.put("再见", partial=True)
+        assert await channel.get() == "再见"
+        channel.put("再见了", partial=True)
+        return first, drain(channel), channel.stats()
+
+    first, second, stats = asyncio.run(main())
+    assert first == ["你好世", "你好世界", "再"]
+    assert second == ["再见了"]
+    assert stats["merged"] == 2
+
+
+def test_merging_can_be_disabled():
+    async def main():
+        channel = EventChannel(merge_partials=False)
+        for text in ("a", "ab", "abc"):
+            channel.put(text, partial=True)
+        return drain(channel)
+
+    assert asyncio.run(main()) == ["a", "ab", "abc"]
+
+
+def test_capacity_drops_partials_but_never_finals():
+    async def main():
+        channel = EventChannel(capacity=2, merge_partials=False)
+        accepted = [channel.put(text, partial=True) for text in ("p1", "p2", "p3")]
+        # FINAL 挤掉最早的 PARTIAL
+        channel.put("f1")
+        evicted = drain(channel)
+
+        channel.put("p4", partial=True)
+        channel.put("f2")
+        channel.put("f3")
+        # 没有 PARTIAL 可挤时允许超出容量
+        channel.put("f4")
+        return accepted, evicted, drain(channel), channel.stats()
+
+    accepted, evicted, items, stats = asyncio.run(main())
+    assert accepted == [True, True, False]
+    assert evicted == ["p2", "f1"]
+    assert items == ["f2", "f3", "f4"]
+    assert stats["dropped"] == 3
+    assert stats["max_depth"] == 3
+
+
+def test_close_drains_buffer_then_raises():
+    async def main():
+        channel = EventChannel()
+        channel.put("a")
+        channel.put("b", partial=True)
+        channel.close()
+        channel.close()
+        rejected = channel.put("c")
+        items = [await channel.get(), await channel.get()]
+        with pytest.raises(ChannelClosed):
+            await channel.get()
+        return rejected, items, channel.closed
+
+    rejected, items, closed = asyncio.run(main())
+    assert not rejected
+    assert items == ["a", "b"]
+    assert closed
+
+
+def test_close_from_thread_wakes_waiting_consumer():
+    async def main():
+        channel = EventChannel()
+        consumer = asyncio.create_task(channel.get())
+        await asyncio.sleep(0)
+        closer = threading.Thread(target=channel.close)
+        closer.start()
+        try:
+            with pytest.raises(ChannelClosed):
+                await asyncio.wait_for(consumer, 1.0)
+        finally:
+            closer.join()
+
+    asyncio.run(main())
+
+
+def test_cancelled_consumer_does_not_lose_events():
+    async def main():
+        channel = EventChannel()
+        consumer = asyncio.create_task(channel.get())
+        await asyncio.sleep(0)
+        consumer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await consumer
+
+        producer = threading.Thread(target=channel.put, args=("after",))
+        producer.start()
+        producer.join()
+        return await asyncio.wait_for(channel.get(), 1.0)
+
+    assert asyncio.run(main()) == "after"
@@ -0,0 +1,134 @@
+"""
+上下文窗口测试
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.reasoning.llm import LlmService, LlmResponse, StreamChunk
+from src.reasoning.context_window import ContextWindow, SUMMARY_PREFIX, get_context_window
+
+
+class CharService(LlmService):
+    """按字符计数 token 的替身，摘要固定返回「摘要」"""
+
+    def __init__(self):
+        self.calls = 0
+
+    @property
+    def provider_name(self):
+        return "chars"
+
+    def count_tokens(self, messages):
+        return sum(len(m.content) for m in messages)
+
+    def count_tokens_batch(self, messages):
+        return [len(m.content) for m in messages]
+
+    async def chat(self, messages, config=None):
+        self.calls += 1
+        return LlmResponse(content="摘要", finish_reason="stop")
+
+    async def chat_stream(self, messages, config=None):
+        yield StreamChunk(delta="摘要", finish_reason="stop")
+
+
+def conversation(turns):
+    messages = [{"role": "system", "content": "s" * 10}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"u{i}".ljust(10)})
+        messages.append({"role": "assistant", "content": f"a{i}".ljust(10)})
+    messages.append({"role": "user", "content": "q" * 10})
+    return messages
+
+
+def window(budget):
+    calls = []
+
+    def count(messages):
+        calls.append(len(messages))
+        return [len(m.content) for m in messages]
+
+    window = ContextWindow(budget, count=count)
+    window.calls = calls
+    return window
+
+
+def test_within_budget_returns_same_list():
+    messages = conversation(2)
+    assert window(1000).fit(messages) is messages
+
+
+def test_trims_oldest_whole_turns():
+    trimmer = window(65)
+    fitted = trimmer.fit(conversation(5))
+    # system + 最近两轮 + 当前输入
+    assert [m["content"].strip() for m in fitted] == ["s" * 10, "u3", "a3", "u4", "a4", "q" * 10]
+    assert sum(len(m["content"]) for m in fitted) <= 65
+    # 整个请求一次计数
+    assert trimmer.calls == [12]
+
+
+def test_window_per_model_keeps_system_and_recent_turns(monkeypatch):
+    monkeypatch.setenv('LLM_CONTEXT_MODEL_TOKENS', 'trim-model:65')
+    service = CharService()
+    trimmer = get_context_window('trim-model', service)
+    assert trimmer.budget_tokens == 65
+    assert get_context_window('trim-model', service) is trimmer
+    fitted = trimmer.fit(conversation(5))
+    assert [m["content"].strip() for m in fitted] == ["s" * 10, "u3", "a3", "u4", "a4", "q" * 10]
+
+    monkeypatch.setenv('LLM_CONTEXT_ENABLED', 'false')
+    assert get_context_window('trim-model', service) is None
+
+
+def test_dropped_turns_are_summarized_in_background(monkeypatch):
+    import asyncio
+
+    monkeypatch.setenv('LLM_CONTEXT_MODEL_TOKENS', 'summary-model:65')
+    monkeypatch.setenv('LLM_CONTEXT_SUMMARY_ENABLED', 'true')
+    service = CharService()
+    trimmer = get_context_window('summary-model', service)
+    messages = conversation(5)
+
+    async def main():
+        first = trimmer.fit(messages)
+        await asyncio.sleep(0.01)
+        return first, trimmer.fit(messages)
+
+    first, second = asyncio.run(main())
+    # 首次只丢弃；摘要生成后以 system 消息代替被丢弃的轮次，并为其多丢弃一轮
+    assert [m["content"].strip() for m in first][1:3] == ["u3", "a3"]
+    assert [m["content"].strip() for m in second] == [
+        "s" * 10, SUMMARY_PREFIX + "摘要", "u4", "a4", "q" * 10
+    ]
+    assert service.calls == 1
+
+
+def test_failed_summary_is_logged_and_dropped(monkeypatch):
+    import asyncio
+
+    class FailingService(CharService):
+        async def chat(self, messages, config=None):
+            raise RuntimeError("summary failed")
+
+    monkeypatch.setenv('LLM_CONTEXT_MODEL_TOKENS', 'failing-summary-model:65')
+    monkeypatch.setenv('LLM_CONTEXT_SUMMARY_ENABLED', 'true')
+    trimmer = get_context_window('failing-summary-model', FailingService())
+    # 与其他用例的历史不同，不命中已缓存的摘要
+    messages = [dict(m, content=m["content"].upper()) for m in conversation(5)]
+
+    async def main():
+        trimmer.fit(messages)
+        tasks = list(trimmer._inflight.values())
+        await asyncio.wait(tasks)
+        return tasks, trimmer.fit(messages)
+
+    tasks, fitted = asyncio.run(main())
+    assert len(tasks) == 1 and tasks[0].exception() is None
+    assert not any(m["content"].startswith(SUMMARY_PREFIX) for m in fitted)
+    assert trimmer._inflight == {}
@@ -0,0 +1,89 @@
+"""
+对话日志与会话上下文测试
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.orchestrator import (
+    ConversationLog, ConversationView, Session, SessionConfig, SessionStatus, TaskResult, TaskStatus
+)
+
+
+def test_view_is_a_stable_snapshot():
+    log = ConversationLog()
+    log.append("user", "你好")
+    log.append("assistant", "你好，有什么可以帮你？")
+    view = log.view()
+    log.append("user", "今天天气怎么样")
+
+    assert len(view) == 2 and len(log) == 3
+    assert view[-1]["content"] == "你好，有什么可以帮你？"
+    assert isinstance(view[1:], ConversationView)
+    assert view[1:] == [{"role": "assistant", "content": "你好，有什么可以帮你？"}]
+    assert log.view(start=2) == [{"role": "user", "content": "今天天气怎么样"}]
+    with pytest.raises(IndexError):
+        view[2]
+
+
+def test_messages_are_frozen_and_shared():
+    source = {"role": "user", "content": "你好"}
+    log = ConversationLog([source])
+    source["content"] = "changed"
+    first, again = log.view()[0], log.view()[0]
+
+    assert first["content"] == "你好"
+    assert first is again
+    with pytest.raises(TypeError):
+        first["content"] = "changed"
+
+
+def session():
+    return Session(
+        session_id="sess_test", trace_id="trace", client_id="client",
+        config=SessionConfig(), status=SessionStatus.ACTIVE,
+    )
+
+
+def answer(task, text):
+    task.complete(TaskResult(content=text, messages=[
+        {"role": "user", "content": task.instruction},
+        {"role": "assistant", "content": text},
+    ]))
+
+
+def test_session_context_merges_finished_tasks_in_order():
+    sess = session()
+    first = sess.create_task("第一问")
+    second = sess.create_task("第二问")
+    failed = sess.create_task("第三问")
+    # 后创建的任务先完成：先完成的追加在前
+    answer(second, "第二答")
+    failed.fail("boom")
+    assert [m["content"] for m in sess.context.messages] == ["第二问", "第二答"]
+
+    answer(first, "第一答")
+    context = sess.context.messages
+    assert [m["content"] for m in context] == ["第二问", "第二答", "第一问", "第一答"]
+    assert failed.status == TaskStatus.FAILED
+    # 快照不复制消息，修改前复制
+    task = sess.create_task("第四问")
+    task.context.add_message("user", "补充")
+    assert len(sess.context.messages) == 4
+
+
+def test_session_keeps_recent_tasks_only(monkeypatch):
+    monkeypatch.setenv('SESSION_TASK_HISTORY', '3')
+    sess = session()
+    for i in range(5):
+        answer(sess.create_task(f"问{i}"), f"答{i}")
+
+    assert [t.instruction for t in sess.tasks] == ["问2", "问3", "问4"]
+    assert len(sess.context.messages) == 10
+    assert sess.stats.tasks_count == 5
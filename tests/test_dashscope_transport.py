@@ -0,0 +1,216 @@
+"""
+DashScope 异步传输测试
+
+本地启动伪 DashScope 接口，覆盖普通调用、SSE 解析（含错误事件与格式异常的状态行）
+以及多路并发流的交错到达（无队头阻塞）。
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+
+import pytest
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.reasoning.llm.transport import DashScopeError, DashScopeTransport, GENERATION_PATH
+
+
+def _result(text, finish='null'):
+    return {'output': {'choices': [{'finish_reason': finish, 'message': {'role': 'assistant', 'content': text}}]}}
+
+
+async def _serve(handler):
+    """启动伪 DashScope 服务，返回 (runner, base_url)"""
+    app = web.Application()
+    app.router.add_post('/api/v1' + GENERATION_PATH, handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    return runner, f'http://127.0.0.1:{port}/api/v1'
+
+
+def _sse_handler(events, gap=0.0):
+    """按给定的原始 SSE 事件文本逐个推送"""
+
+    async def handler(request):
+        resp = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await resp.prepare(request)
+        try:
+            for event in events:
+                if gap:
+                    await asyncio.sleep(gap)
+                await resp.write(event.encode('utf-8'))
+            await resp.write_eof()
+        except ConnectionResetError:
+            pass
+        return resp
+
+    return handler
+
+
+async def _collect(handler, **kwargs):
+    runner, base_url = await _serve(handler)
+    transport = DashScopeTransport(base_url=base_url)
+    try:
+        return [event async for event in transport.stream({'model': 'fake'}, 'sk-test', **kwargs)]
+    finally:
+        await transport.close()
+        await runner.cleanup()
+
+
+def test_generate_returns_json():
+    async def handler(request):
+        body = await request.json()
+        assert request.headers['Authorization'] == 'Bearer sk-test'
+        return web.json_response(_result(body['model'], 'stop'))
+
+    async def main():
+        runner, base_url = await _serve(handler)
+        transport = DashScopeTransport(base_url=base_url)
+        try:
+            return await transport.generate({'model': 'qwen-test'}, 'sk-test')
+        finally:
+            await transport.close()
+            await runner.cleanup()
+
+    data = asyncio.run(main())
+    assert data['output']['choices'][0]['message']['content'] == 'qwen-test'
+
+
+def test_generate_http_error():
+    async def handler(request):
+        return web.json_response({'code': 'Throttling', 'message': 'slow down', 'request_id': 'r1'}, status=429)
+
+    async def main():
+        runner, base_url = await _serve(handler)
+        transport = DashScopeTransport(base_url=base_url)
+        try:
+            await transport.generate({'model': 'fake'}, 'sk-test')
+        finally:
+            await transport.close()
+            await runner.cleanup()
+
+    with pytest.raises(DashScopeError) as info:
+        asyncio.run(main())
+    assert info.value.status_code == 429
+    assert info.value.code == 'Throttling'
+    assert info.value.request_id == 'r1'
+    assert info.value.retryable
+
+
+def test_stream_parses_events():
+    events = [
+        f"id:1\nevent:result\n:HTTP_STATUS/200\ndata:{json.dumps(_result('你好'))}\n\n",
+        f"id:2\nevent:result\nstatus: 200\r\ndata:{json.dumps(_result('，世界'))}\r\n\r\n",
+        f"id:3\nevent:result\n:HTTP_STATUS/\ndata:{json.dumps(_result('', 'stop'))}\n\n",
+    ]
+    received = asyncio.run(_collect(_sse_handler(events)))
+    texts = [e['output']['choices'][0]['message']['content'] for e in received]
+    assert texts == ['你好', '，世界', '']
+
+
+def test_stream_error_event():
+    events = [
+        f"id:1\nevent:result\n:HTTP_STATUS/200\ndata:{json.dumps(_result('a'))}\n\n",
+        "id:2\nevent:error\n:HTTP_STATUS/400\n"
+        'data:{"code":"InvalidParameter","message":"bad input","request_id":"r2"}\n\n',
+    ]
+    with pytest.raises(DashScopeError) as info:
+        asyncio.run(_collect(_sse_handler(events)))
+    assert info.value.status_code == 400
+    assert info.value.code == 'InvalidParameter'
+    assert not info.value.retryable
+
+
+def test_stream_malformed_status_line():
+    events = [f"id:1\nevent:result\n:HTTP_STATUS/OK\ndata:{json.dumps(_result('a'))}\n\n"]
+    with pytest.raises(DashScopeError) as info:
+        asyncio.run(_collect(_sse_handler(events)))
+    assert info.value.code == 'InvalidResponse'
+    assert info.value.status_code == 500
+
+
+def test_stream_malformed_data():
+    events = ["id:1\nevent:result\n:HTTP_STATUS/200\ndata:{not json\n\n"]
+    with pytest.raises(DashScopeError) as info:
+        asyncio.run(_collect(_sse_handler(events)))
+    assert info.value.code == 'InvalidResponse'
+
+
+def test_stream_early_close_keeps_pool_usable():
+    events = [f"id:{i}\nevent:result\ndata:{json.dumps(_result(str(i)))}\n\n" for i in range(20)]
+
+    async def main():
+        runner, base_url = await _serve(_sse_handler(events, gap=0.005))
+        transport = DashScopeTransport(base_url=base_url, pool_size=1)
+        try:
+            for _ in range(3):
+                stream = transport.stream({'model': 'fake'}, 'sk-test')
+                async for _event in stream:
+                    break
+                await stream.aclose()
+            return len([e async for e in transport.stream({'model': 'fake'}, 'sk-test')])
+        finally:
+            await transport.close()
+            await runner.cleanup()
+
+    assert asyncio.run(asyncio.wait_for(main(), 10)) == 20
+
+
+def test_concurrent_streams_interleave():
+    streams, tokens, gap = 20, 10, 0.02
+    events = [f"id:{i}\nevent:result\ndata:{json.dumps(_result(str(i)))}\n\n" for i in range(tokens)]
+
+    async def main():
+        runner, base_url = await _serve(_sse_handler(events, gap=gap))
+        transport = DashScopeTransport(base_url=base_url)
+        arrivals = []
+
+        async def one(index):
+            async for _event in transport.stream({'model': f'fake-{index}'}, 'sk-test'):
+                arrivals.append(index)
+
+        try:
+            begin = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(streams)))
+            return arrivals, time.perf_counter() - begin
+        finally:
+            await transport.close()
+            await runner.cleanup()
+
+    arrivals, elapsed = asyncio.run(main())
+    assert len(arrivals) == streams * tokens
+    # 并发执行：总耗时接近单路耗时，远小于串行的 streams 倍
+    assert elapsed < tokens * gap * 3
+    # 相邻到达的事件大多来自不同的流
+    switches = sum(1 for a, b in zip(arrivals, arrivals[1:]) if a != b)
+    assert switches / (len(arrivals) - 1) > 0.5
+
+
+def test_qwen_service_streams_through_transport():
+    from src.reasoning.llm.base import LlmConfig, Message, MessageRole
+    from src.reasoning.llm.qwen import QwenLlmService
+
+    events = [f"id:{i}\nevent:result\n:HTTP_STATUS/200\ndata:{json.dumps(_result(f't{i} ', 'stop' if i == 2 else 'null'))}\n\n"
+              for i in range(3)]
+
+    async def main():
+        runner, base_url = await _serve(_sse_handler(events))
+        service = QwenLlmService(api_key='sk-test', base_url=base_url)
+        service._transport = DashScopeTransport(base_url=base_url)
+        try:
+            messages = [Message(role=MessageRole.USER, content='hello')]
+            return [chunk.delta async for chunk in service.chat_stream(messages, LlmConfig(model='fake'))]
+        finally:
+            await service._transport.close()
+            await runner.cleanup()
+
+    assert ''.join(asyncio.run(main())) == 't0 t1 t2 '
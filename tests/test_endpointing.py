@@ -0,0 +1,105 @@
+"""
+本地断句测试
+"""
+
+import os
+import sys
+import asyncio
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.orchestrator.endpointing import Endpointer
+
+
+def speech(ms):
+    t = np.arange(ms * 16) / 16000
+    return (8000 * np.sin(2 * np.pi * 440 * t)).astype('<i2').tobytes()
+
+
+def silence(ms):
+    return bytes(ms * 32)
+
+
+async def endpointer(**kwargs):
+    calls = []
+
+    async def on_endpoint():
+        calls.append(True)
+
+    kwargs.setdefault('stable_ms', 0)
+    return Endpointer(on_endpoint, **kwargs), calls
+
+
+async def push(ep, audio, chunk_ms=20):
+    """按 chunk_ms 分块送入音频，返回每块之后的断句次数"""
+    step = chunk_ms * 32
+    counts = []
+    for i in range(0, len(audio), step):
+        await ep.push_audio(audio[i:i + step])
+        counts.append(ep.stats.endpoints)
+    return counts
+
+
+def test_endpoint_after_silence_threshold():
+    async def main():
+        ep, calls = await endpointer(initial_silence_ms=300)
+        await push(ep, speech(200))
+        ep.observe_partial("今天天气")
+        counts = await push(ep, silence(400), chunk_ms=100)
+        return counts, calls
+
+    counts, calls = asyncio.run(main())
+    assert counts == [0, 0, 1, 1]
+    assert calls == [True]
+
+
+def test_punctuation_shortens_or_defers_endpoint():
+    async def main():
+        ep, _ = await endpointer(initial_silence_ms=300)
+        await push(ep, speech(200))
+        ep.observe_partial("好的。")
+        terminal = await push(ep, silence(200), chunk_ms=100)
+
+        ep, _ = await endpointer(initial_silence_ms=300)
+        await push(ep, speech(200))
+        ep.observe_partial("然后，")
+        comma = await push(ep, silence(800), chunk_ms=100)
+        return terminal, comma
+
+    terminal, comma = asyncio.run(main())
+    # 句末标点：300 * 0.6 = 180ms 即断句
+    assert terminal == [0, 1]
+    # 逗号结尾交给 Provider 断句
+    assert comma[-1] == 0
+
+
+def test_unstable_partial_defers_endpoint():
+    async def main():
+        ep, _ = await endpointer(initial_silence_ms=100, stable_ms=10_000)
+        await push(ep, speech(200))
+        ep.observe_partial("今天天气")
+        return await push(ep, silence(800), chunk_ms=100)
+
+    assert asyncio.run(main())[-1] == 0
+
+
+def test_premature_endpoints_raise_threshold():
+    async def main():
+        ep, _ = await endpointer(initial_silence_ms=200, provider_silence_ms=800)
+        before = ep.threshold_ms
+        for _ in range(3):
+            await push(ep, speech(200))
+            ep.observe_partial("我想问一下")
+            await push(ep, silence(400), chunk_ms=100)
+        # 在 Provider 断句窗口内恢复说话：前几次断句过早
+        await push(ep, speech(200))
+        ep.close()
+        return before, ep.stats
+
+    before, stats = asyncio.run(main())
+    assert stats.endpoints == 3 and stats.premature == 3
+    assert before == 200 and stats.threshold_ms == 500
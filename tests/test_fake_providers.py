@@ -0,0 +1,113 @@
+"""
+Fake LLM / STT Provider 测试
+"""
+
+import os
+import sys
+import random
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import LatencyDistribution
+from src.reasoning.llm import LlmConfig, Message, MessageRole
+from src.reasoning.llm.fake import FakeLlmService, FakeLlmError
+from src.perception.stt import SttConfig
+from src.perception.stt.fake import FakeSttService, FakeSttError
+
+INSTANT = LatencyDistribution(0)
+CHUNK = b'\x00' * 3200  # 16kHz 单声道 100ms
+
+
+def test_latency_distribution_kinds(monkeypatch):
+    rng = random.Random(1)
+    assert LatencyDistribution(50, 0.5, kind="fixed").sample_ms(rng) == 50
+    assert LatencyDistribution(50, 0.5, tail_prob=1.0, tail_ms=900).sample(rng) == 0.9
+    assert all(LatencyDistribution(10, 5.0).sample_ms(rng) >= 0 for _ in range(100))
+
+    monkeypatch.setenv('TEST_LAT_MS', '30')
+    monkeypatch.setenv('TEST_LAT_DIST', 'lognormal')
+    dist = LatencyDistribution.from_env('TEST_LAT', 100, 0.2)
+    assert (dist.mean_ms, dist.jitter, dist.kind) == (30.0, 0.2, "lognormal")
+
+
+def llm(**kwargs):
+    return FakeLlmService(ttft=INSTANT, token_gap=INSTANT, tokens=8, **kwargs)
+
+
+def test_fake_llm_is_deterministic():
+    messages = [Message(role=MessageRole.USER, content="你好")]
+
+    async def main():
+        first, second = llm(seed=7), llm(seed=7)
+        response = await first.chat(messages, LlmConfig())
+        chunks = [chunk async for chunk in second.chat_stream(messages, LlmConfig())]
+        other = await llm(seed=8).chat(messages, LlmConfig())
+        return response, chunks, other
+
+    response, chunks, other = asyncio.run(main())
+    assert "".join(c.delta for c in chunks) == response.content
+    assert len(chunks) == response.usage.completion_tokens == 8
+    assert [c.finish_reason for c in chunks][-1] == "stop"
+    assert other.content != response.content
+
+
+def test_fake_llm_injects_errors():
+    messages = [Message(role=MessageRole.USER, content="你好")]
+
+    async def main():
+        with pytest.raises(FakeLlmError):
+            await llm(error_rate=1.0).chat(messages, LlmConfig())
+        with pytest.raises(FakeLlmError):
+            async for _ in llm(error_rate=1.0).chat_stream(messages, LlmConfig()):
+                pass
+
+    asyncio.run(main())
+
+
+def stt(**kwargs):
+    return FakeSttService(
+        ready=INSTANT, final_latency=INSTANT, partial_interval_ms=200, sentence_ms=1000,
+        sentences=["一二三四五六七八九十", "甲乙丙丁"], **kwargs
+    )
+
+
+async def transcribe(service, session_id, chunks, chunk=CHUNK):
+    partials, finals, errors = [], [], []
+    service.on_partial(lambda r: partials.append(r.text))
+    service.on_final(lambda r: finals.append((r.text, r.start_time_ms, r.end_time_ms)))
+    service.on_error(errors.append)
+    await service.start_session(session_id, SttConfig())
+    for _ in range(chunks):
+        await service.send_audio(chunk)
+        await asyncio.sleep(0)
+    await service.stop_session()
+    return partials, finals, errors
+
+
+def test_fake_stt_follows_audio_duration():
+    partials, finals, errors = asyncio.run(transcribe(stt(), "session-1", 25))
+    assert not errors
+    # 每 1000ms 音频结束一句，停止时结束剩余的 500ms
+    assert [(start, end) for _, start, end in finals] == [(0, 1000), (1000, 2000), (2000, 2500)]
+    assert all(text in ("一二三四五六七八九十", "甲乙丙丁") for text, _, _ in finals)
+    # 部分结果逐步揭示当前句子
+    assert partials[0] and finals[0][0].startswith(partials[0])
+
+
+def test_fake_stt_is_deterministic_per_session():
+    async def main():
+        return [await transcribe(stt(seed=3), "same", 25) for _ in range(2)]
+
+    first, second = asyncio.run(main())
+    assert first == second
+
+
+def test_fake_stt_injects_errors():
+    # 出错点在第一句之内：一次发送整句音频必然触发
+    partials, finals, errors = asyncio.run(transcribe(stt(error_rate=1.0), "session-1", 1, CHUNK * 10))
+    assert len(errors) == 1 and isinstance(errors[0], FakeSttError)
@@ -0,0 +1,53 @@
+"""
+音频抖动缓冲测试
+"""
+
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.jitter import JitterBuffer
+
+
+def run(pushes, **kwargs):
+    out = []
+
+    async def sink(data):
+        out.append(data)
+
+    async def main():
+        jitter = JitterBuffer(sink, max_delay_ms=20, **kwargs)
+        for sequence, data in pushes:
+            await jitter.push(sequence, data)
+        await jitter.flush()
+        jitter.close()
+        return jitter
+
+    return out, asyncio.run(main())
+
+
+def test_reorders_and_drops_duplicates():
+    out, jitter = run([(1, b'a'), (3, b'c'), (2, b'b'), (2, b'b'), (4, b'd')])
+    assert out == [b'a', b'b', b'c', b'd']
+    assert jitter.stats.duplicates == 1
+    assert jitter.stats.reordered == 1
+
+
+def test_unsequenced_client_passes_through():
+    out, _ = run([(0, b'a'), (0, b'b'), (0, b'c')])
+    assert out == [b'a', b'b', b'c']
+
+
+def test_retransmitted_zero_keeps_reordering():
+    out, jitter = run([(0, b'a'), (1, b'b'), (0, b'a'), (3, b'd'), (2, b'c')])
+    assert out == [b'a', b'b', b'c', b'd']
+    assert jitter.stats.duplicates == 1
+
+
+def test_stray_zero_after_numbered_frames_is_dropped():
+    out, _ = run([(5, b'a'), (0, b'x'), (7, b'c'), (6, b'b')])
+    assert out == [b'a', b'b', b'c']
@@ -0,0 +1,133 @@
+"""
+LLM 响应缓存测试
+"""
+
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import LruCache
+from src.reasoning.llm import (
+    LlmService, LlmConfig, Message, MessageRole, LlmResponse, StreamChunk, CachedLlmService
+)
+
+
+class CountingService(LlmService):
+    """记录调用次数的替身：回显最后一条消息"""
+
+    def __init__(self, finish_reason="stop", tool_calls=None):
+        self.finish_reason = finish_reason
+        self.tool_calls = tool_calls
+        self.calls = 0
+
+    @property
+    def provider_name(self):
+        return "counting"
+
+    async def chat(self, messages, config=None):
+        self.calls += 1
+        return LlmResponse(content=messages[-1].content, finish_reason=self.finish_reason)
+
+    async def chat_stream(self, messages, config=None):
+        self.calls += 1
+        text = messages[-1].content
+        for i, char in enumerate(text):
+            last = i == len(text) - 1
+            yield StreamChunk(
+                delta=char,
+                finish_reason=self.finish_reason if last else None,
+                tool_calls=self.tool_calls if last else None,
+            )
+
+
+def ask(text):
+    return [Message(role=MessageRole.USER, content=text)]
+
+
+def service(inner):
+    return CachedLlmService(inner, cache=LruCache(max_bytes=1024 * 1024))
+
+
+def test_lru_evicts_least_recently_used_within_byte_budget():
+    cache = LruCache(max_bytes=100, ttl=None)
+    cache.set("a", 1, size=40)
+    cache.set("b", 2, size=40)
+    assert cache.get("a") == 1
+    cache.set("c", 3, size=40)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.size_bytes == 80
+    # 超过预算的单个条目不缓存
+    assert not cache.set("huge", 4, size=101)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_expires_entries_and_limits_count():
+    cache = LruCache(max_bytes=1000, ttl=60, max_entries=2)
+    cache.set("stale", 1, size=1, ttl=0)
+    assert cache.get("stale") is None
+    assert cache.stats()["expirations"] == 1
+    for key in ("a", "b", "c"):
+        cache.set(key, key, size=1)
+    assert len(cache) == 2 and "a" not in cache
+
+
+def test_chat_hits_cache_for_identical_requests():
+    async def main():
+        inner = CountingService()
+        cached = service(inner)
+        first = await cached.chat(ask("你好"), LlmConfig())
+        second = await cached.chat(ask("你好"), LlmConfig(timeout=5, retry_times=0))
+        # 影响输出的配置不同则不命中
+        await cached.chat(ask("你好"), LlmConfig(temperature=0.1))
+        # 单次请求跳过缓存
+        await cached.chat(ask("你好"), LlmConfig(use_cache=False))
+        return inner.calls, first, second
+
+    calls, first, second = asyncio.run(main())
+    assert calls == 3
+    assert second.content == first.content == "你好"
+    assert second is not first
+
+
+def test_truncated_responses_are_not_cached():
+    async def main():
+        inner = CountingService(finish_reason="content_filter")
+        cached = service(inner)
+        for _ in range(2):
+            await cached.chat(ask("你好"), LlmConfig())
+        return inner.calls, len(cached.cache)
+
+    assert asyncio.run(main()) == (2, 0)
+
+
+def test_completed_stream_is_replayed():
+    async def main():
+        inner = CountingService()
+        cached = service(inner)
+        streamed = [chunk async for chunk in cached.chat_stream(ask("你好世界"), LlmConfig())]
+        replayed = [chunk async for chunk in cached.chat_stream(ask("你好世界"), LlmConfig())]
+        response = await cached.chat(ask("你好世界"), LlmConfig())
+        return inner.calls, streamed, replayed, response
+
+    calls, streamed, replayed, response = asyncio.run(main())
+    assert calls == 1
+    assert len(streamed) == 4
+    assert [(c.delta, c.finish_reason) for c in replayed] == [("你好世界", "stop")]
+    assert response.content == "你好世界"
+
+
+def test_stream_with_tool_calls_is_not_cached():
+    async def main():
+        inner = CountingService(finish_reason="tool_calls", tool_calls=[{"index": 0}])
+        cached = service(inner)
+        for _ in range(2):
+            async for _chunk in cached.chat_stream(ask("查天气"), LlmConfig()):
+                pass
+        return inner.calls
+
+    assert asyncio.run(main()) == 2
@@ -0,0 +1,145 @@
+"""
+LLM 对冲与重试测试（替身服务注入长尾与错误）
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.reasoning.llm.base import LlmService, LlmConfig, Message, MessageRole, LlmResponse, StreamChunk
+from src.reasoning.llm.hedging import HedgedLlmService
+
+MESSAGES = [Message(role=MessageRole.USER, content='你好')]
+
+
+class TransientError(Exception):
+    retryable = True
+
+
+class ScriptedLlmService(LlmService):
+    """按种子确定性地注入首 token 延迟长尾与可重试错误的替身（时间单位：毫秒）"""
+
+    def __init__(self, ttft_ms=20, jitter=0.0, tail_prob=0.0, tail_ms=0, gap_ms=0, tokens=3,
+                 error_rate=0.0, seed=0):
+        self.ttft_ms, self.jitter = ttft_ms, jitter
+        self.tail_prob, self.tail_ms = tail_prob, tail_ms
+        self.gap_ms, self.tokens = gap_ms, tokens
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    @property
+    def provider_name(self):
+        return "scripted"
+
+    async def _first_token(self):
+        self.calls += 1
+        if self.rng.random() < self.tail_prob:
+            delay = self.tail_ms
+        else:
+            delay = max(0.0, self.rng.gauss(self.ttft_ms, self.ttft_ms * self.jitter))
+        await asyncio.sleep(delay / 1000)
+        if self.rng.random() < self.error_rate:
+            raise TransientError("injected")
+
+    async def chat(self, messages, config=None):
+        await self._first_token()
+        await asyncio.sleep(self.gap_ms * (self.tokens - 1) / 1000)
+        return LlmResponse(content="x" * self.tokens, finish_reason="stop")
+
+    async def chat_stream(self, messages, config=None):
+        await self._first_token()
+        for i in range(self.tokens):
+            if i:
+                await asyncio.sleep(self.gap_ms / 1000)
+            yield StreamChunk(delta="x", finish_reason="stop" if i == self.tokens - 1 else None)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+async def _ttfts(service, requests, concurrency, config):
+    semaphore = asyncio.Semaphore(concurrency)
+    ttfts = []
+
+    async def one():
+        async with semaphore:
+            begin = time.monotonic()
+            async for _chunk in service.chat_stream(MESSAGES, config):
+                ttfts.append(time.monotonic() - begin)
+                break
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return ttfts
+
+
+def test_hedging_improves_p99_ttft():
+    def fake():
+        return ScriptedLlmService(ttft_ms=20, jitter=0.1, tail_prob=0.04, tail_ms=400, gap_ms=1, seed=3)
+
+    config = LlmConfig(model='scripted', timeout=5, retry_times=0)
+
+    async def main():
+        baseline = await _ttfts(fake(), 300, 20, config)
+        hedged_service = HedgedLlmService(fake(), hedge_enabled=True, max_hedge_ratio=0.1)
+        hedged = await _ttfts(hedged_service, 300, 20, config)
+        await asyncio.sleep(0.05)
+        return baseline, hedged, hedged_service
+
+    baseline, hedged, service = asyncio.run(main())
+    assert percentile(baseline, 99) > 0.3
+    assert percentile(hedged, 99) < percentile(baseline, 99) / 2
+    assert 0 < service._hedges <= 0.1 * 300 + 1
+    # 落败的一路已在后台关闭
+    assert not service._discards
+
+
+def test_retries_transient_errors():
+    inner = ScriptedLlmService(ttft_ms=2, error_rate=0.5, seed=1)
+    service = HedgedLlmService(inner, hedge_enabled=False, backoff_base=0.001)
+    config = LlmConfig(model='scripted', timeout=5, retry_times=8)
+
+    async def main():
+        return [await service.chat(MESSAGES, config) for _ in range(20)]
+
+    responses = asyncio.run(main())
+    assert all(r.content for r in responses)
+    assert inner.calls > 20
+
+
+def test_stream_outlives_call_timeout():
+    inner = ScriptedLlmService(ttft_ms=10, gap_ms=20, tokens=20)
+    service = HedgedLlmService(inner, hedge_enabled=False, idle_timeout=1)
+    config = LlmConfig(model='scripted', timeout=0.2)
+
+    async def main():
+        return [chunk async for chunk in service.chat_stream(MESSAGES, config)]
+
+    chunks = asyncio.run(main())
+    assert len(chunks) == 20
+    assert chunks[-1].finish_reason == 'stop'
+
+
+def test_stream_idle_timeout():
+    inner = ScriptedLlmService(ttft_ms=5, gap_ms=300)
+    service = HedgedLlmService(inner, hedge_enabled=False, idle_timeout=0.05)
+    config = LlmConfig(model='scripted', timeout=5)
+
+    async def main():
+        received = []
+        with pytest.raises(asyncio.TimeoutError):
+            async for chunk in service.chat_stream(MESSAGES, config):
+                received.append(chunk)
+        return received
+
+    assert len(asyncio.run(main())) == 1
@@ -0,0 +1,144 @@
+"""
+LLM 自适应并发限制测试
+"""
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.reasoning.llm import LlmPriority
+from src.reasoning.llm.limiter import AdaptiveLimiter, RateLimitExceeded
+
+
+def limiter(**kwargs):
+    kwargs.setdefault('initial_limit', 1)
+    kwargs.setdefault('min_limit', 1)
+    return AdaptiveLimiter("test", "model", **kwargs)
+
+
+def test_waiters_are_admitted_by_priority():
+    async def main():
+        gate = limiter()
+        await gate.acquire()
+        order = []
+
+        async def wait(name, priority):
+            await gate.acquire(priority)
+            order.append(name)
+            gate.release()
+
+        tasks = [
+            asyncio.ensure_future(wait("batch", LlmPriority.BATCH)),
+            asyncio.ensure_future(wait("normal", LlmPriority.NORMAL)),
+            asyncio.ensure_future(wait("interactive", LlmPriority.INTERACTIVE)),
+        ]
+        await asyncio.sleep(0.01)
+        assert gate.queue_depth == 3
+        gate.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["interactive", "normal", "batch"]
+
+
+def test_rejects_when_queue_full_or_wait_times_out():
+    async def main():
+        gate = limiter(max_queue=1)
+        await gate.acquire()
+        queued = asyncio.ensure_future(gate.acquire(max_wait=0.05))
+        await asyncio.sleep(0)
+        with pytest.raises(RateLimitExceeded) as full:
+            await gate.acquire()
+        with pytest.raises(RateLimitExceeded) as timeout:
+            await queued
+        return full.value.reason, timeout.value.reason, gate.stats()
+
+    full, timeout, stats = asyncio.run(main())
+    assert (full, timeout) == ("queue_full", "wait_timeout")
+    assert stats['rejected'] == 2 and stats['queue_depth'] == 0 and stats['inflight'] == 1
+
+
+def test_overload_decreases_limit_multiplicatively_with_cooldown():
+    async def main():
+        gate = limiter(initial_limit=20, backoff=0.5, decrease_cooldown=60)
+        for _ in range(3):
+            await gate.acquire()
+        gate.release(overloaded=True)
+        after_first = gate.limit
+        gate.release(overloaded=True)   # 冷却期内不重复下降
+        return after_first, gate.stats()
+
+    after_first, stats = asyncio.run(main())
+    assert after_first == 10
+    assert stats['limit'] == 10 and stats['overloads'] == 2 and stats['inflight'] == 1
+
+
+def test_success_near_limit_increases_additively():
+    async def main():
+        gate = limiter(initial_limit=2)
+        await gate.acquire()
+        await gate.acquire()
+        gate.release()
+        return gate._limit
+
+    assert asyncio.run(main()) == pytest.approx(2.5)
+
+
+def test_cancelled_after_grant_does_not_raise_limit():
+    async def main():
+        gate = limiter(initial_limit=2)
+        await gate.acquire()
+        await gate.acquire()
+        limits = []
+        for _ in range(20):
+            waiter = asyncio.ensure_future(gate.acquire())
+            await asyncio.sleep(0)
+            gate.release(completed=False)   # 让出配额，等待者被唤醒前取消
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            await gate.acquire()
+            limits.append(gate._limit)
+        return limits, gate.inflight
+
+    limits, inflight = asyncio.run(main())
+    assert set(limits) == {2.0}
+    assert inflight == 2
+
+
+def test_cancelled_calls_return_slot_without_adjusting_limit():
+    from src.reasoning.llm import LlmService, LlmConfig, LlmResponse, StreamChunk, Message, MessageRole
+    from src.reasoning.llm.limiter import LimitedLlmService, get_limiter
+
+    class Slow(LlmService):
+        provider_name = "slow"
+
+        async def chat(self, messages, config=None):
+            await asyncio.sleep(1)
+            return LlmResponse(content="", finish_reason="stop")
+
+        async def chat_stream(self, messages, config=None):
+            await asyncio.sleep(1)
+            yield StreamChunk(delta="", finish_reason="stop")
+
+    service = LimitedLlmService(Slow())
+    config = LlmConfig(model="limiter-cancel")
+    messages = [Message(role=MessageRole.USER, content="你好")]
+
+    async def main():
+        limiter = get_limiter(service.provider_name, "limiter-cancel")
+        before = limiter._limit
+        tasks = [asyncio.ensure_future(service.chat(messages, config)) for _ in range(int(before))]
+        await asyncio.sleep(0.05)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return before, limiter._limit, limiter.inflight
+
+    before, after, inflight = asyncio.run(main())
+    assert after == before and inflight == 0
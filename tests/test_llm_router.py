@@ -0,0 +1,194 @@
+"""
+LLM 多后端路由测试
+"""
+
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.reasoning.llm import LlmRegistry, LlmRouter, LlmService, LlmConfig, LlmResponse, StreamChunk, Message, MessageRole
+from src.reasoning.llm.hedging import HedgedLlmService
+from src.reasoning.llm.limiter import LimitedLlmService, get_limiter
+
+MESSAGES = [Message(role=MessageRole.USER, content='你好')]
+
+
+class Unavailable(Exception):
+    status_code = 503
+    retryable = True
+
+
+class StubLlmService(LlmService):
+    """等待 delay 秒后回显的后端"""
+
+    def __init__(self, delay=0.005):
+        self.delay = delay
+
+    @property
+    def provider_name(self) -> str:
+        return "stub"
+
+    async def chat(self, messages, config=None):
+        await asyncio.sleep(self.delay)
+        return LlmResponse(content=messages[-1].content, finish_reason="stop")
+
+    async def chat_stream(self, messages, config=None):
+        await asyncio.sleep(self.delay)
+        yield StreamChunk(delta=messages[-1].content, finish_reason="stop")
+
+
+class ThrottledLlmService(StubLlmService):
+    """总是返回 503 的后端"""
+
+    @property
+    def provider_name(self) -> str:
+        return "throttled"
+
+    async def chat(self, messages, config=None):
+        await asyncio.sleep(self.delay)
+        raise Unavailable("throttled")
+
+    async def chat_stream(self, messages, config=None):
+        await asyncio.sleep(self.delay)
+        raise Unavailable("throttled")
+        yield
+
+
+def _register():
+    LlmRegistry._register_builtin_providers()
+    LlmRegistry.register('stub', StubLlmService)
+    LlmRegistry.register('throttled', ThrottledLlmService)
+
+
+def test_fails_over_before_first_chunk():
+    _register()
+    router = LlmRouter('throttled/m,stub/m', failure_threshold=1000)
+
+    async def main():
+        config = LlmConfig(retry_times=0)
+        response = await router.chat(MESSAGES, config)
+        chunks = [chunk.delta async for chunk in router.chat_stream(MESSAGES, config)]
+        return response, chunks
+
+    response, chunks = asyncio.run(main())
+    assert response.content == '你好' and chunks == ['你好']
+    assert router.stats()['throttled/m']['failures'] >= 1
+    assert router.stats()['stub/m']['requests'] == 2
+
+
+def test_prefers_the_faster_backend():
+    router = LlmRouter('stub/fast,stub/slow')
+    router._services['stub/fast'] = StubLlmService(delay=0.001)
+    router._services['stub/slow'] = StubLlmService(delay=0.03)
+
+    async def main():
+        for _ in range(20):
+            await router.chat(MESSAGES)
+
+    asyncio.run(main())
+    # 两个后端各探索一次后只选快的
+    assert router.stats()['stub/slow']['requests'] == 1
+    assert router.stats()['stub/fast']['requests'] == 19
+
+
+def test_circuit_opens_after_consecutive_failures():
+    _register()
+    router = LlmRouter('throttled/m,stub/m', failure_threshold=2, cooldown=60)
+
+    async def main():
+        for _ in range(5):
+            await router.chat(MESSAGES, LlmConfig(retry_times=0))
+
+    asyncio.run(main())
+    stats = router.stats()
+    assert stats['throttled/m']['state'] == 'open'
+    assert stats['throttled/m']['failures'] == 2
+    assert stats['stub/m']['requests'] == 5
+
+
+def _layers(service):
+    layers = []
+    while hasattr(service, 'inner'):
+        layers.append(type(service))
+        service = service.inner
+    return layers
+
+
+def test_limiter_and_hedging_wrap_each_backend():
+    _register()
+    router = LlmRegistry.get_service('router', singleton=False, backends='stub/router-a,stub/router-b')
+    assert LimitedLlmService not in _layers(router)
+    assert HedgedLlmService not in _layers(router)
+
+    async def main():
+        for _ in range(10):
+            await router.chat(MESSAGES, LlmConfig(model='requested'))
+
+    asyncio.run(main())
+    inner = router
+    while not isinstance(inner, LlmRouter):
+        inner = inner.inner
+    for backend in inner.backends:
+        layers = _layers(inner._service(backend))
+        assert LimitedLlmService in layers and HedgedLlmService in layers
+    assert get_limiter('stub', 'router-a').stats()['admitted'] + get_limiter('stub', 'router-b').stats()['admitted'] == 10
+    assert get_limiter('router', 'requested').stats()['admitted'] == 0
+
+
+def test_throttled_backend_does_not_shrink_other_backends():
+    _register()
+    router = LlmRouter('throttled/shared-model,stub/shared-model', failure_threshold=1000)
+
+    async def main():
+        config = LlmConfig(model='shared-model', retry_times=0)
+        for _ in range(20):
+            await router.chat(MESSAGES, config)
+
+    asyncio.run(main())
+    throttled = get_limiter('throttled', 'shared-model').stats()
+    healthy = get_limiter('stub', 'shared-model').stats()
+    assert throttled['overloads'] > 0
+    assert throttled['limit'] < healthy['limit']
+    assert healthy['overloads'] == 0
+
+
+def _half_open_router():
+    from src.reasoning.llm.router import CircuitState
+
+    router = LlmRouter('stub/probe-model', cooldown=0)
+    backend = router.backends[0]
+    router._services[backend.name] = StubLlmService(delay=1.0)
+    stats = router._stats[backend.name]
+    stats.state = CircuitState.OPEN
+    stats.opened_at = 0.0
+    return router, stats
+
+
+def test_cancelled_half_open_probe_can_be_retried():
+    from src.reasoning.llm.router import CircuitState
+
+    async def probe(call):
+        router, stats = _half_open_router()
+        task = asyncio.ensure_future(call(router))
+        await asyncio.sleep(0.05)
+        assert stats.state == CircuitState.HALF_OPEN and stats.probing
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return stats, router._available(stats, 0.0)
+
+    async def chat(router):
+        await router.chat(MESSAGES)
+
+    async def stream(router):
+        async for _ in router.chat_stream(MESSAGES):
+            pass
+
+    for call in (chat, stream):
+        stats, available = asyncio.run(probe(call))
+        assert stats.state == CircuitState.HALF_OPEN
+        assert not stats.probing and available
+        assert stats.inflight == 0
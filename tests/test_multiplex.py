@@ -0,0 +1,157 @@
+"""
+流多路复用测试
+"""
+
+import os
+import sys
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import multiplex
+from src.perception.channel import EventChannel
+
+
+async def collect(iterator):
+    async with aclosing(iterator) as items:
+        return [item async for item in items]
+
+
+def test_drains_queue_after_producer_finishes():
+    async def main():
+        queue = asyncio.Queue()
+
+        async def produce():
+            queue.put_nowait(1)
+            await asyncio.sleep(0.01)
+            for i in (2, 3, 4):
+                queue.put_nowait(i)
+
+        return await asyncio.wait_for(collect(multiplex(queue, asyncio.create_task(produce()))), 1.0)
+
+    assert asyncio.run(main()) == [1, 2, 3, 4]
+
+
+def test_producer_finished_before_iteration():
+    async def main():
+        queue = asyncio.Queue()
+
+        async def produce():
+            for i in range(3):
+                queue.put_nowait(i)
+
+        task = asyncio.create_task(produce())
+        await task
+        return await asyncio.wait_for(collect(multiplex(queue, task)), 1.0)
+
+    assert asyncio.run(main()) == [0, 1, 2]
+
+
+def test_waits_for_all_producers():
+    async def main():
+        queue = asyncio.Queue()
+
+        async def produce(value, delay):
+            await asyncio.sleep(delay)
+            queue.put_nowait(value)
+
+        tasks = [asyncio.create_task(produce("fast", 0)), asyncio.create_task(produce("slow", 0.02))]
+        return await asyncio.wait_for(collect(multiplex(queue, *tasks)), 1.0)
+
+    assert asyncio.run(main()) == ["fast", "slow"]
+
+
+def test_producer_error_propagates():
+    async def main():
+        queue = asyncio.Queue()
+        received = []
+
+        async def produce():
+            queue.put_nowait("before")
+            await asyncio.sleep(0.01)
+            raise ValueError("producer failed")
+
+        with pytest.raises(ValueError, match="producer failed"):
+            async with aclosing(multiplex(queue, asyncio.create_task(produce()))) as items:
+                async for item in items:
+                    received.append(item)
+        return received
+
+    assert asyncio.run(main()) == ["before"]
+
+
+def test_producer_error_ignored_when_not_raising():
+    async def main():
+        queue = asyncio.Queue()
+
+        async def produce():
+            queue.put_nowait("before")
+            raise ValueError("producer failed")
+
+        task = asyncio.create_task(produce())
+        return await asyncio.wait_for(collect(multiplex(queue, task, raise_errors=False)), 1.0)
+
+    assert asyncio.run(main()) == ["before"]
+
+
+def test_ends_when_channel_closed():
+    async def main():
+        channel = EventChannel()
+
+        async def produce():
+            channel.put("a")
+            await asyncio.sleep(0.01)
+            channel.put("b")
+            channel.close()
+
+        task = asyncio.create_task(produce())
+        items = await asyncio.wait_for(collect(multiplex(channel)), 1.0)
+        await task
+        return items
+
+    assert asyncio.run(main()) == ["a", "b"]
+
+
+def test_stop_ends_without_delivering_buffered_events():
+    async def main():
+        queue = asyncio.Queue()
+        stop = asyncio.Event()
+        received = []
+
+        async def consume():
+            async with aclosing(multiplex(queue, stop=stop)) as items:
+                async for item in items:
+                    received.append(item)
+
+        consumer = asyncio.create_task(consume())
+        queue.put_nowait(1)
+        await asyncio.sleep(0.01)
+        stop.set()
+        queue.put_nowait(2)
+        await asyncio.wait_for(consumer, 1.0)
+        return received
+
+    assert asyncio.run(main()) == [1]
+
+
+def test_closing_early_cancels_pending_waits():
+    async def main():
+        queue = asyncio.Queue()
+        producer = asyncio.create_task(asyncio.sleep(10))
+        queue.put_nowait("first")
+        async with aclosing(multiplex(queue, producer, stop=asyncio.Event())) as items:
+            async for item in items:
+                break
+        await asyncio.sleep(0)
+        leftovers = [t for t in asyncio.all_tasks() if t is not asyncio.current_task() and t is not producer]
+        producer.cancel()
+        return item, leftovers
+
+    item, leftovers = asyncio.run(main())
+    assert item == "first"
+    assert leftovers == []
@@ -0,0 +1,112 @@
+"""
+会话管理器分片过期堆测试
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.orchestrator.session import SessionManager, SessionConfig
+
+FAR_FUTURE = 4102444800.0  # 2100-01-01
+
+
+def manager(**kwargs):
+    # 单分片便于直接检查过期堆
+    return SessionManager(shards=1, **kwargs)
+
+
+def heap(sessions):
+    return sessions._shards[0].expiry
+
+
+def registered(sessions):
+    return sum(len(shard.sessions) for shard in sessions._shards)
+
+
+def test_touch_requeues_lazily():
+    sessions = manager()
+    session = sessions.create("client", SessionConfig(timeout_seconds=10))
+    first_deadline = session.expires_at.timestamp()
+
+    session.config.timeout_seconds = 100
+    session.touch()
+    # touch 不访问注册表，堆中仍是旧截止时间
+    assert heap(sessions) == [(first_deadline, session.session_id)]
+
+    assert sessions._cleanup_expired(now=first_deadline) == 0
+    assert sessions.get(session.session_id) is session
+    assert heap(sessions) == [(session.expires_at.timestamp(), session.session_id)]
+
+    assert sessions._cleanup_expired(now=session.expires_at.timestamp()) == 1
+    assert sessions.get(session.session_id) is None
+    assert sessions.count() == 0
+
+
+def test_closed_session_is_reclaimed_on_next_tick():
+    sessions = manager()
+    session = sessions.create("client")
+    sessions.close(session.session_id)
+    assert sessions.count() == 1
+
+    assert sessions._cleanup_expired(now=session.updated_at.timestamp()) == 1
+    assert sessions.get(session.session_id) is None
+    assert sessions.count() == 0
+    # 创建时入堆的原条目留到到期时丢弃
+    assert len(heap(sessions)) == 1
+    assert sessions._cleanup_expired(now=FAR_FUTURE) == 0
+    assert heap(sessions) == []
+
+
+def test_deleted_session_leaves_stale_entry_that_is_skipped():
+    sessions = manager()
+    session = sessions.create("client")
+    assert sessions.delete(session.session_id)
+    assert not sessions.delete(session.session_id)
+    assert sessions.count() == 0
+    assert len(heap(sessions)) == 1
+
+    assert sessions._cleanup_expired(now=FAR_FUTURE) == 0
+    assert heap(sessions) == []
+    assert sessions.count() == 0
+
+
+def test_create_at_capacity_pops_only_due_entries():
+    sessions = manager(max_sessions=2)
+    expired = sessions.create("client", SessionConfig(timeout_seconds=0))
+    alive = sessions.create("client")
+
+    third = sessions.create("client")
+    assert sessions.get(expired.session_id) is None
+    assert {s.session_id for s in sessions.list()} == {alive.session_id, third.session_id}
+    assert sorted(session_id for _, session_id in heap(sessions)) == sorted(
+        [alive.session_id, third.session_id]
+    )
+
+    with pytest.raises(RuntimeError):
+        sessions.create("client")
+    assert sessions.count() == registered(sessions) == 2
+
+
+def test_count_stays_consistent_across_delete_and_cleanup():
+    sessions = manager(max_sessions=10)
+    created = [sessions.create("client") for _ in range(5)]
+
+    # 关闭后在清理前删除：清理不能再次扣减计数
+    sessions.close(created[0].session_id)
+    sessions.delete(created[0].session_id)
+    sessions.close(created[1].session_id)
+    sessions.delete(created[2].session_id)
+    assert sessions.count() == registered(sessions) == 3
+
+    assert sessions._cleanup_expired(now=created[1].updated_at.timestamp()) == 1
+    assert sessions.count() == registered(sessions) == 2
+
+    assert sessions._cleanup_expired(now=FAR_FUTURE) == 2
+    assert sessions.count() == registered(sessions) == 0
+    assert heap(sessions) == []
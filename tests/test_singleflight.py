@@ -0,0 +1,167 @@
+"""
+在途请求合并测试
+"""
+
+import os
+import sys
+import gc
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import SingleFlight, StreamSingleFlight, FlightCancelledError
+from src.reasoning.llm.base import LlmService, LlmConfig, Message, MessageRole, LlmResponse, StreamChunk
+from src.reasoning.llm.singleflight import SingleFlightLlmService
+
+
+class _Source:
+    """可观察的上游流：每 gap 秒产生一个片段，记录是否被关闭"""
+
+    def __init__(self, items=100, gap=0.005):
+        self.items = items
+        self.gap = gap
+        self.produced = 0
+        self.closed = False
+
+    async def __call__(self):
+        try:
+            for i in range(self.items):
+                await asyncio.sleep(self.gap)
+                self.produced += 1
+                yield i
+        finally:
+            self.closed = True
+
+
+def test_singleflight_shares_result():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def main():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do('k', fetch) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert [r for r, _ in results] == [42] * 5
+    assert sum(shared for _, shared in results) == 4
+
+
+def test_stream_late_joiner_replays_buffer():
+    source = _Source(items=10)
+
+    async def main():
+        flights = StreamSingleFlight()
+        first = flights.subscribe('k', source)
+        head = [await first.__anext__() for _ in range(3)]
+        late = [item async for item in flights.subscribe('k', source)]
+        rest = [item async for item in first]
+        return head + rest, late
+
+    first, late = asyncio.run(main())
+    assert first == list(range(10))
+    assert late == list(range(10))
+
+
+def test_stream_join_without_iterating_releases_upstream():
+    source = _Source()
+
+    async def main():
+        flights = StreamSingleFlight()
+        subscription, shared = flights.join('k', source)
+        assert not shared
+        await asyncio.sleep(0.02)
+        del subscription
+        gc.collect()
+        await asyncio.sleep(0.02)
+        return len(flights)
+
+    assert asyncio.run(main()) == 0
+    assert source.closed
+    assert source.produced < source.items
+
+
+def test_stream_last_subscriber_leaving_cancels_upstream():
+    source = _Source()
+
+    async def main():
+        flights = StreamSingleFlight()
+        async for item in flights.subscribe('k', source):
+            if item == 2:
+                break
+        await asyncio.sleep(0.02)
+
+    asyncio.run(main())
+    assert source.closed
+    assert source.produced < source.items
+
+
+def test_stream_cancelled_upstream_is_regular_error():
+    source = _Source()
+
+    async def main():
+        flights = StreamSingleFlight()
+        subscription, _ = flights.join('k', source)
+        await subscription.__anext__()
+        subscription.flight._task.cancel()
+        with pytest.raises(FlightCancelledError):
+            async for _item in subscription:
+                pass
+        # 订阅者所在的任务本身未被取消
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+
+
+class _SlowEcho(LlmService):
+    """较慢的上游替身：记录调用次数，回答固定的 10 个片段"""
+
+    def __init__(self):
+        self.calls = 0
+
+    @property
+    def provider_name(self):
+        return "echo"
+
+    async def chat(self, messages, config=None):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        return LlmResponse(content="0123456789", finish_reason="stop")
+
+    async def chat_stream(self, messages, config=None):
+        self.calls += 1
+        await asyncio.sleep(0.02)
+        for i in range(10):
+            await asyncio.sleep(0.002)
+            yield StreamChunk(delta=str(i), finish_reason="stop" if i == 9 else None)
+
+
+def test_llm_coalesces_only_deterministic_requests():
+    messages = [Message(role=MessageRole.USER, content='你好')]
+
+    async def run(temperature):
+        inner = _SlowEcho()
+        service = SingleFlightLlmService(inner)
+        config = LlmConfig(model='echo', temperature=temperature)
+
+        async def one():
+            return ''.join([chunk.delta async for chunk in service.chat_stream(messages, config)])
+
+        texts = await asyncio.gather(*(one() for _ in range(4)))
+        await asyncio.gather(*(service.chat(messages, config) for _ in range(4)))
+        return inner.calls, texts
+
+    calls, texts = asyncio.run(run(0))
+    assert calls == 2
+    assert len(set(texts)) == 1
+    calls, _ = asyncio.run(run(0.7))
+    assert calls == 8
@@ -0,0 +1,161 @@
+"""
+推测生成测试（以 FakeLlmService 作为 LLM）
+"""
+
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.infra import LatencyDistribution
+from src.reasoning.llm import LlmConfig, Message, MessageRole
+from src.reasoning.llm.fake import FakeLlmService
+from src.orchestrator.speculation import SpeculativeGenerator
+
+STABLE_MS = 20
+
+
+class Generator:
+    """按用户文本打开 FakeLlmService 输出流，记录打开与被取消的流"""
+
+    def __init__(self, token_gap_ms=1.0):
+        self.llm = FakeLlmService(
+            ttft=LatencyDistribution(5, 0), token_gap=LatencyDistribution(token_gap_ms, 0), tokens=5
+        )
+        self.opened = []
+        self.cancelled = []
+
+    async def __call__(self, text):
+        self.opened.append(text)
+        messages = [Message(role=MessageRole.USER, content=text)]
+        try:
+            async for chunk in self.llm.chat_stream(messages, LlmConfig(model="fake-speculation")):
+                yield chunk.delta
+        except asyncio.CancelledError:
+            self.cancelled.append(text)
+            raise
+
+
+async def settle():
+    await asyncio.sleep(STABLE_MS / 1000 * 3)
+
+
+async def collect(speculation):
+    return [delta async for delta in speculation.stream()]
+
+
+def test_matching_final_commits_speculation():
+    async def main():
+        generate = Generator()
+        speculator = SpeculativeGenerator(generate, STABLE_MS, name="test")
+        speculator.observe_partial("今天天气怎么样")
+        await settle()
+        speculator.observe_final("今天天气怎么样？")
+        speculation = speculator.claim("今天天气怎么样？")
+        deltas = await collect(speculation)
+        speculator.release()
+        speculator.close()
+        return generate, speculator.stats, deltas
+
+    generate, stats, deltas = asyncio.run(main())
+    assert generate.opened == ["今天天气怎么样"]
+    assert len(deltas) == 5
+    assert (stats.started, stats.committed, stats.cancelled) == (1, 1, 0)
+    assert stats.committed_chunks == 5 and stats.saved_ms > 0
+
+
+def test_diverging_partial_cancels_and_restarts():
+    async def main():
+        generate = Generator(token_gap_ms=50)
+        speculator = SpeculativeGenerator(generate, STABLE_MS, name="test")
+        speculator.observe_partial("帮我订")
+        await settle()
+        speculator.observe_partial("帮我订一张机票")
+        await asyncio.sleep(0)
+        cancelled = list(generate.cancelled)
+        await settle()
+        speculator.observe_final("帮我订一张机票")
+        speculation = speculator.claim("帮我订一张机票")
+        speculator.release()
+        speculator.close()
+        return generate, speculator.stats, cancelled, speculation
+
+    generate, stats, cancelled, speculation = asyncio.run(main())
+    assert cancelled == ["帮我订"]
+    assert generate.opened == ["帮我订", "帮我订一张机票"]
+    assert speculation is not None and speculation.text == "帮我订一张机票"
+    assert stats.cancelled == 1 and stats.committed == 1
+
+
+def test_mismatching_final_falls_back_to_normal_generation():
+    async def main():
+        speculator = SpeculativeGenerator(Generator(), STABLE_MS, name="test")
+        speculator.observe_partial("打开空调")
+        await settle()
+        speculator.observe_final("打开窗户")
+        speculation = speculator.claim("打开窗户")
+        speculator.release()
+        speculator.close()
+        return speculator.stats, speculation
+
+    stats, speculation = asyncio.run(main())
+    assert speculation is None
+    assert stats.cancelled == 1 and stats.committed == 0
+
+
+def test_claim_turn_with_merged_and_interrupted_turns():
+    async def main():
+        generate = Generator()
+        speculator = SpeculativeGenerator(generate, STABLE_MS, name="test")
+
+        async def sentence(text):
+            speculator.observe_partial(text)
+            await settle()
+            speculator.observe_final(text)
+
+        # 生成期间到达两句（第一句已推测，第二句因有待 claim 的句子不再推测），合并为一个轮次
+        await sentence("第一句")
+        await sentence("第二句")
+        merged = speculator.claim_turn(["第一句", "第二句"], merged=True)
+        speculator.release()
+
+        # 单句轮次提交推测；该轮被打断后与新句子合并重新生成，只有新句子首次参与
+        await sentence("第三句")
+        single = speculator.claim_turn(["第三句"])
+        speculator.release()
+        await sentence("第四句")
+        retried = speculator.claim_turn(["第四句"], merged=True)
+        speculator.release()
+        speculator.close()
+        return generate, speculator.stats, merged, single, retried
+
+    generate, stats, merged, single, retried = asyncio.run(main())
+    assert generate.opened == ["第一句", "第三句", "第四句"]
+    assert merged is None and retried is None
+    assert single is not None and single.text == "第三句"
+    assert (stats.committed, stats.cancelled) == (1, 2)
+
+
+def test_release_and_close_cancel_committed_stream():
+    async def run(finish):
+        generate = Generator(token_gap_ms=100)
+        speculator = SpeculativeGenerator(generate, STABLE_MS, name="test")
+        speculator.observe_partial("讲个故事")
+        await settle()
+        speculator.observe_final("讲个故事")
+        speculation = speculator.claim("讲个故事")
+        stream = speculation.stream()
+        await stream.__anext__()
+        finish(speculator)              # 回答被打断 / 会话结束
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        await stream.aclose()
+        return generate, speculation
+
+    for finish in (lambda s: s.release(), lambda s: s.close()):
+        generate, speculation = asyncio.run(run(finish))
+        assert speculation._task.done()
+        assert generate.cancelled == ["讲个故事"]
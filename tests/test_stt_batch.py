@@ -0,0 +1,129 @@
+"""
+非实时批量识别测试
+"""
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+os.environ['STT_CACHE_ENABLED'] = 'false'
+
+from src.perception.stt import SttConfig, SttResult
+from src.perception.stt.base import SttService
+from src.perception.stt.batch import BatchTranscriber, split_at_silence
+
+SEGMENT = 16000 * 2  # 1 秒
+
+
+class StandInService(SttService):
+    """按段识别的替身：记录并发数，可令某一段失败"""
+
+    active = 0
+    peak = 0
+    started = 0
+    cancelled = 0
+
+    def __init__(self, fail_at=None, delay=0.05):
+        super().__init__()
+        self.fail_at = fail_at
+        self.delay = delay
+
+    @property
+    def provider_name(self):
+        return "standin"
+
+    async def start_session(self, config):
+        raise NotImplementedError
+
+    async def send_audio(self, audio_chunk):
+        raise NotImplementedError
+
+    async def stop_session(self):
+        raise NotImplementedError
+
+    async def transcribe_segment(self, audio_data, config):
+        cls = StandInService
+        cls.started += 1
+        cls.active += 1
+        cls.peak = max(cls.peak, cls.active)
+        try:
+            if self.fail_at is not None and bytes(audio_data[:1]) == bytes([self.fail_at]):
+                raise RuntimeError("segment failed")
+            await asyncio.sleep(self.delay)
+            return [SttResult(text=str(audio_data[0]), is_final=True, start_time_ms=0, end_time_ms=1000)]
+        except asyncio.CancelledError:
+            cls.cancelled += 1
+            raise
+        finally:
+            cls.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    for name in ('active', 'peak', 'started', 'cancelled'):
+        setattr(StandInService, name, 0)
+
+
+def transcriber(**kwargs):
+    service_kwargs = kwargs.pop('service', {})
+    batch = BatchTranscriber("standin", segment_s=1, max_concurrency=2,
+                             service_factory=lambda: StandInService(**service_kwargs), **kwargs)
+    batch.split = lambda audio, config: [(i, i + SEGMENT) for i in range(0, len(audio), SEGMENT)]
+    return batch
+
+
+def audio(segments):
+    return b''.join(bytes([i]) * SEGMENT for i in range(segments))
+
+
+def test_split_at_silence_cuts_in_the_middle_of_silences():
+    import numpy as np
+
+    def speech(ms):
+        t = np.arange(ms * 16) / 16000
+        return (8000 * np.sin(2 * np.pi * 440 * t)).astype('<i2').tobytes()
+
+    def silence(ms):
+        return bytes(ms * 32)
+
+    clip = speech(1500) + silence(500) + speech(1500) + silence(500) + speech(1000)
+    bounds = split_at_silence(clip, target_ms=1000)
+    # 切点落在两段静音的中点，剩余不超过 2 * target_ms 时不再切分
+    assert [(b // 32, e // 32) for b, e in bounds] == [(0, 1740), (1740, 3740), (3740, 5000)]
+
+
+def test_results_are_stitched_in_order_on_the_clip_timeline():
+    transcript = asyncio.run(transcriber().transcribe(audio(3), SttConfig()))
+    assert transcript.text == "0 1 2"
+    assert transcript.segments == 3 and transcript.audio_ms == 3000
+    assert [(r.start_time_ms, r.end_time_ms) for r in transcript.results] == [(0, 1000), (1000, 2000), (2000, 3000)]
+    assert StandInService.peak == 2
+
+
+def test_concurrency_is_shared_across_requests():
+    async def main():
+        return await asyncio.gather(*(transcriber().transcribe(audio(4), SttConfig()) for _ in range(3)))
+
+    transcripts = asyncio.run(main())
+    assert [t.text for t in transcripts] == ["0 1 2 3"] * 3
+    assert StandInService.peak == 2
+    # 新的事件循环重新创建限制器
+    assert asyncio.run(transcriber().transcribe(audio(2), SttConfig())).text == "0 1"
+
+
+def test_failed_segment_cancels_pending_segments():
+    async def main():
+        batch = transcriber(service={'fail_at': 1, 'delay': 1.0})
+        with pytest.raises(RuntimeError):
+            await batch.transcribe(audio(6), SttConfig())
+        return StandInService.active
+
+    assert asyncio.run(main()) == 0
+    # 失败段释放的名额可能已被下一段占用，其余段均未开始
+    assert StandInService.started <= 3
+    assert StandInService.cancelled == StandInService.started - 1
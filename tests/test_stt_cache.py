@@ -0,0 +1,116 @@
+"""
+转写缓存测试
+"""
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.stt import SttConfig, SttResult
+from src.perception.stt import cache as stt_cache
+from src.perception.stt import aliyun
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    monkeypatch.setenv('STT_CACHE_ENABLED', 'true')
+    monkeypatch.setattr(stt_cache, '_cache', stt_cache.TranscriptCache(directory=str(tmp_path)))
+    return stt_cache._cache
+
+
+def test_caches_complete_results(cache):
+    calls = []
+
+    async def compute(audio, config):
+        calls.append(audio)
+        return [SttResult(text="你好", is_final=True, start_time_ms=0, end_time_ms=500)]
+
+    async def main():
+        config = SttConfig()
+        first = await stt_cache.cached_transcription(b'\x01' * 3200, config, "fake", compute)
+        second = await stt_cache.cached_transcription(b'\x01' * 3200, config, "fake", compute)
+        restarted = stt_cache.TranscriptCache(directory=cache.directory)
+        key = stt_cache.transcript_key(b'\x01' * 3200, config, "fake")
+        return first, second, await restarted.get(key)
+
+    first, second, from_disk = asyncio.run(main())
+    assert len(calls) == 1
+    assert [r.text for r in second] == [r.text for r in first] == ["你好"]
+    assert [r.text for r in from_disk] == ["你好"]
+
+
+def test_failed_transcription_is_not_cached(cache):
+    async def compute(audio, config):
+        raise asyncio.TimeoutError("incomplete")
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await stt_cache.cached_transcription(b'\x02' * 3200, SttConfig(), "fake", compute)
+        return len(cache.memory)
+
+    assert asyncio.run(main()) == 0
+    assert not any(files for _, _, files in os.walk(cache.directory))
+
+
+class _Sentence:
+    def __init__(self, text):
+        self.text = text
+
+    def get_sentence(self):
+        return {'text': self.text, 'begin_time': 0, 'end_time': 400}
+
+
+class HangingRecognition:
+    """返回一句结果后不再结束任务（模拟识别未在时限内完成）"""
+
+    def __init__(self, model, format, sample_rate, callback):
+        self.callback = callback
+        self.sent = False
+
+    def start(self):
+        pass
+
+    def send_audio_frame(self, buffer):
+        if not self.sent:
+            self.sent = True
+            self.callback.on_event(_Sentence("只识别了一半"))
+
+    def stop(self):
+        pass
+
+
+def test_aliyun_timeout_raises_and_skips_cache(cache, monkeypatch):
+    from dashscope.audio import asr
+
+    monkeypatch.setattr(asr, 'Recognition', HangingRecognition)
+    real_wait_for = asyncio.wait_for
+    monkeypatch.setattr(aliyun.asyncio, 'wait_for', lambda aw, timeout: real_wait_for(aw, 0.05))
+
+    async def main():
+        service = aliyun.AliyunSttService(api_key='sk-test')
+        with pytest.raises(asyncio.TimeoutError):
+            await service.transcribe_once(b'\x03' * 6400, SttConfig())
+        return len(cache.memory)
+
+    assert asyncio.run(main()) == 0
+
+
+def test_key_covers_result_affecting_config():
+    from dataclasses import replace
+
+    audio = b'\x04' * 3200
+    base = SttConfig()
+    key = stt_cache.transcript_key(audio, base, "aliyun")
+    for change in (
+        {'hotwords': ['通义']}, {'enable_itn': False}, {'enable_words': True},
+        {'max_sentence_silence': 400}, {'enable_vad': not base.enable_vad}, {'language': 'en-US'},
+    ):
+        assert stt_cache.transcript_key(audio, replace(base, **change), "aliyun") != key, change
+    # 只影响传输的字段不改变键
+    assert stt_cache.transcript_key(audio, replace(base, idle_timeout_s=5, max_duration_s=60), "aliyun") == key
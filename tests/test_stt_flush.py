@@ -0,0 +1,134 @@
+"""
+提前结束（合成最终结果）后 Provider 结果处理测试
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.stt import SttResult
+from src.perception.stt.base import SttService
+
+
+class StandInService(SttService):
+    @property
+    def provider_name(self):
+        return "standin"
+
+    async def start_session(self, session_id, config):
+        pass
+
+    async def send_audio(self, audio_chunk):
+        pass
+
+    async def stop_session(self):
+        pass
+
+
+def session():
+    service = StandInService()
+    partials, finals = [], []
+    service.on_partial(partials.append)
+    service.on_final(finals.append)
+    return service, partials, finals
+
+
+def result(text, is_final):
+    return SttResult(text=text, is_final=is_final, start_time_ms=1000)
+
+
+def test_flush_emits_last_partial_as_final():
+    import asyncio
+
+    service, _, finals = session()
+    service._emit_partial(result("今天天气", False))
+    asyncio.run(service.flush())
+    # 已发出的部分去掉后只剩标点：丢弃
+    service._emit_final(result("今天天气。", True))
+    assert [r.text for r in finals] == ["今天天气"]
+    # 没有新的中间结果时不再发出
+    asyncio.run(service.flush())
+    assert len(finals) == 1
+
+
+def test_provider_final_after_flush_keeps_continued_speech():
+    service, _, finals = session()
+    service._emit_partial(result("今天天气", False))
+    assert service._flush_partial()
+    service._emit_final(result("今天天气，怎么样？", True))
+    assert [(r.text, r.is_correction) for r in finals] == [("今天天气", False), ("怎么样？", False)]
+
+
+def test_provider_final_revising_flushed_text_is_emitted_as_correction():
+    service, partials, finals = session()
+    service._emit_partial(result("今天天汽", False))
+    service._flush_partial()
+    service._emit_partial(result("今天天气", False))
+    service._emit_final(result("今天天气。", True))
+    # 改写的中间结果丢弃，最终结果整句下发并标记为修正
+    assert [r.text for r in partials] == ["今天天汽"]
+    assert [(r.text, r.is_correction) for r in finals] == [("今天天汽", False), ("今天天气。", True)]
+    assert finals[-1].to_dict()['is_correction'] is True
+    # 下一句恢复正常
+    service._emit_final(SttResult(text="好的。", is_final=True, start_time_ms=5000))
+    assert not finals[-1].is_correction
+
+
+class CorrectingService(StandInService):
+    """第一块音频后提前结束句子，结束会话时 Provider 给出改写后的最终结果"""
+
+    def __init__(self, **kwargs):
+        super().__init__()
+        self.chunks = 0
+
+    async def send_audio(self, audio_chunk):
+        self.chunks += 1
+        if self.chunks == 1:
+            self._emit_partial(result("今天天汽", False))
+            self._flush_partial()
+
+    async def stop_session(self):
+        if self.chunks:
+            self._emit_final(result("今天天气。", True))
+            self.chunks = 0
+
+
+def test_orchestrator_does_not_answer_correction_again(monkeypatch):
+    import asyncio
+    from src.perception.stt import SttRegistry
+    from src.orchestrator.engine import Orchestrator
+    from src.orchestrator.events import ModalityType
+    from src.orchestrator.task import Task
+
+    SttRegistry.register('correcting', CorrectingService)
+    orchestrator = Orchestrator(stt_provider='correcting')
+    asked = []
+
+    async def should_invoke_agent(task, event):
+        return True
+
+    async def invoke_agent(task, step_id, on_thinking):
+        asked.append([e.content for e in task.perception_buffer])
+        yield {"type": "answer"}
+
+    monkeypatch.setattr(orchestrator.trigger, 'should_invoke_agent', should_invoke_agent)
+    monkeypatch.setattr(orchestrator, '_invoke_agent', invoke_agent)
+
+    async def audio():
+        for _ in range(3):
+            yield bytes(640)
+
+    async def main():
+        task = Task(task_id='t1', instruction='', input_modalities=[ModalityType.AUDIO])
+        seen = []
+        async for _ in orchestrator.execute(task, audio(), on_perception=seen.append):
+            pass
+        return seen
+
+    seen = asyncio.run(main())
+    assert asked == [["今天天汽"]]
+    assert [e.content for e in seen] == ["今天天汽", "今天天汽", "今天天气。"]
+    assert seen[-1].metadata == {"correction": True}
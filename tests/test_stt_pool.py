@@ -0,0 +1,105 @@
+"""
+STT 识别会话预热池测试（以本地替身代替 DashScope Recognition）
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.stt.pool import SttSessionPool
+
+KEY = ("paraformer-realtime-v2", 16000)
+
+
+class StandInRecognition:
+    """stop() 像 SDK 一样阻塞等待工作线程结束"""
+
+    stop_seconds = 0.2
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.frames = 0
+        self.stopped = False
+
+    def send_audio_frame(self, buffer):
+        self.frames += 1
+
+    def stop(self):
+        time.sleep(self.stop_seconds)
+        self.stopped = True
+
+
+def _pool(**kwargs):
+    opened = []
+
+    def opener(key, callback):
+        recognition = StandInRecognition(callback)
+        opened.append(recognition)
+        return recognition
+
+    return SttSessionPool(size=2, max_total=8, warm_keys=[KEY], opener=opener, **kwargs), opened
+
+
+async def _warm(pool):
+    await pool.start()
+    for _ in range(100):
+        if len(pool._idle.get(KEY, [])) == pool.size:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_keepalive_is_opt_in():
+    async def main(keepalive):
+        pool, opened = _pool(keepalive=keepalive, max_idle=60)
+        await _warm(pool)
+        pool.maintain()
+        pool.maintain()
+        await pool.close()
+        return [r.frames for r in opened]
+
+    assert asyncio.run(main(False)) == [0, 0]
+    assert asyncio.run(main(True)) == [2, 2]
+
+
+def test_eviction_does_not_block_event_loop():
+    async def main():
+        pool, opened = _pool(max_idle=0)
+        await _warm(pool)
+        begin = time.perf_counter()
+        pool.maintain()
+        elapsed = time.perf_counter() - begin
+        await pool.close()
+        return elapsed, opened
+
+    elapsed, opened = asyncio.run(main())
+    assert elapsed < StandInRecognition.stop_seconds / 4
+    # close() 等待后台 stop 完成
+    assert opened and all(r.stopped for r in opened[:2])
+
+
+def test_idle_error_callback_marks_unhealthy():
+    class Target:
+        events = []
+
+        def on_event(self, result):
+            self.events.append(result)
+
+    async def main():
+        pool, opened = _pool()
+        await _warm(pool)
+        idle = list(pool._idle[KEY])
+        idle[-1].callback.on_error("connection reset")
+        entry = await pool.acquire(KEY, Target())
+        stats = pool.stats()
+        await pool.close()
+        return idle, entry, stats
+
+    idle, entry, stats = asyncio.run(main())
+    assert entry is idle[0]
+    assert stats['evicted'] >= 1
+    assert stats['hits'] == 1
@@ -0,0 +1,63 @@
+"""
+STT 中间结果稳定化测试
+"""
+
+import os
+import sys
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.stt import SttResult
+from src.perception.stt.stabilizer import PartialStabilizer
+
+
+def partial(text):
+    return SttResult(text=text, is_final=False)
+
+
+def test_delta_reconstructs_sentence():
+    stabilizer = PartialStabilizer(enable_delta=True)
+    client = ""
+    for text in ["今天", "今天天气", "今天天气很好"]:
+        out = stabilizer.partial(partial(text))
+        client = client[:out.stable_prefix_len] + out.text
+    assert client == "今天天气很好"
+    assert stabilizer.final(SttResult(text="今天天气很好。", is_final=True)).stable_prefix_len == 6
+
+
+def test_throttled_partial_is_delivered_when_interval_expires():
+    async def main():
+        delivered = []
+        stabilizer = PartialStabilizer(enable_delta=False, interval_ms=50, on_trailing=delivered.append)
+        sent = [stabilizer.partial(partial("你"))]
+        # SDK 线程上的中间结果在间隔内被节流
+        worker = threading.Thread(target=lambda: [stabilizer.partial(partial(t)) for t in ("你好", "你好吗")])
+        worker.start()
+        worker.join()
+        await asyncio.sleep(0.1)
+        stabilizer.close()
+        return sent, delivered, stabilizer.stats
+
+    sent, delivered, stats = asyncio.run(main())
+    assert [r.text for r in sent] == ["你"]
+    assert [r.text for r in delivered] == ["你好吗"]
+    assert stats.throttled == 2 and stats.trailing == 1
+
+
+def test_final_cancels_trailing_delivery():
+    async def main():
+        delivered = []
+        stabilizer = PartialStabilizer(enable_delta=True, interval_ms=50, on_trailing=delivered.append)
+        stabilizer.partial(partial("你"))
+        stabilizer.partial(partial("你好"))
+        final = stabilizer.final(SttResult(text="你好。", is_final=True))
+        await asyncio.sleep(0.1)
+        return final, delivered
+
+    final, delivered = asyncio.run(main())
+    assert final.text == "你好。" and not final.is_delta
+    assert delivered == []
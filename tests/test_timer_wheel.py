@@ -0,0 +1,213 @@
+"""
+时间轮与会话截止时间测试
+"""
+
+import os
+import sys
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception import timer_wheel
+from src.perception.timer_wheel import TimerWheel, SessionDeadlines
+
+
+class Clock:
+    """替换时间轮模块的 time，由测试手动推进"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(timer_wheel, 'time', clock)
+    return clock
+
+
+def run(clock, test):
+    """在事件循环中执行 test(wheel, advance)，不让出控制权，由 advance(t) 推进时钟与时间轮"""
+    async def main():
+        wheel = TimerWheel(tick=1.0, slots=8)
+
+        def advance(now):
+            clock.now = now
+            wheel.advance(now)
+
+        try:
+            return test(wheel, advance)
+        finally:
+            wheel.close()
+
+    return asyncio.run(main())
+
+
+def test_timers_fire_in_deadline_order(clock):
+    def test(wheel, advance):
+        fired = []
+        for delay in (3, 1, 13, 2):
+            wheel.call_later(delay, fired.append, delay)
+
+        advance(1)
+        first = list(fired)
+        # 13 秒的定时器与 5 秒落在同一槽位，经过时不能提前触发
+        advance(10)
+        second = list(fired)
+        advance(13)
+        return first, second, fired, len(wheel)
+
+    first, second, fired, remaining = run(clock, test)
+    assert first == [1]
+    assert second == [1, 2, 3]
+    assert fired == [1, 2, 3, 13]
+    assert remaining == 0
+
+
+def test_long_pause_fires_overdue_timers_in_order(clock):
+    def test(wheel, advance):
+        fired = []
+        later = wheel.call_later(7, fired.append, 7)
+        wheel.call_later(20, fired.append, 20)
+        # 先到期的回调取消了同一次补扫中稍后到期的定时器
+        wheel.call_later(6, lambda: (fired.append(6), later.cancel()))
+        wheel.call_later(2, fired.append, 2)
+        advance(12)
+        caught_up = list(fired)
+        advance(20)
+        return caught_up, fired, len(wheel)
+
+    caught_up, fired, remaining = run(clock, test)
+    assert caught_up == [2, 6]
+    assert fired == [2, 6, 20]
+    assert remaining == 0
+
+
+def test_cancelled_timer_does_not_fire(clock):
+    def test(wheel, advance):
+        fired = []
+        kept = wheel.call_later(2, fired.append, "kept")
+        dropped = wheel.call_later(2, fired.append, "dropped")
+        dropped.cancel()
+        dropped.touch(1)
+        count = len(wheel)
+        advance(5)
+        return fired, count, kept.active, dropped.active
+
+    fired, count, kept_active, dropped_active = run(clock, test)
+    assert fired == ["kept"]
+    assert count == 1
+    assert not kept_active and not dropped_active
+
+
+def test_touch_postpones_and_rearms(clock):
+    def test(wheel, advance):
+        fired = []
+        timer = wheel.call_later(2, fired.append, "x")
+        advance(1)
+        timer.touch(3)
+        advance(3)
+        postponed = list(fired)
+        advance(4)
+        once = list(fired)
+        # 已触发的定时器 touch 后重新落槽
+        timer.touch(2)
+        active = timer.active
+        advance(6)
+        return postponed, once, active, fired, len(wheel)
+
+    postponed, once, active, fired, remaining = run(clock, test)
+    assert postponed == []
+    assert once == ["x"]
+    assert active
+    assert fired == ["x", "x"]
+    assert remaining == 0
+
+
+def test_touch_earlier_moves_timer_forward(clock):
+    def test(wheel, advance):
+        fired = []
+        timer = wheel.call_later(6, fired.append, "x")
+        timer.touch(2)
+        advance(2)
+        return fired, len(wheel)
+
+    assert run(clock, test) == (["x"], 0)
+
+
+def test_session_deadlines_keepalive_and_idle(clock):
+    def test(wheel, advance):
+        events = []
+        deadlines = SessionDeadlines(
+            on_keepalive=lambda: events.append("keepalive"), keepalive_interval=2,
+            on_expire=events.append, idle_timeout=5, wheel=wheel,
+        )
+        advance(2)
+        advance(4)
+        keepalives = list(events)
+        # 未发往上游的音频只推后空闲截止时间，保活照常重复
+        deadlines.touch(forwarded=False)
+        advance(6)
+        after_touch = list(events)
+        advance(9)
+        return keepalives, after_touch, events, len(wheel)
+
+    keepalives, after_touch, events, remaining = run(clock, test)
+    assert keepalives == ["keepalive", "keepalive"]
+    assert after_touch == ["keepalive"] * 3
+    # 到期后取消全部定时器，保活不再重复
+    assert events == ["keepalive"] * 4 + ["idle_timeout"]
+    assert remaining == 0
+
+
+def test_forwarded_audio_postpones_keepalive(clock):
+    def test(wheel, advance):
+        events = []
+        deadlines = SessionDeadlines(
+            on_keepalive=lambda: events.append("keepalive"), keepalive_interval=2, wheel=wheel,
+        )
+        for now in (1, 2, 3):
+            advance(now)
+            deadlines.touch()
+        advance(4)
+        before = list(events)
+        advance(5)
+        deadlines.cancel()
+        return before, events, len(wheel)
+
+    assert run(clock, test) == ([], ["keepalive"], 0)
+
+
+def test_session_deadlines_max_duration_ignores_touch(clock):
+    def test(wheel, advance):
+        events = []
+        deadlines = SessionDeadlines(
+            on_expire=events.append, idle_timeout=3, max_duration=5, wheel=wheel,
+        )
+        for now in (2, 4):
+            advance(now)
+            deadlines.touch()
+        advance(5)
+        return events, len(wheel)
+
+    assert run(clock, test) == (["max_duration"], 0)
+
+
+def test_driver_task_fires_timers():
+    async def main():
+        wheel = TimerWheel(tick=0.01, slots=16)
+        done = asyncio.get_running_loop().create_future()
+        wheel.call_later(0.05, done.set_result, "fired")
+        try:
+            return await asyncio.wait_for(done, 1.0)
+        finally:
+            wheel.close()
+
+    assert asyncio.run(main()) == "fired"
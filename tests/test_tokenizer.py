@@ -0,0 +1,75 @@
+"""
+Token 计数测试
+"""
+
+import os
+import sys
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.reasoning.llm import tokenizer as tokenizer_module
+from src.reasoning.llm.base import Message, MessageRole
+from src.reasoning.llm.fake import FakeLlmService
+
+
+def test_counts_with_local_vocabulary():
+    tokenizer = tokenizer_module.Tokenizer()
+    assert tokenizer.exact
+    assert tokenizer.count_text("hello world") == 2
+    message = Message(role=MessageRole.USER, content="hello world")
+    assert tokenizer.count_message(message) == 2 + tokenizer_module.MESSAGE_OVERHEAD
+
+
+def test_batch_matches_single_counts_and_hits_cache():
+    tokenizer = tokenizer_module.Tokenizer()
+    messages = [
+        Message(role=MessageRole.USER, content="今天天气怎么样？"),
+        Message(role=MessageRole.ASSISTANT, content="It is sunny today."),
+        Message(role=MessageRole.USER, content="今天天气怎么样？"),
+    ]
+    counts = tokenizer.count_batch(messages)
+    assert counts[0] == counts[2]
+    assert counts == [tokenizer.count_text(m.content) + tokenizer_module.MESSAGE_OVERHEAD for m in messages]
+    hits = tokenizer.stats()["hits"]
+    assert tokenizer.count_messages(messages) == sum(counts)
+    assert tokenizer.stats()["hits"] == hits + 3
+
+
+def test_falls_back_to_estimate_without_vocabulary():
+    tokenizer = tokenizer_module.Tokenizer(vocab_file="/nonexistent/qwen.tiktoken")
+    assert not tokenizer.exact
+    # 中文约 1.5 字符/token，其余约 4 字符/token
+    assert tokenizer.count_text("今天天气") == 3
+    assert tokenizer.count_text("sunny today") == 3
+
+
+def test_warm_loads_vocabulary_off_loop(monkeypatch):
+    tokenizer = tokenizer_module.Tokenizer()
+    monkeypatch.setattr(tokenizer_module, '_tokenizer', tokenizer)
+    loaded_on = []
+    real = tokenizer.warm
+
+    def warm():
+        loaded_on.append(threading.current_thread())
+        return real()
+
+    monkeypatch.setattr(tokenizer, 'warm', warm)
+    exact = asyncio.run(tokenizer_module.warm_tokenizer())
+    assert loaded_on and loaded_on[0] is not threading.main_thread()
+    assert tokenizer._loaded and exact == tokenizer.exact
+
+
+def test_batch_counts_match_request_count():
+    service = FakeLlmService()
+    messages = [
+        Message(role=MessageRole.SYSTEM, content="你是一个助手"),
+        Message(role=MessageRole.USER, content="今天天气怎么样？"),
+        Message(role=MessageRole.ASSISTANT, content="It is sunny today."),
+    ]
+    counts = service.count_tokens_batch(messages)
+    assert len(counts) == 3 and all(c > tokenizer_module.MESSAGE_OVERHEAD for c in counts)
+    assert sum(counts) == service.count_tokens(messages)
@@ -0,0 +1,73 @@
+"""
+对话轮次调度测试
+"""
+
+import os
+import sys
+import asyncio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+os.environ.setdefault('METRICS_ENABLED', 'false')
+
+from src.perception.channel import EventChannel
+from src.orchestrator.turns import TurnScheduler
+
+
+def answered(**kwargs):
+    async def main():
+        source = EventChannel(merge_partials=False, name="test_turns")
+        scheduler = TurnScheduler(source, **kwargs)
+        turns = []
+
+        async def answer(turn):
+            turns.append(turn.text)
+            await asyncio.sleep(0.05)
+
+        async def speak():
+            for text in ("第一句", "第二句", "第三句"):
+                source.put(text)
+                await asyncio.sleep(0.01)
+            source.close()
+
+        await asyncio.gather(scheduler.run(answer), speak())
+        scheduler.close()
+        return turns
+
+    return asyncio.run(main())
+
+
+def test_answers_each_sentence_by_default():
+    assert answered() == ["第一句", "第二句", "第三句"]
+
+
+def test_merge_is_opt_in():
+    assert answered(merge=True) == ["第一句", "第二句 第三句"]
+
+
+def test_barge_in_cancels_and_regenerates_merged_turn():
+    async def main():
+        source = EventChannel(merge_partials=False, name="test_turns")
+        scheduler = TurnScheduler(source, barge_in=True)
+        started, finished = [], []
+
+        async def answer(turn):
+            started.append(turn.text)
+            await asyncio.sleep(0.05)
+            finished.append((turn.text, turn.fresh))
+
+        async def speak():
+            for text in ("第一句", "第二句", "第三句"):
+                source.put(text)
+                await asyncio.sleep(0.01)
+            source.close()
+
+        await asyncio.gather(scheduler.run(answer), speak())
+        scheduler.close()
+        return started, finished, scheduler.stats
+
+    started, finished, stats = asyncio.run(main())
+    assert started == ["第一句", "第一句 第二句", "第一句 第二句 第三句"]
+    # 被打断的轮次不完成；重新生成时只有新句子是首次参与
+    assert finished == [("第一句 第二句 第三句", ["第三句"])]
+    assert stats.interrupted == 2 and stats.turns == 3 and stats.sentences == 3
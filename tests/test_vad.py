@@ -0,0 +1,105 @@
+"""
+本地 VAD 测试
+"""
+
+import os
+import sys
+import math
+import struct
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('LOG_LEVEL', 'ERROR')
+
+from src.perception.vad import VoiceActivityDetector
+
+RATE = 16000
+
+
+def tone(ms, amplitude=8000, freq=220):
+    samples = RATE * ms // 1000
+    return struct.pack(f'<{samples}h', *(int(amplitude * math.sin(2 * math.pi * freq * i / RATE)) for i in range(samples)))
+
+
+def silence(ms):
+    return bytes(RATE * ms // 1000 * 2)
+
+
+def test_drops_long_silence_and_keeps_speech():
+    vad = VoiceActivityDetector(sample_rate=RATE, hangover_ms=200, padding_ms=100)
+    out = vad.process(silence(2000)) + vad.process(tone(500)) + vad.process(silence(2000))
+    # 语音 + padding + hangover，远小于输入
+    assert len(tone(500)) <= len(out) <= len(tone(500) + silence(400))
+    assert vad.stats.dropped_ratio > 0.8
+
+
+def test_flush_forwards_partial_tail_frame():
+    vad = VoiceActivityDetector(sample_rate=RATE)
+    speech = tone(510)  # 25.5 帧
+    out = vad.process(speech)
+    assert len(out) == len(speech) - len(speech) % vad.frame_bytes
+    tail = vad.flush()
+    assert len(tail) == vad.frame_bytes
+    assert (out + tail)[:len(speech)] == speech
+    assert vad.flush() == b""
+
+
+def test_flush_drops_silent_tail_after_hangover():
+    vad = VoiceActivityDetector(sample_rate=RATE, hangover_ms=100)
+    vad.process(tone(200) + silence(1010))
+    assert vad.flush() == b""
+
+
+def test_memoryview_frames_with_partial_tail():
+    vad = VoiceActivityDetector(sample_rate=RATE)
+    speech = tone(510)
+    ring = bytearray(speech)
+    # FrameRing 复用缓冲区：按 30ms 的 memoryview 送入，尾部不足一帧
+    view = memoryview(ring)
+    out = b"".join(vad.process(view[i:i + 960]) for i in range(0, len(ring), 960))
+    ring[:] = bytes(len(ring))  # 缓冲区被复用，剩余部分不能引用它
+    out += vad.process(memoryview(bytes(100)))
+    out += vad.flush()
+    assert out[:len(speech)] == speech
+
+
+def test_fake_stt_with_vad_accepts_unaligned_audio():
+    import asyncio
+    from src.perception.stt import SttConfig
+    from src.perception.stt.fake import FakeSttService
+    from src.perception.stt.batch import BatchTranscriber
+
+    async def main():
+        config = SttConfig(enable_vad=True)
+        await FakeSttService().transcribe_once(bytes(33234), config)
+        await BatchTranscriber('fake', service_factory=FakeSttService).transcribe(bytes(33234), config)
+
+    asyncio.run(main())
+
+
+def test_aliyun_stop_session_stops_recognition_when_vad_flush_fails(monkeypatch):
+    import asyncio
+    from src.perception.stt import aliyun
+
+    class Recognition:
+        stopped = False
+
+        def send_audio_frame(self, buffer):
+            pass
+
+        def stop(self):
+            self.stopped = True
+
+    def broken_flush():
+        raise TypeError("bad tail")
+
+    async def main():
+        service = aliyun.AliyunSttService(api_key='sk-test')
+        recognition = service._recognition = Recognition()
+        service._running = True
+        monkeypatch.setattr(service, '_stop_vad', broken_flush)
+        await service.stop_session()
+        return service, recognition
+
+    service, recognition = asyncio.run(main())
+    assert recognition.stopped
+    assert service._recognition is None and not service._running